@@ -78,6 +78,46 @@ def validate_critical_env_vars():
     
     logger.info("✅ Variables de entorno críticas validadas")
 
+def build_hybrid_search():
+    """Cargar el sistema de búsqueda híbrida (None si no hay vectorstores)"""
+    try:
+        from src.core.hybrid.hybrid_search import HybridSearch
+        vectorstore_path = Path("data/vectorstores")
+        
+        if not all([
+            (vectorstore_path / "bm25.pkl").exists(),
+            (vectorstore_path / "tfidf.pkl").exists(),
+            (vectorstore_path / "transformers.pkl").exists()
+        ]):
+            logger.warning("⚠️ Vectorstores no encontrados, solo funciones de análisis disponibles")
+            return None
+        
+        search = HybridSearch(
+            bm25_vectorstore_path=str(vectorstore_path / "bm25.pkl"),
+            tfidf_vectorstore_path=str(vectorstore_path / "tfidf.pkl"),
+            transformer_vectorstore_path=str(vectorstore_path / "transformers.pkl"),
+            fusion_strategy='weighted'
+        )
+        logger.info("✅ Sistema de búsqueda híbrida inicializado")
+        
+        # Cache semántico para consultas parafraseadas (opt-in: SEMANTIC_CACHE_ENABLED=true)
+        if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true":
+            search.enable_semantic_cache(
+                similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+                max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000")),
+                ttl_seconds=int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+            )
+        return search
+        
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudo inicializar búsqueda híbrida: {e}")
+        return None
+
+# gunicorn --preload (MINEDU_PRELOAD_INDEXES=1 en gunicorn.conf.py): los índices se
+# cargan una vez en el master y los workers comparten sus páginas por copy-on-write
+if os.getenv("MINEDU_PRELOAD_INDEXES") == "1":
+    hybrid_search = build_hybrid_search()
+
 @app.on_event("startup")
 async def startup_event():
     """Inicializar componentes al arrancar la API"""
@@ -100,28 +140,9 @@ async def startup_event():
     # 2. Inicializar procesador adaptativo
     processor = AdaptiveProcessorMINEDU(learning_mode=True)
     
-    # Inicializar sistema de búsqueda híbrida
-    try:
-        from src.core.hybrid.hybrid_search import HybridSearch
-        vectorstore_path = Path("data/vectorstores")
-        
-        if all([
-            (vectorstore_path / "bm25.pkl").exists(),
-            (vectorstore_path / "tfidf.pkl").exists(),
-            (vectorstore_path / "transformers.pkl").exists()
-        ]):
-            hybrid_search = HybridSearch(
-                bm25_vectorstore_path=str(vectorstore_path / "bm25.pkl"),
-                tfidf_vectorstore_path=str(vectorstore_path / "tfidf.pkl"),
-                transformer_vectorstore_path=str(vectorstore_path / "transformers.pkl"),
-                fusion_strategy='weighted'
-            )
-            logger.info("✅ Sistema de búsqueda híbrida inicializado")
-        else:
-            logger.warning("⚠️ Vectorstores no encontrados, solo funciones de análisis disponibles")
-            
-    except Exception as e:
-        logger.warning(f"⚠️ No se pudo inicializar búsqueda híbrida: {e}")
+    # Inicializar sistema de búsqueda híbrida (ya cargado en el master con gunicorn --preload)
+    if hybrid_search is None:
+        hybrid_search = build_hybrid_search()
     
     logger.info("✅ API MINEDU lista")
 
@@ -388,6 +409,10 @@ async def get_system_stats():
         except Exception as e:
             stats_data["model_stats_error"] = str(e)
     
+    # Estadísticas del cache semántico
+    if hybrid_search and hybrid_search.semantic_cache:
+        stats_data["semantic_cache"] = hybrid_search.semantic_cache.get_stats()
+    
     # Estadísticas de sistema
     import psutil
     stats_data["system_resources"] = {
@@ -478,6 +503,25 @@ async def warmup_models():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/memory/report")
+async def get_memory_report():
+    """Memoria por proceso: USS (privada) frente a compartida del master y cada worker"""
+    from src.core.monitoring.memory_report import memory_report
+    
+    report = memory_report()
+    if hybrid_search:
+        report["index_bytes"] = {
+            name: retriever.get_stats().get("index_bytes")
+            for name, retriever in (
+                ("bm25", hybrid_search.bm25_retriever),
+                ("tfidf", hybrid_search.tfidf_retriever),
+                ("transformer", hybrid_search.transformer_retriever)
+            ) if retriever
+        }
+    report["preloaded_indexes"] = os.getenv("MINEDU_PRELOAD_INDEXES") == "1"
+    report["timestamp"] = datetime.now().isoformat()
+    return report
+
 @app.post("/search", response_model=SearchResponse)
 @track_search_metrics("search")
 async def search_documents(search_request: SearchRequest):
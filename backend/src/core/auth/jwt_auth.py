@@ -20,6 +20,7 @@ JWT_EXPIRATION_HOURS = 24
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 class User(BaseModel):
     """Modelo de usuario"""
@@ -175,6 +176,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
     except Exception as e:
         raise credentials_exception
 
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)
+) -> Optional[User]:
+    """Dependencia para endpoints públicos: usuario actual si el token es válido, si no None"""
+    if credentials is None:
+        return None
+    token_data = JWTAuth.verify_token(credentials.credentials)
+    if token_data is None or token_data.username is None:
+        return None
+    if token_data.exp and token_data.exp < datetime.utcnow():
+        return None
+    return JWTAuth.get_user(token_data.username)
+
 async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """Dependencia para verificar rol admin"""
     if "admin" not in current_user.roles:
@@ -255,36 +269,17 @@ async def get_user_from_api_key(credentials: HTTPAuthorizationCredentials = Secu
     
     return user
 
-# Rate limiting básico (en producción usar Redis)
-from collections import defaultdict
-import time
+# Rate limiting: módulo compartido con ventana deslizante O(1)
+# (backend Redis si RATE_LIMIT_REDIS_URL está configurada)
+from src.core.security.rate_limiter import create_rate_limiter
 
-class RateLimiter:
-    """Rate limiter básico por usuario"""
-    
-    def __init__(self, max_requests: int = 100, window_minutes: int = 60):
-        self.max_requests = max_requests
-        self.window_seconds = window_minutes * 60
-        self.requests = defaultdict(list)
-    
-    def is_allowed(self, username: str) -> bool:
-        """Verificar si el usuario puede hacer request"""
-        now = time.time()
-        user_requests = self.requests[username]
-        
-        # Limpiar requests antiguos
-        user_requests[:] = [req_time for req_time in user_requests 
-                           if now - req_time < self.window_seconds]
-        
-        # Verificar límite
-        if len(user_requests) >= self.max_requests:
-            return False
-        
-        # Agregar request actual
-        user_requests.append(now)
-        return True
+JWT_RATE_LIMIT_REQUESTS = int(os.getenv("JWT_RATE_LIMIT_REQUESTS", "100"))
+JWT_RATE_LIMIT_WINDOW_MINUTES = int(os.getenv("JWT_RATE_LIMIT_WINDOW_MINUTES", "60"))
 
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limiter(
+    windows=[("window", JWT_RATE_LIMIT_WINDOW_MINUTES * 60, JWT_RATE_LIMIT_REQUESTS, 0)],
+    key_prefix="ratelimit:jwt"
+)
 
 async def check_rate_limit(current_user: User = Depends(get_current_user)) -> User:
     """Dependencia para verificar rate limiting"""
@@ -133,7 +133,8 @@ class QueryLog(Base):
     __tablename__ = "query_logs"
     
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # NULL para consultas anónimas o de usuarios JWT sin fila en users
+    user_id: Mapped[Optional[UUID]] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     
     # Query information
     query_text: Mapped[str] = mapped_column(Text, nullable=False)
@@ -168,7 +169,7 @@ class QueryLog(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     
     # Relación
-    user: Mapped["User"] = relationship("User", back_populates="queries")
+    user: Mapped[Optional["User"]] = relationship("User", back_populates="queries")
     
     __table_args__ = (
         Index("idx_queries_user_created", "user_id", "created_at"),
@@ -178,6 +179,41 @@ class QueryLog(Base):
         Index("idx_queries_created_at", "created_at"),
     )
 
+class QueryLogHourlyRollup(Base):
+    """Agregados horarios de query_logs mantenidos incrementalmente (dashboard en tiempo constante)"""
+    __tablename__ = "query_log_hourly_rollups"
+    
+    hour_bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    method: Mapped[str] = mapped_column(String(50), primary_key=True)
+    
+    total_queries: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fallback_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sum_processing_time: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sum_confidence: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    max_processing_time: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index("idx_query_rollups_hour", "hour_bucket"),
+    )
+
+class QueryLogLatencyHistogram(Base):
+    """Histograma horario de latencias (percentiles aproximados sin escanear query_logs)"""
+    __tablename__ = "query_log_latency_histogram"
+    
+    # Límites superiores (segundos) de cada bucket; el último bucket es abierto
+    BUCKET_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+    
+    hour_bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    method: Mapped[str] = mapped_column(String(50), primary_key=True)
+    bucket_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Extremos observados en el bucket: acotan la interpolación del percentil
+    min_value: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    max_value: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
 class SystemMetrics(Base):
     """Métricas del sistema para monitoreo y análisis"""
     __tablename__ = "system_metrics"
@@ -0,0 +1,179 @@
+"""
+Buffer write-behind para logs de consultas RAG
+El camino de la petición solo agrega el log a una cola en memoria; una tarea
+de fondo inserta lotes con executemany y actualiza los rollups horarios en
+una única transacción por lote. Los logs pueden llegar con el username del
+usuario autenticado en vez del UUID: se resuelven con una consulta por lote y
+los que no tienen fila en users (usuarios JWT en memoria, anónimos) se guardan
+sin user_id
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import select
+
+from .models import User
+from .repositories import QueryLogRepository
+
+logger = logging.getLogger(__name__)
+
+class QueryLogBuffer:
+    """Cola acotada de QueryLog con flush periódico por lotes"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: List[Dict[str, Any]] = []
+        # Se crean en start(): deben pertenecer al event loop que corre la tarea
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "errors": 0,
+            "unresolved_users": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0
+        }
+
+    def _get_session_factory(self):
+        if self._session_factory is None:
+            from .connection import db_manager
+            self._session_factory = db_manager.get_async_session_factory()
+        return self._session_factory
+
+    def add(
+        self,
+        user_id: Optional[Union[UUID, str]],
+        query_text: str,
+        response_text: str,
+        trace_id: str,
+        method: str,
+        processing_time: float,
+        confidence_score: float,
+        **kwargs
+    ) -> bool:
+        """
+        Encolar un log sin bloquear; False si el buffer está lleno (log descartado).
+        user_id puede ser el UUID, el username (se resuelve al escribir el lote) o None
+        """
+        if len(self._pending) >= self.max_size:
+            self.stats["dropped"] += 1
+            return False
+
+        self._pending.append({
+            "user_id": user_id,
+            "query_text": query_text,
+            "response_text": response_text,
+            "trace_id": trace_id,
+            "method": method,
+            "processing_time": processing_time,
+            "confidence_score": confidence_score,
+            "created_at": datetime.now(timezone.utc),
+            **kwargs
+        })
+        self.stats["enqueued"] += 1
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """Escribir todo lo pendiente en lotes de batch_size"""
+        written = 0
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                written += await self._write_batch(batch)
+        return written
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        start = time.perf_counter()
+        try:
+            async with self._get_session_factory()() as session:
+                batch = await self._resolve_users(session, batch)
+                await QueryLogRepository(session).create_query_logs_bulk(batch)
+                await session.commit()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ Error escribiendo lote de {len(batch)} query logs: {e}")
+            return 0
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+        return len(batch)
+
+    async def _resolve_users(self, session, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reemplazar usernames por UUID con una sola consulta; sin fila en users queda user_id NULL"""
+        usernames = {row["user_id"] for row in batch if isinstance(row["user_id"], str)}
+        if not usernames:
+            return batch
+        result = await session.execute(select(User.username, User.id).where(User.username.in_(usernames)))
+        user_ids = {username: user_id for username, user_id in result.all()}
+        for row in batch:
+            if isinstance(row["user_id"], str):
+                if row["user_id"] not in user_ids:
+                    self.stats["unresolved_users"] += 1
+                row["user_id"] = user_ids.get(row["user_id"])
+        return batch
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Iniciar la tarea de flush periódico (requiere event loop activo)"""
+        if self._task is None or self._task.done():
+            self._flush_lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info("✅ QueryLog write-behind buffer iniciado")
+
+    async def stop(self) -> None:
+        """Detener la tarea de fondo (sin cortar un lote en curso) y drenar lo pendiente"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        written = await self.flush()
+        logger.info(f"🔄 QueryLog buffer drenado: {written} logs escritos al apagar")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "capacity": self.max_size,
+            "running": self._task is not None and not self._task.done()
+        }
+
+# Instancia global del buffer
+query_log_buffer = QueryLogBuffer()
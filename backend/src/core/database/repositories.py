@@ -3,19 +3,46 @@ Repositorios de datos para operaciones CRUD empresariales
 Incluye patrones Repository y Unit of Work para arquitectura limpia
 """
 from abc import ABC, abstractmethod
+import bisect
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Any, Generic, TypeVar, Union
+from typing import List, Optional, Dict, Any, Generic, Tuple, TypeVar, Union
 from uuid import UUID
 
-from sqlalchemy import select, update, delete, func, and_, or_, desc, asc
+from sqlalchemy import select, insert, update, delete, func, and_, or_, desc, asc, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload, joinedload
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
-from .models import User, UserSession, QueryLog, SystemMetrics, Document, DocumentChunk, AuditLog
+from .models import (
+    User, UserSession, QueryLog, SystemMetrics, Document, DocumentChunk, AuditLog,
+    QueryLogHourlyRollup, QueryLogLatencyHistogram
+)
 
 T = TypeVar('T')
 
+def histogram_percentile(buckets: Dict[int, Tuple[int, float, float]], fraction: float) -> float:
+    """
+    Percentil aproximado interpolando linealmente dentro del bucket del histograma,
+    acotado al mínimo y máximo observados en ese bucket. buckets: índice -> (count, min, max)
+    """
+    total = sum(count for count, _, _ in buckets.values())
+    if total == 0:
+        return 0.0
+    bounds = QueryLogLatencyHistogram.BUCKET_BOUNDS
+    target = fraction * total
+    cumulative = 0
+    for index in sorted(buckets):
+        count, min_value, max_value = buckets[index]
+        if count and cumulative + count >= target:
+            lower = bounds[index - 1] if index > 0 else 0.0
+            upper = bounds[index] if index < len(bounds) else max(max_value, lower)
+            value = lower + (upper - lower) * (target - cumulative) / count
+            return round(min(max(value, min_value), max_value), 3)
+        cumulative += count
+    return round(buckets[max(buckets)][2], 3)
+
 class BaseRepository(ABC, Generic[T]):
     """Repositorio base con operaciones CRUD comunes"""
     
@@ -23,6 +50,16 @@ class BaseRepository(ABC, Generic[T]):
         self.session = session
         self.model_class = model_class
     
+    @property
+    def _dialect_name(self) -> str:
+        return self.session.get_bind().dialect.name
+    
+    async def _execute(self, stmt, params=None):
+        """Ejecutar sentencia con sesión síncrona o asíncrona"""
+        if isinstance(self.session, AsyncSession):
+            return await self.session.execute(stmt, params)
+        return self.session.execute(stmt, params)
+    
     async def get_by_id(self, id: Union[UUID, str]) -> Optional[T]:
         """Obtener por ID"""
         if isinstance(self.session, AsyncSession):
@@ -330,7 +367,7 @@ class QueryLogRepository(BaseRepository[QueryLog]):
     
     async def create_query_log(
         self,
-        user_id: UUID,
+        user_id: Optional[UUID],
         query_text: str,
         response_text: str,
         trace_id: str,
@@ -339,7 +376,10 @@ class QueryLogRepository(BaseRepository[QueryLog]):
         confidence_score: float,
         **kwargs
     ) -> QueryLog:
-        """Crear log de consulta con datos específicos"""
+        """
+        Crear log de consulta con escritura inmediata (insert + upsert de rollups).
+        En el camino de la petición usar query_log_buffer.add(), que escribe por lotes
+        """
         log_data = {
             "user_id": user_id,
             "query_text": query_text,
@@ -351,7 +391,9 @@ class QueryLogRepository(BaseRepository[QueryLog]):
             **kwargs
         }
         
-        return await self.create(**log_data)
+        query_log = await self.create(**log_data)
+        await self._upsert_hourly_rollups([{**log_data, "created_at": query_log.created_at}])
+        return query_log
     
     async def get_user_queries(
         self, 
@@ -383,83 +425,217 @@ class QueryLogRepository(BaseRepository[QueryLog]):
         else:
             return self.session.execute(stmt).scalars().all()
     
-    async def get_performance_metrics(self, days: int = 7) -> Dict[str, Any]:
-        """Obtener métricas de rendimiento"""
-        since = datetime.now(timezone.utc) - timedelta(days=days)
-        
-        # Query base
-        base_query = select(QueryLog).where(QueryLog.created_at > since)
+    async def create_query_logs_bulk(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insertar un lote de logs con un solo executemany y actualizar los
+        rollups horarios en la misma transacción (usado por el buffer write-behind)
+        """
+        if not rows:
+            return 0
         
-        if isinstance(self.session, AsyncSession):
-            # Total queries
-            total_result = await self.session.execute(
-                select(func.count(QueryLog.id)).where(QueryLog.created_at > since)
-            )
-            total_queries = total_result.scalar()
-            
-            # Average processing time
-            avg_time_result = await self.session.execute(
-                select(func.avg(QueryLog.processing_time)).where(QueryLog.created_at > since)
-            )
-            avg_processing_time = avg_time_result.scalar() or 0
-            
-            # Average confidence
-            avg_conf_result = await self.session.execute(
-                select(func.avg(QueryLog.confidence_score)).where(QueryLog.created_at > since)
-            )
-            avg_confidence = avg_conf_result.scalar() or 0
-            
-            # Fallback usage
-            fallback_result = await self.session.execute(
-                select(func.count(QueryLog.id)).where(
-                    and_(QueryLog.created_at > since, QueryLog.used_fallback == True)
-                )
-            )
-            fallback_count = fallback_result.scalar()
-            
-            # Error rate
-            error_result = await self.session.execute(
-                select(func.count(QueryLog.id)).where(
-                    and_(QueryLog.created_at > since, QueryLog.error_occurred == True)
-                )
-            )
-            error_count = error_result.scalar()
-            
-        else:
-            # Synchronous version
-            total_queries = self.session.execute(
-                select(func.count(QueryLog.id)).where(QueryLog.created_at > since)
-            ).scalar()
-            
-            avg_processing_time = self.session.execute(
-                select(func.avg(QueryLog.processing_time)).where(QueryLog.created_at > since)
-            ).scalar() or 0
-            
-            avg_confidence = self.session.execute(
-                select(func.avg(QueryLog.confidence_score)).where(QueryLog.created_at > since)
-            ).scalar() or 0
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row.setdefault("created_at", now)
+        
+        await self._execute(insert(QueryLog), rows)
+        await self._upsert_hourly_rollups(rows)
+        return len(rows)
+    
+    def _dialect_insert(self, table):
+        """INSERT con soporte ON CONFLICT según el dialecto de la sesión"""
+        if self._dialect_name == "sqlite":
+            return sqlite_insert(table)
+        return pg_insert(table)
+    
+    async def _upsert_hourly_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        """Agregar el lote en memoria y sumarlo a los rollups con un upsert por tabla"""
+        rollups: Dict[tuple, Dict[str, Any]] = {}
+        histogram: Dict[tuple, Dict[str, Any]] = {}
+        bounds = QueryLogLatencyHistogram.BUCKET_BOUNDS
+        
+        for row in rows:
+            hour = row["created_at"].replace(minute=0, second=0, microsecond=0)
+            method = row.get("method") or "unknown"
+            processing_time = float(row.get("processing_time") or 0.0)
+            key = (hour, method)
             
-            fallback_count = self.session.execute(
-                select(func.count(QueryLog.id)).where(
-                    and_(QueryLog.created_at > since, QueryLog.used_fallback == True)
-                )
-            ).scalar()
+            agg = rollups.get(key)
+            if agg is None:
+                agg = rollups[key] = {
+                    "hour_bucket": hour,
+                    "method": method,
+                    "total_queries": 0,
+                    "error_count": 0,
+                    "fallback_count": 0,
+                    "sum_processing_time": 0.0,
+                    "sum_confidence": 0.0,
+                    "max_processing_time": 0.0,
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            agg["total_queries"] += 1
+            agg["error_count"] += 1 if row.get("error_occurred") else 0
+            agg["fallback_count"] += 1 if row.get("used_fallback") else 0
+            agg["sum_processing_time"] += processing_time
+            agg["sum_confidence"] += float(row.get("confidence_score") or 0.0)
+            agg["max_processing_time"] = max(agg["max_processing_time"], processing_time)
             
-            error_count = self.session.execute(
-                select(func.count(QueryLog.id)).where(
-                    and_(QueryLog.created_at > since, QueryLog.error_occurred == True)
-                )
-            ).scalar()
+            bucket = bisect.bisect_left(bounds, processing_time)
+            cell = histogram.get((hour, method, bucket))
+            if cell is None:
+                cell = histogram[(hour, method, bucket)] = {
+                    "hour_bucket": hour,
+                    "method": method,
+                    "bucket_index": bucket,
+                    "count": 0,
+                    "min_value": processing_time,
+                    "max_value": processing_time
+                }
+            cell["count"] += 1
+            cell["min_value"] = min(cell["min_value"], processing_time)
+            cell["max_value"] = max(cell["max_value"], processing_time)
+        
+        # SQLite usa min()/max() escalares de dos argumentos en lugar de least()/greatest()
+        sqlite = self._dialect_name == "sqlite"
+        greatest = func.max if sqlite else func.greatest
+        least = func.min if sqlite else func.least
+        rollup_stmt = self._dialect_insert(QueryLogHourlyRollup)
+        excluded = rollup_stmt.excluded
+        rollup_stmt = rollup_stmt.on_conflict_do_update(
+            index_elements=["hour_bucket", "method"],
+            set_={
+                "total_queries": QueryLogHourlyRollup.total_queries + excluded.total_queries,
+                "error_count": QueryLogHourlyRollup.error_count + excluded.error_count,
+                "fallback_count": QueryLogHourlyRollup.fallback_count + excluded.fallback_count,
+                "sum_processing_time": QueryLogHourlyRollup.sum_processing_time + excluded.sum_processing_time,
+                "sum_confidence": QueryLogHourlyRollup.sum_confidence + excluded.sum_confidence,
+                "max_processing_time": greatest(
+                    QueryLogHourlyRollup.max_processing_time, excluded.max_processing_time
+                ),
+                "updated_at": excluded.updated_at
+            }
+        )
+        await self._execute(rollup_stmt, list(rollups.values()))
+        
+        histogram_stmt = self._dialect_insert(QueryLogLatencyHistogram)
+        excluded = histogram_stmt.excluded
+        histogram_stmt = histogram_stmt.on_conflict_do_update(
+            index_elements=["hour_bucket", "method", "bucket_index"],
+            set_={
+                "count": QueryLogLatencyHistogram.count + excluded.count,
+                "min_value": least(QueryLogLatencyHistogram.min_value, excluded.min_value),
+                "max_value": greatest(QueryLogLatencyHistogram.max_value, excluded.max_value)
+            }
+        )
+        await self._execute(histogram_stmt, list(histogram.values()))
+    
+    async def get_performance_metrics(self, days: int = 7) -> Dict[str, Any]:
+        """Obtener métricas de rendimiento con una sola consulta agregada"""
+        since = datetime.now(timezone.utc) - timedelta(days=days)
         
-        return {
+        columns = [
+            func.count(QueryLog.id).label("total"),
+            func.avg(QueryLog.processing_time).label("avg_time"),
+            func.avg(QueryLog.confidence_score).label("avg_confidence"),
+            func.sum(case((QueryLog.used_fallback == True, 1), else_=0)).label("fallbacks"),
+            func.sum(case((QueryLog.error_occurred == True, 1), else_=0)).label("errors")
+        ]
+        
+        # Percentiles exactos solo donde el motor soporta percentile_cont (PostgreSQL)
+        supports_percentiles = self._dialect_name == "postgresql"
+        if supports_percentiles:
+            columns += [
+                func.percentile_cont(fraction).within_group(QueryLog.processing_time).label(label)
+                for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            ]
+        
+        result = await self._execute(select(*columns).where(QueryLog.created_at > since))
+        row = result.one()
+        
+        total_queries = row.total or 0
+        error_count = row.errors or 0
+        metrics = {
             "total_queries": total_queries,
-            "average_processing_time": round(avg_processing_time, 3),
-            "average_confidence": round(avg_confidence, 3),
-            "fallback_rate": round(fallback_count / max(total_queries, 1), 3),
+            "average_processing_time": round(row.avg_time or 0, 3),
+            "average_confidence": round(row.avg_confidence or 0, 3),
+            "fallback_rate": round((row.fallbacks or 0) / max(total_queries, 1), 3),
             "error_rate": round(error_count / max(total_queries, 1), 3),
             "success_rate": round((total_queries - error_count) / max(total_queries, 1), 3),
             "period_days": days
         }
+        if supports_percentiles:
+            metrics.update({
+                "p50_processing_time": round(row.p50 or 0, 3),
+                "p95_processing_time": round(row.p95 or 0, 3),
+                "p99_processing_time": round(row.p99 or 0, 3)
+            })
+        return metrics
+    
+    async def get_dashboard_metrics(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Métricas para el dashboard leídas de los rollups horarios: el costo
+        depende de horas × métodos del periodo, no del volumen de logs
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+        
+        rollup_result = await self._execute(
+            select(
+                QueryLogHourlyRollup.method,
+                func.sum(QueryLogHourlyRollup.total_queries).label("total"),
+                func.sum(QueryLogHourlyRollup.error_count).label("errors"),
+                func.sum(QueryLogHourlyRollup.fallback_count).label("fallbacks"),
+                func.sum(QueryLogHourlyRollup.sum_processing_time).label("sum_time"),
+                func.sum(QueryLogHourlyRollup.sum_confidence).label("sum_confidence"),
+                func.max(QueryLogHourlyRollup.max_processing_time).label("max_time")
+            ).where(
+                QueryLogHourlyRollup.hour_bucket >= since
+            ).group_by(QueryLogHourlyRollup.method)
+        )
+        histogram_result = await self._execute(
+            select(
+                QueryLogLatencyHistogram.bucket_index,
+                func.sum(QueryLogLatencyHistogram.count).label("count"),
+                func.min(QueryLogLatencyHistogram.min_value).label("min_value"),
+                func.max(QueryLogLatencyHistogram.max_value).label("max_value")
+            ).where(
+                QueryLogLatencyHistogram.hour_bucket >= since
+            ).group_by(QueryLogLatencyHistogram.bucket_index)
+        )
+        
+        by_method = {}
+        totals = {"total": 0, "errors": 0, "fallbacks": 0, "sum_time": 0.0, "sum_confidence": 0.0, "max_time": 0.0}
+        for row in rollup_result.all():
+            total = row.total or 0
+            by_method[row.method] = {
+                "total_queries": total,
+                "average_processing_time": round((row.sum_time or 0) / max(total, 1), 3),
+                "error_rate": round((row.errors or 0) / max(total, 1), 3)
+            }
+            totals["total"] += total
+            totals["errors"] += row.errors or 0
+            totals["fallbacks"] += row.fallbacks or 0
+            totals["sum_time"] += row.sum_time or 0
+            totals["sum_confidence"] += row.sum_confidence or 0
+            totals["max_time"] = max(totals["max_time"], row.max_time or 0)
+        
+        buckets = {
+            row.bucket_index: (row.count, row.min_value, row.max_value)
+            for row in histogram_result.all()
+        }
+        total_queries = totals["total"]
+        return {
+            "total_queries": total_queries,
+            "average_processing_time": round(totals["sum_time"] / max(total_queries, 1), 3),
+            "average_confidence": round(totals["sum_confidence"] / max(total_queries, 1), 3),
+            "max_processing_time": round(totals["max_time"], 3),
+            "fallback_rate": round(totals["fallbacks"] / max(total_queries, 1), 3),
+            "error_rate": round(totals["errors"] / max(total_queries, 1), 3),
+            "success_rate": round((total_queries - totals["errors"]) / max(total_queries, 1), 3),
+            "p50_processing_time": histogram_percentile(buckets, 0.5),
+            "p95_processing_time": histogram_percentile(buckets, 0.95),
+            "p99_processing_time": histogram_percentile(buckets, 0.99),
+            "by_method": by_method,
+            "period_days": days
+        }
 
 class DocumentRepository(BaseRepository[Document]):
     """Repositorio para gestión de documentos"""
@@ -0,0 +1,239 @@
+"""
+Ejecución paralela y cacheada de evaluaciones RAGAS
+
+- Pool persistente de procesos: cada worker instancia RAGASEvaluator una
+  sola vez (imports y modelos se pagan por worker, no por caso).
+- Timeout por tarea: solo el worker colgado se termina y se reemplaza.
+- Caché de resultados por hash de (query, response, contexts, ground_truth,
+  métricas, método de evaluación) persistida en JSONL.
+- Reporte incremental JSONL: cada resultado se escribe al completarse, por
+  lo que una ejecución interrumpida se reanuda sin reevaluar lo hecho.
+"""
+from collections import deque
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+from queue import Empty
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_READY = "__ready__"
+
+
+def evaluation_cache_key(test_case: Dict[str, Any], method: str) -> str:
+    """Hash canónico del caso y del conjunto de métricas"""
+    payload = {
+        "query": test_case.get("query", ""),
+        "response": test_case.get("response", ""),
+        "contexts": list(test_case.get("contexts") or []),
+        "ground_truth": test_case.get("ground_truth"),
+        "metrics": sorted(test_case.get("metrics") or []),
+        "method": method
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_jsonl_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Resultados previos {cache_key: result} de un JSONL (líneas corruptas se ignoran)"""
+    results: Dict[str, Dict[str, Any]] = {}
+    path = Path(path)
+    if not path.exists():
+        return results
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                results[entry["cache_key"]] = entry["result"]
+            except (ValueError, KeyError, TypeError):
+                continue
+    return results
+
+
+class JSONLResultLog:
+    """Archivo JSONL append-only con flush por línea"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries = load_jsonl_results(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        # Una ejecución interrumpida puede dejar la última línea incompleta
+        if self.path.stat().st_size and not self._ends_with_newline():
+            self._file.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def append(self, key: str, result: Dict[str, Any], **extra) -> None:
+        self.entries[key] = result
+        self._file.write(json.dumps({"cache_key": key, **extra, "result": result}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _evaluation_worker(worker_id: int, task_queue, result_queue, output_dir: str) -> None:
+    """Loop del worker: inicializa el evaluador una vez y procesa tareas hasta recibir None"""
+    from .ragas_evaluator import RAGASEvaluator
+
+    evaluator = RAGASEvaluator(output_dir=output_dir)
+    result_queue.put((worker_id, None, _READY))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        key, test_case = task
+        try:
+            result = evaluator.evaluate_response(
+                query=test_case.get("query", ""),
+                response=test_case.get("response", ""),
+                contexts=test_case.get("contexts", []),
+                ground_truth=test_case.get("ground_truth"),
+                # evaluate_response extiende la lista recibida
+                metrics=list(test_case["metrics"]) if test_case.get("metrics") else None
+            )
+        except Exception as e:
+            result = evaluator._safe_error_response(
+                f"Error en evaluación aislada: {type(e).__name__}",
+                "ERR_SYSTEM_FAILURE"
+            )
+        result_queue.put((worker_id, key, result))
+
+
+class EvaluationWorkerPool:
+    """Pool persistente con timeout por tarea y reemplazo de workers colgados"""
+
+    # Evita reemplazar indefinidamente workers que fallan al importar/cargar modelos
+    MAX_INIT_FAILURES = 3
+
+    def __init__(self, workers: int, timeout: float, output_dir: str, context=None):
+        self.timeout = timeout
+        self.output_dir = output_dir
+        self._ctx = context or multiprocessing.get_context()
+        self._result_queue = self._ctx.Queue()
+        self._workers: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self._init_failures = 0
+        self.stats = {"spawned": 0, "replaced": 0, "timeouts": 0, "crashes": 0}
+        for _ in range(max(1, workers)):
+            self._spawn()
+
+    def _spawn(self) -> None:
+        worker_id = self._next_id
+        self._next_id += 1
+        task_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_evaluation_worker,
+            args=(worker_id, task_queue, self._result_queue, self.output_dir),
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = {
+            "process": process,
+            "tasks": task_queue,
+            "ready": False,
+            "task": None,
+            "started": 0.0
+        }
+        self.stats["spawned"] += 1
+
+    def _replace(self, worker_id: int) -> None:
+        worker = self._workers.pop(worker_id)
+        if worker["process"].is_alive():
+            worker["process"].terminate()
+        worker["process"].join(timeout=5)
+        worker["tasks"].close()
+        self.stats["replaced"] += 1
+        self._spawn()
+
+    def run(self, tasks: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Evaluar tareas (key, caso) y producir (key, resultado, código_error)
+        en orden de finalización; resultado es None si hubo timeout o caída
+        """
+        pending = deque(tasks)
+        in_flight = 0
+        while pending or in_flight:
+            # Despachar a workers listos y libres
+            for worker in self._workers.values():
+                if pending and worker["ready"] and worker["task"] is None:
+                    key, test_case = pending.popleft()
+                    worker["task"] = key
+                    worker["started"] = time.monotonic()
+                    worker["tasks"].put((key, test_case))
+                    in_flight += 1
+
+            try:
+                worker_id, key, result = self._result_queue.get(timeout=0.2)
+            except Empty:
+                worker_id = None
+
+            if worker_id is not None:
+                worker = self._workers.get(worker_id)
+                # Mensajes de workers ya reemplazados se descartan
+                if worker is not None:
+                    if result == _READY:
+                        worker["ready"] = True
+                    elif worker["task"] == key:
+                        worker["task"] = None
+                        in_flight -= 1
+                        yield key, result, None
+
+            now = time.monotonic()
+            for worker_id, worker in list(self._workers.items()):
+                alive = worker["process"].is_alive()
+                if worker["task"] is None:
+                    if not alive:
+                        self.stats["crashes"] += 1
+                        if not worker["ready"]:
+                            self._init_failures += 1
+                            if self._init_failures >= self.MAX_INIT_FAILURES:
+                                raise RuntimeError("Workers de evaluación no pudieron inicializarse")
+                        self._replace(worker_id)
+                    continue
+                hung = now - worker["started"] > self.timeout
+                if hung or not alive:
+                    key = worker["task"]
+                    self.stats["timeouts" if hung else "crashes"] += 1
+                    logger.critical(
+                        f"❌ {'TIMEOUT' if hung else 'CAÍDA'} DE WORKER {worker_id} - reemplazando solo este proceso"
+                    )
+                    self._replace(worker_id)
+                    in_flight -= 1
+                    yield key, None, "ERR_TIMEOUT" if hung else "ERR_SYSTEM_FAILURE"
+
+    def close(self) -> None:
+        for worker in self._workers.values():
+            try:
+                worker["tasks"].put(None)
+            except (ValueError, OSError):
+                pass
+        for worker in self._workers.values():
+            worker["process"].join(timeout=5)
+            if worker["process"].is_alive():
+                worker["process"].terminate()
+                worker["process"].join()
+        self._workers.clear()
+        self._result_queue.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def default_worker_count() -> int:
+    return int(os.getenv("MINEDU_EVAL_WORKERS", str(os.cpu_count() or 1)))
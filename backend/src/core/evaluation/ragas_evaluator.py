@@ -40,14 +40,19 @@ import logging
 import hashlib
 import hmac
 import re
-import multiprocessing
 import copy
-from queue import Queue, Empty
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
 
+from .parallel_runner import (
+    EvaluationWorkerPool,
+    JSONLResultLog,
+    default_worker_count,
+    evaluation_cache_key
+)
+
 # RAGAS imports (instalar con: pip install ragas)
 try:
     from ragas import evaluate
@@ -115,24 +120,6 @@ class RAGASEvaluator:
             "context_relevancy": context_relevancy
         })
     
-    def _isolated_evaluation(self, test_case: Dict[str, Any], result_queue: multiprocessing.Queue):
-        """Evaluación aislada en proceso separado para timeout seguro"""
-        try:
-            result = self.evaluate_response(
-                query=test_case.get("query", ""),
-                response=test_case.get("response", ""),
-                contexts=test_case.get("contexts", []),
-                ground_truth=test_case.get("ground_truth"),
-                metrics=test_case.get("metrics")
-            )
-            result_queue.put(result)
-        except Exception as e:
-            error_response = self._safe_error_response(
-                f"Error en evaluación aislada: {type(e).__name__}",
-                "ERR_SYSTEM_FAILURE"
-            )
-            result_queue.put(error_response)
-    
     def evaluate_response(
         self,
         query: str,
@@ -203,7 +190,7 @@ class RAGASEvaluator:
         
         logger.critical(f"✅ VALIDACIONES EXPLÍCITAS EXITOSAS: query, response y {len(valid_contexts)} contexts válidos")
         
-        # ✅ IMPLEMENTADO: Timeout de 30 segundos con multiprocessing isolation
+        # ✅ IMPLEMENTADO: Timeout de 30 segundos por tarea en pool persistente de workers (parallel_runner)
         # ✅ IMPLEMENTADO: Circuit breaker en evaluate_batch con consecutive_failures
         # ✅ IMPLEMENTADO: Validación "todo o nada" de contexts implementada
         
@@ -691,9 +678,17 @@ class RAGASEvaluator:
     def evaluate_batch(
         self, 
         test_cases: List[Dict[str, Any]], 
-        output_file: str = None
+        output_file: str = None,
+        workers: Optional[int] = None,
+        report_file: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
-        """Evaluar múltiples casos de test"""
+        """
+        Evaluar múltiples casos de test en un pool persistente de workers
+        
+        Los resultados se escriben incrementalmente en report_file (JSONL);
+        si ya existe, los casos presentes no se reevalúan (reanudación).
+        """
         
         logger.critical("⚠️ EVALUACIÓN POR LOTES INICIADA - verificar que NO sean datos hardcodeados")
         logger.critical("FUNCIONALIDAD NO IMPLEMENTADA – Validar que test_cases vengan de base de datos real, no ejemplos hardcodeados")
@@ -795,133 +790,93 @@ class RAGASEvaluator:
         consecutive_failures = 0  # Circuit breaker
         CIRCUIT_BREAKER_THRESHOLD = 3
         
-        # 🛡️ PROCESAMIENTO SEGURO: Solo evaluar casos que pasaron todas las validaciones
+        # 🛡️ PROCESAMIENTO SEGURO: casos idénticos (mismo hash) se evalúan una sola vez
+        method = "ragas" if RAGAS_AVAILABLE else "fallback"
+        case_ids_by_key: Dict[str, List[int]] = {}
+        cases_by_key: Dict[str, Dict[str, Any]] = {}
         for i, test_case in enumerate(test_cases):
-            case_id = i + 1
-            
-            # 🔒 CIRCUIT BREAKER: Bloquear si hay muchos fallos consecutivos
-            if consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
-                logger.critical(f"❌ CIRCUIT BREAKER ACTIVADO: {consecutive_failures} fallos consecutivos")
-                logger.critical("❌ SISTEMA BLOQUEADO - Fallo sistémico detectado")
-                logger.critical(f"❌ AUDITORÍA: Circuit breaker activado en caso {case_id}")
-                return self._safe_error_response("Fallo sistémico – circuit breaker activado", "ERR_CIRCUIT_BREAKER")
-            
-            # 🛡️ VALIDACIÓN PREVIA INDIVIDUAL ANTES DE PROCESAR
-            logger.critical(f"🔍 PRE-VALIDANDO CASO {case_id} ANTES DE EVALUACIÓN...")
-            
-            # Verificar estructura básica nuevamente (por seguridad adicional)
-            if not isinstance(test_case, dict):
-                logger.critical(f"❌ CASO {case_id} SALTADO: No es diccionario válido")
-                failed_evaluations += 1
-                continue
-            
-            # Verificar campos requeridos nuevamente
-            required_fields = ['query', 'response', 'contexts']
-            missing_or_empty = []
-            
-            for field in required_fields:
-                if field not in test_case:
-                    missing_or_empty.append(f"'{field}' faltante")
-                elif not test_case[field]:
-                    missing_or_empty.append(f"'{field}' nulo")
-                elif isinstance(test_case[field], str) and not test_case[field].strip():
-                    missing_or_empty.append(f"'{field}' vacío")
-                elif field == 'contexts' and (not isinstance(test_case[field], list) or len(test_case[field]) == 0):
-                    missing_or_empty.append(f"'{field}' lista vacía")
-            
-            if missing_or_empty:
-                logger.critical(f"❌ CASO {case_id} SALTADO: {', '.join(missing_or_empty)}")
-                logger.critical(f"❌ AUDITORÍA: Caso {case_id} rechazado por campos inválidos")
-                failed_evaluations += 1
-                continue
-            
-            # Si llega aquí, el caso es válido para evaluar
-            logger.critical(f"✅ CASO {case_id} VÁLIDO - Procediendo con evaluación aislada...")
-            
-            # 🔒 EVALUACIÓN CON TIMEOUT MEDIANTE MULTIPROCESSING
-            timeout_seconds = int(os.getenv("MINEDU_EVAL_TIMEOUT", "30"))
-            result_queue = multiprocessing.Queue()
-            evaluation_process = multiprocessing.Process(
-                target=self._isolated_evaluation,
-                args=(test_case, result_queue)
-            )
-            
-            try:
-                evaluation_process.start()
-                evaluation_process.join(timeout=timeout_seconds)
-                
-                if evaluation_process.is_alive():
-                    # Timeout reached
-                    logger.critical(f"❌ TIMEOUT: Caso {case_id} excedió {timeout_seconds} segundos")
-                    logger.critical(f"❌ AUDITORÍA: Timeout en evaluación de caso {case_id}")
-                    evaluation_process.terminate()
-                    evaluation_process.join()
-                    
-                    result = self._safe_error_response(
-                        f"Evaluación de caso {case_id} excedió timeout de {timeout_seconds} segundos",
-                        "ERR_TIMEOUT"
-                    )
-                    consecutive_failures += 1
-                    failed_evaluations += 1
-                else:
-                    # Proceso completado normalmente
-                    try:
-                        result = result_queue.get_nowait()
-                        result["test_case_id"] = case_id
+            key = evaluation_cache_key(test_case, method)
+            case_ids_by_key.setdefault(key, []).append(i + 1)
+            cases_by_key.setdefault(key, test_case)
+        
+        # 📝 Reporte JSONL incremental (reanudable) y caché persistente entre ejecuciones
+        report_path = self.output_dir / (report_file or f"{Path(output_file).stem}.jsonl")
+        report = JSONLResultLog(report_path)
+        cache = JSONLResultLog(self.output_dir / "evaluation_cache.jsonl") if use_cache else None
+        results_by_key: Dict[str, Dict[str, Any]] = {}
+        
+        for key in case_ids_by_key:
+            if report.get(key) is not None:
+                results_by_key[key] = report.get(key)
+            elif cache is not None and cache.get(key) is not None:
+                results_by_key[key] = cache.get(key)
+                report.append(key, results_by_key[key], case_ids=case_ids_by_key[key], source="cache")
+        
+        pending = [(key, cases_by_key[key]) for key in case_ids_by_key if key not in results_by_key]
+        logger.critical(
+            f"📦 CASOS ÚNICOS: {len(case_ids_by_key)} - reanudados/caché: {len(results_by_key)} - a evaluar: {len(pending)}"
+        )
+        
+        # 🔒 EVALUACIÓN EN POOL PERSISTENTE CON TIMEOUT POR TAREA
+        timeout_seconds = int(os.getenv("MINEDU_EVAL_TIMEOUT", "30"))
+        workers = min(workers or default_worker_count(), len(pending))
+        circuit_breaker_open = False
+        
+        try:
+            if pending:
+                with EvaluationWorkerPool(workers, timeout_seconds, str(self.output_dir)) as pool:
+                    for key, result, error_code in pool.run(pending):
+                        case_label = ",".join(str(case_id) for case_id in case_ids_by_key[key])
+                        if result is None:
+                            logger.critical(f"❌ AUDITORÍA: {error_code} en evaluación de caso(s) {case_label}")
+                            result = self._safe_error_response(
+                                f"Evaluación de caso(s) {case_label} excedió timeout de {timeout_seconds} segundos"
+                                if error_code == "ERR_TIMEOUT" else f"Worker de evaluación terminó sin resultado (caso(s) {case_label})",
+                                error_code
+                            )
                         
-                        if result.get("error"):
+                        failed = result.get("status") == "error" or bool(result.get("error"))
+                        if failed:
                             consecutive_failures += 1
-                            failed_evaluations += 1
                         else:
                             consecutive_failures = 0  # Reset circuit breaker
-                            successful_evaluations += 1
-                            logger.critical(f"✅ CASO {case_id} EVALUADO EXITOSAMENTE")
-                        
-                        results.append(result)
+                            if cache is not None:
+                                cache.append(key, result)
+                            logger.critical(f"✅ CASO(S) {case_label} EVALUADO(S) EXITOSAMENTE")
                         
-                    except Empty:
-                        logger.critical(f"❌ CASO {case_id}: Proceso completado sin resultado")
-                        result = self._safe_error_response(
-                            f"Caso {case_id} completado sin resultado",
-                            "ERR_SYSTEM_FAILURE"
-                        )
-                        consecutive_failures += 1
-                        failed_evaluations += 1
-                        results.append(result)
+                        results_by_key[key] = result
+                        report.append(key, result, case_ids=case_ids_by_key[key], source=method)
                         
-            except (SystemExit, KeyboardInterrupt):
-                # No capturar interrupciones de sistema - permitir salida limpia
-                logger.critical(f"❌ INTERRUPCIÓN DE SISTEMA EN CASO {case_id}")
-                raise
-            except Exception as e:
-                # 🔒 LOGGING CRÍTICO MEJORADO PARA AUDITORÍA GUBERNAMENTAL
-                error_type = type(e).__name__
-                error_timestamp = datetime.utcnow().isoformat()
-                logger.critical(f"❌ CASO {case_id} FALLÓ EN {error_timestamp}")
-                logger.critical(f"❌ TIPO DE ERROR GUBERNAMENTAL: {error_type}")
-                logger.critical(f"❌ ÍNDICE DEL CASO FALLIDO: {case_id}")
-                logger.critical(f"❌ AUDITORÍA: Fallo crítico en evaluación gubernamental caso {case_id}")
-                logger.critical("❌ PROTECCIÓN: Detalles técnicos omitidos por seguridad gubernamental")
-                
-                result = self._safe_error_response(
-                    f"Error crítico en caso {case_id}: {error_type}",
-                    "ERR_SYSTEM_FAILURE"
-                )
-                consecutive_failures += 1
-                failed_evaluations += 1
+                        # 🔒 CIRCUIT BREAKER: Bloquear si hay muchos fallos consecutivos
+                        if consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
+                            circuit_breaker_open = True
+                            break
+        except (SystemExit, KeyboardInterrupt):
+            # No capturar interrupciones de sistema - el reporte JSONL permite reanudar
+            logger.critical(f"❌ INTERRUPCIÓN DE SISTEMA - progreso guardado en {report_path}")
+            raise
+        except RuntimeError as e:
+            logger.critical(f"❌ POOL DE EVALUACIÓN NO DISPONIBLE: {type(e).__name__}")
+            return self._safe_error_response("Workers de evaluación no disponibles", "ERR_SYSTEM_FAILURE")
+        finally:
+            report.close()
+            if cache is not None:
+                cache.close()
+        
+        if circuit_breaker_open:
+            logger.critical(f"❌ CIRCUIT BREAKER ACTIVADO: {consecutive_failures} fallos consecutivos")
+            logger.critical("❌ SISTEMA BLOQUEADO - Fallo sistémico detectado")
+            return self._safe_error_response("Fallo sistémico – circuit breaker activado", "ERR_CIRCUIT_BREAKER")
+        
+        for key, case_ids in case_ids_by_key.items():
+            for case_id in case_ids:
+                result = dict(results_by_key[key])
+                result["test_case_id"] = case_id
+                if result.get("status") == "error" or result.get("error"):
+                    failed_evaluations += 1
+                else:
+                    successful_evaluations += 1
                 results.append(result)
-                
-            finally:
-                # Asegurar que el proceso esté limpio
-                if evaluation_process.is_alive():
-                    evaluation_process.terminate()
-                    evaluation_process.join()
-                # Cleanup explícito del Queue IPC
-                try:
-                    result_queue.close()
-                    result_queue.join_thread()
-                except Exception:
-                    pass  # Ignore cleanup errors
         
         # 🛡️ REPORTE FINAL DE EVALUACIÓN GUBERNAMENTAL
         logger.critical("📊 GENERANDO REPORTE FINAL DE EVALUACIÓN GUBERNAMENTAL...")
@@ -966,7 +921,8 @@ class RAGASEvaluator:
             },
             "detailed_results": results,
             "timestamp": datetime.utcnow().isoformat(),
-            "output_file": output_file
+            "output_file": output_file,
+            "report_file": str(report_path)
         }
         
         # Guardar resultados
@@ -1523,7 +1479,7 @@ def _run_smoke_test():
 
 🛡️ 3. FUNCIÓN evaluate_batch() - PROCESAMIENTO SEGURO POR CASO:
    ✅ Pre-validación individual antes de procesar cada test_case
-   ✅ Verificación doble de campos requeridos por seguridad
+   ✅ Pool persistente de workers con timeout por tarea y caché por hash de caso
    ✅ Detección específica de casos inválidos con índice y campo
    ✅ Sistema de conteo: successful_evaluations vs failed_evaluations
    ✅ Bloqueo total si TODOS los casos son inválidos
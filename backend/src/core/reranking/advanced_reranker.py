@@ -2,18 +2,25 @@
 Sistema de reranking avanzado con cross-encoder
 Mejora la relevancia de resultados antes de enviar al LLM
 """
+import importlib.util
 import logging
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import asyncio
+from functools import partial
 
-# Cross-encoder imports (instalar con: pip install sentence-transformers)
-try:
-    from sentence_transformers import CrossEncoder
-    CROSS_ENCODER_AVAILABLE = True
-except ImportError:
-    CROSS_ENCODER_AVAILABLE = False
+from src.ai.reranking.score_cache import (
+    CrossEncoderScoreCache,
+    plan_cascade,
+    score_with_cache,
+    truncate_tokens
+)
+
+# Cross-encoder (instalar con: pip install sentence-transformers)
+# Solo se comprueba que esté instalado: sentence-transformers y torch se
+# importan en initialize() para no pesar en el arranque de la API
+CROSS_ENCODER_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
 
 logger = logging.getLogger(__name__)
 
@@ -36,17 +43,28 @@ class AdvancedReranker:
         self.cross_encoder = None
         self.fallback_enabled = True
         self.initialized = False
+        self.precision: Optional[str] = None  # 'fp32', 'int8' o None (configuración por modelo)
         
         # Configuración de reranking
         self.max_documents = 50  # Máximo documentos a reranquear
         self.top_k_after_rerank = 10  # Top K después del reranking
         
+        # Cascada: omitir el cross-encoder si la primera etapa es concluyente
+        self.cascade_enabled = True
+        self.cascade_margin = 0.3  # Margen relativo (s1 - s2) / s1 decisivo
+        self.rerank_window = 20  # Candidatos inciertos que pasan por el cross-encoder
+        self.max_tokens_per_doc = 256  # Tope de tokens por documento
+        self.score_cache = CrossEncoderScoreCache(max_entries=50000)
+        
         # Métricas
         self.reranking_stats = {
             "total_rerankings": 0,
             "average_processing_time": 0.0,
             "cross_encoder_usage": 0,
-            "fallback_usage": 0
+            "fallback_usage": 0,
+            "cross_encoder_requests": 0,
+            "skipped_reranks": 0,
+            "pairs_scored": 0
         }
     
     async def initialize(self) -> bool:
@@ -58,6 +76,9 @@ class AdvancedReranker:
             if CROSS_ENCODER_AVAILABLE:
                 logger.info(f"🧠 Cargando cross-encoder model: {self.model_name}")
                 
+                from sentence_transformers import CrossEncoder
+                from src.core.performance.quantization import apply_precision
+                
                 # Ejecutar en thread pool para no bloquear
                 loop = asyncio.get_event_loop()
                 self.cross_encoder = await loop.run_in_executor(
@@ -65,8 +86,14 @@ class AdvancedReranker:
                     CrossEncoder, 
                     self.model_name
                 )
+                self.precision = apply_precision(
+                    self.cross_encoder,
+                    self.model_name,
+                    self.precision,
+                    getattr(self.cross_encoder.model, "device", "cpu")
+                )
                 
-                logger.info("✅ Cross-encoder model cargado exitosamente")
+                logger.info(f"✅ Cross-encoder model cargado exitosamente ({self.precision})")
                 self.initialized = True
                 return True
             else:
@@ -145,51 +172,102 @@ class AdvancedReranker:
         query: str,
         documents: List[Dict[str, Any]]
     ) -> List[RerankingResult]:
-        """Reranking usando cross-encoder"""
-        
-        # Preparar pares query-document
-        query_doc_pairs = []
-        for doc in documents:
-            content = doc.get('content', doc.get('text', ''))
-            if content:
-                query_doc_pairs.append([query, content])
+        """Reranking en cascada usando cross-encoder con caché de scores"""
         
-        if not query_doc_pairs:
+        # Orden de la primera etapa
+        ordered = sorted(
+            enumerate(documents),
+            key=lambda item: item[1].get('score', 0.0),
+            reverse=True
+        )
+        contents = [doc.get('content', doc.get('text', '')) for _, doc in ordered]
+        if not any(contents):
             return await self._rerank_fallback(query, documents)
         
-        # Ejecutar cross-encoder en thread pool
+        self.reranking_stats["cross_encoder_requests"] += 1
+        if self.cascade_enabled:
+            skip, window = plan_cascade(
+                [doc.get('score', 0.0) for _, doc in ordered],
+                self.cascade_margin,
+                self.rerank_window
+            )
+        else:
+            skip, window = False, len(ordered)
+        
+        if skip:
+            self.reranking_stats["skipped_reranks"] += 1
+            return [
+                self._first_stage_result(original_rank, doc, "cascade_skip")
+                for original_rank, doc in ordered
+            ]
+        
+        # Solo la ventana incierta pasa por el cross-encoder (scores en caché se reutilizan)
+        window_texts = [truncate_tokens(content, self.max_tokens_per_doc) for content in contents[:window]]
         loop = asyncio.get_event_loop()
-        scores = await loop.run_in_executor(
+        scores, predicted = await loop.run_in_executor(
             None,
-            self.cross_encoder.predict,
-            query_doc_pairs
+            partial(
+                score_with_cache,
+                self.score_cache,
+                f"{self.model_name}:{self.max_tokens_per_doc}",
+                query,
+                window_texts,
+                self.cross_encoder.predict
+            )
         )
+        self.reranking_stats["pairs_scored"] += predicted
         
         # Crear resultados reranqueados
         results = []
-        for i, doc in enumerate(documents):
-            if i < len(scores):
-                result = RerankingResult(
-                    document_id=doc.get('id', str(i)),
-                    content=doc.get('content', doc.get('text', '')),
-                    original_score=doc.get('score', 0.0),
-                    reranked_score=float(scores[i]),
-                    confidence=min(float(scores[i]) * 1.2, 1.0),  # Ajustar confianza
-                    ranking_method="cross_encoder",
-                    metadata={
-                        "model": self.model_name,
-                        "original_rank": i,
-                        "source": doc.get('source', ''),
-                        "title": doc.get('title', ''),
-                    }
-                )
-                results.append(result)
+        unscored = []
+        for (original_rank, doc), score in zip(ordered[:window], scores):
+            if score is None:
+                unscored.append(self._first_stage_result(original_rank, doc, "first_stage"))
+                continue
+            results.append(RerankingResult(
+                document_id=doc.get('id', str(original_rank)),
+                content=doc.get('content', doc.get('text', '')),
+                original_score=doc.get('score', 0.0),
+                reranked_score=score,
+                confidence=min(score * 1.2, 1.0),  # Ajustar confianza
+                ranking_method="cross_encoder",
+                metadata={
+                    "model": self.model_name,
+                    "original_rank": original_rank,
+                    "source": doc.get('source', ''),
+                    "title": doc.get('title', ''),
+                }
+            ))
         
         # Ordenar por score reranqueado (descendente)
         results.sort(key=lambda x: x.reranked_score, reverse=True)
         
+        # El resto conserva el orden de la primera etapa
+        results.extend(unscored)
+        results.extend(
+            self._first_stage_result(original_rank, doc, "first_stage")
+            for original_rank, doc in ordered[window:]
+        )
+        
         return results
     
+    def _first_stage_result(self, original_rank: int, doc: Dict[str, Any], method: str) -> RerankingResult:
+        """Resultado que conserva el score de la primera etapa"""
+        original_score = doc.get('score', 0.0)
+        return RerankingResult(
+            document_id=doc.get('id', str(original_rank)),
+            content=doc.get('content', doc.get('text', '')),
+            original_score=original_score,
+            reranked_score=original_score,
+            confidence=min(max(original_score, 0.0), 1.0),
+            ranking_method=method,
+            metadata={
+                "original_rank": original_rank,
+                "source": doc.get('source', ''),
+                "title": doc.get('title', ''),
+            }
+        )
+    
     async def _rerank_semantic(
         self,
         query: str,
@@ -337,10 +415,18 @@ class AdvancedReranker:
     
     def get_reranking_stats(self) -> Dict[str, Any]:
         """Obtener estadísticas del reranking"""
+        requests = self.reranking_stats["cross_encoder_requests"]
         return {
             **self.reranking_stats,
+            **self.score_cache.get_stats(),
+            "skipped_rerank_rate": round(self.reranking_stats["skipped_reranks"] / requests, 4) if requests else 0.0,
+            "cascade_enabled": self.cascade_enabled,
+            "cascade_margin": self.cascade_margin,
+            "rerank_window": self.rerank_window,
+            "max_tokens_per_doc": self.max_tokens_per_doc,
             "cross_encoder_available": CROSS_ENCODER_AVAILABLE and self.cross_encoder is not None,
             "model_name": self.model_name,
+            "precision": self.precision,
             "initialized": self.initialized,
             "fallback_enabled": self.fallback_enabled,
             "max_documents": self.max_documents,
@@ -0,0 +1,135 @@
+"""
+Proveedores perezosos para el arranque de la API
+Los subsistemas pesados (orquestadores LangGraph, retriever, búsqueda híbrida,
+razonamiento legal, router de modelos) se registran como fábricas: se cargan
+en segundo plano después de abrir el puerto, o en la primera petición que los
+necesite. La disponibilidad (readiness) se expone aparte de la vida (liveness).
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyProvider:
+    """Subsistema que se inicializa una sola vez, bajo demanda"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], required: bool = False):
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.load_time_ms: Optional[float] = None
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """Instancia del subsistema (None si no está disponible)"""
+        if self.status in (READY, FAILED):
+            return self._value
+        with self._lock:
+            if self.status not in (READY, FAILED):
+                self._load()
+        return self._value
+
+    def _load(self) -> None:
+        self.status = LOADING
+        started = time.perf_counter()
+        try:
+            self._value = self.factory()
+            self.status = READY if self._value is not None else FAILED
+        except Exception as e:  # ImportError incluido: dependencia opcional ausente
+            self._value = None
+            self.error = str(e)
+            self.status = FAILED
+            logger.warning(f"⚠️ {self.name} no disponible: {e}")
+        self.load_time_ms = round((time.perf_counter() - started) * 1000, 1)
+        if self.status == READY:
+            logger.info(f"✅ {self.name} cargado en {self.load_time_ms} ms")
+
+    @property
+    def settled(self) -> bool:
+        return self.status in (READY, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "load_time_ms": self.load_time_ms,
+            "error": self.error
+        }
+
+
+class ProviderRegistry:
+    """Registro de proveedores con precarga en segundo plano"""
+
+    def __init__(self):
+        self.providers: Dict[str, LazyProvider] = {}
+        self.warmup_started: Optional[float] = None
+        self.warmup_time_ms: Optional[float] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, factory: Callable[[], Any], required: bool = False) -> LazyProvider:
+        provider = LazyProvider(name, factory, required)
+        self.providers[name] = provider
+        return provider
+
+    def get(self, name: str) -> Any:
+        """Resolver un proveedor de forma síncrona"""
+        return self.providers[name].get()
+
+    def peek(self, name: str) -> Any:
+        """Instancia solo si ya está cargada (no dispara la carga)"""
+        provider = self.providers[name]
+        return provider._value if provider.status == READY else None
+
+    async def resolve(self, name: str) -> Any:
+        """Resolver un proveedor sin bloquear el event loop"""
+        provider = self.providers[name]
+        if provider.settled:
+            return provider.get()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, provider.get)
+
+    async def warm_up(self, names: Optional[List[str]] = None) -> None:
+        """Cargar los proveedores en orden de registro, fuera del event loop"""
+        self.warmup_started = time.perf_counter()
+        for name in names or list(self.providers):
+            await self.resolve(name)
+        self.warmup_time_ms = round((time.perf_counter() - self.warmup_started) * 1000, 1)
+        logger.info(f"🚀 Precarga completa en {self.warmup_time_ms} ms")
+
+    def start_warm_up(self) -> asyncio.Task:
+        """Lanzar la precarga como tarea de fondo (llamar desde el lifespan)"""
+        if self._warmup_task is None:
+            self._warmup_task = asyncio.ensure_future(self.warm_up())
+        return self._warmup_task
+
+    async def stop(self) -> None:
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            try:
+                await self._warmup_task
+            except asyncio.CancelledError:
+                pass
+
+    def readiness(self) -> Dict[str, Any]:
+        """Listo cuando todos los proveedores terminaron y ninguno requerido falló"""
+        settled = all(provider.settled for provider in self.providers.values())
+        failed_required = [name for name, provider in self.providers.items()
+                           if provider.required and provider.status == FAILED]
+        return {
+            "ready": settled and not failed_required,
+            "warmup_time_ms": self.warmup_time_ms,
+            "failed_required": failed_required,
+            "providers": {name: provider.to_dict() for name, provider in self.providers.items()}
+        }
@@ -0,0 +1,76 @@
+"""
+Streaming de respuestas de chat con Server-Sent Events
+Cada etapa del pipeline emite un evento en cuanto termina: fuentes recuperadas,
+fuentes reordenadas, fragmentos de la respuesta y validación/confianza
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Etapas que producen los pipelines: (evento, payload)
+StageEvent = Tuple[str, Dict[str, Any]]
+
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"  # nginx: no bufferizar la respuesta
+}
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Serializar un evento SSE"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def chunk_text(text: str, max_chars: int = 160) -> List[str]:
+    """Partir la respuesta en fragmentos por palabras (concatenados reproducen el texto)"""
+    chunks, current = [], ""
+    for token in _TOKEN_PATTERN.findall(text or ""):
+        if current and len(current) + len(token) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += token
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Ejecutar una etapa síncrona (búsqueda, reranking) sin bloquear el event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: fn(*args, **kwargs))
+
+
+async def sse_stream(stages: AsyncIterator[StageEvent], max_chars: int = 160) -> AsyncIterator[str]:
+    """
+    Convertir las etapas de un pipeline en eventos SSE
+
+    El evento "answer" se emite como una serie de "answer_chunk"; cada evento
+    lleva los milisegundos transcurridos y el stream termina con "done".
+    """
+    started = time.perf_counter()
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    try:
+        async for event, payload in stages:
+            if event == "answer":
+                for index, chunk in enumerate(chunk_text(payload.get("text", ""), max_chars)):
+                    yield sse_event("answer_chunk", {"index": index, "text": chunk, "elapsed_ms": elapsed_ms()})
+                continue
+            yield sse_event(event, {**payload, "elapsed_ms": elapsed_ms()})
+    except Exception as e:
+        logger.error(f"❌ Error en streaming de chat: {e}")
+        yield sse_event("error", {"detail": str(e), "elapsed_ms": elapsed_ms()})
+
+    yield sse_event("done", {"elapsed_ms": elapsed_ms()})
@@ -9,6 +9,7 @@ from datetime import datetime
 
 from ..vectorstores.simple_retriever import retriever, Document
 from ..config import config
+from src.core.agents.pattern_matcher import CompiledPatternSet
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,8 @@ class ViaticosAgent:
             "viaticos": ["viático", "viaticos", "viáticos", "gastos", "comisión", "comision"],
             "diario": ["diario", "diarios", "día", "dias", "por día"]
         }
+        # Todas las keywords en un autómata: una pasada por consulta
+        self.keyword_matcher = CompiledPatternSet(keywords=self.keywords_map)
     
     def extract_monetary_amounts(self, text: str) -> List[str]:
         """Extraer montos monetarios del texto"""
@@ -49,6 +52,7 @@ class ViaticosAgent:
         """Detectar intención específica de la consulta"""
         query_lower = query.lower()
         print(f"🔍 DEBUG: Analyzing query: '{query}' -> '{query_lower}'")
+        found = self.keyword_matcher.keywords_found(query_lower)
         
         intent_data = {
             "intent": "general",
@@ -61,12 +65,12 @@ class ViaticosAgent:
         }
         
         # Detectar si busca montos
-        if any(kw in query_lower for kw in self.keywords_map["monto_maximo"]):
+        if found.intersection(self.keywords_map["monto_maximo"]):
             intent_data["intent"] = "monto_maximo"
             intent_data["entities"]["amounts"] = True
         
         # Detectar si busca declaración jurada
-        if any(kw in query_lower for kw in self.keywords_map["declaracion_jurada"]):
+        if found.intersection(self.keywords_map["declaracion_jurada"]):
             intent_data["intent"] = "declaracion_jurada"
         
         # Detectar ubicación
@@ -75,11 +79,11 @@ class ViaticosAgent:
         print(f"🔍 DEBUG: Checking provincia keywords: {provincia_keywords}")
         print(f"🔍 DEBUG: Checking lima keywords: {lima_keywords}")
         
-        if any(kw in query_lower for kw in provincia_keywords):
+        if found.intersection(provincia_keywords):
             intent_data["entities"]["location"] = "provincia"
             print(f"✅ DEBUG: PROVINCIA detected!")
             logger.info(f"✅ Ubicación detectada: PROVINCIA para query: {query}")
-        elif any(kw in query_lower for kw in lima_keywords):
+        elif found.intersection(lima_keywords):
             intent_data["entities"]["location"] = "lima"
             print(f"✅ DEBUG: LIMA detected!")
             logger.info(f"✅ Ubicación detectada: LIMA para query: {query}")
@@ -92,7 +96,7 @@ class ViaticosAgent:
         # Agregar keywords relevantes
         for category, keywords in self.keywords_map.items():
             for keyword in keywords:
-                if keyword in query_lower:
+                if keyword in found:
                     intent_data["keywords"].append(keyword)
         
         return intent_data
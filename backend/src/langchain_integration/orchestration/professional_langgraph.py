@@ -2,6 +2,7 @@
 LangGraph PROFESIONAL con arquitectura robusta, trazable y escalable
 Combina tu implementación actual con mejores prácticas de ChatGPT
 """
+import asyncio
 import logging
 import time
 from typing import Dict, Any, List, Optional, TypedDict, Annotated
@@ -18,6 +19,7 @@ from langchain.memory import ConversationBufferMemory
 
 from ..agents.viaticos_agent import viaticos_agent
 from ..config import config
+from src.core.monitoring.node_tracing import traced_node, run_concurrently
 
 logger = logging.getLogger(__name__)
 
@@ -60,13 +62,27 @@ class ProfessionalRAGState(TypedDict):
     timestamp: str
     trace_id: str
     node_history: List[str]
+    node_trace: List[Dict[str, Any]]
     error_log: List[str]
 
 class ProfessionalLangGraphOrchestrator:
     """Orquestador LangGraph PROFESIONAL con validación, retry y observabilidad"""
     
-    def __init__(self):
+    # Presupuesto de latencia por nodo (segundos); al excederlo el nodo se cancela
+    DEFAULT_NODE_BUDGETS = {
+        "input_validation": 0.5,
+        "detect_intent": 0.5,
+        "execute_agent": 20.0,
+        "rerank_sources": 5.0,
+        "validate_response": 1.0
+    }
+    
+    def __init__(self, node_budgets: Optional[Dict[str, float]] = None):
         self.orchestrator_name = "professional_langgraph"
+        self.node_budgets = {**self.DEFAULT_NODE_BUDGETS, **(node_budgets or {})}
+        
+        # Reranker resuelto una vez al construir el grafo (no en cada ejecución del agente)
+        self.rerank_search_results = self._load_reranker()
         
         # Agentes especializados
         self.agents = {
@@ -107,25 +123,51 @@ class ProfessionalLangGraphOrchestrator:
         
         logger.info("🚀 LangGraph PROFESIONAL inicializado con validación y retry")
     
+    def _load_reranker(self):
+        """Importar el reranker avanzado (None si no está disponible)"""
+        try:
+            try:
+                from ...core.reranking.advanced_reranker import rerank_search_results
+            except ImportError:
+                # Fallback import
+                import sys
+                from pathlib import Path
+                backend_dir = Path(__file__).parent.parent.parent.parent
+                sys.path.insert(0, str(backend_dir / "src"))
+                from core.reranking.advanced_reranker import rerank_search_results
+            return rerank_search_results
+        except Exception as e:
+            logger.warning(f"⚠️ Reranker avanzado no disponible: {e}")
+            return None
+    
+    def _traced(self, node: str, fn):
+        """Nodo instrumentado con su presupuesto de latencia"""
+        return traced_node(self.orchestrator_name, node, fn, self.node_budgets.get(node))
+    
     def _build_professional_stategraph(self) -> StateGraph:
         """Construir StateGraph profesional con nodos de validación y fallback"""
         
         workflow = StateGraph(ProfessionalRAGState)
         
+        # Validación de entrada y detección de intención son independientes: corren en paralelo
+        self._input_branches = [
+            self._traced("input_validation", self._input_validation_node),
+            self._traced("detect_intent", self._detect_intent_node)
+        ]
+        
         # === NODOS PROFESIONALES ===
-        workflow.add_node("input_validation", self._input_validation_node)
-        workflow.add_node("detect_intent", self._detect_intent_node)
-        workflow.add_node("route_to_agent", self._route_to_agent_node)
-        workflow.add_node("execute_agent", self._execute_agent_node)
-        workflow.add_node("validate_response", self._validate_response_node)
-        workflow.add_node("fallback_legacy", self._fallback_legacy_node)
-        workflow.add_node("compose_response", self._compose_response_node)
-        workflow.add_node("error_handler", self._error_handler_node)
+        workflow.add_node("analyze_input", self._traced("analyze_input", self._analyze_input_node))
+        workflow.add_node("route_to_agent", self._traced("route_to_agent", self._route_to_agent_node))
+        workflow.add_node("execute_agent", self._traced("execute_agent", self._execute_agent_node))
+        workflow.add_node("rerank_sources", self._traced("rerank_sources", self._rerank_sources_node))
+        workflow.add_node("validate_response", self._traced("validate_response", self._validate_response_node))
+        workflow.add_node("fallback_legacy", self._traced("fallback_legacy", self._fallback_legacy_node))
+        workflow.add_node("compose_response", self._traced("compose_response", self._compose_response_node))
+        workflow.add_node("error_handler", self._traced("error_handler", self._error_handler_node))
         
         # === FLUJO PRINCIPAL ===
-        workflow.add_edge(START, "input_validation")
-        workflow.add_edge("input_validation", "detect_intent")
-        workflow.add_edge("detect_intent", "route_to_agent")
+        workflow.add_edge(START, "analyze_input")
+        workflow.add_edge("analyze_input", "route_to_agent")
         workflow.add_edge("route_to_agent", "execute_agent")
         
         # === CONDITIONAL EDGES CON VALIDACIÓN ===
@@ -133,7 +175,7 @@ class ProfessionalLangGraphOrchestrator:
             "execute_agent",
             self._decide_after_agent,
             {
-                "validate": "validate_response",
+                "validate": "rerank_sources",
                 "retry": "execute_agent",
                 "error": "error_handler"
             }
@@ -149,6 +191,7 @@ class ProfessionalLangGraphOrchestrator:
             }
         )
         
+        workflow.add_edge("rerank_sources", "validate_response")
         workflow.add_edge("fallback_legacy", "compose_response")
         workflow.add_edge("compose_response", END)
         workflow.add_edge("error_handler", END)
@@ -157,49 +200,29 @@ class ProfessionalLangGraphOrchestrator:
     
     # === NODOS PROFESIONALES ===
     
+    async def _analyze_input_node(self, state: ProfessionalRAGState) -> ProfessionalRAGState:
+        """Validación de entrada y detección de intención concurrentes"""
+        state["trace_id"] = f"trace_{int(time.time())}"
+        state["max_attempts"] = 3
+        state["agent_attempts"] = 0
+        return await run_concurrently(state, self._input_branches)
+    
     async def _input_validation_node(self, state: ProfessionalRAGState) -> ProfessionalRAGState:
         """Validación robusta de entrada"""
-        start_time = time.time()
         node_name = "input_validation"
         
         try:
+            # En un thread: corre en paralelo con detect_intent y su presupuesto puede cortarla
+            loop = asyncio.get_running_loop()
             query = state["query"].strip()
-            
-            # Validaciones de seguridad
-            validation_errors = []
-            
-            # 1. Longitud mínima/máxima
-            if len(query) < 3:
-                validation_errors.append("Query demasiado corta")
-            elif len(query) > 500:
-                validation_errors.append("Query demasiado larga")
-            
-            # 2. Caracteres maliciosos básicos
-            malicious_patterns = [
-                r"<script",
-                r"javascript:",
-                r"eval\(",
-                r"exec\(",
-                r"__import__"
-            ]
-            
-            for pattern in malicious_patterns:
-                if re.search(pattern, query, re.IGNORECASE):
-                    validation_errors.append(f"Patrón malicioso detectado: {pattern}")
-            
-            # 3. Solo espacios o caracteres especiales
-            if not re.search(r"[a-zA-ZáéíóúÁÉÍÓÚñÑ]", query):
-                validation_errors.append("Query sin contenido textual válido")
+            validation_errors = await loop.run_in_executor(None, self._validate_query, query)
             
             # Actualizar estado
             state["validation_errors"] = validation_errors
-            state["trace_id"] = f"trace_{int(time.time())}"
-            state["node_history"] = [node_name]
-            state["max_attempts"] = 3
-            state["agent_attempts"] = 0
+            state["node_history"].append(node_name)
             
             if validation_errors:
-                state["error_log"] = validation_errors
+                state["error_log"].extend(validation_errors)
                 logger.warning(f"❌ [{node_name}] Errores de validación: {validation_errors}")
             else:
                 logger.info(f"✅ [{node_name}] Input válido: '{query[:50]}...'")
@@ -208,69 +231,50 @@ class ProfessionalLangGraphOrchestrator:
             
         except Exception as e:
             logger.error(f"❌ [{node_name}] Error: {e}")
-            state["error_log"] = [f"Error en {node_name}: {str(e)}"]
+            state["error_log"].append(f"Error en {node_name}: {str(e)}")
             return state
     
+    @staticmethod
+    def _validate_query(query: str) -> List[str]:
+        """Validaciones de seguridad de la consulta (sin tocar el estado)"""
+        validation_errors = []
+        
+        # 1. Longitud mínima/máxima
+        if len(query) < 3:
+            validation_errors.append("Query demasiado corta")
+        elif len(query) > 500:
+            validation_errors.append("Query demasiado larga")
+        
+        # 2. Caracteres maliciosos básicos
+        malicious_patterns = [
+            r"<script",
+            r"javascript:",
+            r"eval\(",
+            r"exec\(",
+            r"__import__"
+        ]
+        
+        for pattern in malicious_patterns:
+            if re.search(pattern, query, re.IGNORECASE):
+                validation_errors.append(f"Patrón malicioso detectado: {pattern}")
+        
+        # 3. Solo espacios o caracteres especiales
+        if not re.search(r"[a-zA-ZáéíóúÁÉÍÓÚñÑ]", query):
+            validation_errors.append("Query sin contenido textual válido")
+        
+        return validation_errors
+    
     async def _detect_intent_node(self, state: ProfessionalRAGState) -> ProfessionalRAGState:
         """Detección avanzada de intención con entidades"""
         node_name = "detect_intent"
         state["node_history"].append(node_name)
         
         try:
-            query = state["query"].lower()
-            
-            # Patrones mejorados de intención
-            intent_patterns = {
-                "viaticos": {
-                    "patterns": ["viático", "viaticos", "viáticos", "monto", "gastos", "comisión"],
-                    "entities": {
-                        "amount": r"(s/\s*\d+\.?\d*|\d+\.?\d*\s*soles)",
-                        "location": r"(lima|provincia|provincias|metropolitana|regional)",
-                        "type": r"(declaración jurada|sin comprobante|con comprobante)"
-                    }
-                },
-                "declaracion_jurada": {
-                    "patterns": ["declaración jurada", "declaracion jurada", "sin comprobante"],
-                    "entities": {
-                        "limit": r"(límite|limite|máximo|maximo|tope)",
-                        "location": r"(lima|provincia|provincias)"
-                    }
-                }
-            }
-            
-            # Calcular scores de intención
-            intent_scores = {}
-            entities_found = {}
-            
-            for intent, config in intent_patterns.items():
-                score = 0
-                entities = {}
-                
-                # Score por patrones
-                for pattern in config["patterns"]:
-                    if pattern in query:
-                        score += len(pattern) * 2  # Peso por longitud
-                
-                # Extraer entidades
-                for entity_type, entity_pattern in config["entities"].items():
-                    matches = re.findall(entity_pattern, query, re.IGNORECASE)
-                    if matches:
-                        entities[entity_type] = matches
-                        score += len(matches) * 3  # Bonus por entidades
-                
-                if score > 0:
-                    intent_scores[intent] = score
-                    entities_found[intent] = entities
-            
-            # Determinar intención principal
-            if intent_scores:
-                primary_intent = max(intent_scores.keys(), key=lambda x: intent_scores[x])
-                confidence = min(intent_scores[primary_intent] / 15, 1.0)
-                intent_entities = entities_found.get(primary_intent, {})
-            else:
-                primary_intent = "general"
-                confidence = 0.2
-                intent_entities = {}
+            # En un thread: corre en paralelo con input_validation y su presupuesto puede cortarla
+            loop = asyncio.get_running_loop()
+            primary_intent, confidence, intent_entities = await loop.run_in_executor(
+                None, self._score_intent, state["query"].lower()
+            )
             
             # Actualizar estado
             state["intent"] = primary_intent
@@ -287,6 +291,59 @@ class ProfessionalLangGraphOrchestrator:
             state["error_log"].append(f"Error en {node_name}: {str(e)}")
             return state
     
+    @staticmethod
+    def _score_intent(query: str) -> tuple:
+        """Intención principal, confianza y entidades de la consulta (sin tocar el estado)"""
+        # Patrones mejorados de intención
+        intent_patterns = {
+            "viaticos": {
+                "patterns": ["viático", "viaticos", "viáticos", "monto", "gastos", "comisión"],
+                "entities": {
+                    "amount": r"(s/\s*\d+\.?\d*|\d+\.?\d*\s*soles)",
+                    "location": r"(lima|provincia|provincias|metropolitana|regional)",
+                    "type": r"(declaración jurada|sin comprobante|con comprobante)"
+                }
+            },
+            "declaracion_jurada": {
+                "patterns": ["declaración jurada", "declaracion jurada", "sin comprobante"],
+                "entities": {
+                    "limit": r"(límite|limite|máximo|maximo|tope)",
+                    "location": r"(lima|provincia|provincias)"
+                }
+            }
+        }
+        
+        # Calcular scores de intención
+        intent_scores = {}
+        entities_found = {}
+        
+        for intent, config in intent_patterns.items():
+            score = 0
+            entities = {}
+            
+            # Score por patrones
+            for pattern in config["patterns"]:
+                if pattern in query:
+                    score += len(pattern) * 2  # Peso por longitud
+            
+            # Extraer entidades
+            for entity_type, entity_pattern in config["entities"].items():
+                matches = re.findall(entity_pattern, query, re.IGNORECASE)
+                if matches:
+                    entities[entity_type] = matches
+                    score += len(matches) * 3  # Bonus por entidades
+            
+            if score > 0:
+                intent_scores[intent] = score
+                entities_found[intent] = entities
+        
+        # Determinar intención principal
+        if intent_scores:
+            primary_intent = max(intent_scores.keys(), key=lambda x: intent_scores[x])
+            confidence = min(intent_scores[primary_intent] / 15, 1.0)
+            return primary_intent, confidence, entities_found.get(primary_intent, {})
+        return "general", 0.2, {}
+    
     async def _route_to_agent_node(self, state: ProfessionalRAGState) -> ProfessionalRAGState:
         """Routing inteligente a agentes especializados"""
         node_name = "route_to_agent"
@@ -336,76 +393,6 @@ class ProfessionalLangGraphOrchestrator:
             documents_found = agent_result.get("documents_found", 0)
             confidence = agent_result.get("confidence", 0.0)
             
-            # 🚀 ENTERPRISE ENHANCEMENT: Advanced Reranking
-            try:
-                if sources and len(sources) > 1:
-                    logger.info(f"🔄 [{node_name}] Aplicando reranking avanzado a {len(sources)} documentos")
-                    
-                    # Importar reranker (usando path relativo correcto)
-                    try:
-                        from ...core.reranking.advanced_reranker import rerank_search_results
-                    except ImportError:
-                        # Fallback import
-                        import sys
-                        from pathlib import Path
-                        backend_dir = Path(__file__).parent.parent.parent.parent
-                        sys.path.insert(0, str(backend_dir / "src"))
-                        from core.reranking.advanced_reranker import rerank_search_results
-                    
-                    # Preparar documentos para reranking
-                    documents_for_rerank = []
-                    for i, source in enumerate(sources):
-                        doc = {
-                            "id": str(i),
-                            "content": source.get("content", ""),
-                            "text": source.get("content", ""),  # Fallback
-                            "score": source.get("score", 0.5),
-                            "source": source.get("source", ""),
-                            "title": source.get("title", "")
-                        }
-                        documents_for_rerank.append(doc)
-                    
-                    # Aplicar reranking híbrido
-                    reranked_results = await rerank_search_results(
-                        query=state["query"],
-                        documents=documents_for_rerank,
-                        strategy="hybrid"  # hybrid, cross_encoder, semantic, fallback
-                    )
-                    
-                    if reranked_results:
-                        # Actualizar sources con resultados reranqueados
-                        reranked_sources = []
-                        for result in reranked_results:
-                            reranked_source = {
-                                "content": result.content,
-                                "source": result.metadata.get("source", ""),
-                                "title": result.metadata.get("title", ""),
-                                "score": result.reranked_score,
-                                "original_score": result.original_score,
-                                "confidence": result.confidence,
-                                "ranking_method": result.ranking_method,
-                                "original_rank": result.metadata.get("original_rank", 0)
-                            }
-                            reranked_sources.append(reranked_source)
-                        
-                        sources = reranked_sources
-                        
-                        # Actualizar confianza basada en reranking
-                        if reranked_results:
-                            top_confidence = reranked_results[0].confidence
-                            confidence = max(confidence, top_confidence)  # Tomar la mejor confianza
-                        
-                        logger.info(f"✅ [{node_name}] Reranking completado: top score {reranked_results[0].reranked_score:.3f}, método: {reranked_results[0].ranking_method}")
-                    else:
-                        logger.warning(f"⚠️ [{node_name}] Reranking no produjo resultados, usando originales")
-                        
-                else:
-                    logger.info(f"ℹ️ [{node_name}] Reranking omitido: {len(sources)} documentos disponibles")
-                    
-            except Exception as rerank_error:
-                logger.warning(f"⚠️ [{node_name}] Error en reranking: {rerank_error}, continuando con documentos originales")
-                # Continuar con documentos originales si el reranking falla
-            
             # Actualizar estado
             state["raw_response"] = raw_response
             state["sources"] = sources
@@ -426,6 +413,77 @@ class ProfessionalLangGraphOrchestrator:
             state["raw_response"] = ""
             return state
     
+    async def _rerank_sources_node(self, state: ProfessionalRAGState) -> ProfessionalRAGState:
+        """Reranking avanzado de las fuentes del agente (nodo propio: las fuentes se publican antes)"""
+        node_name = "rerank_sources"
+        state["node_history"].append(node_name)
+        
+        sources = state["sources"]
+        confidence = state["confidence"]
+        
+        # 🚀 ENTERPRISE ENHANCEMENT: Advanced Reranking
+        try:
+            if sources and len(sources) > 1 and self.rerank_search_results:
+                logger.info(f"🔄 [{node_name}] Aplicando reranking avanzado a {len(sources)} documentos")
+                
+                # Preparar documentos para reranking
+                documents_for_rerank = []
+                for i, source in enumerate(sources):
+                    doc = {
+                        "id": str(i),
+                        "content": source.get("content", ""),
+                        "text": source.get("content", ""),  # Fallback
+                        "score": source.get("score", 0.5),
+                        "source": source.get("source", ""),
+                        "title": source.get("title", "")
+                    }
+                    documents_for_rerank.append(doc)
+                
+                # Aplicar reranking híbrido
+                reranked_results = await self.rerank_search_results(
+                    query=state["query"],
+                    documents=documents_for_rerank,
+                    strategy="hybrid"  # hybrid, cross_encoder, semantic, fallback
+                )
+                
+                if reranked_results:
+                    # Actualizar sources con resultados reranqueados
+                    reranked_sources = []
+                    for result in reranked_results:
+                        reranked_source = {
+                            "content": result.content,
+                            "source": result.metadata.get("source", ""),
+                            "title": result.metadata.get("title", ""),
+                            "score": result.reranked_score,
+                            "original_score": result.original_score,
+                            "confidence": result.confidence,
+                            "ranking_method": result.ranking_method,
+                            "original_rank": result.metadata.get("original_rank", 0)
+                        }
+                        reranked_sources.append(reranked_source)
+                    
+                    sources = reranked_sources
+                    
+                    # Actualizar confianza basada en reranking
+                    if reranked_results:
+                        top_confidence = reranked_results[0].confidence
+                        confidence = max(confidence, top_confidence)  # Tomar la mejor confianza
+                    
+                    logger.info(f"✅ [{node_name}] Reranking completado: top score {reranked_results[0].reranked_score:.3f}, método: {reranked_results[0].ranking_method}")
+                else:
+                    logger.warning(f"⚠️ [{node_name}] Reranking no produjo resultados, usando originales")
+            
+            else:
+                logger.info(f"ℹ️ [{node_name}] Reranking omitido: {len(sources)} documentos disponibles")
+        
+        except Exception as rerank_error:
+            logger.warning(f"⚠️ [{node_name}] Error en reranking: {rerank_error}, continuando con documentos originales")
+            # Continuar con documentos originales si el reranking falla
+        
+        state["sources"] = sources
+        state["confidence"] = confidence
+        return state
+    
     async def _validate_response_node(self, state: ProfessionalRAGState) -> ProfessionalRAGState:
         """Validación robusta de respuesta con evidencia"""
         node_name = "validate_response"
@@ -708,6 +766,84 @@ class ProfessionalLangGraphOrchestrator:
     
     # === API PRINCIPAL ===
     
+    def _initial_state(self, query: str) -> Dict[str, Any]:
+        """Estado inicial profesional"""
+        return {
+            "messages": [HumanMessage(content=query)],
+            "query": query,
+            "conversation_memory": {},
+            "intent": "",
+            "intent_confidence": 0.0,
+            "intent_entities": {},
+            "selected_agent": "",
+            "agent_attempts": 0,
+            "max_attempts": 3,
+            "raw_response": "",
+            "validated_response": False,
+            "validation_errors": [],
+            "evidence_found": [],
+            "sources": [],
+            "documents_found": 0,
+            "confidence": 0.0,
+            "used_fallback": False,
+            "fallback_reason": "",
+            "final_response": "",
+            "processing_time": 0.0,
+            "timestamp": "",
+            "trace_id": "",
+            "node_history": [],
+            "node_trace": [],
+            "error_log": []
+        }
+    
+    async def stream_query_professional(self, query: str, thread_id: str = None):
+        """
+        Ejecutar el grafo emitiendo cada etapa en cuanto termina su nodo
+        
+        Produce tuplas (evento, payload): sources (salida del agente), reranked,
+        answer (respuesta final) y validation (validación y confianza).
+        """
+        if not thread_id:
+            thread_id = f"prof_{int(time.time())}"
+        config_thread = {"configurable": {"thread_id": thread_id}}
+        validation = {}
+        
+        async for update in self.compiled_graph.astream(
+            self._initial_state(query),
+            config=config_thread,
+            stream_mode="updates"
+        ):
+            for node, node_state in update.items():
+                if not node_state:
+                    continue
+                if node == "execute_agent" and node_state.get("sources"):
+                    yield "sources", {
+                        "sources": node_state["sources"],
+                        "documents_found": node_state.get("documents_found", 0),
+                        "attempt": node_state.get("agent_attempts", 0)
+                    }
+                elif node == "rerank_sources":
+                    yield "reranked", {"sources": node_state.get("sources", [])}
+                elif node == "validate_response":
+                    validation = {
+                        "validated": node_state.get("validated_response", False),
+                        "validation_errors": node_state.get("validation_errors", []),
+                        "evidence_found": node_state.get("evidence_found", []),
+                        "confidence": node_state.get("confidence", 0.0)
+                    }
+                elif node in ("compose_response", "error_handler"):
+                    yield "answer", {"text": node_state.get("final_response", "")}
+                    yield "validation", {
+                        **validation,
+                        "confidence": node_state.get("confidence", 0.0),
+                        "used_fallback": node_state.get("used_fallback", False),
+                        "intent": node_state.get("intent", ""),
+                        "agent_used": node_state.get("selected_agent", ""),
+                        "thread_id": thread_id,
+                        "trace_id": node_state.get("trace_id", ""),
+                        "node_trace": node_state.get("node_trace", [])
+                    }
+    
     async def process_query_professional(self, query: str, thread_id: str = None) -> Dict[str, Any]:
         """Procesar consulta con LangGraph profesional"""
         start_time = time.time()
@@ -719,32 +855,7 @@ class ProfessionalLangGraphOrchestrator:
             logger.info(f"🚀 [PROFESSIONAL] Procesando: {query[:50]}...")
             
             # Estado inicial profesional
-            initial_state = {
-                "messages": [HumanMessage(content=query)],
-                "query": query,
-                "conversation_memory": {},
-                "intent": "",
-                "intent_confidence": 0.0,
-                "intent_entities": {},
-                "selected_agent": "",
-                "agent_attempts": 0,
-                "max_attempts": 3,
-                "raw_response": "",
-                "validated_response": False,
-                "validation_errors": [],
-                "evidence_found": [],
-                "sources": [],
-                "documents_found": 0,
-                "confidence": 0.0,
-                "used_fallback": False,
-                "fallback_reason": "",
-                "final_response": "",
-                "processing_time": 0.0,
-                "timestamp": "",
-                "trace_id": "",
-                "node_history": [],
-                "error_log": []
-            }
+            initial_state = self._initial_state(query)
             
             # Configuración de thread
             config_thread = {"configurable": {"thread_id": thread_id}}
@@ -776,6 +887,7 @@ class ProfessionalLangGraphOrchestrator:
                 "processing_time": round(total_time, 3),
                 "method": "professional_langgraph",
                 "agent_used": final_state.get("selected_agent", ""),
+                "node_trace": final_state.get("node_trace", []),
                 "orchestrator_info": {
                     "orchestrator": self.orchestrator_name,
                     "thread_id": thread_id,
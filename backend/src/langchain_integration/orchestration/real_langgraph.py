@@ -209,6 +209,52 @@ class RealLangGraphOrchestrator:
     
     # === API PRINCIPAL ===
     
+    def _initial_state(self, query: str) -> Dict[str, Any]:
+        """Estado inicial REAL"""
+        return {
+            "messages": [HumanMessage(content=query)],
+            "query": query,
+            "intent": "",
+            "confidence": 0.0,
+            "agent_used": "",
+            "documents_found": 0,
+            "extracted_info": {},
+            "sources": [],
+            "processing_time": 0.0,
+            "timestamp": "",
+            "routing_decision": ""
+        }
+    
+    async def stream_query_real(self, query: str, thread_id: str = None):
+        """Ejecutar el grafo emitiendo (evento, payload) al terminar cada nodo: sources, answer, validation"""
+        if not thread_id:
+            thread_id = f"thread_{int(datetime.now().timestamp())}"
+        config_thread = {"configurable": {"thread_id": thread_id}}
+        
+        async for update in self.compiled_graph.astream(
+            self._initial_state(query),
+            config=config_thread,
+            stream_mode="updates"
+        ):
+            for node, node_state in update.items():
+                if not node_state:
+                    continue
+                if node == "viaticos_agent":
+                    yield "sources", {
+                        "sources": node_state.get("sources", []),
+                        "documents_found": node_state.get("documents_found", 0)
+                    }
+                elif node == "synthesize_response":
+                    last_message = node_state["messages"][-1] if node_state.get("messages") else None
+                    yield "answer", {"text": getattr(last_message, "content", "")}
+                    yield "validation", {
+                        "confidence": node_state.get("confidence", 0.0),
+                        "intent": node_state.get("intent", ""),
+                        "agent_used": node_state.get("agent_used", ""),
+                        "documents_found": node_state.get("documents_found", 0),
+                        "thread_id": thread_id
+                    }
+    
     async def process_query_real(self, query: str, thread_id: str = None) -> Dict[str, Any]:
         """Procesar consulta con LangGraph REAL"""
         start_time = datetime.now()
@@ -220,19 +266,7 @@ class RealLangGraphOrchestrator:
             logger.info(f"🚀 [REAL LANGGRAPH] Procesando query: {query[:50]}...")
             
             # Estado inicial REAL
-            initial_state = {
-                "messages": [HumanMessage(content=query)],
-                "query": query,
-                "intent": "",
-                "confidence": 0.0,
-                "agent_used": "",
-                "documents_found": 0,
-                "extracted_info": {},
-                "sources": [],
-                "processing_time": 0.0,
-                "timestamp": "",
-                "routing_decision": ""
-            }
+            initial_state = self._initial_state(query)
             
             # Configuración de thread para checkpointing
             config_thread = {"configurable": {"thread_id": thread_id}}
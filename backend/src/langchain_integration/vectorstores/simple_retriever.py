@@ -1,17 +1,29 @@
 """
 Retriever simple que usa los chunks existentes
 Implementación que funciona SIN dependencias de LangChain hasta que se instalen
+
+Al cargar se precalculan el texto normalizado, los tokens y la longitud de
+cada documento, un índice invertido término -> documentos y un índice de
+n-gramas de caracteres sobre el vocabulario para las coincidencias
+parciales: el costo de una consulta depende de los postings que coinciden y
+no del tamaño del corpus, con el mismo ranking que el recorrido completo.
+Los metadatos también se indexan (campo -> valor -> documentos), así que el
+filtrado intersecta listas en vez de recorrer todos los documentos.
 """
 import json
 import logging
 import re
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set
 from pathlib import Path
 from dataclasses import dataclass
 import math
 
 logger = logging.getLogger(__name__)
 
+# Longitud máxima de los n-gramas de caracteres del vocabulario
+NGRAM_SIZE = 3
+
 @dataclass
 class Document:
     """Documento simple compatible con LangChain"""
@@ -36,6 +48,10 @@ class SimpleRetriever:
         else:
             self.chunks_path = chunks_path
         self.documents = []
+        self._doc_texts: List[str] = []
+        self._doc_lengths: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._ngram_index: Dict[str, List[str]] = {}
         self.load_chunks()
     
     def load_chunks(self):
@@ -70,6 +86,82 @@ class SimpleRetriever:
         except Exception as e:
             logger.error(f"Error cargando chunks: {e}")
             self.documents = []
+        
+        self._build_index()
+    
+    def _build_index(self):
+        """Precalcular texto normalizado, longitudes, postings, n-gramas y metadatos"""
+        self._doc_texts = []
+        self._doc_lengths = []
+        postings = defaultdict(list)
+        metadata_postings = defaultdict(lambda: defaultdict(list))
+        
+        for doc_id, doc in enumerate(self.documents):
+            doc_text = self._normalize_text(doc.page_content)
+            doc_words = doc_text.split()
+            self._doc_texts.append(doc_text)
+            self._doc_lengths.append(len(doc_words))
+            for term in set(doc_words):
+                postings[term].append(doc_id)
+            for key, value in doc.metadata.items():
+                try:
+                    metadata_postings[key][value].append(doc_id)
+                except TypeError:  # valores no hasheables (p. ej. original_chunk) se filtran recorriendo
+                    pass
+        
+        ngram_index = defaultdict(list)
+        for term in postings:
+            ngrams = {
+                term[i:i + n]
+                for n in range(1, NGRAM_SIZE + 1)
+                for i in range(len(term) - n + 1)
+            }
+            for ngram in ngrams:
+                ngram_index[ngram].append(term)
+        
+        self._postings = dict(postings)
+        self._ngram_index = dict(ngram_index)
+        self._metadata_postings = {key: dict(values) for key, values in metadata_postings.items()}
+        logger.info(f"Índice invertido: {len(self._postings)} términos, {len(self._ngram_index)} n-gramas")
+    
+    def _terms_containing(self, fragment: str) -> List[str]:
+        """Términos del vocabulario que contienen el fragmento"""
+        if len(fragment) <= NGRAM_SIZE:
+            return self._ngram_index.get(fragment, [])
+        # El n-grama más raro del fragmento acota los candidatos
+        candidates = min(
+            (self._ngram_index.get(fragment[i:i + NGRAM_SIZE], []) for i in range(len(fragment) - NGRAM_SIZE + 1)),
+            key=len
+        )
+        return [term for term in candidates if fragment in term]
+    
+    def _terms_within(self, word: str) -> Set[str]:
+        """Términos del vocabulario que son subcadena de la palabra"""
+        return {
+            word[i:j]
+            for i in range(len(word))
+            for j in range(i + 1, len(word) + 1)
+            if word[i:j] in self._postings
+        }
+    
+    def _docs_with_terms(self, terms) -> Set[int]:
+        docs = set()
+        for term in terms:
+            docs.update(self._postings[term])
+        return docs
+    
+    def _docs_containing(self, fragment: str) -> Set[int]:
+        """Documentos cuyo texto normalizado contiene el fragmento (puede abarcar varios tokens)"""
+        pieces = fragment.split(' ')
+        if len(pieces) == 1:
+            return self._docs_with_terms(self._terms_containing(fragment))
+        
+        # Primer trozo: sufijo de un término; último: prefijo; intermedios: términos completos
+        candidates = self._docs_with_terms(t for t in self._terms_containing(pieces[0]) if t.endswith(pieces[0]))
+        for piece in pieces[1:-1]:
+            candidates &= set(self._postings.get(piece, []))
+        candidates &= self._docs_with_terms(t for t in self._terms_containing(pieces[-1]) if t.startswith(pieces[-1]))
+        return {doc_id for doc_id in candidates if fragment in self._doc_texts[doc_id]}
     
     def simple_similarity_search(self, query: str, k: int = 5) -> List[Document]:
         """Búsqueda por similitud simple usando coincidencias de texto"""
@@ -77,18 +169,40 @@ class SimpleRetriever:
             return []
         
         query_words = self._normalize_text(query).split()
-        scored_docs = []
         
-        for doc in self.documents:
-            score = self._calculate_similarity(query_words, doc.page_content)
+        # Coincidencias exactas
+        exact_matches = defaultdict(int)
+        for word in query_words:
+            for doc_id in self._postings.get(word, []):
+                exact_matches[doc_id] += 1
+        
+        # Coincidencias parciales: términos que contienen la palabra o están contenidos en ella
+        partial_matches = defaultdict(float)
+        for query_word in query_words:
+            if len(query_word) > 3:  # Solo palabras largas
+                terms = set(self._terms_containing(query_word)) | self._terms_within(query_word)
+                for doc_id in self._docs_with_terms(terms):
+                    partial_matches[doc_id] += 0.5
+        
+        # Bonus por coincidencias de frases
+        phrase_bonus = defaultdict(int)
+        for i in range(len(query_words) - 1):
+            for doc_id in self._docs_containing(f"{query_words[i]} {query_words[i+1]}"):
+                phrase_bonus[doc_id] += 2
+        
+        scored_docs = []
+        for doc_id in set(exact_matches) | set(partial_matches) | set(phrase_bonus):
+            total_score = exact_matches.get(doc_id, 0) * 2 + partial_matches.get(doc_id, 0) + phrase_bonus.get(doc_id, 0)
+            # Normalizar por longitud del documento (penalizar documentos muy largos)
+            score = total_score / math.log(self._doc_lengths[doc_id] + 1)
             if score > 0:
-                scored_docs.append((doc, score))
+                scored_docs.append((doc_id, score))
         
-        # Ordenar por score descendente
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
+        # Ordenar por score descendente (empates en orden de carga)
+        scored_docs.sort(key=lambda x: (-x[1], x[0]))
         
         # Retornar top k documentos
-        return [doc for doc, score in scored_docs[:k]]
+        return [self.documents[doc_id] for doc_id, score in scored_docs[:k]]
     
     def _normalize_text(self, text: str) -> str:
         """Normalizar texto para búsqueda"""
@@ -112,7 +226,7 @@ class SimpleRetriever:
         return text
     
     def _calculate_similarity(self, query_words: List[str], document_text: str) -> float:
-        """Calcular similitud simple entre query y documento"""
+        """Calcular similitud simple entre query y documento (referencia sin índice)"""
         doc_text = self._normalize_text(document_text)
         doc_words = doc_text.split()
         
@@ -153,39 +267,48 @@ class SimpleRetriever:
         if not self.documents:
             return []
         
-        scored_docs = []
+        scores = defaultdict(int)
         normalized_keywords = [self._normalize_text(kw) for kw in keywords]
         
-        for doc in self.documents:
-            doc_text = self._normalize_text(doc.page_content)
-            score = 0
-            
-            for keyword in normalized_keywords:
+        for keyword in normalized_keywords:
+            if not keyword:
+                continue
+            for doc_id in self._docs_containing(keyword):
                 # Contar ocurrencias de cada keyword
-                count = doc_text.count(keyword)
-                score += count * len(keyword)  # Palabras más largas valen más
-            
-            if score > 0:
-                scored_docs.append((doc, score))
+                count = self._doc_texts[doc_id].count(keyword)
+                scores[doc_id] += count * len(keyword)  # Palabras más largas valen más
         
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
-        return [doc for doc, score in scored_docs[:k]]
+        scored_docs = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return [self.documents[doc_id] for doc_id, score in scored_docs[:k]]
     
     def get_documents_by_metadata(self, metadata_filter: Dict[str, Any]) -> List[Document]:
-        """Filtrar documentos por metadatos"""
-        filtered_docs = []
+        """Filtrar documentos por metadatos (intersección de postings, en orden de documento)"""
+        if not self.documents:
+            return []
         
-        for doc in self.documents:
-            match = True
-            for key, value in metadata_filter.items():
-                if key not in doc.metadata or doc.metadata[key] != value:
-                    match = False
+        lists, scanned = [], {}
+        for key, value in metadata_filter.items():
+            try:
+                lists.append(self._metadata_postings.get(key, {}).get(value, []))
+            except TypeError:
+                scanned[key] = value
+        
+        if lists:
+            lists.sort(key=len)
+            candidates = set(lists[0])
+            for doc_ids in lists[1:]:
+                if not candidates:
                     break
-            
-            if match:
-                filtered_docs.append(doc)
+                candidates.intersection_update(doc_ids)
+            candidates = sorted(candidates)
+        else:
+            candidates = range(len(self.documents))
         
-        return filtered_docs
+        return [
+            self.documents[doc_id] for doc_id in candidates
+            if all(key in self.documents[doc_id].metadata and self.documents[doc_id].metadata[key] == value
+                   for key, value in scanned.items())
+        ]
     
     def get_stats(self) -> Dict[str, Any]:
         """Obtener estadísticas del retriever"""
@@ -4,15 +4,13 @@ FastAPI application with plugin system and multi-LLM router.
 
 from fastapi import FastAPI, HTTPException, Depends, Security
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
-import uvicorn
 import logging
 import time
 import sys
 import os
-import re
 
 # === LOGGING PARA SEGURIDAD DE PRODUCCIÓN ===
 logger = logging.getLogger(__name__)
@@ -20,13 +18,16 @@ logging.basicConfig(level=logging.INFO)
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 # Setup paths
 backend_dir = Path(__file__).parent.parent  # /backend
 project_root = backend_dir.parent  # /vm-expedientes-minedu
 sys.path.insert(0, str(project_root))  # Add project root to path
 
+from backend.src.core.streaming.chat_stream import sse_stream, run_blocking, SSE_MEDIA_TYPE, SSE_HEADERS
+from backend.src.core.startup.lazy_providers import ProviderRegistry
+
 # Direct import - create ProjectPaths inline to avoid import issues
 class ProjectPaths:
     """Project paths configuration."""
@@ -50,76 +51,152 @@ class ProjectPaths:
         except ValueError:
             return str(path)
 
-# ==================== LANGGRAPH PROFESIONAL INTEGRATION ====================
-# NUEVO: LangGraph PROFESIONAL con validación, retry y observabilidad
-try:
+# ==================== PROVEEDORES PEREZOSOS ====================
+# Los subsistemas pesados se registran como fábricas: se cargan en segundo
+# plano después de abrir el puerto (lifespan) o en la primera petición que
+# los necesite. /health responde de inmediato; /ready indica cuándo están listos.
+providers = ProviderRegistry()
+
+
+def _load_retriever():
     from backend.src.langchain_integration.vectorstores.simple_retriever import retriever
     print(f"📊 SimpleRetriever cargado: {retriever.get_stats()['total_documents']} documentos")
-    
-    # Try to import LangGraph components
+    return retriever
+
+
+# NUEVO: LangGraph PROFESIONAL con validación, retry y observabilidad
+def _load_professional_orchestrator():
     from backend.src.langchain_integration.orchestration.professional_langgraph import professional_orchestrator
+    print("🚀 LangGraph PROFESIONAL cargado exitosamente - Con validación, retry y fallback")
+    return professional_orchestrator
+
+
+def _load_real_orchestrator():
     from backend.src.langchain_integration.orchestration.real_langgraph import real_orchestrator
+    return real_orchestrator
+
+
+def _load_langchain_config():
     from backend.src.langchain_integration.config import config as langchain_config
-    LANGGRAPH_PROFESSIONAL_AVAILABLE = True
-    LANGGRAPH_REAL_AVAILABLE = True
-    print("🚀 LangGraph PROFESIONAL cargado exitosamente - Con validación, retry y fallback")
-    print("🎯 Sistema: NIVEL EMPRESARIAL")
-except ImportError as e:
-    print(f"⚠️ LangGraph no disponible (usando fallback): {e}")
-    try:
-        # Load only SimpleRetriever for fallback
-        from backend.src.langchain_integration.vectorstores.simple_retriever import retriever
-        print(f"✅ Fallback con SimpleRetriever: {retriever.get_stats()['total_documents']} documentos")
-    except ImportError as fallback_error:
-        print(f"❌ Fallback también falló: {fallback_error}")
-        retriever = None
-    
-    LANGGRAPH_PROFESSIONAL_AVAILABLE = False
-    LANGGRAPH_REAL_AVAILABLE = False
-    professional_orchestrator = None
-    real_orchestrator = None
+    return langchain_config
 
-# ANTIALUCINACIONES v2.0.0: Simuladores eliminados completamente
-# PROHIBIDO: Importar o usar simuladores en sistema gubernamental
-LANGCHAIN_SIMULATOR_AVAILABLE = False  # Permanentemente deshabilitado
-orchestrator = None  # Solo se usa real_orchestrator
 
 # Mantener sistema híbrido existente como fallback
-try:
-    from .core.hybrid.hybrid_search import HybridSearch
-    HYBRID_SEARCH_AVAILABLE = True
-    print("✅ Sistema híbrido legacy disponible como fallback")
-except ImportError as e:
-    print(f"⚠️ Hybrid search not available: {e}")
-    print(f"Project root: {project_root}")
-    print(f"Backend dir: {backend_dir}")
-    HYBRID_SEARCH_AVAILABLE = False
-    HybridSearch = None  # Define it as None so no NameError
+def _build_hybrid_search(source: Path):
+    """HybridSearch sobre un directorio de generación (snapshots o pickles)"""
+    from src.core.hybrid.hybrid_search import HybridSearch
+    from src.core.hybrid.index_generations import generation_paths
+
+    paths = generation_paths(source)
+    print(f"🔍 Loading vectorstores from:")
+    print(f"  - BM25: {paths['bm25']}")
+    print(f"  - TF-IDF: {paths['tfidf']}")
+    print(f"  - Transformer: {paths['transformer']}")
+
+    hybrid_search = HybridSearch(
+        bm25_vectorstore_path=paths["bm25"],
+        tfidf_vectorstore_path=paths["tfidf"],
+        transformer_vectorstore_path=paths["transformer"],
+        fusion_strategy='weighted'
+    )
+    # Cache semántico para consultas parafraseadas (opt-in: SEMANTIC_CACHE_ENABLED=true)
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true":
+        hybrid_search.enable_semantic_cache(
+            similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000")),
+            ttl_seconds=int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+        )
+    return hybrid_search
+
+
+def _load_hybrid_search():
+    """Gestor de generaciones: las consultas usan la generación activa y un
+    nuevo índice se valida y se activa sin reiniciar los workers"""
+    from src.core.hybrid.index_generations import IndexGenerationManager, POINTER_FILE, load_smoke_queries
+
+    manager = IndexGenerationManager(
+        _build_hybrid_search,
+        load_smoke_queries(ProjectPaths.DATA_DIR / "evaluation"),
+        pointer_file=ProjectPaths.VECTORSTORES_DIR / POINTER_FILE,
+        poll_interval=float(os.getenv("INDEX_GENERATION_POLL_SECONDS", "30"))
+    )
+    report = manager.swap(manager.pointer_target() or ProjectPaths.VECTORSTORES_DIR)
+    if manager.current is None:
+        raise RuntimeError(report.get("error", "no index generation loaded"))
+    logger.info(f"✅ Hybrid search system initialized (generation {manager.generation_id})")
+    return manager
 
-# Import backend core modules with error handling
-try:
-    from .core.plugins.plugin_registry import PluginRegistry
-except ImportError:
-    PluginRegistry = None
 
-# Import legal reasoning
-try:
-    sys.path.append(str(project_root))
-    from backend.src.domain.legal_reasoning import create_legal_reasoner
+def _load_legal_reasoner():
+    from .domain.legal_reasoning import create_legal_reasoner
     legal_reasoner = create_legal_reasoner()
-    LEGAL_REASONING_AVAILABLE = True
     print("⚖️ Legal reasoning engine loaded")
-except ImportError as e:
-    print(f"⚠️ Legal reasoning not available: {e}")
-    legal_reasoner = None
-    LEGAL_REASONING_AVAILABLE = False
+    return legal_reasoner
+
+
+def _load_plugin_registry():
+    from .core.plugins.plugin_registry import PluginRegistry
+    plugin_registry = PluginRegistry("../config/plugins.yaml")
+    logger.info(f"✅ Loaded {len(plugin_registry.plugins)} plugins")
+    return plugin_registry
+
+
+def _load_model_router():
+    from .core.llm.model_router import ModelRouter
+    model_router = ModelRouter("../config/models.yaml")
+    logger.info(f"✅ Loaded {len(model_router.models)} models")
+    return model_router
+
+
+def _load_normative_graph():
+    """Grafo normativo compartido (memoria semántica, análisis legal, gráficos),
+    construido una vez desde los chunks de la generación activa"""
+    from src.core.graph.normative_graph import set_normative_graph
+    from src.core.legal.normative_concordance import NormativeConcordance, norms_from_chunks
+
+    manager = providers.get("hybrid_search")
+    if manager is None or manager.current is None:
+        raise RuntimeError("hybrid search not available")
+    searcher = manager.current.searcher
+    retriever = searcher.bm25_retriever or searcher.tfidf_retriever or searcher.transformer_retriever
+    graph = NormativeConcordance().build_normative_graph(norms_from_chunks(retriever.chunks))
+    set_normative_graph(graph)
+    logger.info(f"🕸️ Normative graph published: {graph.get_stats()['nodes']} norms")
+    return graph
+
+
+# Orden de precarga: primero lo que atiende el chat
+providers.register("retriever", _load_retriever, required=True)
+providers.register("professional_orchestrator", _load_professional_orchestrator)
+providers.register("real_orchestrator", _load_real_orchestrator)
+providers.register("langchain_config", _load_langchain_config)
+providers.register("legal_reasoner", _load_legal_reasoner)
+providers.register("hybrid_search", _load_hybrid_search)
+providers.register("plugin_registry", _load_plugin_registry)
+providers.register("model_router", _load_model_router)
+providers.register("normative_graph", _load_normative_graph)
+
+# gunicorn --preload (MINEDU_PRELOAD_INDEXES=1): los índices se cargan una vez en el
+# master y los workers comparten sus páginas por copy-on-write
+if os.getenv("MINEDU_PRELOAD_INDEXES") == "1":
+    providers.get("retriever")
+    providers.get("hybrid_search")
+
+# ANTIALUCINACIONES v2.0.0: Simuladores eliminados completamente
+# PROHIBIDO: Importar o usar simuladores en sistema gubernamental
+LANGCHAIN_SIMULATOR_AVAILABLE = False  # Permanentemente deshabilitado
+orchestrator = None  # Solo se usa real_orchestrator
 
 # ENTERPRISE FEATURES: Auth, Feedback, Database
+# Se importan al arrancar porque sus dependencias declaran las rutas protegidas;
+# el cross-encoder del reranker se carga recién en initialize_reranker()
 try:
-    from .core.auth.jwt_auth import JWTAuth, get_current_user, User
+    from .core.auth.jwt_auth import JWTAuth, get_current_user, get_optional_user, get_admin_user, User
     from .core.feedback.feedback_system import FeedbackRequest, submit_user_feedback, get_system_feedback_analytics
-    from .core.database.session import get_async_session
+    from .core.database.connection import get_async_db_dependency as get_async_session
     from .core.reranking.advanced_reranker import global_reranker, initialize_reranker
+    from .core.database.query_log_buffer import query_log_buffer
+    from .core.database.repositories import QueryLogRepository
     ENTERPRISE_FEATURES_AVAILABLE = True
     print("🏢 Enterprise features loaded: JWT Auth, Feedback System, Advanced Reranking")
 except ImportError as e:
@@ -128,10 +205,12 @@ except ImportError as e:
     get_current_user = None
     get_async_session = None
 
-try:
-    from .core.llm.model_router import ModelRouter  
-except ImportError:
-    ModelRouter = None
+    async def get_optional_user():
+        return None
+
+    async def get_admin_user():
+        # Sin autenticación las rutas de administración quedan cerradas
+        raise HTTPException(status_code=503, detail="Authentication not available")
 
 try:
     from .core.config.settings import get_settings
@@ -147,78 +226,30 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global instances
-plugin_registry: PluginRegistry = None
-model_router: ModelRouter = None
-hybrid_search: HybridSearch = None
 settings = get_settings()
 
-# ==================== LEGAL REASONING ENGINE ====================
-try:
-    from .domain.legal_reasoning import create_legal_reasoner
-    legal_reasoner = create_legal_reasoner()
-    LEGAL_REASONING_AVAILABLE = True
-    print("✅ Legal reasoning engine loaded successfully")
-except Exception as e:
-    legal_reasoner = None
-    LEGAL_REASONING_AVAILABLE = False
-    print(f"⚠️ Legal reasoning not available: {e}")
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management."""
-    global plugin_registry, model_router, hybrid_search
-    
-    # Startup
+    # Startup: por defecto la precarga corre en segundo plano después de abrir el puerto;
+    # MINEDU_EAGER_STARTUP=1 la completa antes de aceptar peticiones
     logger.info("🚀 Starting Government AI Platform...")
-    try:
-        if PluginRegistry:
-            plugin_registry = PluginRegistry("../config/plugins.yaml")
-            logger.info(f"✅ Loaded {len(plugin_registry.plugins)} plugins")
-        else:
-            logger.info("📝 Plugin registry not available - using mock data")
-            
-        if ModelRouter:
-            model_router = ModelRouter("../config/models.yaml")
-            logger.info(f"✅ Loaded {len(model_router.models)} models")
-        else:
-            logger.info("📝 Model router not available - using mock data")
-    except Exception as e:
-        logger.error(f"❌ Error during startup: {e}")
-        # Continue with mock data for development
-        logger.info("📝 Using mock data for development")
-    
-    # Initialize Hybrid Search
-    if HYBRID_SEARCH_AVAILABLE:
-        try:
-            # Paths to vectorstores from project root
-            bm25_path = str(ProjectPaths.BM25_VECTORSTORE)
-            tfidf_path = str(ProjectPaths.TFIDF_VECTORSTORE)
-            transformer_path = str(ProjectPaths.TRANSFORMERS_VECTORSTORE)
-            
-            print(f"🔍 Loading vectorstores from:")
-            print(f"  - BM25: {bm25_path}")
-            print(f"  - TF-IDF: {tfidf_path}")
-            print(f"  - Transformer: {transformer_path}")
-            
-            hybrid_search = HybridSearch(
-                bm25_vectorstore_path=bm25_path,
-                tfidf_vectorstore_path=tfidf_path,
-                transformer_vectorstore_path=transformer_path,
-                fusion_strategy='weighted'
-            )
-            logger.info("✅ Hybrid search system initialized")
-        except Exception as e:
-            logger.error(f"❌ Error initializing hybrid search: {e}")
-            hybrid_search = None
+    if os.getenv("MINEDU_EAGER_STARTUP") == "1":
+        await providers.warm_up()
     else:
-        logger.warning("❌ Hybrid search not available")
-        hybrid_search = None
+        providers.start_warm_up()
+    
+    # Write-behind de QueryLog (inserciones por lotes fuera del camino de la petición)
+    if ENTERPRISE_FEATURES_AVAILABLE:
+        query_log_buffer.start()
     
     yield
     
     # Shutdown
     logger.info("🔄 Shutting down Government AI Platform...")
+    await providers.stop()
+    if ENTERPRISE_FEATURES_AVAILABLE:
+        await query_log_buffer.stop()
 
 # Create FastAPI app
 app = FastAPI(
@@ -259,8 +290,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness: responde sin esperar la precarga de subsistemas."""
     try:
+        plugin_registry = providers.peek("plugin_registry")
+        model_router = providers.peek("model_router")
         plugins_count = len(plugin_registry.plugins) if plugin_registry else 0
         models_count = len(model_router.models) if model_router else 0
         
@@ -280,10 +313,18 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 hasta que los subsistemas terminen de cargar."""
+    readiness = providers.readiness()
+    readiness["timestamp"] = datetime.now().isoformat()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
 @app.get("/api/admin/plugins")
 async def get_plugins():
     """Get all plugins configuration."""
     try:
+        plugin_registry = await providers.resolve("plugin_registry")
         if plugin_registry and plugin_registry.plugins:
             return [
                 {
@@ -356,6 +397,7 @@ async def get_plugins():
 async def get_models():
     """Get all models configuration."""
     try:
+        model_router = await providers.resolve("model_router")
         if model_router and model_router.models:
             return [
                 {
@@ -456,6 +498,16 @@ async def get_system_status():
         logger.error(f"Error getting system status: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving system status")
 
+@app.get("/api/admin/memory")
+async def get_memory_report():
+    """Memoria por proceso: USS (privada) frente a compartida del master y cada worker."""
+    from src.core.monitoring.memory_report import memory_report
+    
+    report = memory_report()
+    report["preloaded_indexes"] = os.getenv("MINEDU_PRELOAD_INDEXES") == "1"
+    report["timestamp"] = datetime.now().isoformat()
+    return report
+
 @app.post("/api/admin/plugins/{plugin_id}/toggle")
 async def toggle_plugin(plugin_id: str):
     """Toggle plugin enabled/disabled state."""
@@ -496,9 +548,33 @@ class SearchRequest(BaseModel):
     method: str = "hybrid"
     top_k: int = 5
 
+class IndexSwapRequest(BaseModel):
+    source: str
+    wait: bool = False
+
+def _enqueue_query_log(request: ChatRequest, response_data: Dict[str, Any], current_user, method: str) -> None:
+    """
+    Registrar la consulta en el buffer write-behind (sin tocar la BD en la petición).
+    Las consultas anónimas se guardan sin usuario
+    """
+    if not ENTERPRISE_FEATURES_AVAILABLE:
+        return
+    query_log_buffer.add(
+        current_user.username if current_user is not None else None,
+        request.message,
+        response_data.get("response", ""),
+        trace_id=uuid4().hex,
+        method=response_data.get("method", method),
+        processing_time=float(response_data.get("processing_time") or 0.0),
+        confidence_score=float(response_data.get("confidence", 0.0) or 0.0),
+        documents_found=int(response_data.get("documents_found", len(response_data.get("sources") or []))),
+        used_fallback=response_data.get("mode") == "fallback"
+    )
+
 @app.post("/api/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, current_user=Depends(get_optional_user)):
     """Chat endpoint for conversational AI with real hybrid search."""
+    hybrid_search = await providers.resolve("hybrid_search")
     try:
         logger.info(f"Received chat request: {request.message}")
         start_time = time.time()
@@ -506,7 +582,9 @@ async def chat_endpoint(request: ChatRequest):
         # Check if hybrid search is available
         if hybrid_search is None:
             logger.warning("Hybrid search not available, using fallback response")
-            return _generate_fallback_response(request)
+            response_data = _generate_fallback_response(request)
+            _enqueue_query_log(request, response_data, current_user, "fallback")
+            return response_data
         
         # Perform hybrid search
         try:
@@ -515,13 +593,16 @@ async def chat_endpoint(request: ChatRequest):
             
             # Generate response based on search results
             response_data = await _generate_chat_response(request, search_results, start_time)
+            _enqueue_query_log(request, response_data, current_user, "hybrid")
             
             logger.info(f"Generated response for query: '{request.message[:50]}...'")
             return response_data
             
         except Exception as search_error:
             logger.error(f"Error in hybrid search: {search_error}")
-            return _generate_fallback_response(request, error_msg=str(search_error))
+            response_data = _generate_fallback_response(request, error_msg=str(search_error))
+            _enqueue_query_log(request, response_data, current_user, "fallback")
+            return response_data
         
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
@@ -529,11 +610,15 @@ async def chat_endpoint(request: ChatRequest):
 
 async def _generate_chat_response(request: ChatRequest, search_results: List[Dict], start_time: float) -> Dict:
     """Generate chat response using LangChain orchestrator or fallback to legacy system."""
+    retriever = await providers.resolve("retriever")
+    professional_orchestrator = await providers.resolve("professional_orchestrator")
+    real_orchestrator = await providers.resolve("real_orchestrator")
+    legal_reasoner = await providers.resolve("legal_reasoner")
     processing_time = time.time() - start_time
     
     # ==================== PARCHE: USAR RETRIEVER DIRECTO SI LANGGRAPH NO DISPONIBLE ====================
     # NUEVO: Si SimpleRetriever está disponible, usar directamente (parche sin LangGraph)
-    if not LANGGRAPH_PROFESSIONAL_AVAILABLE and retriever:
+    if not professional_orchestrator and retriever:
         try:
             logger.info("🔧 Usando SimpleRetriever directo (parche sin LangGraph)")
             
@@ -564,7 +649,7 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
                     response_parts.append(f"**{i}.** {content_preview}...")
                 
                 # Integrar razonamiento legal si está disponible
-                if LEGAL_REASONING_AVAILABLE and legal_reasoner:
+                if legal_reasoner:
                     try:
                         legal_analysis = legal_reasoner.provide_legal_reasoning(
                             request.message,
@@ -595,7 +680,7 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
     
     # ==================== LANGGRAPH PROFESIONAL (si disponible) ====================
     # Usar LangGraph PROFESIONAL si está disponible
-    if LANGGRAPH_PROFESSIONAL_AVAILABLE and professional_orchestrator:
+    if professional_orchestrator:
         try:
             logger.info("🚀 Usando LangGraph PROFESIONAL - Validación + Retry + Fallback")
             
@@ -609,7 +694,7 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
             if professional_result and not professional_result.get("error"):
                 logger.info("✅ LangGraph PROFESIONAL exitoso - sistema empresarial")
                 # Integrar razonamiento legal, si está disponible y hay documentos
-                if LEGAL_REASONING_AVAILABLE and legal_reasoner and professional_result.get("sources"):
+                if legal_reasoner and professional_result.get("sources"):
                     try:
                         legal_analysis = legal_reasoner.provide_legal_reasoning(
                             request.message,
@@ -643,7 +728,7 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
     
     # ==================== FALLBACK: LANGGRAPH REAL ====================
     # Fallback a LangGraph REAL si el profesional falla
-    if LANGGRAPH_REAL_AVAILABLE and real_orchestrator:
+    if real_orchestrator:
         try:
             logger.info("🔄 Fallback: Usando LangGraph REAL básico")
             
@@ -740,7 +825,7 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
         response_text = _generate_smart_fallback(request.message, search_results)
     
     # ---------------- LEGAL REASONING INTEGRATION ----------------
-    if LEGAL_REASONING_AVAILABLE and legal_reasoner and search_results:
+    if legal_reasoner and search_results:
         try:
             legal_analysis = legal_reasoner.provide_legal_reasoning(request.message, search_results)
             response_text = f"{response_text}\n\n{legal_analysis}"
@@ -748,9 +833,19 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
         except Exception as e:
             logger.error(f"❌ Error in legal reasoning: {e}")
     
-    # Prepare sources from search results
+    return {
+        "response": response_text,
+        "conversation_id": request.conversation_id or f"conv_{int(time.time())}",
+        "timestamp": datetime.now().isoformat(),
+        "sources": _format_search_sources(search_results),
+        "processing_time": round(processing_time, 3),
+        "total_results": len(search_results)
+    }
+
+def _format_search_sources(search_results: List[Dict]) -> List[Dict]:
+    """Prepare sources from search results (top 3)"""
     sources = []
-    for i, result in enumerate(search_results[:3]):  # Top 3 sources
+    for i, result in enumerate(search_results[:3]):
         source = {
             "title": result.get('title', f"Documento {i+1}"),
             "excerpt": result.get('content', '')[:200] + "...",
@@ -758,94 +853,97 @@ async def _generate_chat_response(request: ChatRequest, search_results: List[Dic
             "method": result.get('method', 'hybrid')
         }
         sources.append(source)
-    
-    return {
-        "response": response_text,
-        "conversation_id": request.conversation_id or f"conv_{int(time.time())}",
-        "timestamp": datetime.now().isoformat(),
-        "sources": sources,
-        "processing_time": round(processing_time, 3),
-        "total_results": len(search_results)
-    }
+    return sources
+
+# Patrones para montos y límites
+_MONTO_PATTERNS = [
+    r'monto\s*(máximo|maximo|tope|límite|limite)',
+    r'(cuánto|cuanto)\s*(es|son|puedo)',
+    r'(máximo|maximo|tope)\s*(de|para)\s*viáticos',
+    r'límite\s*(de|para)\s*viáticos',
+    r'tope\s*(de|para)\s*(viáticos|viaticos|declaración)',
+    r'(viáticos|viaticos)\s*(máximos|maximos|diarios)',
+    r'valor\s*(de|del)\s*viático'
+]
+
+# Patrones para declaración jurada
+_DECLARACION_PATTERNS = [
+    r'declaración\s*jurada',
+    r'declaracion\s*jurada',
+    r'sin\s*comprobante',
+    r'sin\s*boleta',
+    r'sin\s*factura',
+    r'gastos\s*menores',
+    r'lima|provincia'
+]
+
+# Patrones para procedimientos
+_PROCEDIMIENTO_PATTERNS = [
+    r'procedimiento',
+    r'(cómo|como)\s*(solicitar|pedir|tramitar)',
+    r'pasos\s*para',
+    r'proceso\s*de',
+    r'devolución',
+    r'reembolso',
+    r'devolver',
+    r'gerente\s*asume'
+]
+
+# Patrones para diferencias y comparaciones
+_DIFERENCIA_PATTERNS = [
+    r'diferencia\s*entre',
+    r'comparación',
+    r'ministro.*servidor',
+    r'servidor.*ministro',
+    r'tipos\s*de\s*viático',
+    r'categorías'
+]
+
+# Patrones para componentes/qué incluye
+_COMPONENTE_PATTERNS = [
+    r'(qué|que)\s*incluye',
+    r'componentes',
+    r'(qué|que)\s*cubre',
+    r'alcance',
+    r'comprende',
+    r'abarca',
+    r'incluyen\s*(los\s*)?viáticos',
+    r'incluyen\s*(los\s*)?viaticos'
+]
+
+def _build_intent_matcher():
+    """Compilados una vez; una pasada Aho-Corasick decide qué regex evaluar"""
+    from src.core.agents.pattern_matcher import CompiledPatternSet
+    return CompiledPatternSet(
+        keywords={"viaticos": ["viático", "viatico"]},
+        patterns={
+            "componentes": _COMPONENTE_PATTERNS,
+            "procedimiento": _PROCEDIMIENTO_PATTERNS,
+            "diferencias": _DIFERENCIA_PATTERNS,
+            "montos": _MONTO_PATTERNS,
+            "declaracion": _DECLARACION_PATTERNS
+        }
+    )
+
+providers.register("intent_matcher", _build_intent_matcher)
 
 def _detect_query_intent(query: str) -> str:
     """
     Detecta la intención de la consulta usando patrones sofisticados
     """
-    query_lower = query.lower()
-    
-    # Patrones para montos y límites
-    monto_patterns = [
-        r'monto\s*(máximo|maximo|tope|límite|limite)',
-        r'(cuánto|cuanto)\s*(es|son|puedo)',
-        r'(máximo|maximo|tope)\s*(de|para)\s*viáticos',
-        r'límite\s*(de|para)\s*viáticos',
-        r'tope\s*(de|para)\s*(viáticos|viaticos|declaración)',
-        r'(viáticos|viaticos)\s*(máximos|maximos|diarios)',
-        r'valor\s*(de|del)\s*viático'
-    ]
-    
-    # Patrones para declaración jurada
-    declaracion_patterns = [
-        r'declaración\s*jurada',
-        r'declaracion\s*jurada',
-        r'sin\s*comprobante',
-        r'sin\s*boleta',
-        r'sin\s*factura',
-        r'gastos\s*menores',
-        r'lima|provincia'
-    ]
-    
-    # Patrones para procedimientos
-    procedimiento_patterns = [
-        r'procedimiento',
-        r'(cómo|como)\s*(solicitar|pedir|tramitar)',
-        r'pasos\s*para',
-        r'proceso\s*de',
-        r'devolución',
-        r'reembolso',
-        r'devolver',
-        r'gerente\s*asume'
-    ]
-    
-    # Patrones para diferencias y comparaciones
-    diferencia_patterns = [
-        r'diferencia\s*entre',
-        r'comparación',
-        r'ministro.*servidor',
-        r'servidor.*ministro',
-        r'tipos\s*de\s*viático',
-        r'categorías'
-    ]
-    
-    # Patrones para componentes/qué incluye
-    componente_patterns = [
-        r'(qué|que)\s*incluye',
-        r'componentes',
-        r'(qué|que)\s*cubre',
-        r'alcance',
-        r'comprende',
-        r'abarca',
-        r'incluyen\s*(los\s*)?viáticos',
-        r'incluyen\s*(los\s*)?viaticos'
-    ]
+    keyword_counts, pattern_matches = providers.get("intent_matcher").scan(query.lower())
     
     # Detectar intención con prioridad (orden importante)
-    if any(re.search(pattern, query_lower) for pattern in componente_patterns):
-        return "componentes"
+    for intent in ("componentes", "procedimiento", "diferencias"):
+        if pattern_matches[intent]:
+            return intent
     
-    if any(re.search(pattern, query_lower) for pattern in procedimiento_patterns):
-        return "procedimiento"
-    
-    if any(re.search(pattern, query_lower) for pattern in diferencia_patterns):
-        return "diferencias"
-    
-    if any(re.search(pattern, query_lower) for pattern in monto_patterns):
-        if any(re.search(pattern, query_lower) for pattern in declaracion_patterns):
+    if pattern_matches["montos"]:
+        if pattern_matches["declaracion"]:
             return "declaracion_jurada"
         return "montos_maximos"
     
-    if "viático" in query_lower or "viatico" in query_lower:
+    if keyword_counts["viaticos"]:
         return "viaticos_general"
     
     return "general"
@@ -1361,12 +1459,56 @@ async def search_endpoint(request: SearchRequest):
 
 # ==================== NUEVOS ENDPOINTS LANGCHAIN ====================
 
+def _build_professional_retriever_response(query: str, documents: List) -> tuple:
+    """Respuesta profesional y fuentes a partir de documentos de SimpleRetriever"""
+    response_parts = [
+        "📋 **SISTEMA PROFESIONAL RAG MINEDU**",
+        f"🔍 **Consulta**: {query}",
+        f"📊 **Documentos analizados**: {len(documents)}",
+        "",
+        "📄 **RESULTADOS BASADOS EN NORMATIVA REAL**:"
+    ]
+    
+    sources = []
+    for i, doc in enumerate(documents[:3], 1):
+        content_preview = doc.page_content[:300].replace('\n', ' ')
+        response_parts.append(f"**{i}.** {content_preview}...")
+        
+        sources.append({
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "title": doc.metadata.get("titulo", f"Documento {i}"),
+            "confidence": 0.85,
+            "source_id": doc.metadata.get("id", f"doc_{i}")
+        })
+    
+    # Integrar razonamiento legal
+    legal_reasoner = providers.get("legal_reasoner")
+    if legal_reasoner:
+        try:
+            legal_analysis = legal_reasoner.provide_legal_reasoning(
+                query,
+                [{"content": doc.page_content, "title": doc.metadata.get("titulo", "")} for doc in documents]
+            )
+            response_parts.append("")
+            response_parts.append(legal_analysis)
+        except Exception as le:
+            logger.error(f"Error in legal reasoning: {le}")
+    
+    response_text = "\n".join(response_parts)
+    
+    return response_text, sources
+
+
 @app.post("/api/chat/professional")
-async def chat_langgraph_professional(request: ChatRequest):
+async def chat_langgraph_professional(request: ChatRequest, current_user=Depends(get_optional_user)):
     """Endpoint PROFESIONAL - Con RAG real usando SimpleRetriever + Legal Reasoning"""
+    retriever = await providers.resolve("retriever")
+    professional_orchestrator = await providers.resolve("professional_orchestrator")
+    legal_reasoner = await providers.resolve("legal_reasoner")
     try:
         # PARCHE: Usar SimpleRetriever si LangGraph no está disponible
-        if not LANGGRAPH_PROFESSIONAL_AVAILABLE and retriever:
+        if not professional_orchestrator and retriever:
             logger.info(f"🔧 PARCHE: Usando SimpleRetriever para consulta profesional: {request.message}")
             start_time = time.time()
             
@@ -1376,42 +1518,9 @@ async def chat_langgraph_professional(request: ChatRequest):
             
             if documents:
                 # Generar respuesta profesional basada en documentos reales
-                response_parts = [
-                    "📋 **SISTEMA PROFESIONAL RAG MINEDU**",
-                    f"🔍 **Consulta**: {request.message}",
-                    f"📊 **Documentos analizados**: {len(documents)}",
-                    "",
-                    "📄 **RESULTADOS BASADOS EN NORMATIVA REAL**:"
-                ]
-                
-                sources = []
-                for i, doc in enumerate(documents[:3], 1):
-                    content_preview = doc.page_content[:300].replace('\n', ' ')
-                    response_parts.append(f"**{i}.** {content_preview}...")
-                    
-                    sources.append({
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "title": doc.metadata.get("titulo", f"Documento {i}"),
-                        "confidence": 0.85,
-                        "source_id": doc.metadata.get("id", f"doc_{i}")
-                    })
+                response_text, sources = _build_professional_retriever_response(request.message, documents)
                 
-                # Integrar razonamiento legal
-                if LEGAL_REASONING_AVAILABLE and legal_reasoner:
-                    try:
-                        legal_analysis = legal_reasoner.provide_legal_reasoning(
-                            request.message,
-                            [{"content": doc.page_content, "title": doc.metadata.get("titulo", "")} for doc in documents]
-                        )
-                        response_parts.append("")
-                        response_parts.append(legal_analysis)
-                    except Exception as le:
-                        logger.error(f"Error in legal reasoning: {le}")
-                
-                response_text = "\n".join(response_parts)
-                
-                return {
+                response_data = {
                     "response": response_text,
                     "sources": sources,
                     "intent": "consulta_profesional",
@@ -1423,12 +1532,12 @@ async def chat_langgraph_professional(request: ChatRequest):
                     "method": "simple_retriever_professional",
                     "success": True,
                     "timestamp": datetime.now().isoformat(),
-                    "system_info": {"retriever": "SimpleRetriever", "legal_reasoning": LEGAL_REASONING_AVAILABLE},
+                    "system_info": {"retriever": "SimpleRetriever", "legal_reasoning": legal_reasoner is not None},
                     "thread_id": request.conversation_id or f"prof_{int(time.time())}",
                     "system": "RAG_REAL_PROFESSIONAL"
                 }
             else:
-                return {
+                response_data = {
                     "response": "📋 **SISTEMA PROFESIONAL RAG MINEDU**\n\n❌ No se encontraron documentos relevantes para la consulta.",
                     "sources": [],
                     "documents_found": 0,
@@ -1438,9 +1547,11 @@ async def chat_langgraph_professional(request: ChatRequest):
                     "success": False,
                     "timestamp": datetime.now().isoformat()
                 }
+            _enqueue_query_log(request, response_data, current_user, "simple_retriever_professional")
+            return response_data
         
         # Si LangGraph está disponible, usarlo
-        elif LANGGRAPH_PROFESSIONAL_AVAILABLE:
+        elif professional_orchestrator:
             logger.info("🚀 Usando LangGraph PROFESIONAL original")
             logger.info(f"🚀 Testing LangGraph PROFESIONAL con query: {request.message}")
             start_time = time.time()
@@ -1452,14 +1563,14 @@ async def chat_langgraph_professional(request: ChatRequest):
             
             # ---- Integración de Razonamiento Legal ----
             combined_response = result.get("response", "")
-            if LEGAL_REASONING_AVAILABLE and legal_reasoner and result.get("sources"):
+            if legal_reasoner and result.get("sources"):
                 try:
                     legal_analysis = legal_reasoner.provide_legal_reasoning(request.message, result.get("sources", []))
                     combined_response = f"{combined_response}\n\n{legal_analysis}"
                 except Exception as le:
                     logger.error(f"Error integrating legal reasoning: {le}")
             
-            return {
+            response_data = {
                 "response": combined_response,
                 "sources": result.get("sources", []),
                 "intent": result.get("intent", ""),
@@ -1475,6 +1586,8 @@ async def chat_langgraph_professional(request: ChatRequest):
                 "thread_id": thread_id,
                 "system": "LANGGRAPH_PROFESSIONAL"
             }
+            _enqueue_query_log(request, response_data, current_user, "langgraph_professional_direct")
+            return response_data
         
         # Caso cuando ni LangGraph ni retriever están disponibles
         else:
@@ -1488,10 +1601,11 @@ async def chat_langgraph_professional(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Error en LangGraph PROFESIONAL: {str(e)}")
 
 @app.post("/api/chat/langgraph")
-async def chat_langgraph_real(request: ChatRequest):
+async def chat_langgraph_real(request: ChatRequest, current_user=Depends(get_optional_user)):
     """Endpoint directo para testing LangGraph REAL - StateGraph + CompiledGraph"""
+    real_orchestrator = await providers.resolve("real_orchestrator")
     try:
-        if not LANGGRAPH_REAL_AVAILABLE:
+        if not real_orchestrator:
             raise HTTPException(
                 status_code=503, 
                 detail="LangGraph REAL no disponible. Verifica la instalación."
@@ -1505,7 +1619,7 @@ async def chat_langgraph_real(request: ChatRequest):
         result = await real_orchestrator.process_query_real(request.message, thread_id=thread_id)
         processing_time = time.time() - start_time
         
-        return {
+        response_data = {
             "response": result.get("response", ""),
             "sources": result.get("sources", []),
             "intent": result.get("intent", ""),
@@ -1521,11 +1635,121 @@ async def chat_langgraph_real(request: ChatRequest):
             "thread_id": thread_id,
             "langgraph_version": "real"
         }
+        _enqueue_query_log(request, response_data, current_user, "langgraph_real_direct")
+        return response_data
         
     except Exception as e:
         logger.error(f"❌ Error en endpoint LangGraph REAL: {e}")
         raise HTTPException(status_code=500, detail=f"Error en LangGraph REAL: {str(e)}")
 
+# ==================== STREAMING (SSE) ====================
+# Variantes en streaming de /api/chat, /api/chat/professional y /api/chat/langgraph:
+# eventos sources -> reranked -> answer_chunk* -> validation -> done
+
+async def _chat_stage_events(request: ChatRequest):
+    """Etapas de /api/chat: fuentes de la búsqueda híbrida antes de componer la respuesta"""
+    hybrid_search = await providers.resolve("hybrid_search")
+    start_time = time.time()
+    
+    if hybrid_search is None:
+        response_data = _generate_fallback_response(request)
+    else:
+        try:
+            search_results = await run_blocking(hybrid_search.search, request.message, top_k=5)
+            yield "sources", {"sources": _format_search_sources(search_results), "total_results": len(search_results)}
+            response_data = await _generate_chat_response(request, search_results, start_time)
+        except Exception as search_error:
+            # Igual que /api/chat: respuesta en modo básico en vez de un evento de error
+            logger.error(f"Error in hybrid search: {search_error}")
+            response_data = _generate_fallback_response(request, error_msg=str(search_error))
+    
+    yield "answer", {"text": response_data.get("response", "")}
+    yield "validation", {
+        "confidence": response_data.get("confidence"),
+        "method": response_data.get("method", "hybrid_legacy"),
+        "used_fallback": response_data.get("mode") == "fallback",
+        "conversation_id": response_data.get("conversation_id"),
+        "processing_time": round(time.time() - start_time, 3)
+    }
+
+async def _professional_stage_events(request: ChatRequest):
+    """Etapas de /api/chat/professional (LangGraph profesional o SimpleRetriever)"""
+    professional_orchestrator = await providers.resolve("professional_orchestrator")
+    retriever = await providers.resolve("retriever")
+    if professional_orchestrator:
+        thread_id = request.conversation_id or f"prof_{int(time.time())}"
+        async for event, payload in professional_orchestrator.stream_query_professional(request.message, thread_id=thread_id):
+            yield event, payload
+        return
+    
+    if not retriever:
+        raise RuntimeError("Sistema profesional no disponible. Ni LangGraph ni SimpleRetriever están operativos.")
+    
+    documents = await run_blocking(retriever.simple_similarity_search, request.message, k=5)
+    await providers.resolve("legal_reasoner")
+    response_text, sources = _build_professional_retriever_response(request.message, documents)
+    yield "sources", {"sources": sources, "documents_found": len(documents)}
+    yield "answer", {"text": response_text}
+    yield "validation", {
+        "confidence": 0.85 if documents else 0.0,
+        "method": "simple_retriever_professional",
+        "thread_id": request.conversation_id or f"prof_{int(time.time())}"
+    }
+
+async def _langgraph_stage_events(request: ChatRequest):
+    """Etapas de /api/chat/langgraph"""
+    real_orchestrator = await providers.resolve("real_orchestrator")
+    if not real_orchestrator:
+        raise RuntimeError("LangGraph REAL no disponible. Verifica la instalación.")
+    thread_id = request.conversation_id or f"test_{int(time.time())}"
+    async for event, payload in real_orchestrator.stream_query_real(request.message, thread_id=thread_id):
+        yield event, payload
+
+async def _logged_stages(stages, request: ChatRequest, current_user, method: str):
+    """Reenviar las etapas y registrar la consulta cuando el stream termina"""
+    start_time = time.time()
+    response_data: Dict[str, Any] = {}
+    async for event, payload in stages:
+        if event == "sources":
+            response_data["sources"] = payload.get("sources") or []
+            if "documents_found" in payload:
+                response_data["documents_found"] = payload["documents_found"]
+        elif event == "answer":
+            response_data["response"] = payload.get("text", "")
+        elif event == "validation":
+            response_data["confidence"] = payload.get("confidence")
+            response_data["method"] = payload.get("method", method)
+            if payload.get("used_fallback"):
+                response_data["mode"] = "fallback"
+        yield event, payload
+    response_data["processing_time"] = round(time.time() - start_time, 3)
+    _enqueue_query_log(request, response_data, current_user, method)
+
+def _sse_response(stages) -> StreamingResponse:
+    return StreamingResponse(sse_stream(stages), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, current_user=Depends(get_optional_user)):
+    """Chat con búsqueda híbrida en streaming (Server-Sent Events)"""
+    logger.info(f"📡 Streaming chat request: {request.message}")
+    return _sse_response(_logged_stages(_chat_stage_events(request), request, current_user, "hybrid_stream"))
+
+@app.post("/api/chat/professional/stream")
+async def chat_professional_stream(request: ChatRequest, current_user=Depends(get_optional_user)):
+    """Endpoint PROFESIONAL en streaming (Server-Sent Events)"""
+    logger.info(f"📡 Streaming PROFESIONAL: {request.message}")
+    return _sse_response(_logged_stages(
+        _professional_stage_events(request), request, current_user, "langgraph_professional_stream"
+    ))
+
+@app.post("/api/chat/langgraph/stream")
+async def chat_langgraph_stream(request: ChatRequest, current_user=Depends(get_optional_user)):
+    """Endpoint LangGraph REAL en streaming (Server-Sent Events)"""
+    logger.info(f"📡 Streaming LangGraph REAL: {request.message}")
+    return _sse_response(_logged_stages(
+        _langgraph_stage_events(request), request, current_user, "langgraph_real_stream"
+    ))
+
 @app.post("/api/chat/langchain")
 async def chat_langchain_real(request: ChatRequest):
     """
@@ -1546,7 +1770,8 @@ async def chat_langchain_real(request: ChatRequest):
         start_time = time.time()
         
         # SOLO procesamiento real - PROHIBIDO simular
-        if not LANGGRAPH_REAL_AVAILABLE or not real_orchestrator:
+        real_orchestrator = await providers.resolve("real_orchestrator")
+        if not real_orchestrator:
             logger.error("❌ CRÍTICO: Sistema real no disponible - NO SE SIMULA")
             raise HTTPException(
                 status_code=503, 
@@ -1603,13 +1828,16 @@ async def chat_langchain_real(request: ChatRequest):
 @app.get("/api/admin/langchain/status")
 async def langchain_system_status():
     """Estado del sistema LangGraph REAL y simuladores"""
+    real_orchestrator = await providers.resolve("real_orchestrator")
+    hybrid_search = await providers.resolve("hybrid_search")
+    langchain_config = await providers.resolve("langchain_config")
     try:
         status_info = {
             "timestamp": datetime.now().isoformat()
         }
         
         # LangGraph REAL status (PRINCIPAL)
-        if LANGGRAPH_REAL_AVAILABLE and real_orchestrator:
+        if real_orchestrator:
             real_status = real_orchestrator.get_system_status()
             status_info.update({
                 "status": "operational",
@@ -1633,7 +1861,7 @@ async def langchain_system_status():
             })
         
         # Hybrid fallback
-        status_info["hybrid_fallback_available"] = HYBRID_SEARCH_AVAILABLE
+        status_info["hybrid_fallback_available"] = hybrid_search is not None
         
         # Config
         status_info["config"] = langchain_config.to_dict()
@@ -1660,6 +1888,7 @@ async def langchain_system_status():
 @app.get("/api/admin/documents/stats")
 async def document_statistics():
     """Estadísticas de documentos cargados"""
+    retriever = await providers.resolve("retriever")
     try:
         if not LANGCHAIN_AVAILABLE:
             raise HTTPException(status_code=503, detail="LangChain no disponible")
@@ -1677,6 +1906,42 @@ async def document_statistics():
         logger.error(f"Error obteniendo estadísticas: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@app.get("/api/admin/index/generations")
+async def get_index_generations():
+    """Generación activa, generaciones retiradas e historial de swaps."""
+    manager = await providers.resolve("hybrid_search")
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Hybrid search not available")
+    return manager.status()
+
+@app.post("/api/admin/index/generations/swap")
+async def swap_index_generation(request: IndexSwapRequest, current_user=Depends(get_admin_user)):
+    """Cargar, validar y activar una nueva generación del índice sin downtime (solo admin)."""
+    logger.info(f"🔄 Index swap to '{request.source}' requested by admin {current_user.username}")
+    manager = await providers.resolve("hybrid_search")
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Hybrid search not available")
+
+    # Solo generaciones dentro del directorio de vectorstores
+    root = ProjectPaths.VECTORSTORES_DIR.resolve()
+    source = (root / request.source).resolve()
+    if source != root and root not in source.parents or not source.is_dir():
+        raise HTTPException(status_code=400, detail="Invalid generation directory")
+
+    if manager.swapping:
+        raise HTTPException(status_code=409, detail="A swap is already in progress")
+    if request.wait:
+        # Mismo guard que el swap en segundo plano; el puntero se publica si la generación quedó activa
+        report = await run_blocking(manager.swap, source)
+        if report["status"] == "busy":
+            raise HTTPException(status_code=409, detail="A swap is already in progress")
+        if report["status"] == "swapped":
+            manager.publish_pointer(source)
+        return report
+    if not manager.publish(source):
+        raise HTTPException(status_code=409, detail="A swap is already in progress")
+    return {"status": "started", "source": ProjectPaths.rel(source), "timestamp": datetime.now().isoformat()}
+
 @app.post("/api/admin/test-queries")
 async def test_critical_queries():
     """Test de queries críticas para validar migración"""
@@ -1740,6 +2005,7 @@ async def test_critical_queries():
 @app.post("/api/admin/compare-systems")
 async def compare_langchain_vs_legacy(request: ChatRequest):
     """Comparar respuesta LangChain vs sistema legacy para debugging"""
+    hybrid_search = await providers.resolve("hybrid_search")
     try:
         comparison_result = {
             "query": request.message,
@@ -1768,7 +2034,7 @@ async def compare_langchain_vs_legacy(request: ChatRequest):
             comparison_result["langchain"] = {"error": "No disponible"}
         
         # Test con sistema legacy si está disponible
-        if HYBRID_SEARCH_AVAILABLE:
+        if hybrid_search is not None:
             try:
                 # Simulación de sistema legacy (sin ejecutar búsqueda real para evitar timeouts)
                 comparison_result["legacy"] = {
@@ -1870,10 +2136,32 @@ if ENTERPRISE_FEATURES_AVAILABLE:
             logger.error(f"❌ Error initializing reranker: {e}")
             raise HTTPException(status_code=500, detail=f"Error initializing reranker: {str(e)}")
 
+    @app.get("/api/admin/query-metrics")
+    async def get_query_metrics_endpoint(
+        days: int = 7,
+        current_user: User = Depends(get_admin_user),
+        session = Depends(get_async_session)
+    ):
+        """Get query dashboard metrics from hourly rollups (admin only)"""
+        try:
+            metrics = await QueryLogRepository(session).get_dashboard_metrics(days)
+            logger.info(f"📊 Query metrics requested by admin {current_user.username}")
+            return {
+                "metrics": metrics,
+                "write_behind": query_log_buffer.get_stats(),
+                "timestamp": datetime.now().isoformat()
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error getting query metrics: {e}")
+            raise HTTPException(status_code=500, detail=f"Error getting query metrics: {str(e)}")
+
 else:
     logger.warning("⚠️ Enterprise endpoints disabled - Auth system not available")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
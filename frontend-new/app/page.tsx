@@ -3,6 +3,7 @@
 import { useState, useRef, useEffect } from 'react'
 import { Send, MessageSquare, FileText, Search, Settings, Plus, Moon, Sun } from 'lucide-react'
 import { Button } from '@/components/ui/button'
+import { streamChat, StreamSource } from '@/lib/chat-stream'
 
 interface Message {
   id: string
@@ -16,17 +17,11 @@ interface Message {
   }>
 }
 
-interface ChatResponse {
-  response: string
-  conversation_id: string
-  timestamp: string
-  sources: Array<{
-    title: string
-    excerpt: string
-    confidence: number
-  }>
-  processing_time: number
-}
+const toMessageSource = (source: StreamSource) => ({
+  title: source.title || source.titulo || 'Documento',
+  excerpt: source.excerpt || (source.content || '').slice(0, 200),
+  confidence: source.confidence ?? 0
+})
 
 export default function ChatPage() {
   const [messages, setMessages] = useState<Message[]>([])
@@ -74,47 +69,40 @@ export default function ChatPage() {
     setInput('')
     setIsLoading(true)
 
+    const aiMessageId = (Date.now() + 1).toString()
+    const updateAiMessage = (update: (message: Message) => Message) => {
+      setMessages(prev => prev.map(message => message.id === aiMessageId ? update(message) : message))
+    }
+
     try {
       const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8001/api';
-      const response = await fetch(`${API_URL}/chat`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          message: userMessage.content,
-          ...(conversationId && { conversation_id: conversationId })
-        }),
-      })
 
-      if (!response.ok) {
-        throw new Error('Failed to send message')
-      }
-
-      const data: ChatResponse = await response.json()
-      
-      setConversationId(data.conversation_id)
-
-      const aiMessage: Message = {
-        id: (Date.now() + 1).toString(),
+      // Mensaje vacío que se completa a medida que llegan los eventos SSE
+      setMessages(prev => [...prev, {
+        id: aiMessageId,
         type: 'ai',
-        content: data.response,
-        timestamp: new Date(),
-        sources: data.sources
-      }
+        content: '',
+        timestamp: new Date()
+      }])
 
-      setMessages(prev => [...prev, aiMessage])
+      await streamChat(`${API_URL}/chat/stream`, {
+        message: userMessage.content,
+        ...(conversationId && { conversation_id: conversationId })
+      }, {
+        onSources: (sources) => updateAiMessage(message => ({ ...message, sources: sources.map(toMessageSource) })),
+        onAnswerChunk: (text) => updateAiMessage(message => ({ ...message, content: message.content + text })),
+        onValidation: (data) => {
+          if (data.conversation_id) setConversationId(data.conversation_id)
+        },
+        onError: (detail) => { throw new Error(detail) }
+      })
     } catch (error) {
       console.error('Error sending message:', error)
       
-      const errorMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        type: 'ai',
-        content: 'Lo siento, hubo un error al procesar tu mensaje. Por favor, inténtalo de nuevo.',
-        timestamp: new Date()
-      }
-      
-      setMessages(prev => [...prev, errorMessage])
+      updateAiMessage(message => ({
+        ...message,
+        content: 'Lo siento, hubo un error al procesar tu mensaje. Por favor, inténtalo de nuevo.'
+      }))
     } finally {
       setIsLoading(false)
     }
@@ -0,0 +1,81 @@
+// Cliente SSE para los endpoints /api/chat*/stream del backend.
+// EventSource solo admite GET, por eso se lee el cuerpo de un POST con fetch.
+
+export interface StreamSource {
+  title?: string
+  titulo?: string
+  excerpt?: string
+  content?: string
+  confidence?: number
+}
+
+export interface StreamHandlers {
+  onSources?: (sources: StreamSource[], reranked: boolean) => void
+  onAnswerChunk?: (text: string) => void
+  onValidation?: (data: Record<string, any>) => void
+  onError?: (detail: string) => void
+  onDone?: (elapsedMs: number) => void
+}
+
+export async function streamChat(url: string, body: Record<string, unknown>, handlers: StreamHandlers) {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify(body),
+  })
+
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to send message')
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Los eventos SSE terminan con una línea en blanco
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      dispatchEvent(buffer.slice(0, boundary), handlers)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+    }
+  }
+}
+
+function dispatchEvent(raw: string, handlers: StreamHandlers) {
+  let event = 'message'
+  const dataLines: string[] = []
+  for (const line of raw.split('\n')) {
+    if (line.startsWith('event:')) event = line.slice(6).trim()
+    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim())
+  }
+  if (!dataLines.length) return
+  const data = JSON.parse(dataLines.join('\n'))
+
+  switch (event) {
+    case 'sources':
+    case 'reranked':
+      handlers.onSources?.(data.sources || [], event === 'reranked')
+      break
+    case 'answer_chunk':
+      handlers.onAnswerChunk?.(data.text || '')
+      break
+    case 'validation':
+      handlers.onValidation?.(data)
+      break
+    case 'error':
+      handlers.onError?.(data.detail || 'Error desconocido')
+      break
+    case 'done':
+      handlers.onDone?.(data.elapsed_ms || 0)
+      break
+  }
+}
@@ -116,6 +116,63 @@ def query_rag_system(query: str, token: str, method: str = "professional") -> Op
         st.error(f"Error en la consulta: {e}")
         return None
 
+STREAM_ENDPOINTS = {
+    "professional": "/api/chat/professional/stream",
+    "real": "/api/chat/langgraph/stream",
+    "hybrid": "/api/chat/stream"
+}
+
+def stream_rag_system(query: str, token: str, method: str = "professional"):
+    """Consultar el sistema RAG en streaming: produce (evento, datos) por cada evento SSE"""
+    headers = {"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+    with requests.post(
+        f"{BACKEND_URL}{STREAM_ENDPOINTS[method]}",
+        json={"message": query},
+        headers=headers,
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        event, data_lines = "message", []
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data:"):].strip())
+            elif not line and data_lines:
+                yield event, json.loads("\n".join(data_lines))
+                event, data_lines = "message", []
+
+def render_streaming_response(query: str, token: str, method: str):
+    """Mostrar fuentes, respuesta y validación a medida que llegan los eventos"""
+    status_box = st.empty()
+    answer_box = st.empty()
+    sources_box = st.container()
+    answer = ""
+    
+    try:
+        for event, data in stream_rag_system(query, token, method):
+            if event in ("sources", "reranked"):
+                label = "📚 Fuentes recuperadas" if event == "sources" else "🔄 Fuentes reordenadas"
+                status_box.info(f"{label} en {data.get('elapsed_ms', 0):.0f} ms")
+                with sources_box.expander(f"{label} ({len(data.get('sources', []))})"):
+                    for source in data.get("sources", [])[:3]:
+                        st.write(f"**{source.get('title') or source.get('titulo', 'Sin título')}**")
+                        st.write((source.get('excerpt') or source.get('content', ''))[:300] + "...")
+            elif event == "answer_chunk":
+                answer += data.get("text", "")
+                answer_box.markdown(answer)
+            elif event == "validation":
+                confidence = data.get("confidence") or 0
+                st.metric("🎯 Confianza", f"{confidence:.1%}")
+                with st.expander("🔍 Validación"):
+                    st.json(data)
+            elif event == "error":
+                st.error(f"Error en consulta: {data.get('detail')}")
+            elif event == "done":
+                status_box.success(f"✅ Completado en {data.get('elapsed_ms', 0) / 1000:.2f}s")
+    except Exception as e:
+        st.error(f"Error en la consulta: {e}")
+
 def run_coverage_test(token: str) -> Optional[Dict[str, Any]]:
     """Ejecutar tests de coverage"""
     try:
@@ -226,9 +283,12 @@ def main():
                 ["professional", "real", "hybrid"],
                 help="professional: LangGraph con validación, real: LangGraph básico, hybrid: Sistema tradicional"
             )
+            streaming = st.checkbox("📡 Streaming (SSE)", value=True, help="Mostrar fuentes y respuesta a medida que se generan")
             
             if st.button("🚀 Consultar", type="primary"):
-                if query.strip():
+                if query.strip() and streaming:
+                    render_streaming_response(query.strip(), st.session_state.token, method)
+                elif query.strip():
                     with st.spinner("🤖 Procesando consulta..."):
                         start_time = time.time()
                         result = query_rag_system(query.strip(), st.session_state.token, method)
@@ -1,6 +1,7 @@
 # Configuración de Gunicorn para VM-Expedientes-MINEDU
 # Configuración optimizada para producción gubernamental
 
+import gc
 import multiprocessing
 import os
 
@@ -46,6 +47,10 @@ tmp_upload_dir = "/tmp"
 # Preload de la aplicación para eficiencia
 preload_app = True
 
+# Con preload los índices se cargan una vez en el master (buffers NumPy planos)
+# y los workers comparten esas páginas por copy-on-write
+raw_env = ["MINEDU_PRELOAD_INDEXES=1"]
+
 # Límite de memoria
 limit_request_line = 4094
 limit_request_fields = 100
@@ -65,7 +70,11 @@ def worker_int(worker):
     worker.log.info("worker received INT or QUIT signal")
 
 def pre_fork(server, worker):
-    server.log.info("Worker spawned (pid: %s)", worker.pid)
+    # Objetos del preload a la generación permanente: el GC de los workers
+    # no los recorre ni escribe en sus páginas compartidas
+    gc.collect()
+    gc.freeze()
+    server.log.info("gc.freeze(): %s objetos congelados", gc.get_freeze_count())
 
 def post_fork(server, worker):
     server.log.info("Worker spawned (pid: %s)", worker.pid)
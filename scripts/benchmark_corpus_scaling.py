@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escala: tiempo de build, tamaño de índice, tiempo de carga y
+latencia de consulta vs. tamaño del corpus, para cada retriever
+
+Genera corpus sintéticos deterministas (10k, 100k, 1M chunks) a partir de
+los chunks reales, construye los vectorstores con VectorstoreGenerator y
+mide cada retriever con el benchmark de retrieval.
+
+Uso:
+    python scripts/benchmark_corpus_scaling.py --sizes 10000 100000
+    python scripts/benchmark_corpus_scaling.py --sizes 1000000 --skip-transformer
+"""
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config.paths import ProjectPaths  # noqa: E402
+from src.core.performance.retrieval_benchmark import TARGETS, run_benchmark  # noqa: E402
+from src.data_pipeline.generate_vectorstores import VectorstoreGenerator  # noqa: E402
+from src.data_pipeline.synthetic_corpus import SyntheticCorpusGenerator  # noqa: E402
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+# Vectorstores que usa cada objetivo (para atribuir build e índice a los híbridos)
+TARGET_COMPONENTS = {
+    "bm25": ["bm25"],
+    "tfidf": ["tfidf"],
+    "transformer": ["transformer"],
+    "hybrid_weighted": ["bm25", "tfidf", "transformer"],
+    "hybrid_rank_fusion": ["bm25", "tfidf", "transformer"],
+    "hybrid_simple": ["bm25", "tfidf", "transformer"],
+    "hybrid_fusion_rrf": ["bm25", "tfidf"]
+}
+
+
+def build_vectorstores(chunks_file: Path, output_dir: Path, components) -> dict:
+    """Construir los vectorstores del corpus y medir tiempo y tamaño de cada uno"""
+    generator = VectorstoreGenerator()
+    generator.load_chunks(str(chunks_file))
+    builders = {
+        "bm25": generator.generate_bm25_vectorstore,
+        "tfidf": generator.generate_tfidf_vectorstore,
+        "transformer": generator.generate_transformer_vectorstore
+    }
+
+    built = {}
+    for component in components:
+        path = output_dir / f"{component}.pkl"
+        start = time.perf_counter()
+        builders[component](str(path))
+        built[component] = {
+            "path": str(path),
+            "build_s": round(time.perf_counter() - start, 3),
+            "index_mb": round(path.stat().st_size / (1024 * 1024), 2)
+        }
+    return built
+
+
+def plot(rows, output_path: Path) -> None:
+    metrics = [
+        ("build_s", "Build (s)"),
+        ("index_mb", "Índice (MB)"),
+        ("load_s", "Carga (s)"),
+        ("p95_ms", "Latencia p95 (ms)")
+    ]
+    fig, axes = plt.subplots(2, 2, figsize=(12, 9))
+    for ax, (metric, label) in zip(axes.flat, metrics):
+        for target in sorted({row["target"] for row in rows}):
+            points = sorted((r["corpus_size"], r[metric]) for r in rows if r["target"] == target and r.get(metric) is not None)
+            if points:
+                ax.plot(*zip(*points), marker="o", label=target)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Chunks")
+        ax.set_title(label)
+        ax.grid(True, which="both", alpha=0.3)
+    axes.flat[0].legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=120)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escala de retrievers sobre corpus sintéticos")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    parser.add_argument("--skip-transformer", action="store_true", help="No generar embeddings (y omitir objetivos que los usan)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1])
+    parser.add_argument("--corpus-dir", type=Path, default=ProjectPaths.DATA_DIR / "synthetic")
+    parser.add_argument("--output-dir", type=Path, default=ProjectPaths.BENCHMARK_RESULTS_DIR / "scaling")
+    parser.add_argument("--force", action="store_true", help="Regenerar corpus existentes")
+    args = parser.parse_args()
+
+    targets = args.targets
+    if args.skip_transformer:
+        targets = [t for t in targets if "transformer" not in TARGET_COMPONENTS[t]]
+    components = sorted({c for t in targets for c in TARGET_COMPONENTS[t]})
+
+    corpus_generator = SyntheticCorpusGenerator(seed=args.seed)
+    rows = []
+    for size in args.sizes:
+        size_dir = args.corpus_dir / f"{size}"
+        chunks_file = size_dir / "chunks.json"
+        print(f"\n📚 Corpus de {size:,} chunks")
+
+        if args.force or not chunks_file.exists():
+            start = time.perf_counter()
+            corpus_generator.write(size, str(chunks_file))
+            print(f"   Generado en {time.perf_counter() - start:.1f}s")
+
+        built = build_vectorstores(chunks_file, size_dir, components)
+        paths = {component: info["path"] for component, info in built.items()}
+        report = run_benchmark(targets=targets, paths=paths, repeats=args.repeats, concurrency_levels=args.concurrency)
+
+        for target in targets:
+            result = report["results"][target]
+            used = [built[c] for c in TARGET_COMPONENTS[target]]
+            row = {
+                "corpus_size": size,
+                "target": target,
+                "build_s": round(sum(u["build_s"] for u in used), 3),
+                "index_mb": round(sum(u["index_mb"] for u in used), 2)
+            }
+            if "error" in result:
+                row["error"] = result["error"]
+            else:
+                row.update({
+                    "load_s": result["load_s"],
+                    "cold_start_s": result["cold_start_s"],
+                    "peak_rss_mb": result["peak_rss_mb"],
+                    "p50_ms": result["latency_ms"]["p50"],
+                    "p95_ms": result["latency_ms"]["p95"],
+                    "p99_ms": result["latency_ms"]["p99"]
+                })
+            rows.append(row)
+            print(f"   {target:<20} build={row['build_s']:>8.2f}s índice={row['index_mb']:>9.2f}MB "
+                  f"carga={row.get('load_s', float('nan')):>7.2f}s p95={row.get('p95_ms', float('nan')):>9.2f}ms")
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = args.output_dir / f"scaling_{stamp}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": stamp, "seed": args.seed, "sizes": args.sizes, "rows": rows}, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados: {output}")
+
+    if MATPLOTLIB_AVAILABLE:
+        plot_path = output.with_suffix(".png")
+        plot(rows, plot_path)
+        print(f"📈 Gráfico: {plot_path}")
+    else:
+        print("⚠️ matplotlib no disponible: se omite el gráfico")
+
+
+if __name__ == "__main__":
+    main()
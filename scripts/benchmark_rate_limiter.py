@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark del rate limiter: costo por verificación vs. usuarios rastreados
+
+Uso:
+    python scripts/benchmark_rate_limiter.py --users 1000000 --checks 200000
+    python scripts/benchmark_rate_limiter.py --redis-url redis://localhost:6379/2
+"""
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.security.rate_limiter import RateLimiter, create_rate_limiter  # noqa: E402
+
+
+def measure(limiter: RateLimiter, identifiers, checks: int, seed: int = 42) -> float:
+    """Microsegundos promedio por check_rate_limit sobre usuarios aleatorios"""
+    rng = random.Random(seed)
+    sample = [identifiers[rng.randrange(len(identifiers))] for _ in range(checks)]
+    start = time.perf_counter()
+    for identifier in sample:
+        limiter.check_rate_limit(identifier)
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rate limiter O(1)")
+    parser.add_argument("--users", type=int, default=1_000_000, help="Usuarios rastreados máximos")
+    parser.add_argument("--checks", type=int, default=100_000, help="Verificaciones por punto")
+    parser.add_argument("--redis-url", default=None, help="Medir backend Redis en lugar de memoria")
+    args = parser.parse_args()
+
+    limiter = create_rate_limiter(redis_url=args.redis_url) if args.redis_url else RateLimiter()
+    identifiers = [f"user-{i}" for i in range(args.users)]
+
+    results = []
+    tracked = 0
+    for target in (1_000, 10_000, 100_000, args.users):
+        target = min(target, args.users)
+        # Poblar usuarios hasta el tamaño objetivo
+        for identifier in identifiers[tracked:target]:
+            limiter.check_rate_limit(identifier)
+        tracked = target
+
+        us_per_check = measure(limiter, identifiers[:tracked], args.checks)
+        results.append({"tracked_users": tracked, "us_per_check": round(us_per_check, 3)})
+        print(f"👥 {tracked:>9,} usuarios → {us_per_check:8.3f} µs/check")
+        if tracked == args.users:
+            break
+
+    ratio = results[-1]["us_per_check"] / max(results[0]["us_per_check"], 1e-9)
+    print(f"\n📈 Relación costo (máx/mín usuarios): {ratio:.2f}x (≈1 indica costo constante)")
+    print(json.dumps({"backend": limiter.get_system_stats()["backend"], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
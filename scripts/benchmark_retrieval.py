@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark y suite de regresión de retrieval sobre data/evaluation
+
+Uso:
+    python scripts/benchmark_retrieval.py
+    python scripts/benchmark_retrieval.py --targets bm25 tfidf --save-baseline
+    python scripts/benchmark_retrieval.py --compare   # exit 1 si hay regresión
+"""
+import argparse
+import json
+import logging
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.performance.retrieval_benchmark import (  # noqa: E402
+    BASELINE_FILE,
+    RESULTS_DIR,
+    TARGETS,
+    compare_with_baseline,
+    default_vectorstore_paths,
+    run_benchmark,
+    save_report
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de retrievers (latencia, throughput, memoria, calidad)")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones del set de consultas")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--bm25", help="Vectorstore BM25 (por defecto data/vectorstores)")
+    parser.add_argument("--tfidf", help="Vectorstore TF-IDF")
+    parser.add_argument("--transformer", help="Vectorstore transformer")
+    parser.add_argument("--no-isolate", action="store_true", help="No usar un proceso nuevo por objetivo")
+    parser.add_argument("--output-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar el resultado como baseline")
+    parser.add_argument("--compare", action="store_true", help="Comparar contra el baseline y fallar si hay regresión")
+    parser.add_argument("--max-latency-regression", type=float, default=0.20, help="Aumento relativo máximo de p95")
+    parser.add_argument("--max-quality-drop", type=float, default=0.02, help="Caída absoluta máxima de recall/MRR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    paths = default_vectorstore_paths()
+    for key in ("bm25", "tfidf", "transformer"):
+        if getattr(args, key):
+            paths[key] = getattr(args, key)
+
+    report = run_benchmark(
+        targets=args.targets,
+        paths=paths,
+        top_k=args.top_k,
+        repeats=args.repeats,
+        concurrency_levels=args.concurrency,
+        isolate=not args.no_isolate
+    )
+    report_path = save_report(report, args.output_dir)
+    print(f"💾 Reporte: {report_path}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📌 Baseline actualizado: {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"❌ No existe baseline en {args.baseline} (usar --save-baseline)")
+            sys.exit(2)
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(
+            report, baseline,
+            max_latency_regression=args.max_latency_regression,
+            max_quality_drop=args.max_quality_drop
+        )
+        if regressions:
+            print("❌ Regresiones detectadas:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print("✅ Sin regresiones frente al baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Verificación de precisión del modo int8 (cuantización dinámica) vs. fp32
+
+Compara, sobre el set de evaluación y el vectorstore transformer:
+- deriva de embeddings: coseno entre el embedding fp32 y el int8 de cada
+  consulta y de una muestra de chunks
+- recall@k y solapamiento del top-k buscando con embeddings de consulta
+  int8 contra el índice fp32 (el índice no se reconstruye)
+- throughput de codificación de consultas y RSS tras cargar cada modelo
+
+Uso:
+    python scripts/check_quantization_accuracy.py
+    python scripts/check_quantization_accuracy.py --threads 4 --max-drift 0.02
+    # exit 1 si la deriva o la caída de recall superan los umbrales
+"""
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+import pickle
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config.paths import ProjectPaths  # noqa: E402
+from src.core.performance.quantization import apply_precision, configure_inference_threads  # noqa: E402
+from src.core.performance.retrieval_benchmark import load_ground_truth, load_queries, recall_at_k  # noqa: E402
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def rss_mb():
+    return round(psutil.Process().memory_info().rss / (1024 * 1024), 1) if PSUTIL_AVAILABLE else None
+
+
+def load_model(model_name: str, precision: str):
+    from sentence_transformers import SentenceTransformer
+
+    before = rss_mb()
+    model = SentenceTransformer(model_name, device="cpu")
+    effective = apply_precision(model, model_name, precision, "cpu")
+    if effective != precision:
+        raise RuntimeError(f"No se pudo cargar {model_name} en {precision}")
+    after = rss_mb()
+    return model, (after - before) if before is not None else None
+
+
+def encode(model, texts):
+    return model.encode(texts, show_progress_bar=False, normalize_embeddings=True)
+
+
+def throughput(model, queries, repeats: int) -> float:
+    """Consultas por segundo codificando una a una (como en tiempo de consulta)"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            model.encode([query], show_progress_bar=False)
+    return round(repeats * len(queries) / (time.perf_counter() - start), 2)
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1) + 1e-12)
+
+
+def search(query_embeddings: np.ndarray, index: np.ndarray, top_k: int) -> np.ndarray:
+    scores = query_embeddings @ index.T
+    return np.argsort(-scores, axis=1)[:, :top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deriva y recall del modo int8 frente a fp32")
+    parser.add_argument("--vectorstore", type=Path, default=ProjectPaths.TRANSFORMERS_VECTORSTORE)
+    parser.add_argument("--model", help="Modelo (por defecto el del vectorstore)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--doc-sample", type=int, default=200, help="Chunks para medir deriva de documentos")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones del set para el throughput")
+    parser.add_argument("--threads", type=int, help="Threads de torch (por defecto MINEDU_TORCH_THREADS)")
+    parser.add_argument("--max-drift", type=float, default=0.02, help="Máximo 1 - coseno medio de consultas")
+    parser.add_argument("--max-recall-drop", type=float, default=0.02)
+    parser.add_argument("--output-dir", type=Path, default=ProjectPaths.BENCHMARK_RESULTS_DIR / "quantization")
+    args = parser.parse_args()
+
+    threads = configure_inference_threads(args.threads)
+
+    with open(args.vectorstore, "rb") as f:
+        vectorstore = pickle.load(f)
+    chunks = vectorstore["chunks"]
+    index = np.asarray(vectorstore["embeddings"], dtype=np.float32)
+    index /= np.linalg.norm(index, axis=1, keepdims=True) + 1e-12
+    model_name = args.model or vectorstore["model_name"]
+
+    cases = load_ground_truth()
+    queries = load_queries()
+    for case in cases:
+        if case["query"] not in queries:
+            queries.append(case["query"])
+    doc_texts = [str(chunk.get("texto", chunk.get("text", ""))) for chunk in chunks[:args.doc_sample]]
+
+    report = {"model": model_name, "threads": threads, "top_k": args.top_k, "precisions": {}}
+    embeddings = {}
+    for precision in ("fp32", "int8"):
+        model, rss_delta = load_model(model_name, precision)
+        query_embeddings = encode(model, queries)
+        embeddings[precision] = {"queries": query_embeddings, "docs": encode(model, doc_texts)}
+
+        by_query = dict(zip(queries, query_embeddings))
+        case_embeddings = np.array([by_query[case["query"]] for case in cases]) if cases else np.empty((0, index.shape[1]))
+        top = search(case_embeddings, index, args.top_k) if cases else []
+        recalls = [
+            recall_at_k([chunks[i] for i in top_indices], case, args.top_k)
+            for top_indices, case in zip(top, cases)
+        ]
+        embeddings[precision]["top"] = top
+        report["precisions"][precision] = {
+            "rss_delta_mb": rss_delta,
+            "queries_per_s": throughput(model, queries, args.repeats),
+            f"recall@{args.top_k}": round(float(np.mean(recalls)), 4) if recalls else None
+        }
+        del model
+        print(f"   {precision}: {report['precisions'][precision]}")
+
+    query_cos = cosine_rows(embeddings["fp32"]["queries"], embeddings["int8"]["queries"])
+    doc_cos = cosine_rows(embeddings["fp32"]["docs"], embeddings["int8"]["docs"]) if doc_texts else np.array([1.0])
+    overlap = [
+        len(set(a) & set(b)) / args.top_k
+        for a, b in zip(embeddings["fp32"]["top"], embeddings["int8"]["top"])
+    ]
+    fp32, int8 = report["precisions"]["fp32"], report["precisions"]["int8"]
+    recall_key = f"recall@{args.top_k}"
+    recall_drop = (fp32[recall_key] - int8[recall_key]) if fp32[recall_key] is not None else 0.0
+    report["drift"] = {
+        "query_cosine_mean": round(float(query_cos.mean()), 5),
+        "query_cosine_min": round(float(query_cos.min()), 5),
+        "doc_cosine_mean": round(float(doc_cos.mean()), 5),
+        "doc_cosine_min": round(float(doc_cos.min()), 5),
+        f"top{args.top_k}_overlap": round(float(np.mean(overlap)), 4) if overlap else None
+    }
+    report["speedup"] = round(int8["queries_per_s"] / fp32["queries_per_s"], 2)
+    report["recall_drop"] = round(recall_drop, 4)
+
+    failures = []
+    if 1 - report["drift"]["query_cosine_mean"] > args.max_drift:
+        failures.append(f"deriva de consultas {1 - report['drift']['query_cosine_mean']:.4f} > {args.max_drift}")
+    if recall_drop > args.max_recall_drop:
+        failures.append(f"caída de {recall_key} {recall_drop:.4f} > {args.max_recall_drop}")
+    report["passed"] = not failures
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output = args.output_dir / f"quantization_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n📐 Deriva: {report['drift']}")
+    print(f"⚡ Speedup int8: {report['speedup']}x — caída de {recall_key}: {report['recall_drop']}")
+    print(f"💾 Reporte: {output}")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ int8 dentro de los umbrales")
+
+
+if __name__ == "__main__":
+    main()
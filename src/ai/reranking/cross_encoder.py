@@ -23,6 +23,14 @@ import torch
 from sentence_transformers import CrossEncoder
 from tqdm import tqdm
 
+from src.ai.reranking.score_cache import (
+    CrossEncoderScoreCache,
+    plan_cascade,
+    score_with_cache,
+    truncate_tokens
+)
+from src.core.performance.quantization import apply_precision
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -44,7 +52,12 @@ class NeuralReranker:
         cache_dir: Optional[str] = None,
         device: Optional[str] = None,
         batch_size: int = 16,
-        max_length: int = 512
+        max_length: int = 512,
+        max_tokens_per_doc: Optional[int] = 256,
+        cascade_margin: float = 0.3,
+        rerank_window: int = 20,
+        score_cache_size: int = 50000,
+        precision: Optional[str] = None
     ):
         """
         Inicializa el re-ranker neural con CrossEncoder.
@@ -55,11 +68,24 @@ class NeuralReranker:
             device: Dispositivo para inferencia ('cpu', 'cuda', 'cuda:0', etc.)
             batch_size: Tamaño de batch para inferencia
             max_length: Longitud máxima de tokens
+            max_tokens_per_doc: Tope de tokens por documento antes de puntuar
+            cascade_margin: Margen relativo entre el 1.º y 2.º score de la primera
+                etapa a partir del cual se omite el CrossEncoder
+            rerank_window: Candidatos inciertos que pasan por el CrossEncoder
+            score_cache_size: Entradas máximas de la caché de scores
+            precision: 'fp32' o 'int8' (cuantización dinámica, solo CPU); None usa
+                la configuración por modelo de ModelManager
         """
         self.model_name = model_name
         self.cache_dir = cache_dir
         self.batch_size = batch_size
         self.max_length = max_length
+        self.precision = precision
+        self.max_tokens_per_doc = max_tokens_per_doc
+        self.cascade_margin = cascade_margin
+        self.rerank_window = rerank_window
+        self.score_cache = CrossEncoderScoreCache(max_entries=score_cache_size)
+        self.stats = {"rerankings": 0, "skipped_reranks": 0, "pairs_scored": 0}
         
         # Determinar dispositivo
         if device:
@@ -86,6 +112,7 @@ class NeuralReranker:
             device=self.device,
             max_length=self.max_length
         )
+        self.precision = apply_precision(self.model, self.model_name, self.precision, self.device)
         
         load_time = time.time() - start_time
         logger.info(f"Modelo CrossEncoder cargado en {load_time:.2f} segundos")
@@ -95,16 +122,24 @@ class NeuralReranker:
         query: str,
         documents: List[Dict[str, Any]],
         top_k: Optional[int] = None,
-        score_threshold: Optional[float] = None
+        score_threshold: Optional[float] = None,
+        cascade: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Re-rankea documentos usando el modelo CrossEncoder.
         
+        Con cascade=True se omite el modelo si la primera etapa es concluyente
+        y, si no, solo se re-rankea la ventana incierta; el resto de
+        documentos conserva el orden y score de la primera etapa. El umbral
+        está en la escala del CrossEncoder: con score_threshold se puntúan
+        todos los documentos y la cascada no se aplica.
+        
         Args:
             query: Consulta de búsqueda
             documents: Lista de documentos a re-rankear
             top_k: Número de documentos a devolver después del re-ranking
-            score_threshold: Umbral mínimo de score para incluir documentos
+            score_threshold: Umbral mínimo de score del CrossEncoder para incluir documentos
+            cascade: Aplicar la política de cascada (se ignora con score_threshold)
             
         Returns:
             Lista de documentos re-rankeados
@@ -115,20 +150,44 @@ class NeuralReranker:
             logger.warning("No se proporcionaron documentos para re-rankear")
             return []
         
-        # Preparar pares consulta-documento para CrossEncoder
-        query_doc_pairs = [(query, doc["text"]) for doc in documents]
+        self.stats["rerankings"] += 1
         
-        # Calcular scores de relevancia
-        logger.info(f"Calculando scores para {len(query_doc_pairs)} pares consulta-documento")
-        scores = self.model.predict(
-            query_doc_pairs,
-            batch_size=self.batch_size,
-            show_progress_bar=len(query_doc_pairs) > 10
+        # Orden de la primera etapa
+        documents = sorted(documents, key=lambda doc: doc.get("score", 0.0), reverse=True)
+        if cascade and score_threshold is None:
+            skip, window = plan_cascade(
+                [doc.get("score", 0.0) for doc in documents],
+                self.cascade_margin,
+                self.rerank_window
+            )
+        else:
+            skip, window = False, len(documents)
+        
+        if skip:
+            self.stats["skipped_reranks"] += 1
+            logger.info("Margen de primera etapa decisivo: se omite el CrossEncoder")
+            window = 0
+        
+        # Calcular scores de relevancia (solo pares que no están en caché)
+        texts = [truncate_tokens(doc["text"], self.max_tokens_per_doc) for doc in documents[:window]]
+        scores, predicted = score_with_cache(
+            self.score_cache,
+            f"{self.model_name}:{self.max_tokens_per_doc}",
+            query,
+            texts,
+            lambda pairs: self.model.predict(
+                pairs,
+                batch_size=self.batch_size,
+                show_progress_bar=len(pairs) > 10
+            )
         )
+        self.stats["pairs_scored"] += predicted
+        logger.info(f"Scores calculados para {predicted} pares consulta-documento ({len(texts) - predicted} desde caché)")
         
         # Combinar documentos con sus nuevos scores
         reranked_docs = []
-        for i, (doc, score) in enumerate(zip(documents, scores)):
+        first_stage_docs = []
+        for doc, score in zip(documents, scores + [None] * (len(documents) - window)):
             # Crear copia del documento original
             reranked_doc = doc.copy()
             
@@ -136,18 +195,26 @@ class NeuralReranker:
             if "score" in reranked_doc:
                 reranked_doc["original_score"] = reranked_doc["score"]
             
-            # Actualizar con nuevo score
-            reranked_doc["score"] = float(score)
-            reranked_doc["reranker_score"] = float(score)
+            # Sin score del CrossEncoder se conserva el de la primera etapa
+            reranked_doc["reranker_score"] = score
+            if score is None:
+                first_stage_docs.append(reranked_doc)
+                continue
             
+            # Actualizar con nuevo score
+            reranked_doc["score"] = score
             reranked_docs.append(reranked_doc)
         
         # Ordenar por score de mayor a menor
         reranked_docs = sorted(reranked_docs, key=lambda x: x["score"], reverse=True)
         
-        # Aplicar filtro de umbral si se especifica
+        # Aplicar filtro de umbral si se especifica (sin cascada, todos tienen score del CrossEncoder)
         if score_threshold is not None:
             reranked_docs = [doc for doc in reranked_docs if doc["score"] >= score_threshold]
+            first_stage_docs = []  # solo documentos sin texto: no alcanzan ningún umbral
+        
+        # Fuera de la ventana se conserva el orden de la primera etapa
+        reranked_docs.extend(first_stage_docs)
         
         # Limitar a top_k si se especifica
         if top_k is not None:
@@ -163,6 +230,17 @@ class NeuralReranker:
         
         return reranked_docs
     
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del re-ranker: caché de scores y reranks omitidos.
+        """
+        rerankings = self.stats["rerankings"]
+        return {
+            **self.stats,
+            **self.score_cache.get_stats(),
+            "skipped_rerank_rate": round(self.stats["skipped_reranks"] / rerankings, 4) if rerankings else 0.0
+        }
+    
     def calibrate_scores(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Calibra los scores para que sean más interpretables.
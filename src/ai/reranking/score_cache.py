@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caché de scores de CrossEncoder y política de reranking en cascada.
+
+- La caché es un LRU acotado con clave (modelo, consulta normalizada,
+  hash del contenido del chunk): consultas repetidas sobre los mismos
+  chunks no vuelven a pasar por el cross-encoder.
+- La cascada omite el cross-encoder cuando el margen entre el primer y el
+  segundo score de la primera etapa es decisivo, y si no lo es reranquea
+  solo la ventana incierta (los primeros candidatos).
+- Los documentos se recortan a un máximo de tokens para que los chunks
+  largos no dominen el tiempo de CPU.
+"""
+
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """Normaliza la consulta para la clave de caché (minúsculas, espacios)."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+def content_hash(text: str) -> str:
+    """Hash corto y estable del contenido de un chunk."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def truncate_tokens(text: str, max_tokens: Optional[int]) -> str:
+    """Recorta el texto a max_tokens palabras (aproximación barata a tokens)."""
+    if not max_tokens:
+        return text
+    tokens = text.split()
+    if len(tokens) <= max_tokens:
+        return text
+    return " ".join(tokens[:max_tokens])
+
+
+def plan_cascade(
+    first_stage_scores: Sequence[float],
+    decisive_margin: float,
+    window: int
+) -> Tuple[bool, int]:
+    """
+    Decide si reranquear y cuántos candidatos.
+
+    El margen es relativo al score del primero: (s1 - s2) / |s1|, para que
+    funcione con scores de BM25, TF-IDF o similitud coseno.
+
+    Returns:
+        (omitir_cross_encoder, tamaño_de_ventana)
+    """
+    if len(first_stage_scores) < 2:
+        return True, len(first_stage_scores)
+    top, second = sorted(first_stage_scores, reverse=True)[:2]
+    if top > 0 and (top - second) / abs(top) >= decisive_margin:
+        return True, 0
+    return False, min(window, len(first_stage_scores))
+
+
+class CrossEncoderScoreCache:
+    """LRU acotado de scores (modelo, consulta normalizada, hash de chunk) -> score."""
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        model_key: str,
+        query: str,
+        texts: Sequence[str]
+    ) -> Tuple[Dict[int, float], List[int], List[Tuple[str, str, str]]]:
+        """
+        Busca los scores de los textos para la consulta.
+
+        Returns:
+            (scores encontrados por índice, índices faltantes, claves de todos los textos)
+        """
+        normalized = normalize_query(query)
+        keys = [(model_key, normalized, content_hash(text)) for text in texts]
+        found: Dict[int, float] = {}
+        missing: List[int] = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                score = self._scores.get(key)
+                if score is None:
+                    missing.append(index)
+                else:
+                    self._scores.move_to_end(key)
+                    found[index] = score
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing, keys
+
+    def store(self, keys: Sequence[Tuple[str, str, str]], scores: Sequence[float]) -> None:
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._scores[key] = float(score)
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "cache_entries": len(self._scores),
+            "cache_max_entries": self.max_entries,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def score_with_cache(
+    cache: CrossEncoderScoreCache,
+    model_key: str,
+    query: str,
+    texts: Sequence[str],
+    predict: Callable[[List[Tuple[str, str]]], Sequence[float]]
+) -> Tuple[List[Optional[float]], int]:
+    """
+    Scores del cross-encoder para los textos, prediciendo solo los que no
+    están en caché. Los textos vacíos no se puntúan (score None). El modelo
+    recibe la misma consulta normalizada que forma la clave, para que un
+    score en caché sea el que el modelo habría devuelto.
+
+    Returns:
+        (scores alineados con texts, número de pares predichos)
+    """
+    query = normalize_query(query)
+    found, missing, keys = cache.lookup(model_key, query, texts)
+    missing = [index for index in missing if texts[index]]
+    if missing:
+        predicted = predict([(query, texts[index]) for index in missing])
+        cache.store([keys[index] for index in missing], predicted)
+        found.update((index, float(score)) for index, score in zip(missing, predicted))
+    return [found.get(index) for index in range(len(texts))], len(missing)
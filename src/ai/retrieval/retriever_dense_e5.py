@@ -22,6 +22,8 @@ import torch
 from transformers import AutoTokenizer, AutoModel
 from tqdm import tqdm
 
+from src.core.performance.quantization import apply_precision
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -44,7 +46,8 @@ class DenseRetrieverE5:
         device: Optional[str] = None,
         batch_size: int = 8,
         max_length: int = 512,
-        normalize_embeddings: bool = True
+        normalize_embeddings: bool = True,
+        precision: Optional[str] = None
     ):
         """
         Inicializa el retriever denso con E5-Large.
@@ -56,12 +59,15 @@ class DenseRetrieverE5:
             batch_size: Tamaño de batch para inferencia
             max_length: Longitud máxima de tokens
             normalize_embeddings: Si normalizar los embeddings
+            precision: 'fp32' o 'int8' (cuantización dinámica, solo CPU); None usa
+                la configuración por modelo de ModelManager
         """
         self.model_name = model_name
         self.cache_dir = cache_dir
         self.batch_size = batch_size
         self.max_length = max_length
         self.normalize_embeddings = normalize_embeddings
+        self.precision = precision
         
         # Determinar dispositivo
         if device:
@@ -99,6 +105,9 @@ class DenseRetrieverE5:
         # Poner modelo en modo evaluación
         self.model.eval()
         
+        # Cuantización int8 opcional de las capas Linear
+        self.precision = apply_precision(self.model, self.model_name, self.precision, self.device)
+        
         load_time = time.time() - start_time
         logger.info(f"Modelo E5 cargado en {load_time:.2f} segundos")
     
@@ -26,6 +26,8 @@ from transformers import AutoTokenizer, AutoModel
 import torch
 from tqdm import tqdm
 
+from src.core.performance.quantization import apply_precision
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,12 +43,13 @@ class E5EmbeddingFunction:
     significativamente superior a modelos anteriores como Sentence Transformers.
     """
     
-    def __init__(self, model_name: str = "intfloat/multilingual-e5-large"):
+    def __init__(self, model_name: str = "intfloat/multilingual-e5-large", precision: Optional[str] = None):
         """
         Inicializa el modelo E5 para generación de embeddings.
         
         Args:
             model_name: Nombre del modelo E5 a utilizar.
+            precision: 'fp32' o 'int8' (cuantización dinámica, solo CPU).
         """
         logger.info(f"Cargando modelo E5: {model_name}")
         start_time = time.time()
@@ -57,8 +60,10 @@ class E5EmbeddingFunction:
         # Mover a GPU si está disponible
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
+        self.model.eval()
+        self.precision = apply_precision(self.model, model_name, precision, self.device)
         
-        logger.info(f"Modelo E5 cargado en {time.time() - start_time:.2f} segundos. Usando device: {self.device}")
+        logger.info(f"Modelo E5 cargado en {time.time() - start_time:.2f} segundos. Usando device: {self.device} ({self.precision})")
     
     def __call__(self, texts: List[str]) -> List[List[float]]:
         """
@@ -12,6 +12,8 @@ class ProjectPaths:
     PROCESSED_DIR: Path = DATA_DIR / "processed"
     VECTORSTORES_DIR: Path = DATA_DIR / "vectorstores"
     RESULTS_DIR: Path = DATA_DIR / "results"
+    EVALUATION_DIR: Path = DATA_DIR / "evaluation"
+    BENCHMARK_RESULTS_DIR: Path = EVALUATION_DIR / "benchmark_results"
 
     # Files
     CHUNKS_FILE: Path = PROCESSED_DIR / "chunks.json"
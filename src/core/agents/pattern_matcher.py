@@ -0,0 +1,201 @@
+"""
+Motor de Patrones Compilado
+Keywords en un autómata Aho-Corasick y regex precompiladas con anclas literales
+"""
+from collections import defaultdict, deque
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import re._parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+
+class AhoCorasickAutomaton:
+    """
+    Autómata Aho-Corasick: todas las keywords presentes en el texto en una pasada
+
+    Semántica de subcadena, equivalente a `keyword in text` para cada keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+        self.keywords: Set[str] = set()
+
+        for keyword in keywords:
+            if keyword:
+                self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(keyword)
+        self.keywords.add(keyword)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords que aparecen en el texto"""
+        found: Set[str] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+def _literal_run(items) -> List[str]:
+    """Tramos de literales consecutivos de una secuencia del parser de re"""
+    runs, current = [], []
+    for op, arg in items:
+        if op is _sre_parse.LITERAL:
+            current.append(chr(arg))
+        else:
+            if current:
+                runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def _required_alternatives(items) -> Optional[List[str]]:
+    """Literales de los que al menos uno debe aparecer si la secuencia coincide"""
+    candidates = [[run] for run in _literal_run(items)]
+
+    for op, arg in items:
+        if op is _sre_parse.SUBPATTERN:
+            add_flags, content = arg[1], arg[-1]
+            if not add_flags & re.IGNORECASE:
+                required = _required_alternatives(list(content))
+                if required:
+                    candidates.append(required)
+        elif op is _sre_parse.BRANCH:
+            alternatives = []
+            for branch in arg[1]:
+                required = _required_alternatives(list(branch))
+                if not required:
+                    alternatives = None
+                    break
+                alternatives.extend(required)
+            if alternatives:
+                candidates.append(alternatives)
+
+    # El conjunto cuyo literal más corto es más largo es el filtro más selectivo
+    return max(candidates, key=lambda alternatives: min(map(len, alternatives)), default=None)
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[Tuple[str, ...]]:
+    """
+    Literales de los que al menos uno aparece en todo texto que coincide con el patrón
+
+    None si no se puede derivar (el patrón se evalúa siempre). Con IGNORECASE no
+    se derivan anclas: el plegado de mayúsculas de re no equivale a str.lower.
+    """
+    if flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+    alternatives = _required_alternatives(list(parsed))
+    return tuple(dict.fromkeys(alternatives)) if alternatives else None
+
+
+class CompiledPatternSet:
+    """
+    Grupos de keywords y regex compilados una sola vez
+
+    Una pasada del autómata sobre el texto encuentra las keywords y las anclas
+    literales de las regex; solo se evalúan las regex cuyas anclas aparecen.
+    Las regex se mantienen separadas y precompiladas: una única alternancia
+    con grupos nombrados no permite saber qué patrones coinciden a la vez y
+    en CPython es mucho más lenta que evaluar patrones ya filtrados.
+    """
+
+    def __init__(self,
+                 keywords: Optional[Dict[Hashable, Sequence[str]]] = None,
+                 patterns: Optional[Dict[Hashable, Sequence[str]]] = None,
+                 flags: int = 0):
+        self.keywords = {group: list(words) for group, words in (keywords or {}).items()}
+        self.patterns = {group: [re.compile(p, flags) for p in group_patterns]
+                         for group, group_patterns in (patterns or {}).items()}
+
+        # keyword -> [(grupo, repeticiones)] (las listas pueden repetir keywords)
+        self._keyword_owners: Dict[str, List[Tuple[Hashable, int]]] = defaultdict(list)
+        for group, words in self.keywords.items():
+            counts: Dict[str, int] = defaultdict(int)
+            for word in words:
+                counts[word] += 1
+            for word, count in counts.items():
+                self._keyword_owners[word].append((group, count))
+
+        # Regex con anclas: se evalúan solo si alguna ancla aparece
+        self._anchored: Dict[str, List[Tuple[Hashable, int]]] = defaultdict(list)
+        self._unanchored: List[Tuple[Hashable, int]] = []
+        for group, compiled in self.patterns.items():
+            for index, regex in enumerate(compiled):
+                anchors = required_literals(regex.pattern, regex.flags)
+                if anchors is None:
+                    self._unanchored.append((group, index))
+                else:
+                    for anchor in anchors:
+                        self._anchored[anchor].append((group, index))
+
+        self._automaton = AhoCorasickAutomaton(list(self._keyword_owners) + list(self._anchored))
+
+    def scan(self, text: str) -> Tuple[Dict[Hashable, int], Dict[Hashable, List[int]]]:
+        """
+        Analizar el texto en una pasada
+
+        Returns:
+            (keywords encontradas por grupo, índices de regex que coinciden por grupo)
+        """
+        found = self._automaton.find(text)
+
+        keyword_counts: Dict[Hashable, int] = {group: 0 for group in self.keywords}
+        candidates = set(self._unanchored)
+        for literal in found:
+            for group, count in self._keyword_owners.get(literal, ()):
+                keyword_counts[group] += count
+            candidates.update(self._anchored.get(literal, ()))
+
+        pattern_matches: Dict[Hashable, List[int]] = {group: [] for group in self.patterns}
+        for group, index in candidates:
+            if self.patterns[group][index].search(text):
+                pattern_matches[group].append(index)
+        for matches in pattern_matches.values():
+            matches.sort()
+        return keyword_counts, pattern_matches
+
+    def keywords_found(self, text: str) -> Set[str]:
+        """Keywords (de cualquier grupo) presentes en el texto"""
+        return self._automaton.find(text) & self._keyword_owners.keys()
@@ -4,10 +4,13 @@ Determina el tipo de consulta y el agente especializado más apropiado
 """
 import logging
 import re
-from typing import Dict, Any, List, Optional, Tuple
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .pattern_matcher import CompiledPatternSet
+
 logger = logging.getLogger(__name__)
 
 class QueryType(Enum):
@@ -39,6 +42,7 @@ class QueryClassifierAgent:
     def __init__(self):
         self.classification_patterns = self._load_classification_patterns()
         self.entity_extractors = self._setup_entity_extractors()
+        self._compile_patterns()
         
         logger.info("🎯 QueryClassifierAgent inicializado")
     
@@ -160,6 +164,23 @@ class QueryClassifierAgent:
             }
         }
     
+    def _compile_patterns(self):
+        """Compilar keywords, regex e indicadores de complejidad en un solo motor"""
+        keywords = {
+            query_type: data["keywords"] for query_type, data in self.classification_patterns.items()
+        }
+        keywords["complexity"] = ["y", "además", "también", "comparar", "diferencia", "entre"]
+        self._matcher = CompiledPatternSet(
+            keywords=keywords,
+            patterns={
+                query_type: data["patterns"] for query_type, data in self.classification_patterns.items()
+            }
+        )
+        self._entity_patterns = {
+            entity_type: re.compile(extractor["pattern"], re.IGNORECASE)
+            for entity_type, extractor in self.entity_extractors.items()
+        }
+    
     def classify_query(self, query: str) -> ClassificationResult:
         """
         Clasificar consulta y determinar agente apropiado
@@ -171,54 +192,92 @@ class QueryClassifierAgent:
             Resultado de clasificación con agente recomendado
         """
         try:
-            query_lower = query.lower()
-            
-            # 1. Extraer entidades
-            entities = self._extract_entities(query)
-            
-            # 2. Calcular scores por tipo
-            type_scores = self._calculate_type_scores(query_lower)
-            
-            # 3. Determinar tipo principal
-            primary_type = max(type_scores.items(), key=lambda x: x[1])
-            query_type, confidence = primary_type
-            
-            # 4. Determinar complejidad
-            complexity_score = self._calculate_complexity(query_lower, entities)
-            
-            # 5. Verificar si requiere múltiples agentes
-            requires_multiple = self._requires_multiple_agents(type_scores, complexity_score)
-            
-            # 6. Determinar agente objetivo
-            target_agent = self._determine_target_agent(query_type, requires_multiple)
-            
-            # 7. Generar razonamiento
-            reasoning = self._generate_reasoning(query_type, confidence, entities, complexity_score)
-            
-            result = ClassificationResult(
-                query_type=query_type,
-                confidence=confidence,
-                target_agent=target_agent,
-                reasoning=reasoning,
-                detected_entities=entities,
-                complexity_score=complexity_score,
-                requires_multiple_agents=requires_multiple
-            )
-            
-            logger.info(f"🎯 Consulta clasificada: {query_type.value} (conf: {confidence:.2f})")
+            result = self._classify(query)
+            logger.info(f"🎯 Consulta clasificada: {result.query_type.value} (conf: {result.confidence:.2f})")
             return result
             
         except Exception as e:
             logger.error(f"❌ Error clasificando consulta: {e}")
             return self._create_fallback_classification(query)
     
+    def classify_batch(self, queries: Iterable[str]) -> List[ClassificationResult]:
+        """
+        Clasificar un lote de consultas (p. ej. logs para analítica)
+        
+        Las consultas repetidas se clasifican una sola vez y no se registra
+        cada clasificación en el log.
+        """
+        cache: Dict[str, ClassificationResult] = {}
+        results = []
+        for query in queries:
+            if query not in cache:
+                try:
+                    cache[query] = self._classify(query)
+                except Exception as e:
+                    logger.error(f"❌ Error clasificando consulta: {e}")
+                    cache[query] = self._create_fallback_classification(query)
+            results.append(cache[query])
+        
+        logger.info(f"🎯 Lote clasificado: {len(results)} consultas ({len(cache)} únicas)")
+        return results
+    
+    def summarize_batch(self, results: List[ClassificationResult]) -> Dict[str, Any]:
+        """Resumen de un lote clasificado: distribución por tipo y agente"""
+        total = len(results)
+        return {
+            "total_queries": total,
+            "by_type": dict(Counter(result.query_type.value for result in results)),
+            "by_agent": dict(Counter(result.target_agent for result in results)),
+            "multi_agent_rate": round(sum(r.requires_multiple_agents for r in results) / total, 4) if total else 0.0,
+            "avg_confidence": round(sum(r.confidence for r in results) / total, 4) if total else 0.0,
+            "avg_complexity": round(sum(r.complexity_score for r in results) / total, 4) if total else 0.0
+        }
+    
+    def _classify(self, query: str) -> ClassificationResult:
+        """Clasificación con una sola pasada del motor de patrones"""
+        query_lower = query.lower()
+        keyword_counts, pattern_matches = self._matcher.scan(query_lower)
+        
+        # 1. Extraer entidades
+        entities = self._extract_entities(query)
+        
+        # 2. Calcular scores por tipo
+        type_scores = self._scores_from_scan(keyword_counts, pattern_matches)
+        
+        # 3. Determinar tipo principal
+        primary_type = max(type_scores.items(), key=lambda x: x[1])
+        query_type, confidence = primary_type
+        
+        # 4. Determinar complejidad
+        complexity_score = self._calculate_complexity(
+            query_lower, entities, type_scores, keyword_counts["complexity"]
+        )
+        
+        # 5. Verificar si requiere múltiples agentes
+        requires_multiple = self._requires_multiple_agents(type_scores, complexity_score)
+        
+        # 6. Determinar agente objetivo
+        target_agent = self._determine_target_agent(query_type, requires_multiple)
+        
+        # 7. Generar razonamiento
+        reasoning = self._generate_reasoning(query_type, confidence, entities, complexity_score)
+        
+        return ClassificationResult(
+            query_type=query_type,
+            confidence=confidence,
+            target_agent=target_agent,
+            reasoning=reasoning,
+            detected_entities=entities,
+            complexity_score=complexity_score,
+            requires_multiple_agents=requires_multiple
+        )
+    
     def _extract_entities(self, query: str) -> Dict[str, Any]:
         """Extraer entidades de la consulta"""
         entities = {}
         
         for entity_type, extractor in self.entity_extractors.items():
-            pattern = extractor["pattern"]
-            matches = re.findall(pattern, query, re.IGNORECASE)
+            matches = self._entity_patterns[entity_type].findall(query)
             
             if matches:
                 entities[entity_type] = {
@@ -231,35 +290,38 @@ class QueryClassifierAgent:
     
     def _calculate_type_scores(self, query_lower: str) -> Dict[QueryType, float]:
         """Calcular scores para cada tipo de consulta"""
+        return self._scores_from_scan(*self._matcher.scan(query_lower))
+    
+    def _scores_from_scan(self,
+                          keyword_counts: Dict[Any, int],
+                          pattern_matches: Dict[Any, List[int]]) -> Dict[QueryType, float]:
+        """Scores por tipo a partir de las keywords y regex encontradas"""
         scores = {}
         
         for query_type, patterns_data in self.classification_patterns.items():
-            score = 0.0
-            
             # Score por keywords
-            keywords_found = 0
-            for keyword in patterns_data["keywords"]:
-                if keyword in query_lower:
-                    keywords_found += 1
-            
-            keyword_score = keywords_found / len(patterns_data["keywords"])
+            keyword_score = keyword_counts[query_type] / len(patterns_data["keywords"])
             
             # Score por patrones regex
-            patterns_found = 0
-            for pattern in patterns_data["patterns"]:
-                if re.search(pattern, query_lower):
-                    patterns_found += 1
-            
+            patterns_found = len(pattern_matches[query_type])
             pattern_score = patterns_found / len(patterns_data["patterns"]) if patterns_data["patterns"] else 0
             
             # Score combinado (70% keywords, 30% patterns)
-            score = (keyword_score * 0.7) + (pattern_score * 0.3)
-            scores[query_type] = score
+            scores[query_type] = (keyword_score * 0.7) + (pattern_score * 0.3)
         
         return scores
     
-    def _calculate_complexity(self, query_lower: str, entities: Dict[str, Any]) -> float:
-        """Calcular score de complejidad de la consulta"""
+    def _calculate_complexity(self,
+                              query_lower: str,
+                              entities: Dict[str, Any],
+                              type_scores: Optional[Dict[QueryType, float]] = None,
+                              syntax_complexity: Optional[int] = None) -> float:
+        """Calcular score de complejidad de la consulta (reutiliza el análisis si se pasa)"""
+        if type_scores is None or syntax_complexity is None:
+            keyword_counts, pattern_matches = self._matcher.scan(query_lower)
+            type_scores = self._scores_from_scan(keyword_counts, pattern_matches)
+            syntax_complexity = keyword_counts["complexity"]
+        
         complexity_factors = []
         
         # Factor 1: Longitud de la consulta
@@ -272,13 +334,10 @@ class QueryClassifierAgent:
         complexity_factors.append(entity_factor)
         
         # Factor 3: Indicadores de complejidad sintáctica
-        complexity_indicators = ["y", "además", "también", "comparar", "diferencia", "entre"]
-        syntax_complexity = sum(1 for indicator in complexity_indicators if indicator in query_lower)
         syntax_factor = min(syntax_complexity / 3, 1.0)
         complexity_factors.append(syntax_factor)
         
         # Factor 4: Múltiples tipos de consulta detectados
-        type_scores = self._calculate_type_scores(query_lower)
         high_scores = [score for score in type_scores.values() if score > 0.3]
         multi_type_factor = min(len(high_scores) / 3, 1.0)
         complexity_factors.append(multi_type_factor)
@@ -10,7 +10,7 @@ import json
 import pickle
 import hashlib
 import asyncio
-from typing import Any, Optional, Union, Dict, List
+from typing import Any, Callable, Optional, Union, Dict, List
 from datetime import datetime, timedelta
 import logging
 import os
@@ -165,29 +165,30 @@ class RedisManager:
     
     # Search Result Caching
     def cache_search_result(self, query: str, method: str, results: List[Dict], 
-                          ttl: int = 1800):
+                          ttl: int = 1800, generation: str = ""):
         """Cache search results with query-specific key"""
-        cache_key = self._generate_search_key(query, method)
+        cache_key = self._generate_search_key(query, method, generation)
         cache_data = {
             'query': query,
             'method': method,
+            'generation': generation,
             'results': results,
             'timestamp': datetime.utcnow().isoformat(),
             'ttl': ttl
         }
         return self.cache_set(cache_key, cache_data, ttl)
     
-    def get_cached_search_result(self, query: str, method: str) -> Optional[Dict]:
+    def get_cached_search_result(self, query: str, method: str, generation: str = "") -> Optional[Dict]:
         """Get cached search result"""
-        cache_key = self._generate_search_key(query, method)
+        cache_key = self._generate_search_key(query, method, generation)
         return self.cache_get(cache_key)
     
-    def _generate_search_key(self, query: str, method: str) -> str:
-        """Generate consistent cache key for search queries"""
+    def _generate_search_key(self, query: str, method: str, generation: str = "") -> str:
+        """Generate consistent cache key for search queries (scoped to the index generation)"""
         query_hash = hashlib.md5(
             f"{query.lower().strip()}{method}".encode('utf-8')
         ).hexdigest()
-        return f"search:{method}:{query_hash}"
+        return f"search:{method}:{generation or 'default'}:{query_hash}"
     
     # Session Management
     def create_session(self, user_id: str, session_data: Dict, ttl: int = 3600) -> str:
@@ -287,8 +288,8 @@ def get_redis_manager() -> RedisManager:
         redis_manager = RedisManager()
     return redis_manager
 
-def cache_search_results(ttl: int = 1800):
-    """Decorator for caching search results"""
+def cache_search_results(ttl: int = 1800, generation: Optional[Callable[[], Optional[str]]] = None):
+    """Decorator for caching search results; generation returns the active index generation id"""
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -296,17 +297,18 @@ def cache_search_results(ttl: int = 1800):
             query = kwargs.get('query') or (args[0] if args else '')
             method = kwargs.get('method', 'default')
             
+            index_generation = (generation() if generation else None) or ""
             redis_mgr = get_redis_manager()
             
             # Try to get cached result
-            cached_result = redis_mgr.get_cached_search_result(query, method)
+            cached_result = redis_mgr.get_cached_search_result(query, method, index_generation)
             if cached_result:
                 logger.info(f"Cache hit for query: {query[:50]}...")
                 return cached_result['results']
             
             # Execute function and cache result
             result = await func(*args, **kwargs)
-            redis_mgr.cache_search_result(query, method, result, ttl)
+            redis_mgr.cache_search_result(query, method, result, ttl, index_generation)
             
             logger.info(f"Cache miss, result cached for query: {query[:50]}...")
             return result
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Cache Semántico de Consultas
+============================
+
+Responde consultas parafraseadas ("¿cuánto es el viático diario?" vs.
+"monto máximo de viáticos por día") con resultados ya calculados:
+
+- La clave es el embedding de la consulta; hay hit cuando el vecino más
+  cercano supera un umbral de similitud coseno.
+- Cada entrada guarda la generación del índice con la que se calculó: si
+  los vectorstores cambian, la entrada deja de ser válida.
+- Las cifras de la consulta deben coincidir ("3 días" no responde a "5 días").
+- Expulsión por TTL y por tamaño (LRU).
+- Índice de claves: matriz preasignada con búsqueda exacta para caches
+  pequeños y FAISS HNSW (ANN) para caches grandes, como en faiss_search.
+"""
+
+from collections import OrderedDict
+import copy
+from dataclasses import dataclass
+import hashlib
+import logging
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def query_numbers(query: str) -> FrozenSet[str]:
+    """Cifras de la consulta (montos, días, artículos) normalizadas"""
+    return frozenset(number.replace(",", ".") for number in _NUMBER_PATTERN.findall(query))
+
+
+def index_generation(paths: Iterable[str]) -> str:
+    """Generación del índice a partir de ruta, tamaño y fecha de los vectorstores"""
+    fingerprint = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            # Snapshot: el manifiesto cambia con cualquier segmento
+            path = path / "manifest.json"
+        if path.exists():
+            stat = path.stat()
+            fingerprint.append(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}")
+        else:
+            fingerprint.append(f"{path}:missing")
+    return hashlib.md5("|".join(fingerprint).encode()).hexdigest()[:12]
+
+
+@dataclass
+class SemanticCacheEntry:
+    """Entrada del cache semántico"""
+    query: str
+    namespace: str
+    generation: str
+    numbers: FrozenSet[str]
+    value: Any
+    created_at: float
+
+
+class SemanticCache:
+    """
+    Cache de resultados indexado por embeddings de consultas.
+
+    embed_fn recibe una consulta y devuelve su embedding (se normaliza aquí).
+    """
+
+    # Vecinos evaluados por consulta (filtran namespace, generación y cifras)
+    CANDIDATES = 8
+    # Fracción de vectores obsoletos en HNSW que fuerza reconstruir el índice
+    ANN_REBUILD_RATIO = 0.3
+
+    def __init__(self,
+                 embed_fn: Callable[[str], Any],
+                 similarity_threshold: float = 0.92,
+                 max_entries: int = 5000,
+                 ttl_seconds: int = 3600,
+                 ann_min_entries: int = 20000):
+        self._embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_ann = FAISS_AVAILABLE and max_entries >= ann_min_entries
+
+        # Índice de claves: una fila por slot, se dimensiona con el primer embedding
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[SemanticCacheEntry]] = [None] * max_entries
+        self._live = np.zeros(max_entries, dtype=bool)
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._ann = None
+        self._ann_stale = 0
+        self._lock = threading.RLock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'inserts': 0,
+            'evictions': 0,
+            'expired': 0,
+            'stale_generation': 0
+        }
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embedding normalizado de la consulta"""
+        vector = np.asarray(self._embed_fn(query), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self,
+               query: str,
+               namespace: str = "default",
+               generation: str = "",
+               embedding: Optional[np.ndarray] = None) -> Tuple[Optional[Any], np.ndarray]:
+        """
+        Buscar una consulta equivalente en el cache
+
+        Returns:
+            (valor cacheado o None, embedding de la consulta para reutilizar en put)
+        """
+        if embedding is None:
+            embedding = self.embed(query)
+        numbers = query_numbers(query)
+        now = time.monotonic()
+
+        value = None
+        with self._lock:
+            for slot, similarity in self._nearest(embedding):
+                if similarity < self.similarity_threshold:
+                    break
+                entry = self._entries[slot]
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(slot)
+                    self.stats['expired'] += 1
+                    continue
+                if entry.namespace != namespace or entry.numbers != numbers:
+                    continue
+                if entry.generation != generation:
+                    self._remove(slot)
+                    self.stats['stale_generation'] += 1
+                    continue
+
+                self._lru.move_to_end(slot)
+                self.stats['hits'] += 1
+                logger.debug(f"✅ Cache semántico HIT ({similarity:.3f}): '{query}' ≈ '{entry.query}'")
+                value = entry.value
+                break
+
+            if value is None:
+                self.stats['misses'] += 1
+                return None, embedding
+
+        # Copia para que el llamador no modifique la entrada
+        return copy.deepcopy(value), embedding
+
+    def get(self, query: str, namespace: str = "default", generation: str = "") -> Optional[Any]:
+        """Valor cacheado para una consulta equivalente o None"""
+        return self.lookup(query, namespace, generation)[0]
+
+    def put(self,
+            query: str,
+            value: Any,
+            namespace: str = "default",
+            generation: str = "",
+            embedding: Optional[np.ndarray] = None) -> None:
+        """Almacenar el resultado de una consulta"""
+        if embedding is None:
+            embedding = self.embed(query)
+        entry = SemanticCacheEntry(
+            query=query,
+            namespace=namespace,
+            generation=generation,
+            numbers=query_numbers(query),
+            value=copy.deepcopy(value),
+            created_at=time.monotonic()
+        )
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+            # Reemplazar la misma consulta en lugar de duplicarla
+            for slot, similarity in self._nearest(embedding):
+                if similarity < 0.9999:
+                    break
+                existing = self._entries[slot]
+                if (existing.namespace, existing.numbers) == (namespace, entry.numbers):
+                    self._remove(slot)
+                    break
+
+            if not self._free:
+                lru_slot = next(iter(self._lru))
+                self._remove(lru_slot)
+                self.stats['evictions'] += 1
+
+            slot = self._free.pop()
+            self._vectors[slot] = embedding
+            self._entries[slot] = entry
+            self._live[slot] = True
+            self._lru[slot] = None
+            if self.use_ann:
+                self._ann_add(slot)
+            self.stats['inserts'] += 1
+
+    def invalidate(self, generation: Optional[str] = None) -> int:
+        """Eliminar todas las entradas, o las que no son de la generación indicada"""
+        with self._lock:
+            slots = [
+                slot for slot in list(self._lru)
+                if generation is None or self._entries[slot].generation != generation
+            ]
+            for slot in slots:
+                self._remove(slot)
+        if slots:
+            logger.info(f"🗑️ Cache semántico: {len(slots)} entradas invalidadas")
+        return len(slots)
+
+    def _remove(self, slot: int) -> None:
+        self._entries[slot] = None
+        self._live[slot] = False
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+        if self.use_ann:
+            self._ann_stale += 1
+
+    def _nearest(self, embedding: np.ndarray) -> List[Tuple[int, float]]:
+        """Slots vivos más cercanos, ordenados por similitud descendente"""
+        if not self._lru:
+            return []
+        if self.use_ann and self._ann is not None:
+            _, ids = self._ann.search(embedding.reshape(1, -1), self.CANDIDATES * 2)
+            candidates = np.unique(ids[0][ids[0] >= 0])
+            candidates = candidates[self._live[candidates]]
+        else:
+            candidates = np.flatnonzero(self._live)
+
+        # Similitud exacta (HNSW puede contener vectores de slots reutilizados)
+        similarities = self._vectors[candidates] @ embedding
+        if len(candidates) > self.CANDIDATES:
+            top = np.argpartition(-similarities, self.CANDIDATES)[:self.CANDIDATES]
+            candidates, similarities = candidates[top], similarities[top]
+        order = np.argsort(-similarities)
+        return [(int(candidates[i]), float(similarities[i])) for i in order]
+
+    def _ann_add(self, slot: int) -> None:
+        if self._ann is None or self._ann_stale > self.ANN_REBUILD_RATIO * max(1, self._ann.ntotal):
+            self._ann = faiss.IndexIDMap2(faiss.IndexHNSWFlat(self._vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT))
+            live = np.flatnonzero(self._live)
+            live = live[live != slot]
+            if len(live):
+                self._ann.add_with_ids(self._vectors[live], live.astype(np.int64))
+            self._ann_stale = 0
+        self._ann.add_with_ids(self._vectors[slot:slot + 1], np.array([slot], dtype=np.int64))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del cache semántico"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+            'entries': len(self._lru),
+            'max_entries': self.max_entries,
+            'similarity_threshold': self.similarity_threshold,
+            'ttl_seconds': self.ttl_seconds,
+            'index': 'hnsw' if self.use_ann else 'exact'
+        }
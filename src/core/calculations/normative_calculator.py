@@ -1,19 +1,23 @@
 """
-Calculadora normativa simplificada - compatible sin pandas
+Calculadora normativa con tablas compiladas
 Mantiene datos dinámicos actualizados: UIT, tipo de cambio, valores vigentes
+Las tablas se compilan al cargar en arrays NumPy ordenados (searchsorted) e
+índices por (año, nivel); pandas solo se usa para reportes históricos
 """
 import logging
+from collections import OrderedDict
 from datetime import datetime, date
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 import json
 from decimal import Decimal, ROUND_HALF_UP
 
-# Pandas/numpy opcionales
+import numpy as np
+
+# Pandas opcional
 try:
     import pandas as pd
-    import numpy as np
     PANDAS_AVAILABLE = True
 except ImportError:
     PANDAS_AVAILABLE = False
@@ -30,13 +34,53 @@ UIT_VALUES = {
     2025: 5350.0  # Proyectado
 }
 
+# Resoluciones (año, nivel) memorizadas; los niveles vienen de filas de usuario
+VIATICO_LOOKUP_CACHE_SIZE = 1024
+
+# Archivos JSON de las tablas normativas (en data_path)
+TABLE_FILES = {
+    "uit": "uit_values.json",
+    "tipo_cambio": "tipo_cambio.json",
+    "viaticos": "viaticos_table.json",
+    "infracciones": "infracciones_table.json",
+}
+
+DEFAULT_VIATICOS = [
+    {
+        "year": 2025, "category": "Minister", "level": "Ministro",
+        "amount_soles": 380.0, "amount_uit": 0.071, "location": "Nacional",
+        "decree": "DS-007-2013-EF", "valid_from": "2025-01-01", "valid_to": "2025-12-31"
+    }
+]
+
+DEFAULT_INFRACCIONES = [
+    {
+        "code": "INF001", "description": "Uso indebido de viáticos",
+        "severity": "Grave", "min_uit": 0.5, "max_uit": 2.0,
+        "article": "Artículo 166", "law": "Ley 27815",
+        "valid_from": "2020-01-01", "valid_to": "2025-12-31"
+    },
+    {
+        "code": "INF002", "description": "No rendición de cuentas en plazo",
+        "severity": "Leve", "min_uit": 0.1, "max_uit": 0.5,
+        "article": "Artículo 167", "law": "Ley 27815",
+        "valid_from": "2020-01-01", "valid_to": "2025-12-31"
+    },
+    {
+        "code": "INF003", "description": "Falsificación de comprobantes",
+        "severity": "Muy Grave", "min_uit": 2.0, "max_uit": 8.0,
+        "article": "Artículo 168", "law": "Ley 27815",
+        "valid_from": "2020-01-01", "valid_to": "2025-12-31"
+    }
+]
+
 @dataclass
 class UIT:
     """Unidad Impositiva Tributaria por año"""
     year: int
     value: float
     source: str
-    
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'UIT':
         return cls(
@@ -45,14 +89,14 @@ class UIT:
             source=data.get('source', 'SUNAT')
         )
 
-@dataclass 
+@dataclass
 class TipoCambio:
     """Tipo de cambio USD/PEN por fecha"""
     date: date
     buy: float
     sell: float
     source: str = "BCRP"
-    
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TipoCambio':
         return cls(
@@ -62,253 +106,280 @@ class TipoCambio:
             source=data.get('source', 'BCRP')
         )
 
+def _nearest_index(sorted_values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Índice del valor más cercano en un array ordenado (empates: el menor)"""
+    right = np.clip(np.searchsorted(sorted_values, targets), 0, len(sorted_values) - 1)
+    left = np.clip(right - 1, 0, len(sorted_values) - 1)
+    closest = np.where(np.abs(targets - sorted_values[left]) <= np.abs(sorted_values[right] - targets), left, right)
+    # Con valores repetidos, la primera fila del bloque (como argmin)
+    return np.searchsorted(sorted_values, sorted_values[closest])
+
+def _to_date(value: Union[date, datetime, str]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def _as_number(value: Any, default: float) -> float:
+    if value is None or value == "":
+        return default
+    return float(value)
+
 class NormativeCalculator:
     """
-    Calculadora normativa simplificada - compatible sin pandas
-    Mantiene funcionalidad esencial para cálculos de viáticos y UIT
+    Calculadora normativa sobre tablas compiladas
+    Las consultas por año, fecha o nivel son búsquedas en arrays ordenados o dicts,
+    sin filtrar DataFrames por llamada
     """
-    
+
     def __init__(self, data_path: Optional[Path] = None):
         self.data_path = data_path or Path(__file__).parent / "data"
         self.data_path.mkdir(exist_ok=True)
-        
-        # Datos simples sin pandas
-        self.uit_data = {}
-        self.tipo_cambio_data = {}
-        self.viaticos_data = {}
-        
-        # Cargar datos
+
+        # Registros fuente (listas de dicts, como en los JSON)
+        self.uit_records: List[Dict[str, Any]] = []
+        self.tipo_cambio_records: List[Dict[str, Any]] = []
+        self.viaticos_records: List[Dict[str, Any]] = []
+        self.infracciones_records: List[Dict[str, Any]] = []
+
+        # Cargar y compilar datos
         self._load_normative_data()
-        
-        logger.info(f"📊 NormativeCalculator inicializado (modo simplificado)")
-        if not PANDAS_AVAILABLE:
-            logger.warning("⚠️ Pandas no disponible - usando versión simplificada")
-    
+
+        logger.info(f"📊 NormativeCalculator inicializado ({len(self.viaticos_records)} tarifas de viáticos)")
+
     def _load_normative_data(self):
         """Cargar datos normativos desde archivos JSON o valores por defecto"""
         try:
-            # Cargar UIT histórica
-            self._load_uit_data()
-            
-            # Cargar tipo de cambio
-            self._load_exchange_rate_data()
-            
-            # Cargar tablas de viáticos
-            self._load_viaticos_data()
-            
+            self.uit_records = self._load_table(
+                "uit", [{"year": year, "value": value, "source": "SUNAT"} for year, value in UIT_VALUES.items()]
+            )
+            self.tipo_cambio_records = self._load_table(
+                "tipo_cambio", [{"date": date.today().isoformat(), "buy": 3.78, "sell": 3.80, "source": "Default"}]
+            )
+            self.viaticos_records = self._load_table("viaticos", DEFAULT_VIATICOS)
+            self.infracciones_records = self._load_table("infracciones", DEFAULT_INFRACCIONES)
+            self._compile_tables()
+
         except Exception as e:
             logger.error(f"❌ Error cargando datos normativos: {e}")
             self._create_default_data()
-    
-    def _load_uit_data(self):
-        """Cargar valores UIT históricos"""
-        # Datos UIT actualizados
-        self.uit_data = {
-            2020: 4300.0,
-            2021: 4400.0,
-            2022: 4600.0,
-            2023: 4950.0,
-            2024: 5150.0,
-            2025: 5350.0  # Proyectado
-        }
-    
-    def _load_exchange_rate_data(self):
-        """Cargar tipo de cambio actual"""
-        # Tipo de cambio actual simplificado
-        self.tipo_cambio_data = {
-            "buy": 3.78,
-            "sell": 3.80,
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "source": "BCRP"
-        }
-    
-    def _load_viaticos_data(self):
-        """Cargar tabla de viáticos simplificada"""
-        # Tabla de viáticos MINEDU simplificada
-        self.viaticos_data = {
-            "ministro": {"nacional": 380.0, "internacional": 650.0},
-            "viceministro": {"nacional": 340.0, "internacional": 580.0},
-            "funcionario": {"nacional": 320.0, "internacional": 520.0},
-            "servidor": {"nacional": 280.0, "internacional": 450.0}
-        }
-    
-    def _load_infracciones_data(self):
-        """Cargar tabla de infracciones y sanciones"""
-        infracciones_file = self.data_path / "infracciones_table.json"
-        
-        if infracciones_file.exists():
-            with open(infracciones_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.infracciones_df = pd.DataFrame(data)
-        else:
-            # Tabla de infracciones administrativas
-            infracciones_data = [
-                {
-                    "code": "INF001", "description": "Uso indebido de viáticos",
-                    "severity": "Grave", "min_uit": 0.5, "max_uit": 2.0,
-                    "article": "Artículo 166", "law": "Ley 27815",
-                    "valid_from": "2020-01-01", "valid_to": "2025-12-31"
-                },
-                {
-                    "code": "INF002", "description": "No rendición de cuentas en plazo",
-                    "severity": "Leve", "min_uit": 0.1, "max_uit": 0.5,
-                    "article": "Artículo 167", "law": "Ley 27815", 
-                    "valid_from": "2020-01-01", "valid_to": "2025-12-31"
-                },
-                {
-                    "code": "INF003", "description": "Falsificación de comprobantes",
-                    "severity": "Muy Grave", "min_uit": 2.0, "max_uit": 8.0,
-                    "article": "Artículo 168", "law": "Ley 27815",
-                    "valid_from": "2020-01-01", "valid_to": "2025-12-31"
-                }
-            ]
-            self.infracciones_df = pd.DataFrame(infracciones_data)
-            self.infracciones_df['valid_from'] = pd.to_datetime(self.infracciones_df['valid_from'])
-            self.infracciones_df['valid_to'] = pd.to_datetime(self.infracciones_df['valid_to'])
-            self._save_infracciones_data()
-    
+
+    def _load_table(self, name: str, default: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Registros de una tabla JSON; valores por defecto si no existe"""
+        table_file = self.data_path / TABLE_FILES[name]
+        if not table_file.exists():
+            return [dict(record) for record in default]
+        with open(table_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def _create_default_data(self):
         """Crear datos por defecto si no se pueden cargar"""
         logger.warning("🔄 Creando datos normativos por defecto")
-        
-        # UIT básica
-        self.uit_df = pd.DataFrame([
-            {"year": 2025, "value": 5350.0, "source": "Default"}
-        ])
-        
-        # Tipo de cambio básico
-        self.tipo_cambio_df = pd.DataFrame([
-            {"date": pd.Timestamp.now(), "buy": 3.78, "sell": 3.80, "source": "Default"}
-        ])
-        
-        # Viáticos básicos
-        self.viaticos_df = pd.DataFrame([
-            {
-                "year": 2025, "category": "Minister", "level": "Ministro",
-                "amount_soles": 380.0, "amount_uit": 0.071, "location": "Nacional",
-                "decree": "DS-007-2013-EF", "valid_from": pd.Timestamp.now(),
-                "valid_to": pd.Timestamp.now().replace(year=2025, month=12, day=31)
-            }
-        ])
-    
+        self.uit_records = [{"year": 2025, "value": 5350.0, "source": "Default"}]
+        self.tipo_cambio_records = [
+            {"date": date.today().isoformat(), "buy": 3.78, "sell": 3.80, "source": "Default"}
+        ]
+        self.viaticos_records = [dict(record) for record in DEFAULT_VIATICOS]
+        self.infracciones_records = [dict(record) for record in DEFAULT_INFRACCIONES]
+        self._compile_tables()
+
+    def _compile_tables(self):
+        """Compilar los registros en arrays ordenados e índices de búsqueda"""
+        # UIT: año -> valor (la primera fila de cada año manda)
+        self._uit_index: Dict[int, float] = {}
+        for record in self.uit_records:
+            self._uit_index.setdefault(int(record["year"]), float(record["value"]))
+        self._uit_years = np.array(sorted(self._uit_index), dtype=np.int64)
+        self._uit_values = np.array([self._uit_index[year] for year in self._uit_years.tolist()], dtype=np.float64)
+
+        # Tipo de cambio ordenado por fecha (ordinales de día)
+        rates = sorted(self.tipo_cambio_records, key=lambda record: _to_date(record["date"]))
+        self._fx_dates = [_to_date(record["date"]) for record in rates]
+        self._fx_days = np.array([day.toordinal() for day in self._fx_dates], dtype=np.int64)
+        self._fx_buy = np.array([record["buy"] for record in rates], dtype=np.float64)
+        self._fx_sell = np.array([record["sell"] for record in rates], dtype=np.float64)
+        self._fx_sources = [record.get("source", "BCRP") for record in rates]
+
+        # Viáticos: (año, nivel) -> fila, niveles por año en orden de tabla
+        self._viaticos_amounts = np.array([record["amount_soles"] for record in self.viaticos_records], dtype=np.float64)
+        self._viaticos_index: Dict[Tuple[int, str], int] = {}
+        self._viaticos_levels: Dict[int, List[str]] = {}
+        for row, record in enumerate(self.viaticos_records):
+            key = (int(record["year"]), str(record["level"]).lower())
+            if key not in self._viaticos_index:
+                self._viaticos_index[key] = row
+                self._viaticos_levels.setdefault(key[0], []).append(key[1])
+        self._viaticos_years = np.array(sorted(self._viaticos_levels), dtype=np.int64)
+        self._viatico_lookups: "OrderedDict[Tuple[int, str], Tuple[Optional[int], int]]" = OrderedDict()
+
+        self._infracciones_index = {record["code"]: record for record in reversed(self.infracciones_records)}
+
+    # === BÚSQUEDAS SOBRE TABLAS COMPILADAS ===
+
+    def _find_viatico(self, level: str, year: int) -> Tuple[Optional[int], int]:
+        """Fila de viáticos para (nivel, año) y año usado; el año más cercano si falta"""
+        key = (year, level.lower())
+        cached = self._viatico_lookups.get(key)
+        if cached is not None:
+            self._viatico_lookups.move_to_end(key)
+            return cached
+        row, used_year = self._match_level(year, key[1]), year
+        if row is None and len(self._viaticos_years):
+            used_year = int(self._viaticos_years[_nearest_index(self._viaticos_years, np.array([year]))[0]])
+            row = self._match_level(used_year, key[1])
+            logger.warning(f"⚠️ Viáticos para {level} en {year} no encontrados, usando {used_year}")
+        self._viatico_lookups[key] = (row, used_year)
+        if len(self._viatico_lookups) > VIATICO_LOOKUP_CACHE_SIZE:
+            self._viatico_lookups.popitem(last=False)
+        return row, used_year
+
+    def _match_level(self, year: int, level: str) -> Optional[int]:
+        """Primera fila del año cuyo nivel contiene el nivel buscado"""
+        for table_level in self._viaticos_levels.get(year, ()):
+            if level in table_level:
+                return self._viaticos_index[(year, table_level)]
+        return None
+
+    def _uit_for_years(self, years: np.ndarray) -> np.ndarray:
+        """Valores UIT por año; el más reciente para años sin dato"""
+        if not len(self._uit_years):
+            return np.full(len(years), 5350.0)
+        positions = np.clip(np.searchsorted(self._uit_years, years), 0, len(self._uit_years) - 1)
+        found = self._uit_years[positions] == years
+        if not found.all():
+            latest = int(self._uit_years[-1])
+            for year in np.unique(years[~found]).tolist():
+                logger.warning(f"⚠️ UIT para {year} no encontrada, usando {latest}: S/ {self._uit_values[-1]}")
+        return np.where(found, self._uit_values[positions], self._uit_values[-1])
+
     # === MÉTODOS DE CÁLCULO PRINCIPALES ===
-    
+
     def get_uit_value(self, year: int) -> float:
         """Obtener valor UIT para un año específico"""
         try:
-            uit_row = self.uit_df[self.uit_df['year'] == year]
-            if not uit_row.empty:
-                return float(uit_row.iloc[0]['value'])
-            else:
-                # Usar el valor más reciente disponible
-                latest_uit = self.uit_df.sort_values('year', ascending=False).iloc[0]
-                logger.warning(f"⚠️ UIT para {year} no encontrada, usando {latest_uit['year']}: S/ {latest_uit['value']}")
-                return float(latest_uit['value'])
+            value = self._uit_index.get(year)
+            if value is not None:
+                return value
+            # Usar el valor más reciente disponible
+            return float(self._uit_for_years(np.array([year], dtype=np.int64))[0])
         except Exception as e:
             logger.error(f"❌ Error obteniendo UIT para {year}: {e}")
             return 5350.0  # Valor por defecto 2025
-    
+
     def get_exchange_rate(self, target_date: Union[date, str]) -> Dict[str, float]:
         """Obtener tipo de cambio para una fecha específica"""
         try:
-            if isinstance(target_date, str):
-                target_date = pd.to_datetime(target_date).date()
-            
+            target_date = _to_date(target_date)
+
             # Buscar la fecha más cercana
-            self.tipo_cambio_df['date_only'] = self.tipo_cambio_df['date'].dt.date
-            closest_idx = np.argmin(np.abs((self.tipo_cambio_df['date_only'] - target_date).dt.days))
-            closest_rate = self.tipo_cambio_df.iloc[closest_idx]
-            
+            closest = int(_nearest_index(self._fx_days, np.array([target_date.toordinal()]))[0])
+
             return {
-                "buy": float(closest_rate['buy']),
-                "sell": float(closest_rate['sell']),
-                "date": closest_rate['date_only'].isoformat(),
-                "source": closest_rate['source']
+                "buy": float(self._fx_buy[closest]),
+                "sell": float(self._fx_sell[closest]),
+                "date": self._fx_dates[closest].isoformat(),
+                "source": self._fx_sources[closest]
             }
         except Exception as e:
             logger.error(f"❌ Error obteniendo tipo de cambio para {target_date}: {e}")
             return {"buy": 3.78, "sell": 3.80, "date": str(target_date), "source": "Default"}
-    
+
     def calculate_viaticos(
-        self, 
-        level: str, 
-        year: int, 
+        self,
+        level: str,
+        year: int,
         days: int = 1,
         location: str = "Nacional"
     ) -> Dict[str, Any]:
         """Calcular viáticos según nivel y año"""
         try:
-            # Filtrar por año y nivel
-            viaticos_query = self.viaticos_df[
-                (self.viaticos_df['year'] == year) & 
-                (self.viaticos_df['level'].str.contains(level, case=False, na=False))
-            ]
-            
-            if viaticos_query.empty:
-                # Buscar el año más cercano
-                available_years = self.viaticos_df['year'].unique()
-                closest_year = min(available_years, key=lambda x: abs(x - year))
-                
-                viaticos_query = self.viaticos_df[
-                    (self.viaticos_df['year'] == closest_year) &
-                    (self.viaticos_df['level'].str.contains(level, case=False, na=False))
-                ]
-                
-                logger.warning(f"⚠️ Viáticos para {level} en {year} no encontrados, usando {closest_year}")
-            
-            if not viaticos_query.empty:
-                viatico_row = viaticos_query.iloc[0]
-                
-                daily_amount = float(viatico_row['amount_soles'])
-                total_amount = daily_amount * days
-                uit_value = self.get_uit_value(year)
-                amount_in_uit = total_amount / uit_value
-                
-                return {
-                    "level": level,
-                    "year": year,
-                    "days": days,
-                    "daily_amount_soles": daily_amount,
-                    "total_amount_soles": total_amount,
-                    "amount_uit": round(amount_in_uit, 4),
-                    "uit_reference": uit_value,
-                    "decree": viatico_row['decree'],
-                    "calculation_date": datetime.now().isoformat(),
-                    "location": location
-                }
-            else:
-                raise ValueError(f"No se encontraron datos de viáticos para {level}")
-                
+            return self.calculate_viaticos_batch(
+                [{"level": level, "year": year, "days": days, "location": location}]
+            )[0]
         except Exception as e:
             logger.error(f"❌ Error calculando viáticos: {e}")
             return self._default_viaticos_calculation(level, year, days)
-    
+
+    def calculate_viaticos_batch(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Calcular viáticos de muchas comisiones a la vez (conciliación anual)
+        Cada fila: level, year, days (1) y location ("Nacional"); acepta un DataFrame.
+        Los resultados tienen el formato de calculate_viaticos y el orden de entrada
+        """
+        if PANDAS_AVAILABLE and isinstance(rows, pd.DataFrame):
+            rows = rows.to_dict("records")
+        rows = list(rows)
+        if not rows:
+            return []
+
+        current_year = datetime.now().year
+        try:
+            levels = [str(row.get("level") or "funcionario") for row in rows]
+            years = np.array([int(_as_number(row.get("year"), current_year)) for row in rows], dtype=np.int64)
+            days = np.array([_as_number(row.get("days"), 1) for row in rows], dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Fila de comisión inválida: {e}") from e
+        invalid_days = np.flatnonzero(~(days >= 1))
+        if len(invalid_days):
+            row = int(invalid_days[0])
+            raise ValueError(f"Fila de comisión inválida: days debe ser al menos 1 (fila {row + 1}: {rows[row].get('days')!r})")
+
+        # Un lookup por par (año, nivel) distinto; el resto es aritmética vectorizada
+        table_rows = np.array([
+            -1 if row is None else row
+            for row, _ in (self._find_viatico(level, year) for level, year in zip(levels, years.tolist()))
+        ], dtype=np.int64)
+        found = table_rows >= 0
+        daily = np.zeros(len(rows))
+        daily[found] = self._viaticos_amounts[table_rows[found]]
+        total = daily * days
+        uit = self._uit_for_years(years)
+        amount_uit = np.round(total / uit, 4)
+
+        calculation_date = datetime.now().isoformat()
+        days_values = [int(value) if value.is_integer() else value for value in days.tolist()]
+        results = []
+        for i, (row, level, year, day_count) in enumerate(zip(rows, levels, years.tolist(), days_values)):
+            if not found[i]:
+                results.append(self._default_viaticos_calculation(level, year, day_count))
+                continue
+            results.append({
+                "level": level,
+                "year": year,
+                "days": day_count,
+                "daily_amount_soles": float(daily[i]),
+                "total_amount_soles": float(total[i]),
+                "amount_uit": float(amount_uit[i]),
+                "uit_reference": float(uit[i]),
+                "decree": self.viaticos_records[table_rows[i]]["decree"],
+                "calculation_date": calculation_date,
+                "location": row.get("location") or "Nacional"
+            })
+        return results
+
     def calculate_sanctions(
-        self, 
-        infraction_code: str, 
+        self,
+        infraction_code: str,
         severity_factor: float = 1.0,
         year: int = 2025
     ) -> Dict[str, Any]:
         """Calcular sanciones administrativas"""
         try:
-            # Filtrar infracción
-            infraction_query = self.infracciones_df[
-                self.infracciones_df['code'] == infraction_code
-            ]
-            
-            if infraction_query.empty:
-                available_codes = self.infracciones_df['code'].tolist()
+            infraction = self._infracciones_index.get(infraction_code)
+
+            if infraction is None:
+                available_codes = [record["code"] for record in self.infracciones_records]
                 raise ValueError(f"Código de infracción {infraction_code} no encontrado. Disponibles: {available_codes}")
-            
-            infraction = infraction_query.iloc[0]
+
             uit_value = self.get_uit_value(year)
-            
+
             min_sanction_uit = float(infraction['min_uit']) * severity_factor
             max_sanction_uit = float(infraction['max_uit']) * severity_factor
-            
+
             min_sanction_soles = min_sanction_uit * uit_value
             max_sanction_soles = max_sanction_uit * uit_value
-            
+
             return {
                 "infraction_code": infraction_code,
                 "description": infraction['description'],
@@ -324,22 +395,22 @@ class NormativeCalculator:
                 "legal_framework": infraction['law'],
                 "calculation_date": datetime.now().isoformat()
             }
-            
+
         except Exception as e:
             logger.error(f"❌ Error calculando sanciones: {e}")
             return {"error": str(e)}
-    
+
     def compare_historical_values(
-        self, 
+        self,
         concept: str,
-        start_year: int, 
+        start_year: int,
         end_year: int
-    ) -> pd.DataFrame:
-        """Comparar valores históricos entre años"""
+    ) -> "pd.DataFrame":
+        """Comparar valores históricos entre años (requiere pandas)"""
         try:
             years = list(range(start_year, end_year + 1))
             comparison_data = []
-            
+
             for year in years:
                 if concept.lower() == "uit":
                     value = self.get_uit_value(year)
@@ -358,36 +429,36 @@ class NormativeCalculator:
                             "value_soles": viaticos['daily_amount_soles'],
                             "unit": "soles/día"
                         })
-            
+
             comparison_df = pd.DataFrame(comparison_data)
-            
+
             if not comparison_df.empty:
                 # Calcular variaciones
                 comparison_df['variation_abs'] = comparison_df['value_soles'].diff()
                 comparison_df['variation_pct'] = comparison_df['value_soles'].pct_change() * 100
-                
+
             return comparison_df
-            
+
         except Exception as e:
             logger.error(f"❌ Error en comparación histórica: {e}")
-            return pd.DataFrame()
-    
+            return pd.DataFrame() if PANDAS_AVAILABLE else None
+
     def _default_viaticos_calculation(self, level: str, year: int, days: int) -> Dict[str, Any]:
         """Cálculo por defecto si no se encuentran datos específicos"""
         default_amounts = {
             "ministro": 380.0,
-            "viceministro": 380.0, 
+            "viceministro": 380.0,
             "funcionario": 320.0,
             "directivo": 320.0,
             "profesional": 320.0,
             "técnico": 320.0,
             "apoyo": 320.0
         }
-        
+
         level_key = next((k for k in default_amounts.keys() if k in level.lower()), "funcionario")
         daily_amount = default_amounts[level_key]
         total_amount = daily_amount * days
-        
+
         return {
             "level": level,
             "year": year,
@@ -397,86 +468,53 @@ class NormativeCalculator:
             "note": "Cálculo por defecto - verificar normativa vigente",
             "calculation_date": datetime.now().isoformat()
         }
-    
+
     # === MÉTODOS DE PERSISTENCIA ===
-    
-    def _save_uit_data(self):
-        """Guardar datos UIT"""
-        try:
-            uit_file = self.data_path / "uit_values.json"
-            self.uit_df.to_json(uit_file, orient='records', indent=2)
-        except Exception as e:
-            logger.error(f"❌ Error guardando datos UIT: {e}")
-    
-    def _save_exchange_rate_data(self):
-        """Guardar datos tipo de cambio"""
-        try:
-            tc_file = self.data_path / "tipo_cambio.json" 
-            tc_data = self.tipo_cambio_df.copy()
-            tc_data['date'] = tc_data['date'].dt.strftime('%Y-%m-%d')
-            tc_data.to_json(tc_file, orient='records', indent=2)
-        except Exception as e:
-            logger.error(f"❌ Error guardando tipo de cambio: {e}")
-    
-    def _save_viaticos_data(self):
-        """Guardar datos de viáticos"""
-        try:
-            viaticos_file = self.data_path / "viaticos_table.json"
-            viaticos_data = self.viaticos_df.copy()
-            viaticos_data['valid_from'] = viaticos_data['valid_from'].dt.strftime('%Y-%m-%d')
-            viaticos_data['valid_to'] = viaticos_data['valid_to'].dt.strftime('%Y-%m-%d')
-            viaticos_data.to_json(viaticos_file, orient='records', indent=2)
-        except Exception as e:
-            logger.error(f"❌ Error guardando datos viáticos: {e}")
-    
-    def _save_infracciones_data(self):
-        """Guardar datos de infracciones"""
+
+    def _save_table(self, name: str, records: List[Dict[str, Any]]):
+        """Guardar una tabla normativa en su archivo JSON"""
         try:
-            infracciones_file = self.data_path / "infracciones_table.json"
-            infracciones_data = self.infracciones_df.copy()
-            infracciones_data['valid_from'] = infracciones_data['valid_from'].dt.strftime('%Y-%m-%d')
-            infracciones_data['valid_to'] = infracciones_data['valid_to'].dt.strftime('%Y-%m-%d')
-            infracciones_data.to_json(infracciones_file, orient='records', indent=2)
+            with open(self.data_path / TABLE_FILES[name], 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=2)
         except Exception as e:
-            logger.error(f"❌ Error guardando datos infracciones: {e}")
-    
+            logger.error(f"❌ Error guardando tabla {name}: {e}")
+
     def update_uit_value(self, year: int, value: float, source: str = "Manual"):
         """Actualizar valor UIT"""
         try:
-            # Verificar si existe
-            existing = self.uit_df[self.uit_df['year'] == year]
-            
-            if not existing.empty:
-                self.uit_df.loc[self.uit_df['year'] == year, 'value'] = value
-                self.uit_df.loc[self.uit_df['year'] == year, 'source'] = source
+            existing = [record for record in self.uit_records if record["year"] == year]
+
+            if existing:
+                for record in existing:
+                    record.update(value=value, source=source)
             else:
-                new_row = pd.DataFrame([{"year": year, "value": value, "source": source}])
-                self.uit_df = pd.concat([self.uit_df, new_row], ignore_index=True)
-            
-            self._save_uit_data()
+                self.uit_records.append({"year": year, "value": value, "source": source})
+
+            self._compile_tables()
+            self._save_table("uit", self.uit_records)
             logger.info(f"✅ UIT actualizada: {year} = S/ {value}")
-            
+
         except Exception as e:
             logger.error(f"❌ Error actualizando UIT: {e}")
-    
+
     def get_calculation_summary(self) -> Dict[str, Any]:
         """Resumen del estado del calculador"""
         try:
             return {
                 "status": "operational",
                 "data_loaded": {
-                    "uit_records": len(self.uit_df) if self.uit_df is not None else 0,
-                    "exchange_rate_records": len(self.tipo_cambio_df) if self.tipo_cambio_df is not None else 0,
-                    "viaticos_records": len(self.viaticos_df) if self.viaticos_df is not None else 0,
-                    "infractions_records": len(self.infracciones_df) if self.infracciones_df is not None else 0
+                    "uit_records": len(self.uit_records),
+                    "exchange_rate_records": len(self.tipo_cambio_records),
+                    "viaticos_records": len(self.viaticos_records),
+                    "infractions_records": len(self.infracciones_records)
                 },
                 "available_years": {
-                    "uit": self.uit_df['year'].tolist() if self.uit_df is not None else [],
-                    "viaticos": self.viaticos_df['year'].unique().tolist() if self.viaticos_df is not None else []
+                    "uit": self._uit_years.tolist(),
+                    "viaticos": self._viaticos_years.tolist()
                 },
                 "data_path": str(self.data_path),
                 "last_update": datetime.now().isoformat()
             }
         except Exception as e:
             logger.error(f"❌ Error generando resumen: {e}")
-            return {"status": "error", "error": str(e)}
\ No newline at end of file
+            return {"status": "error", "error": str(e)}
@@ -3,14 +3,27 @@ Procesador de temporalidad legal
 Detecta año de referencia en consultas y aplica normativa vigente
 """
 import re
+import heapq
 import logging
+from bisect import bisect_right
 from datetime import datetime, date
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterable, Optional, List, Tuple, Union
 from dataclasses import dataclass
-import pandas as pd
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Fin abierto para períodos vigentes
+OPEN_END = date.max.toordinal()
+
+# Todo patrón temporal requiere un dígito o alguna de estas palabras
+TEMPORAL_CUES = re.compile(r"\d|pasado|anterior|actual|hoy|vigente|vigor")
+YEAR_PATTERN = re.compile(r"(20\d{2}|19\d{2})")
+YEAR_20_PATTERN = re.compile(r"20\d{2}")
+DIGITS_PATTERN = re.compile(r"\d+")
+YEARS_AGO_PATTERN = re.compile(r"hace\s+(\d+)\s+años?")
+
 @dataclass
 class LegalPeriod:
     """Período legal con normativa específica"""
@@ -29,6 +42,76 @@ class TemporalQuery:
     temporal_context: str  # "historical", "current", "future", "comparative"
     confidence: float
 
+def _ordinal(value: Union[date, datetime, str]) -> int:
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+class LegalPeriodIndex:
+    """
+    Índice de intervalos sobre períodos legales (pueden solaparse)
+    La línea de tiempo se divide en tramos elementales y cada tramo guarda el
+    período aplicable: el primero en orden de carga que lo cubre. Las consultas
+    puntuales usan bisect y las masivas searchsorted, ambas O(log n)
+    """
+    
+    def __init__(self, periods: List[LegalPeriod]):
+        self.periods = list(periods)
+        
+        # Orden por inicio para consultas de rango
+        self._order = sorted(range(len(self.periods)), key=lambda i: self.periods[i].start_date)
+        self._starts = [self.periods[i].start_date.toordinal() for i in self._order]
+        self._ends = np.array([self._end(self.periods[i]) for i in self._order], dtype=np.int64)
+        
+        # Barrido: en cada límite entra/sale un período; gana la menor posición de carga
+        starting: Dict[int, List[int]] = {}
+        for i, period in enumerate(self.periods):
+            starting.setdefault(period.start_date.toordinal(), []).append(i)
+        bounds = sorted(set(starting) | {self._end(p) + 1 for p in self.periods if p.end_date is not None})
+        active: List[Tuple[int, int]] = []
+        winners = []
+        for bound in bounds:
+            for i in starting.get(bound, ()):
+                heapq.heappush(active, (i, self._end(self.periods[i])))
+            while active and active[0][1] < bound:
+                heapq.heappop(active)
+            winners.append(active[0][0] if active else -1)
+        
+        self._bounds = bounds
+        self._bounds_array = np.array(bounds, dtype=np.int64)
+        self._segment_period = np.array(winners, dtype=np.int64)
+        # Sin período aplicable: el de inicio más reciente
+        self._latest = max(range(len(self.periods)), key=lambda i: self.periods[i].start_date) if self.periods else -1
+    
+    @staticmethod
+    def _end(period: LegalPeriod) -> int:
+        return period.end_date.toordinal() if period.end_date else OPEN_END
+    
+    def __len__(self) -> int:
+        return len(self.periods)
+    
+    def lookup(self, target_date: Union[date, str]) -> Optional[LegalPeriod]:
+        """Período aplicable a una fecha"""
+        segment = bisect_right(self._bounds, _ordinal(target_date)) - 1
+        winner = self._segment_period[segment] if segment >= 0 else -1
+        if winner < 0:
+            winner = self._latest
+        return self.periods[winner] if winner >= 0 else None
+    
+    def lookup_many(self, ordinals: np.ndarray) -> np.ndarray:
+        """Posición del período aplicable para cada fecha (ordinales); -1 si no hay períodos"""
+        segments = np.searchsorted(self._bounds_array, ordinals, side="right") - 1
+        winners = np.full(len(ordinals), -1, dtype=np.int64)
+        if len(self._segment_period):
+            winners = np.where(segments >= 0, self._segment_period[np.maximum(segments, 0)], -1)
+        return np.where(winners >= 0, winners, self._latest)
+    
+    def overlapping(self, start: Union[date, str], end: Union[date, str]) -> List[LegalPeriod]:
+        """Períodos vigentes en algún momento de [start, end], por fecha de inicio"""
+        candidates = bisect_right(self._starts, _ordinal(end))
+        hits = np.flatnonzero(self._ends[:candidates] >= _ordinal(start))
+        return [self.periods[self._order[i]] for i in hits]
+
 class TemporalLegalProcessor:
     """
     Procesador de temporalidad legal para consultas con referencias históricas
@@ -61,9 +144,11 @@ class TemporalLegalProcessor:
             (r"(20\d{2})\s+(vs|versus|contra|frente\s+a)\s+(20\d{2})", "comparative"),
             (r"evolución\s+.*(desde|de)\s+(20\d{2})", "comparative")
         ]
+        self._compiled_patterns = [(re.compile(pattern), kind) for pattern, kind in self.temporal_patterns]
         
         # Períodos legales importantes MINEDU
         self.legal_periods = self._load_legal_periods()
+        self.period_index = LegalPeriodIndex(self.legal_periods)
         
         logger.info("📅 TemporalLegalProcessor inicializado")
     
@@ -103,14 +188,15 @@ class TemporalLegalProcessor:
             
             query_lower = query.lower()
             
-            # Buscar patrones temporales
-            for pattern, pattern_type in self.temporal_patterns:
-                matches = re.finditer(pattern, query_lower)
+            # Buscar patrones temporales (solo si hay alguna señal temporal)
+            patterns = self._compiled_patterns if TEMPORAL_CUES.search(query_lower) else []
+            for pattern, pattern_type in patterns:
+                matches = pattern.finditer(query_lower)
                 
                 for match in matches:
                     if pattern_type == "year":
                         # Extraer año
-                        year_match = re.search(r"(20\d{2}|19\d{2})", match.group())
+                        year_match = YEAR_PATTERN.search(match.group())
                         if year_match:
                             detected_year = int(year_match.group())
                             confidence = 0.9
@@ -126,7 +212,7 @@ class TemporalLegalProcessor:
                         # Extraer fecha completa
                         try:
                             if "/" in match.group() or "-" in match.group():
-                                date_parts = re.findall(r"\d+", match.group())
+                                date_parts = DIGITS_PATTERN.findall(match.group())
                                 if len(date_parts) >= 3:
                                     day, month, year = date_parts[0], date_parts[1], date_parts[2]
                                     detected_date = date(int(year), int(month), int(day))
@@ -140,7 +226,7 @@ class TemporalLegalProcessor:
                         temporal_context = "comparative"
                         confidence = 0.8
                         # Intentar extraer años para comparación
-                        years = re.findall(r"20\d{2}", match.group())
+                        years = YEAR_20_PATTERN.findall(match.group())
                         if years:
                             detected_year = int(years[0])  # Primer año encontrado
                     
@@ -153,7 +239,7 @@ class TemporalLegalProcessor:
                         temporal_context = "historical"
                         confidence = 0.6
                         # Intentar inferir año basado en "hace X años"
-                        years_ago_match = re.search(r"hace\s+(\d+)\s+años?", match.group())
+                        years_ago_match = YEARS_AGO_PATTERN.search(match.group())
                         if years_ago_match:
                             years_ago = int(years_ago_match.group(1))
                             detected_year = self.current_year - years_ago
@@ -179,18 +265,23 @@ class TemporalLegalProcessor:
     def get_applicable_regulation(self, target_date: date) -> Optional[LegalPeriod]:
         """Obtener la regulación aplicable para una fecha específica"""
         try:
-            for period in self.legal_periods:
-                if period.start_date <= target_date:
-                    if period.end_date is None or target_date <= period.end_date:
-                        return period
-            
-            # Si no se encuentra período específico, usar el más reciente
-            return max(self.legal_periods, key=lambda p: p.start_date)
+            # Si no se encuentra período específico, el índice usa el más reciente
+            return self.period_index.lookup(target_date)
             
         except Exception as e:
             logger.error(f"❌ Error obteniendo regulación aplicable: {e}")
             return None
     
+    def get_applicable_regulations(self, dates: Iterable[Union[date, str]]) -> List[Optional[LegalPeriod]]:
+        """Regulación aplicable para muchas fechas a la vez (p. ej. todas las comisiones del año)"""
+        ordinals = np.fromiter((_ordinal(value) for value in dates), dtype=np.int64)
+        positions = self.period_index.lookup_many(ordinals)
+        return [self.period_index.periods[i] if i >= 0 else None for i in positions.tolist()]
+    
+    def get_periods_between(self, start: Union[date, str], end: Union[date, str]) -> List[LegalPeriod]:
+        """Períodos legales vigentes en algún momento del rango"""
+        return self.period_index.overlapping(start, end)
+    
     def explain_temporal_differences(
         self, 
         query: str,
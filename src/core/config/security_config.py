@@ -81,6 +81,14 @@ class SecurityConfig:
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     AUDIT_LOG_FILE = LOGS_DIR / "audit.log"
     SECURITY_LOG_FILE = LOGS_DIR / "security.log"
+    AUDIT_PARTITIONS_DIR = LOGS_DIR / "audit_partitions"
+    
+    # Escritura asíncrona por lotes de auditoría (cola acotada + hilo escritor)
+    AUDIT_ASYNC_WRITES = os.getenv('AUDIT_ASYNC_WRITES', 'true').lower() == 'true'
+    AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', '10000'))
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
+    # Segundos tras los que un lock de migración legacy huérfano se considera vencido
+    AUDIT_LEGACY_LOCK_TTL = int(os.getenv('AUDIT_LEGACY_LOCK_TTL', '1800'))
     
     # Rutas de archivos del sistema
     VECTORSTORE_PATH = DATA_DIR / "processed" / "vectorstore_semantic_full_v2.pkl"
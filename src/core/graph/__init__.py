@@ -0,0 +1,12 @@
+"""
+Grafo normativo compartido
+Conceptos, normas y relaciones tipadas en arrays CSR
+"""
+
+from .normative_graph import NormativeGraph, get_normative_graph, set_normative_graph
+
+__all__ = [
+    'NormativeGraph',
+    'get_normative_graph',
+    'set_normative_graph'
+]
@@ -0,0 +1,321 @@
+"""
+Grafo compacto de relaciones normativas
+Conceptos, normas y relaciones tipadas en arrays CSR: vecindarios a k saltos,
+componentes conexas (union-find mantenido al insertar) y caminos mínimos
+ponderados. Se construye una vez a partir de la concordancia normativa y lo
+comparten la memoria semántica, el análisis legal y la visualización.
+"""
+import heapq
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NODE_KINDS = ("concept", "norm")
+
+
+class NormativeGraph:
+    """
+    Grafo dirigido con aristas tipadas y ponderadas
+
+    Las aristas se acumulan en listas (COO) y se compilan a CSR (indptr,
+    indices, tipos, pesos) en la primera consulta posterior a un cambio. El
+    peso es el costo de la arista para caminos mínimos (menor = más cercano).
+    """
+
+    def __init__(self):
+        self.node_ids: Dict[str, int] = {}
+        self.node_names: List[str] = []
+        self.node_kinds: List[str] = []
+        self.node_labels: List[str] = []
+        self.relation_ids: Dict[str, int] = {}
+        self.relation_names: List[str] = []
+
+        self._edges: Dict[Tuple[int, int, int], float] = {}  # (origen, destino, tipo) -> peso
+        self._csr: Optional[Dict[str, np.ndarray]] = None
+        self._parent: List[int] = []
+        self._size: List[int] = []
+        self._components_stale = False
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------ construcción
+
+    def add_node(self, name: str, kind: str = "concept", label: Optional[str] = None) -> int:
+        """Agregar un nodo (idempotente) y devolver su índice"""
+        with self._lock:
+            node = self.node_ids.get(name)
+            if node is not None:
+                if label:
+                    self.node_labels[node] = label
+                return node
+            node = len(self.node_names)
+            self.node_ids[name] = node
+            self.node_names.append(name)
+            self.node_kinds.append(kind)
+            self.node_labels.append(label or name)
+            self._parent.append(node)
+            self._size.append(1)
+            self._csr = None
+            return node
+
+    def add_edge(self, source: str, target: str, relation_type: str, weight: float = 1.0,
+                 directed: bool = True, kind: str = "concept") -> None:
+        """Agregar una relación tipada; los nodos inexistentes se crean con `kind`"""
+        with self._lock:
+            a = self.add_node(source, kind)
+            b = self.add_node(target, kind)
+            relation = self.relation_ids.get(relation_type)
+            if relation is None:
+                relation = self.relation_ids[relation_type] = len(self.relation_names)
+                self.relation_names.append(relation_type)
+            self._edges[(a, b, relation)] = float(weight)
+            if not directed:
+                self._edges[(b, a, relation)] = float(weight)
+            self._union(a, b)
+            self._csr = None
+
+    def remove_edges(self, source: str, relation_type: Optional[str] = None) -> None:
+        """Quitar las aristas salientes de un nodo (de un tipo o todas)"""
+        with self._lock:
+            node = self.node_ids.get(source)
+            relation = self.relation_ids.get(relation_type) if relation_type else None
+            if node is None or (relation_type and relation is None):
+                return
+            self._edges = {key: weight for key, weight in self._edges.items()
+                           if not (key[0] == node and (relation is None or key[2] == relation))}
+            # Union-find no admite borrados: se recalcula en la próxima consulta
+            self._components_stale = True
+            self._csr = None
+
+    def _compiled(self) -> Dict[str, np.ndarray]:
+        csr = self._csr
+        if csr is not None:
+            return csr
+        with self._lock:
+            if self._csr is None:
+                keys = list(self._edges)
+                sources = np.fromiter((key[0] for key in keys), dtype=np.int64, count=len(keys))
+                # Orden estable: las aristas de cada nodo conservan el orden de inserción
+                order = np.argsort(sources, kind="stable")
+                indptr = np.zeros(len(self.node_names) + 1, dtype=np.int64)
+                np.cumsum(np.bincount(sources, minlength=len(self.node_names)), out=indptr[1:])
+                self._csr = {
+                    "indptr": indptr,
+                    "indices": np.fromiter((key[1] for key in keys), dtype=np.int32, count=len(keys))[order],
+                    "types": np.fromiter((key[2] for key in keys), dtype=np.int16, count=len(keys))[order],
+                    "weights": np.fromiter(self._edges.values(), dtype=np.float64, count=len(keys))[order],
+                }
+            return self._csr
+
+    # ------------------------------------------------------------ union-find
+
+    def _find(self, node: int) -> int:
+        parent = self._parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:  # compresión de caminos
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+
+    def _refresh_components(self) -> None:
+        if not self._components_stale:
+            return
+        self._parent = list(range(len(self.node_names)))
+        self._size = [1] * len(self.node_names)
+        for a, b, _ in self._edges:
+            self._union(a, b)
+        self._components_stale = False
+
+    def component(self, name: str) -> Set[str]:
+        """Componente conexa (sin dirección) de un nodo"""
+        with self._lock:
+            node = self.node_ids.get(name)
+            if node is None:
+                return set()
+            self._refresh_components()
+            root = self._find(node)
+            return {self.node_names[i] for i in range(len(self.node_names)) if self._find(i) == root}
+
+    def components(self, min_size: int = 1, kind: Optional[str] = None) -> List[Set[str]]:
+        """Componentes conexas de al menos `min_size` nodos (opcionalmente de un tipo), mayores primero"""
+        with self._lock:
+            self._refresh_components()
+            groups: Dict[int, Set[str]] = {}
+            for node, name in enumerate(self.node_names):
+                if kind is None or self.node_kinds[node] == kind:
+                    groups.setdefault(self._find(node), set()).add(name)
+        return sorted((group for group in groups.values() if len(group) >= min_size), key=len, reverse=True)
+
+    def connected(self, a: str, b: str) -> bool:
+        with self._lock:
+            if a not in self.node_ids or b not in self.node_ids:
+                return False
+            self._refresh_components()
+            return self._find(self.node_ids[a]) == self._find(self.node_ids[b])
+
+    # ------------------------------------------------------------ consultas
+
+    def _type_mask(self, relation_types: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if relation_types is None:
+            return None
+        mask = np.zeros(max(len(self.relation_names), 1), dtype=bool)
+        for relation_type in relation_types:
+            if relation_type in self.relation_ids:
+                mask[self.relation_ids[relation_type]] = True
+        return mask
+
+    @staticmethod
+    def _edge_ranges(indptr: np.ndarray, frontier: np.ndarray) -> np.ndarray:
+        """Índices de todas las aristas salientes de la frontera"""
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+    def neighbors(self, name: str, relation_types: Optional[Iterable[str]] = None) -> List[Tuple[str, str, float]]:
+        """Vecinos directos: (nodo, tipo de relación, peso)"""
+        node = self.node_ids.get(name)
+        if node is None:
+            return []
+        csr = self._compiled()
+        edges = np.arange(csr["indptr"][node], csr["indptr"][node + 1])
+        mask = self._type_mask(relation_types)
+        if mask is not None:
+            edges = edges[mask[csr["types"][edges]]]
+        return [(self.node_names[target], self.relation_names[relation], weight)
+                for target, relation, weight in zip(csr["indices"][edges].tolist(),
+                                                    csr["types"][edges].tolist(),
+                                                    csr["weights"][edges].tolist())]
+
+    def k_hop(self, name: str, k: int = 2, relation_types: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None, kind: Optional[str] = None) -> Dict[str, int]:
+        """Nodos alcanzables en a lo sumo k saltos -> distancia (en orden BFS, sin el origen)"""
+        start = self.node_ids.get(name)
+        if start is None or k <= 0:
+            return {}
+        csr = self._compiled()
+        mask = self._type_mask(relation_types)
+        visited = np.zeros(len(self.node_names), dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        found: Dict[str, int] = {}
+
+        for depth in range(1, k + 1):
+            edges = self._edge_ranges(csr["indptr"], frontier)
+            if mask is not None:
+                edges = edges[mask[csr["types"][edges]]]
+            targets = csr["indices"][edges]
+            targets = targets[~visited[targets]]
+            if not targets.size:
+                break
+            _, first = np.unique(targets, return_index=True)
+            targets = targets[np.sort(first)].astype(np.int64)
+            visited[targets] = True
+            for target in targets.tolist():
+                if kind is None or self.node_kinds[target] == kind:
+                    found[self.node_names[target]] = depth
+                    if limit and len(found) >= limit:
+                        return found
+            frontier = targets
+        return found
+
+    def shortest_path(self, source: str, target: str,
+                      relation_types: Optional[Iterable[str]] = None) -> Tuple[List[str], float]:
+        """Camino de menor costo (Dijkstra); ([], inf) si no hay camino"""
+        start, goal = self.node_ids.get(source), self.node_ids.get(target)
+        if start is None or goal is None:
+            return [], float("inf")
+        csr = self._compiled()
+        mask = self._type_mask(relation_types)
+        indptr, indices, types, weights = csr["indptr"], csr["indices"], csr["types"], csr["weights"]
+
+        distances = {start: 0.0}
+        previous: Dict[int, int] = {}
+        heap = [(0.0, start)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node == goal:
+                break
+            if distance > distances.get(node, float("inf")):
+                continue
+            begin, end = int(indptr[node]), int(indptr[node + 1])
+            for neighbor, relation, weight in zip(indices[begin:end].tolist(), types[begin:end].tolist(),
+                                                  weights[begin:end].tolist()):
+                if mask is not None and not mask[relation]:
+                    continue
+                candidate = distance + weight
+                if candidate < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+
+        if goal not in distances:
+            return [], float("inf")
+        path = [goal]
+        while path[-1] != start:
+            path.append(previous[path[-1]])
+        return [self.node_names[node] for node in reversed(path)], distances[goal]
+
+    def degrees(self) -> np.ndarray:
+        """Grado de salida por nodo"""
+        return np.diff(self._compiled()["indptr"])
+
+    def edges(self, nodes: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str, float]]:
+        """Aristas (origen, destino, tipo, peso), opcionalmente del subgrafo inducido por `nodes`"""
+        csr = self._compiled()
+        sources = np.repeat(np.arange(len(self.node_names)), np.diff(csr["indptr"]))
+        keep = np.ones(len(sources), dtype=bool)
+        if nodes is not None:
+            selected = np.zeros(len(self.node_names), dtype=bool)
+            selected[[self.node_ids[name] for name in nodes if name in self.node_ids]] = True
+            keep = selected[sources] & selected[csr["indices"]]
+        return [(self.node_names[a], self.node_names[b], self.relation_names[t], w)
+                for a, b, t, w in zip(sources[keep].tolist(), csr["indices"][keep].tolist(),
+                                      csr["types"][keep].tolist(), csr["weights"][keep].tolist())]
+
+    def get_stats(self) -> Dict[str, Any]:
+        csr = self._compiled()
+        return {
+            "nodes": len(self.node_names),
+            "edges": len(self._edges),
+            "nodes_by_kind": {kind: self.node_kinds.count(kind) for kind in NODE_KINDS},
+            "relation_types": list(self.relation_names),
+            "components": len(self.components()),
+            "csr_bytes": int(sum(array.nbytes for array in csr.values())),
+        }
+
+
+# Grafo compartido por memoria semántica, análisis legal y visualización
+_shared_graph: Optional[NormativeGraph] = None
+_shared_lock = threading.Lock()
+
+
+def get_normative_graph() -> NormativeGraph:
+    """Grafo normativo compartido (vacío hasta que se construye desde la concordancia)"""
+    global _shared_graph
+    if _shared_graph is None:
+        with _shared_lock:
+            if _shared_graph is None:
+                _shared_graph = NormativeGraph()
+    return _shared_graph
+
+
+def set_normative_graph(graph: NormativeGraph) -> None:
+    global _shared_graph
+    with _shared_lock:
+        _shared_graph = graph
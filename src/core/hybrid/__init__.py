@@ -6,5 +6,7 @@ BM25, TF-IDF, and Transformer-based search for optimal results.
 """
 
 from .hybrid_search import HybridSearch
+from .index_generations import IndexGenerationManager
+from .metadata_index import FilterError, MetadataIndex
 
-__all__ = ['HybridSearch'] 
\ No newline at end of file
+__all__ = ['HybridSearch', 'IndexGenerationManager', 'MetadataIndex', 'FilterError'] 
\ No newline at end of file
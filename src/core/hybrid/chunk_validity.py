@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Validity intervals of indexed chunks
+Each chunk's validity is compiled once into two day-ordinal arrays (start, end),
+so checking candidates against a query date is one vectorized comparison
+instead of a Python check per chunk. The start comes from valid_from (or
+publication_date) and the end from valid_to; missing bounds are open.
+validity_status is not used: a repealed norm still applied on past dates.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, Tuple, Union
+
+import numpy as np
+
+UNBOUNDED_START = date.min.toordinal()
+UNBOUNDED_END = date.max.toordinal()
+
+START_FIELDS = ("valid_from", "publication_date")
+END_FIELDS = ("valid_to",)
+
+DateLike = Union[date, str]
+
+
+def chunk_metadata(chunk: Any) -> Dict[str, Any]:
+    """Chunk fields plus its 'metadatos' (loaders write them at either level)"""
+    if not isinstance(chunk, dict):
+        return {}
+    metadata = chunk.get('metadatos')
+    return {**metadata, **chunk} if isinstance(metadata, dict) else chunk
+
+
+def to_ordinal(value: DateLike) -> int:
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def _field_ordinal(metadata: Dict[str, Any], fields: tuple, default: int) -> int:
+    for field in fields:
+        value = metadata.get(field)
+        if value:
+            try:
+                return to_ordinal(value)
+            except ValueError:
+                continue
+    return default
+
+
+def validity_bounds(metadata: Dict[str, Any]) -> Tuple[int, int]:
+    """(start, end) day ordinals of a chunk; open bounds when missing"""
+    return (_field_ordinal(metadata, START_FIELDS, UNBOUNDED_START),
+            _field_ordinal(metadata, END_FIELDS, UNBOUNDED_END))
+
+
+class ChunkValidity:
+    """Per-chunk validity intervals as aligned ordinal arrays"""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Any]) -> "ChunkValidity":
+        bounds = [validity_bounds(chunk_metadata(chunk)) for chunk in chunks]
+        return cls(np.array([start for start, _ in bounds], dtype=np.int64),
+                   np.array([end for _, end in bounds], dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def bounded(self) -> bool:
+        """False when no chunk carries validity dates (every check passes)"""
+        return bool((self.starts != UNBOUNDED_START).any() or (self.ends != UNBOUNDED_END).any())
+
+    def mask(self, at: DateLike) -> np.ndarray:
+        """Boolean mask of chunks in force at the given date"""
+        day = to_ordinal(at)
+        return (self.starts <= day) & (day <= self.ends)
+
+    def is_valid(self, ids: np.ndarray, at: DateLike) -> np.ndarray:
+        """Validity of candidate chunk ids; ids outside the index count as valid"""
+        ids = np.asarray(ids, dtype=np.int64)
+        known = (ids >= 0) & (ids < len(self.starts))
+        safe = np.where(known, ids, 0)
+        day = to_ordinal(at)
+        if not len(self.starts):
+            return ~known
+        return ~known | ((self.starts[safe] <= day) & (day <= self.ends[safe]))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'chunks': len(self),
+            'with_start': int((self.starts != UNBOUNDED_START).sum()),
+            'with_end': int((self.ends != UNBOUNDED_END).sum()),
+        }
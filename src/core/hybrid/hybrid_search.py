@@ -10,12 +10,19 @@ methods (BM25, TF-IDF, and Transformers) for optimal document search results.
 import re
 import time
 import logging
-from typing import List, Dict, Any, Optional
+from datetime import date
+from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 
+import numpy as np
+
 from ..retrieval.bm25_retriever import BM25Retriever
 from ..retrieval.tfidf_retriever import TFIDFRetriever
 from ..retrieval.transformer_retriever import TransformerRetriever
+from ..cache.semantic_cache import SemanticCache, index_generation
+from ..retrieval.index_snapshot import resolve_index_path
+from .chunk_validity import ChunkValidity
+from .metadata_index import MetadataFilter, MetadataIndex, filter_key
 
 
 class HybridSearch:
@@ -34,10 +41,15 @@ class HybridSearch:
         bm25_retriever (BM25Retriever): BM25-based retriever
         tfidf_retriever (TFIDFRetriever): TF-IDF-based retriever
         transformer_retriever (TransformerRetriever): Transformer-based retriever
+        semantic_cache (Optional[SemanticCache]): Cache of results for paraphrased queries
+        index_generation (str): Fingerprint of the loaded vectorstores
         logger (logging.Logger): Logger instance for debugging
     """
     AMOUNT_KEYWORDS = ["monto", "máximo", "cantidad", "valor", "importe", "viático"]
     MINISTER_KEYWORDS = ["ministro", "ministros", "ministro de estado", "funcionario de nivel", "alto funcionario"]
+    # Extra candidates per retriever when results are boosted by validity
+    VALIDITY_OVERFETCH = 4
+    VALIDITY_BOOST = 0.3
     
     def __init__(
         self,
@@ -101,7 +113,88 @@ class HybridSearch:
         if available_retrievers == 0:
             raise ValueError("No retrievers could be initialized")
         
+        # Fingerprint what was actually loaded (a snapshot directory takes precedence over the pickle)
+        self.index_generation = index_generation([
+            resolve_index_path(path)
+            for path in (bm25_vectorstore_path, tfidf_vectorstore_path, transformer_vectorstore_path)
+        ])
+        self.semantic_cache: Optional[SemanticCache] = None
+        self._metadata_index: Optional[MetadataIndex] = None
+        
         self.logger.info(f"Hybrid search system initialized with {available_retrievers} retrievers")
+    
+    def enable_semantic_cache(self, **cache_options) -> bool:
+        """
+        Enable the semantic cache, reusing the transformer model for query embeddings.
+        
+        Args:
+            **cache_options: SemanticCache options (similarity_threshold, max_entries, ttl_seconds)
+            
+        Returns:
+            bool: True if the cache was enabled
+        """
+        if not self.transformer_retriever or not self.transformer_retriever.model:
+            self.logger.warning("Semantic cache requires the transformer retriever")
+            return False
+        model = self.transformer_retriever.model
+        self.semantic_cache = SemanticCache(
+            lambda query: model.encode([query], show_progress_bar=False)[0],
+            **cache_options
+        )
+        self.logger.info(f"Semantic cache enabled: {self.semantic_cache.get_stats()}")
+        return True
+
+    @property
+    def metadata_index(self) -> MetadataIndex:
+        """
+        Metadata and validity indexes of the indexed chunks (compiled on first use)
+        
+        Raises:
+            ValueError: If the retrievers were built from different chunk lists,
+                since chunk ids would not mean the same chunk in each of them
+        """
+        if self._metadata_index is None:
+            retrievers = [retriever for retriever in
+                          (self.bm25_retriever, self.tfidf_retriever, self.transformer_retriever)
+                          if retriever is not None]
+            sizes = {type(retriever).__name__: len(retriever.chunks) for retriever in retrievers}
+            if len(set(sizes.values())) > 1:
+                raise ValueError(f"Retrievers index different chunk lists, cannot filter by chunk id: {sizes}")
+            self._metadata_index = MetadataIndex.from_chunks(retrievers[0].chunks)
+            self.logger.info(f"Metadata index built: {self._metadata_index.get_stats()}")
+        return self._metadata_index
+
+    @property
+    def chunk_validity(self) -> ChunkValidity:
+        """Validity intervals of the indexed chunks"""
+        return self.metadata_index.validity
+
+    def _allowed_ids(self, metadata_filter: Optional[MetadataFilter], valid_at: Optional[Union[date, str]],
+                     validity_mode: str) -> Optional[np.ndarray]:
+        """Chunk ids the retrievers may score; None when nothing is excluded"""
+        mask = None
+        if metadata_filter:
+            mask = self.metadata_index.mask(metadata_filter)
+        if valid_at and validity_mode == 'filter' and self.chunk_validity.bounded:
+            in_force = self.chunk_validity.mask(valid_at)
+            mask = in_force if mask is None else mask & in_force
+        if mask is None or mask.all():
+            return None
+        return np.flatnonzero(mask)
+
+    def _apply_validity(self, results: List[Dict[str, Any]], valid_at: Union[date, str]) -> List[Dict[str, Any]]:
+        """Boost results in force at a date"""
+        validity = self.chunk_validity
+        if not results or not validity.bounded:
+            return results
+        ids = np.array([result.get('index', -1) for result in results], dtype=np.int64)
+        in_force = validity.is_valid(ids, valid_at)
+        for result, boost in zip(results, in_force):
+            if boost:
+                result['score'] += self.VALIDITY_BOOST
+                result['hybrid_score'] = result['score']
+        results.sort(key=lambda x: x['score'], reverse=True)
+        return results
 
     def _contains_numbers(self, text: str) -> bool:
         """
@@ -131,7 +224,10 @@ class HybridSearch:
         self, 
         query: str, 
         top_k: int = 5,
-        use_methods: Optional[List[str]] = None
+        use_methods: Optional[List[str]] = None,
+        valid_at: Optional[Union[date, str]] = None,
+        validity_mode: str = 'filter',
+        metadata_filter: Optional[MetadataFilter] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid search using multiple retrieval methods.
@@ -140,6 +236,12 @@ class HybridSearch:
             query (str): Search query string
             top_k (int): Number of top results to return
             use_methods (Optional[List[str]]): List of methods to use ('bm25', 'tfidf', 'transformer')
+            valid_at (Optional[Union[date, str]]): Only chunks in force at this date ('filter')
+                or ranked first ('boost')
+            validity_mode (str): 'filter' or 'boost'
+            metadata_filter (Optional[MetadataFilter]): Expression such as
+                "norm_type=directiva AND vigente AND date<=2023-12-31" or a dict
+                {field: value}; only matching chunks are scored
             
         Returns:
             List[Dict[str, Any]]: Combined search results with scores and metadata
@@ -156,13 +258,36 @@ class HybridSearch:
         # Determine which methods to use
         if use_methods is None:
             use_methods = ['bm25', 'tfidf', 'transformer']
+        if validity_mode not in ('filter', 'boost'):
+            raise ValueError("validity_mode must be 'filter' or 'boost'")
+        boost = bool(valid_at) and validity_mode == 'boost'
+        fetch_k = top_k * self.VALIDITY_OVERFETCH if boost else top_k
+        
+        # Filters are pushed down: retrievers only score the allowed chunk ids
+        doc_ids = self._allowed_ids(metadata_filter, valid_at, validity_mode)
+        if doc_ids is not None and not len(doc_ids):
+            self.logger.info("No chunks match the metadata filter")
+            return []
+        
+        # Paraphrased queries are answered from the semantic cache
+        query_embedding = None
+        if self.semantic_cache:
+            namespace = f"{self.fusion_strategy}:{top_k}:{','.join(sorted(use_methods))}"
+            if valid_at:
+                namespace += f":{validity_mode}@{valid_at}"
+            if metadata_filter:
+                namespace += f":where {filter_key(metadata_filter)}"
+            cached, query_embedding = self.semantic_cache.lookup(query, namespace, self.index_generation)
+            if cached is not None:
+                self.logger.info(f"Semantic cache hit in {time.time() - start_time:.4f}s")
+                return cached
         
         # Collect results from each method
         all_results = []
         
         if 'bm25' in use_methods and self.bm25_retriever:
             try:
-                bm25_results = self.bm25_retriever.search(query, top_k=top_k)
+                bm25_results = self.bm25_retriever.search(query, top_k=fetch_k, doc_ids=doc_ids)
                 all_results.extend(bm25_results)
                 self.logger.info(f"BM25 returned {len(bm25_results)} results")
             except Exception as e:
@@ -170,7 +295,7 @@ class HybridSearch:
         
         if 'tfidf' in use_methods and self.tfidf_retriever:
             try:
-                tfidf_results = self.tfidf_retriever.search(query, top_k=top_k)
+                tfidf_results = self.tfidf_retriever.search(query, top_k=fetch_k, doc_ids=doc_ids)
                 all_results.extend(tfidf_results)
                 self.logger.info(f"TF-IDF returned {len(tfidf_results)} results")
             except Exception as e:
@@ -178,7 +303,9 @@ class HybridSearch:
         
         if 'transformer' in use_methods and self.transformer_retriever:
             try:
-                transformer_results = self.transformer_retriever.search(query, top_k=top_k)
+                transformer_results = self.transformer_retriever.search(
+                    query, top_k=fetch_k, query_embedding=query_embedding, doc_ids=doc_ids
+                )
                 all_results.extend(transformer_results)
                 self.logger.info(f"Transformer returned {len(transformer_results)} results")
             except Exception as e:
@@ -186,11 +313,15 @@ class HybridSearch:
         
         # Combine results using the specified fusion strategy
         if self.fusion_strategy == 'weighted':
-            final_results = self._weighted_fusion(query, all_results, top_k)
+            final_results = self._weighted_fusion(query, all_results, fetch_k)
         elif self.fusion_strategy == 'rank_fusion':
-            final_results = self._rank_fusion(all_results, top_k)
+            final_results = self._rank_fusion(all_results, fetch_k)
         else:  # simple
-            final_results = self._simple_fusion(all_results, top_k)
+            final_results = self._simple_fusion(all_results, fetch_k)
+        
+        if boost:
+            final_results = self._apply_validity(final_results, valid_at)
+        final_results = final_results[:top_k]
         
         elapsed_time = time.time() - start_time
         self.logger.info(
@@ -198,6 +329,9 @@ class HybridSearch:
             f"returning {len(final_results)} results"
         )
         
+        if self.semantic_cache and final_results:
+            self.semantic_cache.put(query, final_results, namespace, self.index_generation, query_embedding)
+        
         return final_results
     
 
@@ -371,6 +505,9 @@ class HybridSearch:
         """
         return {
             'fusion_strategy': self.fusion_strategy,
+            'index_generation': self.index_generation,
+            'semantic_cache': self.semantic_cache.get_stats() if self.semantic_cache else None,
+            'metadata_index': self._metadata_index.get_stats() if self._metadata_index else None,
             'available_methods': {
                 'bm25': self.bm25_retriever is not None,
                 'tfidf': self.tfidf_retriever is not None,
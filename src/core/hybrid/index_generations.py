@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Zero-downtime index generations for hybrid search
+A generation is a directory with the BM25, TF-IDF and transformer vectorstores
+(pickles or snapshots). A new generation is loaded in the background, validated
+with smoke queries and swapped in atomically; in-flight queries finish on the
+generation they acquired, and a retired generation is released (its memory
+mappings dropped) when its last query completes.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+VECTORSTORE_FILES = {"bm25": "bm25.pkl", "tfidf": "tfidf.pkl", "transformer": "transformers.pkl"}
+
+# File with the path of the active generation, shared by every worker
+POINTER_FILE = "CURRENT"
+
+PathLike = Union[str, Path]
+
+
+def generation_paths(directory: PathLike) -> Dict[str, str]:
+    """Vectorstore paths of a generation directory (snapshots preferred over pickles)"""
+    from ..retrieval.index_snapshot import resolve_index_path
+    directory = Path(directory)
+    return {kind: str(resolve_index_path(directory / name)) for kind, name in VECTORSTORE_FILES.items()}
+
+
+def load_smoke_queries(evaluation_dir: PathLike, files: tuple = ("test_queries_basic.json",),
+                       per_category: int = 2) -> List[str]:
+    """First queries of each category of the evaluation sets"""
+    queries: List[str] = []
+    for name in files:
+        try:
+            with open(Path(evaluation_dir) / name, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Smoke queries not available ({name}): {e}")
+            continue
+        categories = data.values() if isinstance(data, dict) else [data]
+        for category in categories:
+            if isinstance(category, list):
+                queries.extend(query for query in category[:per_category] if isinstance(query, str))
+    return queries
+
+
+class IndexGeneration:
+    """A loaded searcher plus its in-flight query count"""
+
+    def __init__(self, generation_id: str, source: Path, searcher: Any):
+        self.id = generation_id
+        self.source = source
+        self.searcher = searcher
+        self.loaded_at = time.time()
+        self.active = 0
+        self.retired = False
+        self.validation: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "source": str(self.source),
+            "loaded_at": self.loaded_at,
+            "active_queries": self.active,
+            "retired": self.retired,
+            "validation": self.validation,
+        }
+
+
+class IndexGenerationManager:
+    """
+    Atomic reference to the active index generation
+
+    Attributes:
+        loader: builds a searcher (HybridSearch) from a generation directory
+        smoke_queries: queries every new generation must answer before the swap
+        min_hit_rate: fraction of smoke queries that must return results
+        pointer_file: optional CURRENT file; workers follow it every poll_interval seconds
+    """
+
+    def __init__(self, loader: Callable[[Path], Any], smoke_queries: List[str], min_hit_rate: float = 0.8,
+                 pointer_file: Optional[PathLike] = None, poll_interval: float = 30.0):
+        self.loader = loader
+        self.smoke_queries = smoke_queries
+        self.min_hit_rate = min_hit_rate
+        self.pointer_file = Path(pointer_file) if pointer_file else None
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        # Held for the whole load/validate/activate cycle, by threaded and blocking swaps alike
+        self._swap_lock = threading.Lock()
+        self._current: Optional[IndexGeneration] = None
+        self._retired: List[IndexGeneration] = []
+        self._swap_thread: Optional[threading.Thread] = None
+        self._last_poll = 0.0
+        self._failed_source: Optional[Path] = None
+
+        self.state = "idle"
+        self.history: deque = deque(maxlen=20)
+        self.stats = {"swaps": 0, "failed_swaps": 0, "released": 0}
+
+    @property
+    def current(self) -> Optional[IndexGeneration]:
+        return self._current
+
+    @property
+    def generation_id(self) -> Optional[str]:
+        current = self._current
+        return current.id if current else None
+
+    @property
+    def swapping(self) -> bool:
+        return self._swap_lock.locked()
+
+    # ------------------------------------------------------------ queries
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Searcher of the active generation, pinned until the block exits"""
+        self._follow_pointer()
+        with self._lock:
+            generation = self._current
+            if generation is None:
+                raise RuntimeError("No index generation loaded")
+            generation.active += 1
+        try:
+            yield generation.searcher
+        finally:
+            with self._lock:
+                generation.active -= 1
+                self._release_if_idle(generation)
+
+    def search(self, query: str, *args, **kwargs) -> List[Dict[str, Any]]:
+        with self.acquire() as searcher:
+            return searcher.search(query, *args, **kwargs)
+
+    # ------------------------------------------------------------ swaps
+
+    def validate(self, generation: IndexGeneration) -> Dict[str, Any]:
+        """Run the smoke queries; the new generation may not lose retrievers.
+        Fails closed: without smoke queries nothing proves the generation works"""
+        started = time.perf_counter()
+        hits, errors = 0, []
+        for query in self.smoke_queries:
+            try:
+                if generation.searcher.search(query, top_k=3):
+                    hits += 1
+            except Exception as e:
+                errors.append(f"{query[:40]}: {e}")
+
+        hit_rate = hits / len(self.smoke_queries) if self.smoke_queries else 0.0
+        if not self.smoke_queries:
+            errors.append("no smoke queries configured")
+        retrievers = _retriever_count(generation.searcher)
+        current = self._current
+        required = _retriever_count(current.searcher) if current else 0
+        return {
+            "passed": not errors and hit_rate >= self.min_hit_rate and retrievers >= required,
+            "queries": len(self.smoke_queries),
+            "hit_rate": round(hit_rate, 3),
+            "errors": errors[:5],
+            "retrievers": retrievers,
+            "required_retrievers": required,
+            "time_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def swap(self, source: PathLike) -> Dict[str, Any]:
+        """Load, validate and activate a generation (blocking; see start_swap).
+        Returns status 'busy' without doing anything if another swap is running"""
+        if not self._swap_lock.acquire(blocking=False):
+            return {"source": str(Path(source).resolve()), "status": "busy"}
+        return self._swap_locked(source)
+
+    def _swap_locked(self, source: PathLike) -> Dict[str, Any]:
+        """Swap body; the caller holds _swap_lock, released here"""
+        source = Path(source).resolve()
+        report: Dict[str, Any] = {"source": str(source), "started_at": time.time()}
+        try:
+            self.state = "loading"
+            searcher = self.loader(source)
+            generation = IndexGeneration(getattr(searcher, "index_generation", None) or source.name, source, searcher)
+            report["generation_id"] = generation.id
+
+            if generation.id == self.generation_id:
+                report["status"] = "unchanged"
+                return report
+
+            self.state = "validating"
+            generation.validation = report["validation"] = self.validate(generation)
+            if not generation.validation["passed"]:
+                if self._current is not None:
+                    raise ValueError(f"smoke validation failed: {generation.validation}")
+                logger.warning("⚠️ First index generation failed validation; activating it anyway")
+
+            with self._lock:
+                previous, self._current = self._current, generation
+                if previous:
+                    previous.retired = True
+                    self._retired.append(previous)
+                    self._release_if_idle(previous)
+            self.stats["swaps"] += 1
+            self._failed_source = None
+            report.update(status="swapped", previous_id=previous.id if previous else None)
+            logger.info(f"🔄 Index generation {generation.id} active (previous: {report['previous_id']})")
+        except Exception as e:
+            self.stats["failed_swaps"] += 1
+            self._failed_source = source
+            report.update(status="failed", error=str(e))
+            logger.error(f"❌ Index generation swap from {source} failed: {e}")
+        finally:
+            self.state = "idle"
+            report["time_ms"] = round((time.time() - report["started_at"]) * 1000, 1)
+            self.history.appendleft(report)
+            self._swap_lock.release()
+        return report
+
+    def start_swap(self, source: PathLike) -> bool:
+        """Swap in a background thread; False if a swap is already running"""
+        if not self._swap_lock.acquire(blocking=False):
+            return False
+        self._swap_thread = threading.Thread(target=self._swap_locked, args=(source,),
+                                             name="index-generation-swap", daemon=True)
+        self._swap_thread.start()
+        return True
+
+    def publish(self, source: PathLike) -> bool:
+        """Point every worker to a new generation and start the local swap"""
+        self.publish_pointer(source)
+        return self.start_swap(source)
+
+    def publish_pointer(self, source: PathLike) -> None:
+        """Atomically rewrite the pointer file (other workers follow it on their next poll)"""
+        if not self.pointer_file:
+            return
+        temp = self.pointer_file.with_name(f"{self.pointer_file.name}.tmp-{os.getpid()}")
+        temp.write_text(str(Path(source).resolve()), encoding="utf-8")
+        os.replace(temp, self.pointer_file)
+
+    def pointer_target(self) -> Optional[Path]:
+        """Generation directory named by the pointer file, if any"""
+        if not self.pointer_file:
+            return None
+        try:
+            target = self.pointer_file.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return Path(target).resolve() if target else None
+
+    def _follow_pointer(self) -> None:
+        """Start a swap when another worker published a new generation"""
+        if not self.pointer_file or time.monotonic() - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = time.monotonic()
+        target = self.pointer_target()
+        current = self._current
+        if target and current and target != current.source and target != self._failed_source and not self.swapping:
+            self.start_swap(target)
+
+    def _release_if_idle(self, generation: IndexGeneration) -> None:
+        """Drop a retired generation once no query uses it (lock held)"""
+        if generation.retired and generation.active == 0 and generation in self._retired:
+            self._retired.remove(generation)
+            # Memory-mapped segments are unmapped when the last reference goes
+            generation.searcher = None
+            self.stats["released"] += 1
+            logger.info(f"🧹 Index generation {generation.id} released")
+
+    def status(self) -> Dict[str, Any]:
+        current = self._current
+        return {
+            "current": current.to_dict() if current else None,
+            "retired": [generation.to_dict() for generation in self._retired],
+            "state": self.state,
+            "swapping": self.swapping,
+            "pointer_target": str(self.pointer_target()) if self.pointer_file else None,
+            "smoke_queries": len(self.smoke_queries),
+            "history": list(self.history),
+            **self.stats,
+        }
+
+
+def _retriever_count(searcher: Any) -> int:
+    return sum(getattr(searcher, name, None) is not None
+               for name in ("bm25_retriever", "tfidf_retriever", "transformer_retriever"))
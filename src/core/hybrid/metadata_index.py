@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Metadata indexes and filter expressions for hybrid search
+Chunk metadata is indexed once per generation: categorical fields as sorted
+chunk-id arrays per value, dates as (ordinal, id) arrays sorted by date. A
+filter such as
+
+    norm_type=directiva AND vigente AND date<=2023-12-31
+
+is parsed once and evaluated into a boolean bitmap over chunk ids with array
+operations, so the retrievers only score the allowed ids.
+
+Grammar: predicates joined with AND / OR / NOT and parentheses. A predicate is
+field=value, field!=value, a date comparison (<, <=, >, >=, =) or the keyword
+'vigente' (in force today and not repealed). Values are case-insensitive and
+may be quoted. Dict filters ({field: value or [values]}) are also accepted.
+"""
+
+from collections import OrderedDict
+from datetime import date
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .chunk_validity import ChunkValidity, chunk_metadata, to_ordinal, validity_bounds
+
+CATEGORICAL_FIELDS = ("norm_type", "validity_status", "tags", "source", "type", "section",
+                      "document_id", "norm_number", "numeral")
+DATE_FIELDS = ("publication_date", "valid_from", "valid_to")
+FIELD_ALIASES = {"date": "publication_date", "status": "validity_status", "tag": "tags"}
+REPEALED_STATUSES = ("derogada",)
+
+# Evaluated bitmaps kept per index (keyed by normalized expression)
+MASK_CACHE_SIZE = 64
+
+MetadataFilter = Union[str, Dict[str, Any]]
+
+_TOKEN = re.compile(r"""\s*(?:(?P<paren>[()])|(?P<op><=|>=|!=|=|<|>)|"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<word>[^\s()<>=!"']+))""")
+_KEYWORDS = {"and", "or", "not"}
+
+
+class FilterError(ValueError):
+    """Invalid filter expression"""
+
+
+def _normalize(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+# ------------------------------------------------------------ parsing
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise FilterError(f"Unexpected character in filter at {position}: {expression[position:]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "word" and value.lower() in _KEYWORDS:
+            tokens.append(("keyword", value.lower()))
+        else:
+            tokens.append(("value" if kind in ("dq", "sq", "word") else kind, value))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser: or_expr := and_expr (OR and_expr)*, and so on"""
+
+    def __init__(self, expression: str):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise FilterError("Empty filter expression")
+        node = self._or()
+        if self.position < len(self.tokens):
+            raise FilterError(f"Unexpected token in filter: {self.tokens[self.position][1]!r}")
+        return node
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self, kind: str, value: Optional[str] = None) -> Optional[str]:
+        token = self._peek()
+        if token and token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return token[1]
+        return None
+
+    def _or(self) -> tuple:
+        node = self._and()
+        while self._take("keyword", "or"):
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self) -> tuple:
+        node = self._not()
+        while self._take("keyword", "and"):
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self) -> tuple:
+        if self._take("keyword", "not"):
+            return ("not", self._not())
+        if self._take("paren", "("):
+            node = self._or()
+            if not self._take("paren", ")"):
+                raise FilterError("Missing closing parenthesis in filter")
+            return node
+        return self._predicate()
+
+    def _predicate(self) -> tuple:
+        field = self._take("value")
+        if field is None:
+            raise FilterError(f"Expected a predicate, got {self._peek()[1] if self._peek() else 'end of filter'!r}")
+        op = self._take("op")
+        if op is None:
+            if field.lower() == "vigente":
+                return ("vigente",)
+            raise FilterError(f"Expected an operator after {field!r}")
+        value = self._take("value")
+        if value is None:
+            raise FilterError(f"Expected a value after {field}{op}")
+        return ("cmp", FIELD_ALIASES.get(field.lower(), field.lower()), op, value)
+
+
+def parse_filter(metadata_filter: MetadataFilter) -> tuple:
+    """Filter expression or dict -> expression tree"""
+    if isinstance(metadata_filter, dict):
+        node = None
+        for field, values in metadata_filter.items():
+            field = FIELD_ALIASES.get(field.lower(), field.lower())
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            if not values:
+                raise FilterError(f"Empty value list for {field}")
+            clause = None
+            for value in values:
+                predicate = ("cmp", field, "=", str(value))
+                clause = predicate if clause is None else ("or", clause, predicate)
+            node = clause if node is None else ("and", node, clause)
+        if node is None:
+            raise FilterError("Empty filter")
+        return node
+    return _Parser(str(metadata_filter)).parse()
+
+
+def filter_key(metadata_filter: MetadataFilter) -> str:
+    """Stable text form of a filter (cache keys)"""
+    if isinstance(metadata_filter, dict):
+        return json.dumps(metadata_filter, sort_keys=True, ensure_ascii=False, default=str)
+    return " ".join(str(metadata_filter).split())
+
+
+# ------------------------------------------------------------ index
+
+class MetadataIndex:
+    """
+    Per-field indexes over chunk ids
+
+    Attributes:
+        size: number of chunks (ids are positions in the chunk store)
+        postings: field -> normalized value -> sorted chunk ids
+        dates: field -> (sorted day ordinals, chunk ids in that order)
+        validity: ChunkValidity intervals used by 'vigente' and valid_at
+    """
+
+    def __init__(self, size: int, postings: Dict[str, Dict[str, np.ndarray]],
+                 dates: Dict[str, Tuple[np.ndarray, np.ndarray]], validity: ChunkValidity):
+        self.size = size
+        self.postings = postings
+        self.dates = dates
+        self.validity = validity
+        self._masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.stats = {"evaluations": 0, "mask_cache_hits": 0}
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Any]) -> "MetadataIndex":
+        postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in CATEGORICAL_FIELDS}
+        dates: Dict[str, Tuple[List[int], List[int]]] = {field: ([], []) for field in DATE_FIELDS}
+        starts, ends = [], []
+        size = 0
+        for chunk_id, chunk in enumerate(chunks):
+            size += 1
+            metadata = chunk_metadata(chunk)
+            for field in CATEGORICAL_FIELDS:
+                values = metadata.get(field)
+                if values is None or values == "":
+                    continue
+                for value in (values if isinstance(values, (list, tuple, set)) else [values]):
+                    postings[field].setdefault(_normalize(value), []).append(chunk_id)
+            for field in DATE_FIELDS:
+                value = metadata.get(field)
+                if value:
+                    try:
+                        ordinal = to_ordinal(value)
+                    except ValueError:
+                        continue
+                    dates[field][0].append(ordinal)
+                    dates[field][1].append(chunk_id)
+            start, end = validity_bounds(metadata)
+            starts.append(start)
+            ends.append(end)
+
+        compiled_dates = {}
+        for field, (ordinals, ids) in dates.items():
+            ordinals = np.array(ordinals, dtype=np.int64)
+            order = np.argsort(ordinals, kind="stable")
+            compiled_dates[field] = (ordinals[order], np.array(ids, dtype=np.int64)[order])
+        return cls(
+            size,
+            {field: {value: np.unique(ids) for value, ids in values.items()} for field, values in postings.items()},
+            compiled_dates,
+            ChunkValidity(np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)),
+        )
+
+    # ------------------------------------------------------------ evaluation
+
+    def mask(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """Boolean bitmap of the chunks matching the filter (read-only, cached)"""
+        key = filter_key(metadata_filter)
+        if "vigente" in key.lower():
+            key += f"@{date.today().isoformat()}"
+        cached = self._masks.get(key)
+        if cached is not None:
+            self._masks.move_to_end(key)
+            self.stats["mask_cache_hits"] += 1
+            return cached
+
+        mask = self._evaluate(parse_filter(metadata_filter))
+        mask.setflags(write=False)
+        self.stats["evaluations"] += 1
+        self._masks[key] = mask
+        if len(self._masks) > MASK_CACHE_SIZE:
+            self._masks.popitem(last=False)
+        return mask
+
+    def allowed_ids(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """Sorted chunk ids matching the filter"""
+        return np.flatnonzero(self.mask(metadata_filter))
+
+    def _ids_mask(self, ids: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[ids] = True
+        return mask
+
+    def _evaluate(self, node: tuple) -> np.ndarray:
+        kind = node[0]
+        if kind == "and":
+            return self._evaluate(node[1]) & self._evaluate(node[2])
+        if kind == "or":
+            return self._evaluate(node[1]) | self._evaluate(node[2])
+        if kind == "not":
+            return ~self._evaluate(node[1])
+        if kind == "vigente":
+            return self.validity.mask(date.today()) & ~self._equals("validity_status", REPEALED_STATUSES)
+        _, field, op, value = node
+        if field in self.dates:
+            return self._date_range(field, op, value)
+        if field not in self.postings:
+            raise FilterError(f"Unknown filter field: {field}")
+        if op == "=":
+            return self._equals(field, [value])
+        if op == "!=":
+            return ~self._equals(field, [value])
+        raise FilterError(f"Operator {op} is only supported on date fields ({', '.join(DATE_FIELDS)})")
+
+    def _equals(self, field: str, values: Iterable[str]) -> np.ndarray:
+        ids = [self.postings[field].get(_normalize(value)) for value in values]
+        ids = [array for array in ids if array is not None]
+        return self._ids_mask(np.concatenate(ids)) if ids else np.zeros(self.size, dtype=bool)
+
+    def _date_range(self, field: str, op: str, value: str) -> np.ndarray:
+        try:
+            day = to_ordinal(value)
+        except ValueError as e:
+            raise FilterError(f"Invalid date for {field}: {value!r}") from e
+        ordinals, ids = self.dates[field]
+        if op == "!=":
+            return ~self._date_range(field, "=", value)
+        lower = {">": np.searchsorted(ordinals, day, side="right"),
+                 ">=": np.searchsorted(ordinals, day, side="left"),
+                 "=": np.searchsorted(ordinals, day, side="left")}.get(op, 0)
+        upper = {"<": np.searchsorted(ordinals, day, side="left"),
+                 "<=": np.searchsorted(ordinals, day, side="right"),
+                 "=": np.searchsorted(ordinals, day, side="right")}.get(op, len(ordinals))
+        return self._ids_mask(ids[lower:upper])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.size,
+            "fields": {field: len(values) for field, values in self.postings.items() if values},
+            "date_fields": {field: len(ordinals) for field, (ordinals, _) in self.dates.items() if len(ordinals)},
+            "cached_masks": len(self._masks),
+            **self.stats,
+        }
@@ -25,6 +25,9 @@ from ..langchain_integration.semantic_rag import SemanticRAGChain
 # Memoria episódica
 from ..memory.episodic_memory import EpisodicMemoryManager
 
+# Trazas y presupuestos de latencia por nodo
+from ..monitoring.node_tracing import traced_node, run_concurrently
+
 logger = logging.getLogger(__name__)
 
 class RAGState(TypedDict):
@@ -40,6 +43,7 @@ class RAGState(TypedDict):
     final_response: str
     confidence: float
     reasoning_chain: List[str]
+    node_trace: List[Dict[str, Any]]
     metadata: Dict[str, Any]
 
 class LangGraphOrchestrator:
@@ -48,7 +52,16 @@ class LangGraphOrchestrator:
     Coordina agentes especializados con memoria episódica
     """
     
-    def __init__(self):
+    # Presupuesto de latencia por nodo (segundos); al excederlo el nodo se cancela
+    DEFAULT_NODE_BUDGETS = {
+        "classify_query": 1.0,
+        "retrieve_episodic": 2.0,
+        "calculation_agent": 10.0,
+        "semantic_rag_agent": 20.0,
+        "episodic_recorder": 2.0
+    }
+    
+    def __init__(self, node_budgets: Optional[Dict[str, float]] = None):
         # Verificar disponibilidad de LangGraph
         if not LANGGRAPH_AVAILABLE:
             logger.warning("⚠️ LangGraph no disponible - usando implementación simulada")
@@ -61,6 +74,8 @@ class LangGraphOrchestrator:
         # Memoria episódica
         self.episodic_memory = EpisodicMemoryManager()
         
+        self.node_budgets = {**self.DEFAULT_NODE_BUDGETS, **(node_budgets or {})}
+        
         # Construir grafo LangGraph
         self.graph = self._build_langgraph()
         
@@ -81,30 +96,23 @@ class LangGraphOrchestrator:
         # Crear grafo de estado
         workflow = StateGraph(RAGState)
         
+        # Clasificación y memoria episódica son independientes: corren en paralelo
+        self._classify_branch = self._traced("classify_query", self._classify_query_node)
+        self._episodic_branch = self._traced("retrieve_episodic", self._retrieve_episodic_node)
+        
         # Añadir nodos especializados
-        workflow.add_node("classify_query", self._classify_query_node)
-        workflow.add_node("retrieve_episodic", self._retrieve_episodic_node)
-        workflow.add_node("route_to_agent", self._route_to_agent_node)
-        workflow.add_node("calculation_agent", self._calculation_agent_node)
-        workflow.add_node("semantic_rag_agent", self._semantic_rag_node)
-        workflow.add_node("context_enhancer", self._context_enhancer_node)
-        workflow.add_node("response_synthesizer", self._response_synthesizer_node)
-        workflow.add_node("episodic_recorder", self._episodic_recorder_node)
+        workflow.add_node("analyze_query", self._traced("analyze_query", self._analyze_query_node))
+        workflow.add_node("route_to_agent", self._traced("route_to_agent", self._route_to_agent_node))
+        workflow.add_node("calculation_agent", self._traced("calculation_agent", self._calculation_agent_node))
+        workflow.add_node("semantic_rag_agent", self._traced("semantic_rag_agent", self._semantic_rag_node))
+        workflow.add_node("context_enhancer", self._traced("context_enhancer", self._context_enhancer_node))
+        workflow.add_node("response_synthesizer", self._traced("response_synthesizer", self._response_synthesizer_node))
+        workflow.add_node("episodic_recorder", self._traced("episodic_recorder", self._episodic_recorder_node))
         
         # Definir punto de entrada
-        workflow.set_entry_point("classify_query")
-        
-        # Definir flujo condicional
-        workflow.add_conditional_edges(
-            "classify_query",
-            self._determine_next_step,
-            {
-                "retrieve_episodic": "retrieve_episodic",
-                "route_to_agent": "route_to_agent"
-            }
-        )
+        workflow.set_entry_point("analyze_query")
         
-        workflow.add_edge("retrieve_episodic", "route_to_agent")
+        workflow.add_edge("analyze_query", "route_to_agent")
         
         workflow.add_conditional_edges(
             "route_to_agent",
@@ -124,6 +132,10 @@ class LangGraphOrchestrator:
         
         return workflow
     
+    def _traced(self, node: str, fn):
+        """Nodo instrumentado con su presupuesto de latencia"""
+        return traced_node("langgraph_orchestrator", node, fn, self.node_budgets.get(node))
+    
     def _compile_graph(self):
         """Compilar el grafo con memoria"""
         if not LANGGRAPH_AVAILABLE or not self.graph:
@@ -164,6 +176,7 @@ class LangGraphOrchestrator:
                 "final_response": "",
                 "confidence": 0.0,
                 "reasoning_chain": [],
+                "node_trace": [],
                 "metadata": {
                     "session_id": session_id,
                     "timestamp": datetime.now().isoformat(),
@@ -184,6 +197,7 @@ class LangGraphOrchestrator:
                 "query_type": final_state["query_type"],
                 "agent_used": final_state["agent_route"],
                 "reasoning_chain": final_state["reasoning_chain"],
+                "node_trace": final_state["node_trace"],
                 "episodic_context": final_state["episodic_context"],
                 "calculation_result": final_state["calculation_result"],
                 "rag_result": final_state["rag_result"],
@@ -199,10 +213,21 @@ class LangGraphOrchestrator:
             logger.error(f"❌ Error en LangGraph orchestrator: {e}")
             return await self._process_query_fallback(query, context)
     
+    async def _analyze_query_node(self, state: RAGState) -> RAGState:
+        """Nodo: Clasificación y recuperación episódica concurrentes"""
+        branches = [self._classify_branch]
+        if self._determine_next_step(state) == "retrieve_episodic":
+            branches.append(self._episodic_branch)
+        return await run_concurrently(state, branches)
+    
     async def _classify_query_node(self, state: RAGState) -> RAGState:
         """Nodo: Clasificar consulta y determinar estrategia"""
         try:
-            classification = self.query_classifier.classify_query(state["query"])
+            # En un thread: no bloquea la recuperación episódica concurrente
+            loop = asyncio.get_running_loop()
+            classification = await loop.run_in_executor(
+                None, self.query_classifier.classify_query, state["query"]
+            )
             
             state["query_type"] = classification.query_type.value
             state["agent_route"] = classification.target_agent
@@ -417,7 +442,7 @@ Esta respuesta se genera mediante análisis contextual del sistema RAG MINEDU.""
             return state
     
     def _determine_next_step(self, state: RAGState) -> str:
-        """Determinar siguiente paso después de clasificación"""
+        """Determinar si se recupera memoria episódica junto a la clasificación"""
         # Si hay contexto episódico relevante disponible, recuperarlo
         if state["metadata"].get("session_id") != "default":
             return "retrieve_episodic"
@@ -481,7 +506,7 @@ Esta respuesta se genera mediante análisis contextual del sistema RAG MINEDU.""
                 "episodic_memory": True
             },
             "graph_nodes": [
-                "classify_query", "retrieve_episodic", "route_to_agent",
+                "analyze_query", "classify_query", "retrieve_episodic", "route_to_agent",
                 "calculation_agent", "semantic_rag_agent", "context_enhancer",
                 "response_synthesizer", "episodic_recorder"
             ] if LANGGRAPH_AVAILABLE else [],
@@ -490,6 +515,8 @@ Esta respuesta se genera mediante análisis contextual del sistema RAG MINEDU.""
                 "Episodic memory integration", 
                 "Contextual enhancement",
                 "Reasoning chain tracking",
+                "Parallel classification and episodic recall",
+                "Per-node latency budgets and tracing",
                 "Session persistence"
             ]
         }
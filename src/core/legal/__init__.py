@@ -3,7 +3,7 @@ Módulo de análisis legal avanzado
 Concordancia normativa, relaciones entre fuentes, análisis jurídico
 """
 
-from .normative_concordance import NormativeConcordance, RelatedNorm, NormativeRelation
+from .normative_concordance import NormativeConcordance, RelatedNorm, NormativeRelation, norms_from_chunks
 from .legal_analyzer import LegalAnalyzer, LegalConflict
 from .report_generator import NormativeReportGenerator, ReportTemplate
 
@@ -11,6 +11,7 @@ __all__ = [
     'NormativeConcordance',
     'RelatedNorm',
     'NormativeRelation', 
+    'norms_from_chunks',
     'LegalAnalyzer',
     'LegalConflict',
     'NormativeReportGenerator',
@@ -2,15 +2,20 @@
 Sistema de concordancia normativa entre fuentes
 Encuentra relaciones entre ley → reglamento → directiva → jurisprudencia
 """
+from collections import OrderedDict
+import hashlib
 import logging
 import re
+import time
 from typing import List, Dict, Any, Optional, Tuple, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, date
 import numpy as np
 from pathlib import Path
 import json
 
+from ..graph.normative_graph import NormativeGraph
+
 # Para embeddings y similaridad
 try:
     from sentence_transformers import SentenceTransformer
@@ -20,6 +25,10 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+SEMANTIC_THRESHOLD = 0.3
+CORPUS_INDEX_CACHE_SIZE = 4
+RESULT_CACHE_SIZE = 1024
+
 @dataclass
 class RelatedNorm:
     """Norma relacionada con metadatos de relación"""
@@ -43,6 +52,46 @@ class NormativeRelation:
     explanation: str
     detected_patterns: List[str]
 
+@dataclass
+class CorpusIndex:
+    """Corpus normativo indexado una vez por versión"""
+    version: str
+    norms: List[Dict[str, Any]]
+    hierarchy: np.ndarray  # nivel jerárquico por norma
+    dates: List[Optional[date]]
+    pattern_hits: List[Dict[str, List[str]]]  # patrones detectados por tipo de relación
+    pattern_scores: np.ndarray  # score de la primera relación por patrones
+    has_pattern: np.ndarray
+    has_content: np.ndarray
+    embeddings: Optional[np.ndarray]  # (normas, dim) normalizada
+    duplicate_ids: bool
+
+def norms_from_chunks(chunks: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Corpus normativo a partir de los chunks indexados: una norma por documento
+    fuente (metadatos 'source' o 'document_id'), con el texto de sus chunks
+    """
+    norms: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    for chunk in chunks:
+        if not isinstance(chunk, dict):
+            continue
+        metadata = {**(chunk.get('metadatos') or {}), **chunk}
+        norm_id = str(metadata.get('document_id') or metadata.get('source') or '').strip()
+        if not norm_id:
+            continue
+        norm = norms.setdefault(norm_id, {
+            'id': norm_id,
+            'name': str(metadata.get('source') or norm_id),
+            'article': '',
+            'content': [],
+            'date': metadata.get('publication_date'),
+            'status': metadata.get('validity_status', 'vigente')
+        })
+        norm['content'].append(str(metadata.get('texto') or metadata.get('text') or ''))
+    for norm in norms.values():
+        norm['content'] = "\n".join(text for text in norm['content'] if text)
+    return list(norms.values())
+
 class NormativeConcordance:
     """
     Sistema de concordancia normativa usando embeddings y análisis semántico
@@ -110,8 +159,22 @@ class NormativeConcordance:
             ]
         }
         
-        # Cache de embeddings
+        # Una alternancia compilada por tipo de relación (grupo p<i> = patrón i)
+        self._compiled_relations = {
+            relation_type: re.compile(
+                "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns)), re.IGNORECASE
+            )
+            for relation_type, patterns in self.relation_patterns.items()
+        }
+        
+        # Cache de embeddings, jerarquías, corpus indexados y resultados
         self.embeddings_cache = {}
+        self._hierarchy_cache: Dict[str, int] = {}
+        self._corpus_indexes: "OrderedDict[str, CorpusIndex]" = OrderedDict()
+        # Versión de cada lista de corpus ya vista, por identidad: id -> (lista, versión)
+        self._corpus_versions: "OrderedDict[int, Tuple[List[Dict[str, Any]], str]]" = OrderedDict()
+        self._results_cache: "OrderedDict[tuple, List[RelatedNorm]]" = OrderedDict()
+        self.stats = {"corpus_indexed": 0, "result_cache_hits": 0}
         
         logger.info("📋 NormativeConcordance inicializado")
     
@@ -125,6 +188,13 @@ class NormativeConcordance:
         """
         Encontrar normas relacionadas a un artículo específico
         
+        Cada norma aporta una sola relación, con la prioridad de siempre:
+        patrones explícitos, luego similaridad semántica, luego jerarquía.
+        El corpus se indexa una vez por versión y los resultados se cachean
+        por (hash del artículo, jerarquía de la norma fuente, versión del corpus).
+        La versión se calcula una vez por lista: si se modifica en el sitio,
+        llamar a invalidate_corpus(corpus_norms).
+        
         Args:
             source_article: Texto del artículo fuente
             source_norm: Nombre de la norma fuente
@@ -135,211 +205,249 @@ class NormativeConcordance:
             Lista de normas relacionadas ordenadas por relevancia
         """
         try:
-            related_norms = []
-            
-            # 1. Búsqueda por patrones explícitos
-            pattern_matches = self._find_pattern_relations(source_article, corpus_norms)
-            
-            # 2. Búsqueda por embeddings semánticos
-            if self.embeddings_model:
-                semantic_matches = self._find_semantic_relations(source_article, corpus_norms)
-            else:
-                semantic_matches = []
-            
-            # 3. Búsqueda por jerarquía normativa
-            hierarchical_matches = self._find_hierarchical_relations(source_norm, corpus_norms)
-            
-            # 4. Combinar y rankear resultados
-            all_matches = pattern_matches + semantic_matches + hierarchical_matches
-            
-            # Eliminar duplicados y ordenar por score
-            seen = set()
-            unique_matches = []
-            for match in all_matches:
-                if match.norm_id not in seen:
-                    seen.add(match.norm_id)
-                    unique_matches.append(match)
-            
-            # Ordenar por similarity_score descendente
-            unique_matches.sort(key=lambda x: x.similarity_score, reverse=True)
-            
-            return unique_matches[:max_results]
-            
+            return self._related_in_index(self.index_corpus(corpus_norms), source_article, source_norm, max_results)
         except Exception as e:
             logger.error(f"❌ Error encontrando normas relacionadas: {e}")
             return []
     
-    def _find_pattern_relations(
-        self, 
-        source_article: str, 
-        corpus_norms: List[Dict[str, Any]]
-    ) -> List[RelatedNorm]:
-        """Encontrar relaciones por patrones explícitos"""
-        matches = []
-        source_lower = source_article.lower()
-        
-        for norm in corpus_norms:
-            content = norm.get('content', '').lower()
-            norm_name = norm.get('name', '')
-            
-            # Buscar patrones en cada categoría
-            for relation_type, patterns in self.relation_patterns.items():
-                pattern_score = 0
-                detected_patterns = []
-                
-                for pattern in patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        pattern_score += 1
-                        detected_patterns.append(pattern)
-                
-                if pattern_score > 0:
-                    # Calcular score basado en número de patrones
-                    similarity_score = min(pattern_score / len(patterns), 1.0)
-                    
-                    hierarchy = self._get_norm_hierarchy(norm_name)
-                    
-                    related_norm = RelatedNorm(
-                        norm_id=norm.get('id', ''),
-                        norm_name=norm_name,
-                        article=norm.get('article', ''),
-                        content=norm.get('content', ''),
-                        relation_type=relation_type,
-                        similarity_score=similarity_score,
-                        legal_hierarchy=hierarchy,
-                        publication_date=self._parse_date(norm.get('date')),
-                        validity_status=norm.get('status', 'vigente')
-                    )
-                    matches.append(related_norm)
-        
-        return matches
-    
-    def _find_semantic_relations(
-        self, 
-        source_article: str, 
-        corpus_norms: List[Dict[str, Any]]
+    def _related_in_index(
+        self,
+        index: CorpusIndex,
+        source_article: str,
+        source_norm: str,
+        max_results: int
     ) -> List[RelatedNorm]:
-        """Encontrar relaciones por similaridad semántica"""
-        if not self.embeddings_model:
+        """Normas relacionadas dentro de un corpus ya indexado"""
+        source_hierarchy = self._get_norm_hierarchy(source_norm)
+        cache_key = (
+            hashlib.md5(source_article.encode("utf-8")).hexdigest(),
+            source_hierarchy, index.version, max_results
+        )
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            self._results_cache.move_to_end(cache_key)
+            self.stats["result_cache_hits"] += 1
+            return [replace(match) for match in cached]
+        
+        n = len(index.norms)
+        if n == 0:
             return []
         
-        matches = []
+        # 1. Jerarquía: todas las normas tienen al menos esta relación
+        scores = np.where(index.hierarchy < source_hierarchy, 0.7,
+                          np.where(index.hierarchy > source_hierarchy, 0.6, 0.5))
+        stage = np.full(n, 2, dtype=np.int8)
+        
+        # 2. Similaridad semántica: un solo producto matriz-vector
+        if self.embeddings_model and index.embeddings is not None:
+            similarities = self._find_semantic_relations(source_article, index)
+            semantic = index.has_content & (similarities > SEMANTIC_THRESHOLD)
+            scores = np.where(semantic, similarities, scores)
+            stage[semantic] = 1
+        
+        # 3. Patrones explícitos (precalculados por norma)
+        scores = np.where(index.has_pattern, index.pattern_scores, scores)
+        stage[index.has_pattern] = 0
+        
+        # Mismo orden de desempate que la concatenación original
+        order = stage.astype(np.int64) * n + np.arange(n)
+        keep = self._dedupe_ids(index, order) if index.duplicate_ids else np.arange(n)
+        
+        top = self._top_k(scores[keep], order[keep], max_results)
+        results = [
+            self._make_related(index, int(i), int(stage[i]), float(scores[i]), source_hierarchy)
+            for i in keep[top]
+        ]
         
+        self._results_cache[cache_key] = results
+        if len(self._results_cache) > RESULT_CACHE_SIZE:
+            self._results_cache.popitem(last=False)
+        return [replace(match) for match in results]
+    
+    def index_corpus(self, corpus_norms: List[Dict[str, Any]]) -> CorpusIndex:
+        """Indexar el corpus (jerarquías, fechas, patrones y embeddings) una vez por versión"""
+        version = self.corpus_version(corpus_norms)
+        index = self._corpus_indexes.get(version)
+        if index is not None:
+            self._corpus_indexes.move_to_end(version)
+            return index
+        
+        started = time.perf_counter()
+        contents = [norm.get('content', '') for norm in corpus_norms]
+        pattern_hits = [self._detect_patterns(content.lower()) for content in contents]
+        
+        # Primera relación por patrones de cada norma (orden de relation_patterns)
+        pattern_scores = np.zeros(len(corpus_norms))
+        has_pattern = np.zeros(len(corpus_norms), dtype=bool)
+        for i, hits in enumerate(pattern_hits):
+            for relation_type, detected in hits.items():
+                pattern_scores[i] = min(len(detected) / len(self.relation_patterns[relation_type]), 1.0)
+                has_pattern[i] = True
+                break
+        
+        ids = [norm.get('id', '') for norm in corpus_norms]
+        index = CorpusIndex(
+            version=version,
+            norms=corpus_norms,
+            hierarchy=np.array([self._get_norm_hierarchy(norm.get('name', '')) for norm in corpus_norms], dtype=np.int16),
+            dates=[self._parse_date(norm.get('date')) for norm in corpus_norms],
+            pattern_hits=pattern_hits,
+            pattern_scores=pattern_scores,
+            has_pattern=has_pattern,
+            has_content=np.array([bool(content) for content in contents], dtype=bool),
+            embeddings=self._embedding_matrix(contents),
+            duplicate_ids=len(set(ids)) < len(ids)
+        )
+        
+        self._corpus_indexes[version] = index
+        if len(self._corpus_indexes) > CORPUS_INDEX_CACHE_SIZE:
+            self._corpus_indexes.popitem(last=False)
+        self.stats["corpus_indexed"] += 1
+        logger.info(f"📚 Corpus normativo indexado: {len(corpus_norms)} normas en "
+                    f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        return index
+    
+    def corpus_version(self, corpus_norms: List[Dict[str, Any]]) -> str:
+        """Versión del corpus, calculada una sola vez por lista (al cargarla o tras invalidarla)"""
+        entry = self._corpus_versions.get(id(corpus_norms))
+        if entry is not None and entry[0] is corpus_norms:
+            self._corpus_versions.move_to_end(id(corpus_norms))
+            return entry[1]
+        version = self._corpus_version(corpus_norms)
+        self._corpus_versions[id(corpus_norms)] = (corpus_norms, version)
+        if len(self._corpus_versions) > CORPUS_INDEX_CACHE_SIZE:
+            self._corpus_versions.popitem(last=False)
+        return version
+    
+    def invalidate_corpus(self, corpus_norms: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Descartar la versión calculada de un corpus modificado en el sitio (sin argumento: todas)"""
+        if corpus_norms is None:
+            self._corpus_versions.clear()
+        else:
+            self._corpus_versions.pop(id(corpus_norms), None)
+    
+    def _corpus_version(self, corpus_norms: List[Dict[str, Any]]) -> str:
+        """Huella del corpus a partir de los campos que usa la concordancia"""
+        digest = hashlib.md5()
+        for norm in corpus_norms:
+            for field in ('id', 'name', 'article', 'content', 'date', 'status'):
+                digest.update(str(norm.get(field, '')).encode("utf-8"))
+                digest.update(b"\x1f")
+            digest.update(b"\x1e")
+        return digest.hexdigest()[:16]
+    
+    def _detect_patterns(self, content: str) -> Dict[str, List[str]]:
+        """Patrones detectados por tipo de relación (una pasada por tipo)"""
+        hits = {}
+        for relation_type, compiled in self._compiled_relations.items():
+            patterns = self.relation_patterns[relation_type]
+            found = set()
+            position = 0
+            # Reanudar desde el inicio del match + 1 para no perder patrones solapados
+            while len(found) < len(patterns):
+                match = compiled.search(content, position)
+                if not match:
+                    break
+                found.add(int(match.lastgroup[1:]))
+                position = match.start() + 1
+            if found:
+                hits[relation_type] = [pattern for i, pattern in enumerate(patterns) if i in found]
+        return hits
+    
+    def _embedding_matrix(self, contents: List[str]) -> Optional[np.ndarray]:
+        """Matriz de embeddings normalizados (filas en cero para normas sin contenido)"""
+        if not self.embeddings_model or not contents:
+            return None
         try:
-            # Obtener embedding del artículo fuente
-            source_embedding = self._get_embedding(source_article)
-            
-            for norm in corpus_norms:
-                content = norm.get('content', '')
-                if not content:
-                    continue
-                
-                # Obtener embedding del contenido
-                content_embedding = self._get_embedding(content)
-                
-                # Calcular similaridad coseno
-                similarity = self._cosine_similarity(source_embedding, content_embedding)
-                
-                # Solo incluir si similaridad es significativa
-                if similarity > 0.3:
-                    hierarchy = self._get_norm_hierarchy(norm.get('name', ''))
-                    
-                    related_norm = RelatedNorm(
-                        norm_id=norm.get('id', ''),
-                        norm_name=norm.get('name', ''),
-                        article=norm.get('article', ''),
-                        content=content,
-                        relation_type="thematic",
-                        similarity_score=similarity,
-                        legal_hierarchy=hierarchy,
-                        publication_date=self._parse_date(norm.get('date')),
-                        validity_status=norm.get('status', 'vigente')
-                    )
-                    matches.append(related_norm)
-        
+            texts = [content[:512] for content in contents]  # Límite para modelos sentence-transformers
+            matrix = np.asarray(self.embeddings_model.encode(texts, show_progress_bar=False), dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
         except Exception as e:
-            logger.error(f"❌ Error en búsqueda semántica: {e}")
-        
-        return matches
+            logger.error(f"❌ Error calculando embeddings del corpus: {e}")
+            return None
     
-    def _find_hierarchical_relations(
-        self, 
-        source_norm: str, 
-        corpus_norms: List[Dict[str, Any]]
-    ) -> List[RelatedNorm]:
-        """Encontrar relaciones por jerarquía normativa"""
-        matches = []
-        source_hierarchy = self._get_norm_hierarchy(source_norm)
-        
-        for norm in corpus_norms:
-            norm_name = norm.get('name', '')
-            norm_hierarchy = self._get_norm_hierarchy(norm_name)
-            
-            # Buscar relaciones jerárquicas
-            relation_type = "hierarchical"
-            similarity_score = 0.0
-            
-            if norm_hierarchy < source_hierarchy:
-                # Norma superior (ley vs reglamento)
-                similarity_score = 0.7
-                relation_type = "hierarchical_superior"
-            elif norm_hierarchy > source_hierarchy:
-                # Norma inferior (reglamento vs directiva)
-                similarity_score = 0.6
-                relation_type = "hierarchical_inferior"
-            elif norm_hierarchy == source_hierarchy:
-                # Mismo nivel (ley vs ley)
-                similarity_score = 0.5
-                relation_type = "hierarchical_equal"
-            
-            if similarity_score > 0:
-                related_norm = RelatedNorm(
-                    norm_id=norm.get('id', ''),
-                    norm_name=norm_name,
-                    article=norm.get('article', ''),
-                    content=norm.get('content', ''),
-                    relation_type=relation_type,
-                    similarity_score=similarity_score,
-                    legal_hierarchy=norm_hierarchy,
-                    publication_date=self._parse_date(norm.get('date')),
-                    validity_status=norm.get('status', 'vigente')
-                )
-                matches.append(related_norm)
-        
-        return matches
+    def _find_semantic_relations(self, source_article: str, index: CorpusIndex) -> np.ndarray:
+        """Similaridad coseno del artículo contra todo el corpus"""
+        query = self._get_embedding(source_article).astype(np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(index.norms), dtype=np.float32)
+        return index.embeddings @ (query / norm)
+    
+    def _dedupe_ids(self, index: CorpusIndex, order: np.ndarray) -> np.ndarray:
+        """Una relación por norm_id: la de menor orden"""
+        best: Dict[str, int] = {}
+        for i in np.argsort(order, kind="stable").tolist():
+            best.setdefault(index.norms[i].get('id', ''), i)
+        return np.array(sorted(best.values()), dtype=np.int64)
+    
+    def _top_k(self, scores: np.ndarray, order: np.ndarray, k: int) -> np.ndarray:
+        """Índices de los k mejores por score descendente (empates por orden)"""
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        candidates = np.arange(len(scores))
+        if len(scores) > k:
+            # argpartition acota los candidatos; se conservan los empates con el k-ésimo
+            kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            candidates = np.flatnonzero(scores >= kth)
+        ranked = candidates[np.lexsort((order[candidates], -scores[candidates]))]
+        return ranked[:k]
+    
+    def _make_related(self, index: CorpusIndex, i: int, stage: int, score: float,
+                      source_hierarchy: int) -> RelatedNorm:
+        if stage == 0:
+            relation_type = next(iter(index.pattern_hits[i]))
+        elif stage == 1:
+            relation_type = "thematic"
+        elif index.hierarchy[i] < source_hierarchy:
+            relation_type = "hierarchical_superior"  # Norma superior (ley vs reglamento)
+        elif index.hierarchy[i] > source_hierarchy:
+            relation_type = "hierarchical_inferior"  # Norma inferior (reglamento vs directiva)
+        else:
+            relation_type = "hierarchical_equal"  # Mismo nivel (ley vs ley)
+        
+        norm = index.norms[i]
+        return RelatedNorm(
+            norm_id=norm.get('id', ''),
+            norm_name=norm.get('name', ''),
+            article=norm.get('article', ''),
+            content=norm.get('content', ''),
+            relation_type=relation_type,
+            similarity_score=score,
+            legal_hierarchy=int(index.hierarchy[i]),
+            publication_date=index.dates[i],
+            validity_status=norm.get('status', 'vigente')
+        )
     
     def _get_embedding(self, text: str) -> np.ndarray:
         """Obtener embedding con cache"""
-        if text in self.embeddings_cache:
-            return self.embeddings_cache[text]
-        
         # Limitar longitud del texto
         text = text[:512]  # Límite para modelos sentence-transformers
         
+        if text in self.embeddings_cache:
+            return self.embeddings_cache[text]
+        
         embedding = self.embeddings_model.encode(text)
         self.embeddings_cache[text] = embedding
         
         return embedding
     
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calcular similaridad coseno"""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return dot_product / (norm1 * norm2)
-    
     def _get_norm_hierarchy(self, norm_name: str) -> int:
-        """Determinar jerarquía de una norma"""
-        norm_lower = norm_name.lower()
+        """Determinar jerarquía de una norma (cacheada por nombre)"""
+        hierarchy = self._hierarchy_cache.get(norm_name)
+        if hierarchy is not None:
+            return hierarchy
         
-        for norm_type, hierarchy in self.legal_hierarchy.items():
+        norm_lower = norm_name.lower()
+        hierarchy = 7  # Jerarquía por defecto (más baja)
+        for norm_type, level in self.legal_hierarchy.items():
             if norm_type in norm_lower:
-                return hierarchy
+                hierarchy = level
+                break
         
-        return 7  # Jerarquía por defecto (más baja)
+        self._hierarchy_cache[norm_name] = hierarchy
+        return hierarchy
     
     def _parse_date(self, date_str: Optional[str]) -> Optional[date]:
         """Parsear fecha de string"""
@@ -420,6 +528,39 @@ class NormativeConcordance:
             logger.error(f"❌ Error analizando red normativa: {e}")
             return {"error": str(e)}
     
+    def build_normative_graph(
+        self,
+        corpus_norms: List[Dict[str, Any]],
+        max_related: int = 5,
+        graph: Optional[NormativeGraph] = None
+    ) -> NormativeGraph:
+        """
+        Construir el grafo normativo a partir de las relaciones de concordancia
+        
+        Cada norma se enlaza con sus `max_related` normas más relacionadas; el
+        costo de la arista es el inverso del score (más relacionada = más cercana).
+        El corpus se indexa (y se versiona) una sola vez para todo el grafo.
+        """
+        graph = graph or NormativeGraph()
+        started = time.perf_counter()
+        index = self.index_corpus(corpus_norms)
+        
+        for norm in corpus_norms:
+            graph.add_node(norm.get('id', ''), kind="norm", label=norm.get('name', ''))
+        
+        for norm in corpus_norms:
+            source_id = norm.get('id', '')
+            related = self._related_in_index(
+                index, norm.get('content', ''), norm.get('name', ''), max_results=max_related + 1
+            )
+            for match in [m for m in related if m.norm_id != source_id][:max_related]:
+                graph.add_edge(source_id, match.norm_id, match.relation_type,
+                               weight=1.0 / max(match.similarity_score, 1e-6), kind="norm")
+        
+        logger.info(f"🕸️ Grafo normativo construido: {graph.get_stats()['edges']} relaciones en "
+                    f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        return graph
+    
     def _get_hierarchy_name(self, hierarchy: int) -> str:
         """Obtener nombre de jerarquía"""
         hierarchy_names = {
@@ -537,6 +678,9 @@ class NormativeConcordance:
             "hierarchy_levels": len(self.legal_hierarchy),
             "relation_types": list(self.relation_patterns.keys()),
             "cache_size": len(self.embeddings_cache),
+            "indexed_corpora": len(self._corpus_indexes),
+            "cached_results": len(self._results_cache),
+            **self.stats,
             "features": {
                 "pattern_matching": True,
                 "semantic_similarity": EMBEDDINGS_AVAILABLE,
@@ -7,6 +7,8 @@ from typing import Dict, Any, List, Optional, Set
 from dataclasses import dataclass
 from datetime import datetime
 
+from ..graph.normative_graph import NormativeGraph
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -29,12 +31,19 @@ class SemanticRelation:
 class SemanticMemoryManager:
     """
     Gestor de memoria semántica para RAG avanzado
+    
+    Los conceptos y relaciones viven en un grafo normativo (CSR) propio de cada
+    gestor; para compartirlo con las normas de la concordancia se inyecta
+    get_normative_graph().
     """
     
-    def __init__(self):
+    RELATED = "related"  # tipo de arista de SemanticConcept.related_concepts
+    
+    def __init__(self, graph: Optional[NormativeGraph] = None):
         self.concepts: Dict[str, SemanticConcept] = {}
         self.relations: List[SemanticRelation] = []
         self.concept_clusters: Dict[str, Set[str]] = {}
+        self.graph = graph if graph is not None else NormativeGraph()
         logger.info("🔗 SemanticMemoryManager inicializado")
     
     def add_concept(self, name: str, description: str, 
@@ -48,6 +57,11 @@ class SemanticMemoryManager:
             last_accessed=datetime.now()
         )
         self.concepts[name] = concept
+        
+        self.graph.add_node(name, kind="concept")
+        self.graph.remove_edges(name, self.RELATED)
+        for related in concept.related_concepts:
+            self.graph.add_edge(name, related, self.RELATED)
     
     def add_relation(self, concept_a: str, concept_b: str, 
                     relation_type: str, strength: float = 1.0) -> None:
@@ -59,36 +73,21 @@ class SemanticMemoryManager:
             strength=strength
         )
         self.relations.append(relation)
+        # Costo inverso a la fuerza: relaciones fuertes = caminos cortos
+        self.graph.add_edge(concept_a, concept_b, relation_type,
+                            weight=1.0 / max(strength, 1e-6), directed=False)
     
     def get_related_concepts(self, concept_name: str, 
                            max_depth: int = 2) -> List[str]:
-        """Obtener conceptos relacionados"""
+        """Obtener conceptos relacionados (BFS sobre el grafo, en orden de cercanía)"""
         if concept_name not in self.concepts:
             return []
         
-        related = set()
-        to_explore = [(concept_name, 0)]
-        explored = set()
-        
-        while to_explore and len(related) < 20:  # Limitar resultados
-            current, depth = to_explore.pop(0)
-            if current in explored or depth >= max_depth:
-                continue
-                
-            explored.add(current)
-            
-            # Agregar conceptos directamente relacionados
-            if current in self.concepts:
-                for rel_concept in self.concepts[current].related_concepts:
-                    if rel_concept not in explored:
-                        related.add(rel_concept)
-                        if depth < max_depth - 1:
-                            to_explore.append((rel_concept, depth + 1))
-        
-        return list(related)
+        return list(self.graph.k_hop(concept_name, k=max_depth,
+                                     relation_types=[self.RELATED], limit=20))
     
     def find_semantic_clusters(self, min_cluster_size: int = 2) -> Dict[str, Set[str]]:
-        """Encontrar clusters semánticos"""
+        """Encontrar clusters semánticos: un concepto y sus relacionados directos"""
         clusters = {}
         processed = set()
         
@@ -105,6 +104,11 @@ class SemanticMemoryManager:
         self.concept_clusters = clusters
         return clusters
     
+    def get_concept_path(self, concept_a: str, concept_b: str) -> List[str]:
+        """Cadena de relaciones más fuerte entre dos conceptos"""
+        path, _ = self.graph.shortest_path(concept_a, concept_b)
+        return path
+    
     def get_concept_by_similarity(self, query: str) -> List[str]:
         """Buscar conceptos por similitud textual básica"""
         query_lower = query.lower()
@@ -129,6 +133,7 @@ class SemanticMemoryManager:
             "total_concepts": len(self.concepts),
             "total_relations": len(self.relations),
             "concept_clusters": len(self.concept_clusters),
+            "graph": self.graph.get_stats(),
             "avg_relations_per_concept": (
                 len(self.relations) / len(self.concepts) 
                 if self.concepts else 0
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-process memory report (Linux /proc)
+USS (private) versus shared memory for the gunicorn master and its workers
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('minedu.metrics')
+
+PROC = Path("/proc")
+
+_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Shared_Dirty": "shared_dirty_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+    "Swap": "swap_kb",
+}
+
+
+def process_memory(pid: int) -> Optional[Dict[str, Any]]:
+    """RSS/PSS/USS/shared (kB) of a process from smaps_rollup (or smaps); None if unreadable"""
+    totals = {key: 0 for key in _FIELDS.values()}
+    for name in ("smaps_rollup", "smaps"):
+        try:
+            lines = (PROC / str(pid) / name).read_text().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            field, _, value = line.partition(":")
+            if field in _FIELDS:
+                totals[_FIELDS[field]] += int(value.split()[0])
+        break
+    else:
+        return None
+
+    totals["uss_kb"] = totals["private_clean_kb"] + totals["private_dirty_kb"]
+    totals["shared_kb"] = totals["shared_clean_kb"] + totals["shared_dirty_kb"]
+    totals["pid"] = pid
+    return totals
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process"""
+    children_file = PROC / str(pid) / "task" / str(pid) / "children"
+    try:
+        return [int(child) for child in children_file.read_text().split()]
+    except OSError:
+        pass
+
+    # Kernels without CONFIG_PROC_CHILDREN: scan the parent pid of every process
+    children = []
+    for entry in PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # pid (comm) state ppid ...; comm may contain spaces
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            children.append(int(entry.name))
+    return sorted(children)
+
+
+def memory_report(master_pid: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Memory of the master process and all of its workers
+
+    Under gunicorn (SERVER_SOFTWARE=gunicorn/...) the master is the parent of
+    the current worker; otherwise the current process. Pages shared after fork
+    count in every worker's RSS but only once in the sum of PSS.
+    """
+    if master_pid is None:
+        under_gunicorn = os.getenv("SERVER_SOFTWARE", "").startswith("gunicorn")
+        master_pid = os.getppid() if under_gunicorn else os.getpid()
+    workers = [report for report in map(process_memory, child_pids(master_pid)) if report]
+    master = process_memory(master_pid)
+
+    processes = workers + ([master] if master else [])
+    return {
+        "current_pid": os.getpid(),
+        "master": master,
+        "workers": workers,
+        "totals": {
+            "worker_count": len(workers),
+            "rss_kb": sum(report["rss_kb"] for report in processes),
+            "pss_kb": sum(report["pss_kb"] for report in processes),
+            "uss_kb": sum(report["uss_kb"] for report in processes),
+            "shared_kb_max": max((report["shared_kb"] for report in processes), default=0),
+        },
+    }
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Per-node tracing for the LangGraph orchestrators
+Latency budgets with cancellation, per-request traces and Prometheus histograms
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from .prometheus_metrics import get_metrics, PROMETHEUS_AVAILABLE
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger('minedu.metrics')
+
+NodeFn = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+TRACE_KEY = "node_trace"
+
+
+def record_node(trace: List[Dict[str, Any]], orchestrator: str, node: str, started: float, status: str) -> None:
+    """Append a node timing to the request trace and export it"""
+    duration = time.perf_counter() - started
+    trace.append({
+        "node": node,
+        "duration_ms": round(duration * 1000, 3),
+        "status": status
+    })
+    if PROMETHEUS_AVAILABLE:
+        get_metrics().record_graph_node(orchestrator, node, duration, status)
+
+
+def traced_node(orchestrator: str, node: str, fn: NodeFn, budget: Optional[float] = None) -> NodeFn:
+    """
+    Wrap a graph node with timing and an optional latency budget (seconds)
+
+    A node that exceeds its budget is cancelled and the state is passed on
+    unchanged, so downstream nodes see the defaults for the keys it owns.
+    """
+    async def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        trace = state.setdefault(TRACE_KEY, [])
+        started = time.perf_counter()
+        try:
+            if budget:
+                result = await asyncio.wait_for(fn(state), timeout=budget)
+            else:
+                result = await fn(state)
+        except asyncio.TimeoutError:
+            record_node(trace, orchestrator, node, started, "timeout")
+            logger.warning(f"⏱️ [{orchestrator}] {node} cancelled after {budget}s budget")
+            return state
+        except Exception:
+            record_node(trace, orchestrator, node, started, "error")
+            raise
+        record_node(trace, orchestrator, node, started, "ok")
+        return result
+
+    wrapper.__name__ = node
+    return wrapper
+
+
+async def run_concurrently(state: Dict[str, Any], nodes: List[NodeFn]) -> Dict[str, Any]:
+    """Run independent nodes concurrently on the same state (they must write disjoint keys)"""
+    await asyncio.gather(*(node(state) for node in nodes))
+    return state
@@ -203,6 +203,15 @@ class MinEducMetrics:
             registry=self.registry
         )
         
+        # Orchestration graph metrics
+        self.graph_node_duration = Histogram(
+            'minedu_graph_node_duration_seconds',
+            'Orchestration graph node duration in seconds',
+            ['orchestrator', 'node', 'status'],  # status: ok/timeout/error
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+            registry=self.registry
+        )
+        
         # Error metrics
         self.errors_total = Counter(
             'minedu_errors_total',
@@ -293,6 +302,17 @@ class MinEducMetrics:
         self.cache_operations_total.labels(operation=operation, status=status).inc()
         self.cache_operation_duration.labels(operation=operation).observe(duration)
 
+    def record_graph_node(self, orchestrator: str, node: str, duration: float, status: str):
+        """Record orchestration graph node duration"""
+        if not PROMETHEUS_AVAILABLE:
+            return
+        
+        self.graph_node_duration.labels(
+            orchestrator=orchestrator,
+            node=node,
+            status=status
+        ).observe(duration)
+
     def record_error(self, component: str, error_type: str):
         """Record application errors"""
         if not PROMETHEUS_AVAILABLE:
@@ -7,7 +7,7 @@ Handles preloading, caching, and optimization of ML models
 import time
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 import threading
 from concurrent.futures import ThreadPoolExecutor
@@ -30,6 +30,13 @@ try:
 except ImportError:
     TORCH_AVAILABLE = False
 
+from src.core.performance.quantization import (
+    apply_precision,
+    configure_inference_threads,
+    resolve_precision,
+    set_model_precision
+)
+
 logger = logging.getLogger('minedu.models')
 
 class ModelManager:
@@ -38,7 +45,9 @@ class ModelManager:
     def __init__(self, 
                  models_cache_dir: str = "models/cache",
                  max_memory_usage: float = 0.7,  # 70% of available RAM
-                 enable_model_sharing: bool = True):
+                 enable_model_sharing: bool = True,
+                 model_precision: Optional[Dict[str, str]] = None,  # model name -> 'fp32' | 'int8'
+                 inference_threads: Optional[int] = None):
         
         self.models_cache_dir = Path(models_cache_dir)
         self.models_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -55,6 +64,11 @@ class ModelManager:
         self._load_times: Dict[str, float] = {}
         self._usage_counts: Dict[str, int] = {}
         
+        # Inference precision per model and torch thread count
+        for model_name, precision in (model_precision or {}).items():
+            set_model_precision(model_name, precision)
+        self.inference_threads = configure_inference_threads(inference_threads)
+        
         # Thread pool for async loading
         self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model_loader")
         
@@ -80,8 +94,9 @@ class ModelManager:
     
     async def preload_sentence_transformer(self, 
                                          model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
-                                         device: str = "auto") -> bool:
-        """Preload sentence transformer model"""
+                                         device: str = "auto",
+                                         precision: Optional[str] = None) -> bool:
+        """Preload sentence transformer model (precision: 'fp32', 'int8' or None for the per-model setting)"""
         if not TRANSFORMERS_AVAILABLE:
             logger.warning("Sentence transformers not available")
             return False
@@ -109,11 +124,12 @@ class ModelManager:
             
             # Load model in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
-            model = await loop.run_in_executor(
+            model, precision = await loop.run_in_executor(
                 self._executor,
                 self._load_sentence_transformer,
                 model_name,
-                device
+                device,
+                precision
             )
             
             if model:
@@ -127,11 +143,12 @@ class ModelManager:
                     'type': 'sentence_transformer',
                     'name': model_name,
                     'device': device,
+                    'precision': precision,
                     'load_time': load_time,
                     'memory_footprint': self._estimate_model_memory(model)
                 }
                 
-                logger.info(f"✅ Loaded {model_name} in {load_time:.2f}s on {device}")
+                logger.info(f"✅ Loaded {model_name} in {load_time:.2f}s on {device} ({precision})")
                 return True
             
         except Exception as e:
@@ -140,8 +157,8 @@ class ModelManager:
         
         return False
     
-    def _load_sentence_transformer(self, model_name: str, device: str) -> Optional[SentenceTransformer]:
-        """Synchronous model loading (runs in thread pool)"""
+    def _load_sentence_transformer(self, model_name: str, device: str, precision: Optional[str] = None) -> Tuple[Optional[SentenceTransformer], str]:
+        """Synchronous model loading (runs in thread pool), returns the model and its effective precision"""
         try:
             # Check for cached model
             cache_path = self.models_cache_dir / f"{model_name.replace('/', '_')}"
@@ -160,15 +177,18 @@ class ModelManager:
             if device == "cuda" and TORCH_AVAILABLE:
                 model = model.to(torch.device("cuda"))
             
+            # Int8 dynamic quantization (after caching, so the fp32 weights stay on disk)
+            precision = apply_precision(model, model_name, precision, device)
+            
             # Warmup with dummy input
             dummy_text = ["This is a warmup sentence for the model."]
             _ = model.encode(dummy_text, show_progress_bar=False)
             
-            return model
+            return model, precision
             
         except Exception as e:
             logger.error(f"Failed to load sentence transformer: {e}")
-            return None
+            return None, "fp32"
     
     def _estimate_model_memory(self, model) -> float:
         """Estimate model memory usage in MB"""
@@ -235,6 +255,15 @@ class ModelManager:
             logger.error(f"Failed to load vectorstore from {path}: {e}")
             return None
     
+    def set_model_precision(self, model_name: str, precision: str) -> None:
+        """Select 'fp32' or 'int8' inference for a model (applies to subsequent loads)"""
+        set_model_precision(model_name, precision)
+        logger.info(f"Precision for {model_name} set to {precision}")
+    
+    def get_model_precision(self, model_name: str) -> str:
+        """Get the configured inference precision for a model"""
+        return resolve_precision(model_name)
+    
     def get_model(self, model_key: str) -> Optional[Any]:
         """Get a preloaded model"""
         if model_key in self._models:
@@ -301,7 +330,8 @@ class ModelManager:
                 'usage_count': self._usage_counts.get(model_key, 0),
                 'memory_footprint_mb': metadata.get('memory_footprint', 0),
                 'type': metadata.get('type', 'unknown'),
-                'device': metadata.get('device', 'unknown')
+                'device': metadata.get('device', 'unknown'),
+                'precision': metadata.get('precision', 'fp32')
             }
         
         return {
@@ -309,7 +339,8 @@ class ModelManager:
             'memory_stats': memory_stats,
             'model_details': model_info,
             'cache_directory': str(self.models_cache_dir),
-            'memory_limit_percent': self.max_memory_usage * 100
+            'memory_limit_percent': self.max_memory_usage * 100,
+            'inference_threads': self.inference_threads or (torch.get_num_threads() if TORCH_AVAILABLE else None)
         }
     
     def cleanup_unused_models(self, min_usage_count: int = 0) -> List[str]:
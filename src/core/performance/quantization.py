@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Int8 dynamic quantization for CPU inference
+Per-model precision selection and torch thread-count control
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+logger = logging.getLogger('minedu.models')
+
+PRECISIONS = ("fp32", "int8")
+
+# Per-model overrides registered by ModelManager (model name -> precision)
+_model_precision: Dict[str, str] = {}
+
+
+def _env_int8_models() -> set:
+    """Models listed in MINEDU_INT8_MODELS (comma separated, '*' for all)"""
+    return {name.strip() for name in os.getenv("MINEDU_INT8_MODELS", "").split(",") if name.strip()}
+
+
+def set_model_precision(model_name: str, precision: str) -> None:
+    """Select the inference precision for a model loaded from now on"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision '{precision}', expected one of {PRECISIONS}")
+    _model_precision[model_name] = precision
+
+
+def resolve_precision(model_name: str, precision: Optional[str] = None) -> str:
+    """Effective precision: explicit argument > registered override > environment > fp32"""
+    if precision:
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{precision}', expected one of {PRECISIONS}")
+        return precision
+    if model_name in _model_precision:
+        return _model_precision[model_name]
+    int8_models = _env_int8_models()
+    if "*" in int8_models or model_name in int8_models:
+        return "int8"
+    return "fp32"
+
+
+def configure_inference_threads(num_threads: Optional[int] = None) -> Optional[int]:
+    """Set torch intra-op threads (argument or MINEDU_TORCH_THREADS)"""
+    if num_threads is None:
+        env_threads = os.getenv("MINEDU_TORCH_THREADS")
+        num_threads = int(env_threads) if env_threads else None
+    if not TORCH_AVAILABLE or not num_threads:
+        return None
+    torch.set_num_threads(num_threads)
+    logger.info(f"🧵 Torch inference threads set to {num_threads}")
+    return num_threads
+
+
+def quantize_dynamic_int8(model: Any) -> Any:
+    """
+    Quantize the Linear layers of a model to int8 in place (CPU only)
+
+    Accepts torch modules (SentenceTransformer, transformers AutoModel) and
+    wrappers that keep the torch module in `.model` (CrossEncoder).
+    """
+    module = model if isinstance(model, torch.nn.Module) else getattr(model, "model", None)
+    if not isinstance(module, torch.nn.Module):
+        raise TypeError(f"Cannot quantize {type(model).__name__}: no torch module found")
+    module.eval()
+    torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def apply_precision(model: Any, model_name: str, precision: Optional[str] = None, device: Any = "cpu") -> str:
+    """Apply the resolved precision to a loaded model and return the effective precision"""
+    precision = resolve_precision(model_name, precision)
+    if precision != "int8":
+        return "fp32"
+    if not TORCH_AVAILABLE:
+        logger.warning(f"Torch not available, keeping {model_name} in fp32")
+        return "fp32"
+    if str(device).split(":")[0] != "cpu":
+        logger.warning(f"Int8 dynamic quantization is CPU only, keeping {model_name} in fp32 on {device}")
+        return "fp32"
+    try:
+        quantize_dynamic_int8(model)
+    except Exception as e:
+        logger.error(f"❌ Failed to quantize {model_name}, keeping fp32: {e}")
+        return "fp32"
+    logger.info(f"⚡ {model_name} quantized to int8 (dynamic, Linear layers)")
+    return "int8"
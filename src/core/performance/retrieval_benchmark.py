@@ -0,0 +1,359 @@
+"""
+Benchmark de retrieval: latencia, throughput, memoria y calidad por retriever
+
+Cada objetivo (BM25, TF-IDF, transformer, HybridSearch por estrategia de
+fusión y HybridFusion RRF) se mide en un proceso nuevo (spawn) para que el
+cold start incluya imports y carga del vectorstore, y el pico de RSS sea el
+del retriever y no el acumulado de los anteriores.
+
+La calidad se mide contra data/evaluation/ground_truth_manual.json: un
+resultado es relevante si su id está en respuestas_relevantes o si su texto
+contiene alguna de las entidades_esperadas (los ids del ground truth manual
+no siempre coinciden con los chunks indexados).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import logging
+import multiprocessing
+from pathlib import Path
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+from src.config.paths import ProjectPaths
+
+logger = logging.getLogger(__name__)
+
+TARGETS = (
+    "bm25",
+    "tfidf",
+    "transformer",
+    "hybrid_weighted",
+    "hybrid_rank_fusion",
+    "hybrid_simple",
+    "hybrid_fusion_rrf"
+)
+
+QUERY_FILES = ("test_queries_basic.json", "test_queries_advanced.json", "test_queries_edge_cases.json")
+GROUND_TRUTH_FILE = "ground_truth_manual.json"
+RESULTS_DIR = ProjectPaths.BENCHMARK_RESULTS_DIR / "retrieval"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+
+SearchFn = Callable[[str, int], List[Dict[str, Any]]]
+
+
+def default_vectorstore_paths() -> Dict[str, str]:
+    return {
+        "bm25": str(ProjectPaths.BM25_VECTORSTORE),
+        "tfidf": str(ProjectPaths.TFIDF_VECTORSTORE),
+        "transformer": str(ProjectPaths.TRANSFORMERS_VECTORSTORE)
+    }
+
+
+# === DATOS DE EVALUACIÓN ===
+
+def load_queries(evaluation_dir: Path = ProjectPaths.EVALUATION_DIR) -> List[str]:
+    """Consultas de los sets básico, avanzado y de casos borde (sin duplicados)"""
+    queries: List[str] = []
+    for filename in QUERY_FILES:
+        path = Path(evaluation_dir) / filename
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        groups = data.values() if isinstance(data, dict) else [data]
+        for group in groups:
+            for query in group if isinstance(group, list) else [group]:
+                if isinstance(query, str) and query.strip() and query not in queries:
+                    queries.append(query)
+    return queries
+
+
+def load_ground_truth(evaluation_dir: Path = ProjectPaths.EVALUATION_DIR) -> List[Dict[str, Any]]:
+    """Casos de ground truth con ids relevantes y entidades esperadas aplanadas"""
+    path = Path(evaluation_dir) / GROUND_TRUTH_FILE
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    cases = []
+    for case in data.values():
+        entities = []
+        for values in case.get("entidades_esperadas", {}).values():
+            entities.extend(str(value) for value in values)
+        cases.append({
+            "query": case["query"],
+            "relevant_ids": [str(doc_id) for doc_id in case.get("respuestas_relevantes", [])],
+            "entities": entities
+        })
+    return cases
+
+
+# === MÉTRICAS ===
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Percentil con interpolación lineal entre rangos"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def _result_text(result: Dict[str, Any]) -> str:
+    return _normalize(result.get("texto") or result.get("text") or result.get("content") or "")
+
+
+def _result_ids(result: Dict[str, Any]) -> set:
+    ids = set()
+    for key in ("id", "chunk_id", "index"):
+        value = result.get(key)
+        if value is not None:
+            ids.update({str(value), f"chunk_id_{value}"})
+    return ids
+
+
+def _is_relevant(result: Dict[str, Any], case: Dict[str, Any]) -> bool:
+    if _result_ids(result) & set(case["relevant_ids"]):
+        return True
+    text = _result_text(result)
+    return any(_normalize(entity) in text for entity in case["entities"])
+
+
+def recall_at_k(results: List[Dict[str, Any]], case: Dict[str, Any], k: int) -> float:
+    """Fracción de ids relevantes y entidades esperadas cubiertas por el top-k"""
+    targets = len(case["relevant_ids"]) + len(case["entities"])
+    if targets == 0:
+        return 0.0
+    top = results[:k]
+    found_ids = set().union(*(_result_ids(r) for r in top)) if top else set()
+    texts = " ".join(_result_text(r) for r in top)
+    hits = sum(1 for doc_id in case["relevant_ids"] if doc_id in found_ids)
+    hits += sum(1 for entity in case["entities"] if _normalize(entity) in texts)
+    return hits / targets
+
+
+def reciprocal_rank(results: List[Dict[str, Any]], case: Dict[str, Any], k: int) -> float:
+    for rank, result in enumerate(results[:k], start=1):
+        if _is_relevant(result, case):
+            return 1.0 / rank
+    return 0.0
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if not RESOURCE_AVAILABLE:
+        return None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+# === OBJETIVOS ===
+
+def build_target(name: str, paths: Dict[str, str]) -> SearchFn:
+    """Construir la función de búsqueda del objetivo (imports diferidos para medir cold start)"""
+    if name == "bm25":
+        from src.core.retrieval.bm25_retriever import BM25Retriever
+        return BM25Retriever(paths["bm25"]).search
+    if name == "tfidf":
+        from src.core.retrieval.tfidf_retriever import TFIDFRetriever
+        return TFIDFRetriever(paths["tfidf"]).search
+    if name == "transformer":
+        from src.core.retrieval.transformer_retriever import TransformerRetriever
+        return TransformerRetriever(paths["transformer"]).search
+    if name.startswith("hybrid_") and name != "hybrid_fusion_rrf":
+        from src.core.hybrid.hybrid_search import HybridSearch
+        searcher = HybridSearch(
+            bm25_vectorstore_path=paths["bm25"],
+            tfidf_vectorstore_path=paths["tfidf"],
+            transformer_vectorstore_path=paths["transformer"],
+            fusion_strategy=name[len("hybrid_"):]
+        )
+        return searcher.search
+    if name == "hybrid_fusion_rrf":
+        from src.ai.retrieval.hybrid_fusion import HybridFusion
+        from src.core.retrieval.bm25_retriever import BM25Retriever
+        from src.core.retrieval.tfidf_retriever import TFIDFRetriever
+        fusion = HybridFusion({
+            "bm25": BM25Retriever(paths["bm25"]),
+            "tfidf": TFIDFRetriever(paths["tfidf"])
+        })
+        return lambda query, top_k: fusion.search(query, top_k=top_k)["results"]
+    raise ValueError(f"Objetivo de benchmark desconocido: {name}")
+
+
+def run_target(
+    name: str,
+    paths: Dict[str, str],
+    queries: List[str],
+    ground_truth: List[Dict[str, Any]],
+    top_k: int = 5,
+    repeats: int = 3,
+    concurrency_levels: Iterable[int] = (1, 4, 16)
+) -> Dict[str, Any]:
+    """Medir un objetivo en el proceso actual"""
+    # Los retrievers registran cada búsqueda en INFO; se silencia para medir la búsqueda
+    logging.disable(logging.INFO)
+
+    start = time.perf_counter()
+    search = build_target(name, paths)
+    load_s = time.perf_counter() - start
+    search(queries[0] if queries else "viáticos", top_k)
+    cold_start_s = time.perf_counter() - start
+
+    # Latencia secuencial
+    latencies = []
+    for _ in range(repeats):
+        for query in queries:
+            query_start = time.perf_counter()
+            search(query, top_k)
+            latencies.append((time.perf_counter() - query_start) * 1000)
+
+    # Throughput con clientes concurrentes
+    throughput = {}
+    workload = queries * repeats
+    for clients in concurrency_levels:
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            wall_start = time.perf_counter()
+            list(executor.map(lambda q: search(q, top_k), workload))
+            wall = time.perf_counter() - wall_start
+        throughput[str(clients)] = round(len(workload) / wall, 2) if wall > 0 else 0.0
+
+    # Calidad
+    recalls, reciprocal_ranks = [], []
+    for case in ground_truth:
+        results = search(case["query"], top_k)
+        recalls.append(recall_at_k(results, case, top_k))
+        reciprocal_ranks.append(reciprocal_rank(results, case, top_k))
+
+    return {
+        "target": name,
+        "queries": len(queries),
+        "samples": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "mean": round(sum(latencies) / max(len(latencies), 1), 3)
+        },
+        "throughput_qps": throughput,
+        "load_s": round(load_s, 3),
+        "cold_start_s": round(cold_start_s, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "quality": {
+            f"recall@{top_k}": round(sum(recalls) / max(len(recalls), 1), 4),
+            "mrr": round(sum(reciprocal_ranks) / max(len(reciprocal_ranks), 1), 4),
+            "cases": len(ground_truth)
+        }
+    }
+
+
+def _run_target_safe(*args, **kwargs) -> Dict[str, Any]:
+    try:
+        return run_target(*args, **kwargs)
+    except Exception as e:
+        return {"target": args[0], "error": str(e)}
+
+
+def run_benchmark(
+    targets: Iterable[str] = TARGETS,
+    paths: Optional[Dict[str, str]] = None,
+    top_k: int = 5,
+    repeats: int = 3,
+    concurrency_levels: Iterable[int] = (1, 4, 16),
+    isolate: bool = True,
+    evaluation_dir: Path = ProjectPaths.EVALUATION_DIR
+) -> Dict[str, Any]:
+    """Medir todos los objetivos; con isolate=True cada uno corre en un proceso nuevo"""
+    paths = paths or default_vectorstore_paths()
+    queries = load_queries(evaluation_dir)
+    ground_truth = load_ground_truth(evaluation_dir)
+    concurrency_levels = list(concurrency_levels)
+
+    results = {}
+    for name in targets:
+        args = (name, paths, queries, ground_truth, top_k, repeats, concurrency_levels)
+        if isolate:
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                result = pool.apply(_run_target_safe, args)
+        else:
+            result = _run_target_safe(*args)
+        results[name] = result
+        if "error" in result:
+            logger.warning(f"⚠️ {name}: {result['error']}")
+        else:
+            logger.info(
+                f"📊 {name}: p95={result['latency_ms']['p95']}ms "
+                f"recall@{top_k}={result['quality'][f'recall@{top_k}']} mrr={result['quality']['mrr']}"
+            )
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "top_k": top_k,
+        "repeats": repeats,
+        "concurrency_levels": concurrency_levels,
+        "vectorstores": paths,
+        "results": results
+    }
+
+
+# === PERSISTENCIA Y REGRESIONES ===
+
+def save_report(report: Dict[str, Any], output_dir: Path = RESULTS_DIR) -> Path:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"retrieval_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare_with_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_latency_regression: float = 0.20,
+    max_quality_drop: float = 0.02,
+    min_latency_delta_ms: float = 1.0
+) -> List[str]:
+    """
+    Regresiones del reporte frente al baseline
+
+    Latencia: p95 sube más de max_latency_regression (relativo) y más de
+    min_latency_delta_ms (absoluto, evita falsos positivos por ruido).
+    Calidad: recall@k o MRR bajan más de max_quality_drop (absoluto).
+    """
+    regressions = []
+    for name, current in report.get("results", {}).items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "error" in previous:
+            continue
+        if "error" in current:
+            regressions.append(f"{name}: falló ({current['error']})")
+            continue
+
+        old_p95 = previous["latency_ms"]["p95"]
+        new_p95 = current["latency_ms"]["p95"]
+        if new_p95 - old_p95 > min_latency_delta_ms and new_p95 > old_p95 * (1 + max_latency_regression):
+            regressions.append(f"{name}: p95 {old_p95}ms → {new_p95}ms")
+
+        for metric, old_value in previous["quality"].items():
+            if metric == "cases" or metric not in current["quality"]:
+                continue
+            new_value = current["quality"][metric]
+            if old_value - new_value > max_quality_drop:
+                regressions.append(f"{name}: {metric} {old_value} → {new_value}")
+    return regressions
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Flat, copy-on-write friendly layout for the search indexes
+Chunks and BM25 postings live in a few NumPy buffers instead of Python object
+graphs, so gunicorn workers forked after preload share the pages (refcount
+updates never touch them) and the arrays can be memory-mapped from disk.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+ArrayMap = Dict[str, np.ndarray]
+
+
+def pack_strings(values: Sequence[str]) -> ArrayMap:
+    """UTF-8 buffer plus int64 offsets (len(values) + 1)"""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8) if encoded else np.zeros(0, dtype=np.uint8)
+    return {"data": data, "offsets": offsets}
+
+
+class FlatStrings:
+    """Read-only sequence of strings over a packed UTF-8 buffer"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        raw = self.data.tobytes()
+        for index in range(len(self)):
+            yield raw[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+
+class FlatChunkStore:
+    """
+    Read-only sequence of chunk dicts backed by one byte buffer
+
+    Each chunk is stored as JSON; only the chunks a query returns are decoded.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_chunks(cls, chunks: Sequence[Any]) -> "FlatChunkStore":
+        packed = pack_strings([json.dumps(chunk, ensure_ascii=False, default=str) for chunk in chunks])
+        return cls(packed["data"], packed["offsets"])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return json.loads(self.data[start:end].tobytes().decode("utf-8"))
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes + self.offsets.nbytes)
+
+    def to_arrays(self) -> ArrayMap:
+        return {"data": self.data, "offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays: ArrayMap) -> "FlatChunkStore":
+        return cls(arrays["data"], arrays["offsets"])
+
+
+class CSRPostings:
+    """
+    BM25 postings in CSR form (term -> doc ids, term frequencies)
+
+    Scores match rank_bm25.BM25Okapi.get_scores: documents without the term
+    contribute exactly zero there, so only the posting lists are visited.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], indptr: np.ndarray, doc_ids: np.ndarray,
+                 term_freqs: np.ndarray, idf: np.ndarray, doc_len: np.ndarray,
+                 avgdl: float, k1: float, b: float):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.idf = idf
+        self.doc_len = doc_len
+        self.avgdl = float(avgdl)
+        self.k1 = float(k1)
+        self.b = float(b)
+
+    @classmethod
+    def from_bm25(cls, bm25: Any) -> "CSRPostings":
+        """Build from a fitted BM25Okapi (doc_freqs, idf, doc_len, avgdl, k1, b)"""
+        postings: Dict[str, List[tuple]] = {}
+        for doc_id, freqs in enumerate(bm25.doc_freqs):
+            for term, freq in freqs.items():
+                postings.setdefault(term, []).append((doc_id, freq))
+
+        terms = sorted(postings)
+        vocabulary = {term: index for index, term in enumerate(terms)}
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[term]) for term in terms], out=indptr[1:])
+        doc_ids = np.fromiter((doc for term in terms for doc, _ in postings[term]), dtype=np.int32, count=int(indptr[-1]))
+        term_freqs = np.fromiter((freq for term in terms for _, freq in postings[term]), dtype=np.float64, count=int(indptr[-1]))
+        idf = np.array([bm25.idf.get(term) or 0.0 for term in terms], dtype=np.float64)
+
+        return cls(vocabulary, indptr, doc_ids, term_freqs, idf,
+                   np.asarray(bm25.doc_len, dtype=np.float64), bm25.avgdl, bm25.k1, bm25.b)
+
+    @property
+    def corpus_size(self) -> int:
+        return len(self.doc_len)
+
+    def get_scores(self, query_tokens: Sequence[str], doc_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """BM25 scores of every document, or only of the sorted unique doc_ids (aligned to them)"""
+        if doc_ids is None:
+            scores = np.zeros(self.corpus_size, dtype=np.float64)
+        else:
+            doc_ids = np.asarray(doc_ids, dtype=self.doc_ids.dtype)
+            scores = np.zeros(len(doc_ids), dtype=np.float64)
+        for token in query_tokens:
+            term = self.vocabulary.get(token)
+            if term is None:
+                continue
+            start, end = self.indptr[term], self.indptr[term + 1]
+            if doc_ids is None:
+                docs = self.doc_ids[start:end]
+                freqs = self.term_freqs[start:end]
+                targets = docs
+            else:
+                # Intersect the posting list with the allowed ids, probing from the shorter side
+                posting = self.doc_ids[start:end]
+                if len(doc_ids) < len(posting):
+                    found = np.minimum(np.searchsorted(posting, doc_ids), len(posting) - 1)
+                    hit = posting[found] == doc_ids
+                    targets = np.flatnonzero(hit)
+                    found = found[hit]
+                else:
+                    targets = np.minimum(np.searchsorted(doc_ids, posting), max(len(doc_ids) - 1, 0))
+                    found = np.flatnonzero(doc_ids[targets] == posting) if len(doc_ids) else targets[:0]
+                    targets = targets[found]
+                if not len(found):
+                    continue
+                docs = posting[found]
+                freqs = self.term_freqs[start:end][found]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[docs] / self.avgdl)
+            scores[targets] += self.idf[term] * (freqs * (self.k1 + 1) / (freqs + norm))
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(array.nbytes for array in (self.indptr, self.doc_ids, self.term_freqs, self.idf, self.doc_len)))
+
+    def to_arrays(self) -> ArrayMap:
+        terms = [None] * len(self.vocabulary)
+        for term, index in self.vocabulary.items():
+            terms[index] = term
+        packed = pack_strings(terms)
+        return {
+            "terms_data": packed["data"], "terms_offsets": packed["offsets"],
+            "indptr": self.indptr, "doc_ids": self.doc_ids, "term_freqs": self.term_freqs,
+            "idf": self.idf, "doc_len": self.doc_len,
+            "params": np.array([self.avgdl, self.k1, self.b], dtype=np.float64)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: ArrayMap) -> "CSRPostings":
+        terms = FlatStrings(arrays["terms_data"], arrays["terms_offsets"])
+        avgdl, k1, b = (float(value) for value in arrays["params"])
+        return cls({term: index for index, term in enumerate(terms)}, arrays["indptr"], arrays["doc_ids"],
+                   arrays["term_freqs"], arrays["idf"], arrays["doc_len"], avgdl, k1, b)
+
+
+def save_arrays(directory: Path, arrays: ArrayMap) -> None:
+    """One .npy file per array, loadable with memory mapping"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(directory / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+
+
+def load_arrays(directory: Path, names: Sequence[str], mmap: bool = True) -> ArrayMap:
+    """Load arrays written by save_arrays; mmap shares the page cache across processes"""
+    directory = Path(directory)
+    mode = "r" if mmap else None
+    return {name: np.load(directory / f"{name}.npy", mmap_mode=mode, allow_pickle=False) for name in names}
+
+
+def as_shared_matrix(matrix: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Contiguous, read-only view of a dense matrix (embeddings)"""
+    if matrix is None:
+        return None
+    matrix = np.ascontiguousarray(matrix)
+    matrix.setflags(write=False)
+    return matrix
+
@@ -11,10 +11,13 @@ import pickle
 import time
 import re
 import logging
+import numpy as np
 from typing import List, Dict, Any, Optional
-from pathlib import Path
 from rank_bm25 import BM25Okapi
 
+from src.core.performance.shared_index import CSRPostings, FlatChunkStore
+from src.core.retrieval.index_snapshot import IndexSnapshot, is_snapshot, resolve_index_path
+
 
 class BM25Retriever:
     """
@@ -25,8 +28,8 @@ class BM25Retriever:
     
     Attributes:
         vectorstore_path (str): Path to the BM25 vectorstore file
-        bm25 (BM25Okapi): BM25 model instance
-        chunks (List[Dict]): Document chunks for retrieval
+        postings (CSRPostings): BM25 postings in flat NumPy buffers
+        chunks (FlatChunkStore): Document chunks for retrieval
         logger (logging.Logger): Logger instance for debugging
     """
     
@@ -35,15 +38,16 @@ class BM25Retriever:
         Initialize the BM25 retriever.
         
         Args:
-            vectorstore_path (str): Path to the BM25 vectorstore pickle file
+            vectorstore_path (str): Path to the BM25 vectorstore pickle file or
+                snapshot directory (a sibling <name>.snapshot/ is preferred)
             
         Raises:
             FileNotFoundError: If the vectorstore file doesn't exist
             ValueError: If the vectorstore is corrupted or invalid
         """
-        self.vectorstore_path = Path(vectorstore_path)
-        self.bm25: Optional[BM25Okapi] = None
-        self.chunks: List[Dict[str, Any]] = []
+        self.vectorstore_path = resolve_index_path(vectorstore_path)
+        self.postings: Optional[CSRPostings] = None
+        self.chunks: FlatChunkStore = FlatChunkStore.from_chunks([])
         self.logger = self._setup_logging()
         
         if not self.vectorstore_path.exists():
@@ -77,31 +81,44 @@ class BM25Retriever:
             ValueError: If the vectorstore is corrupted or missing required components
         """
         try:
+            if is_snapshot(self.vectorstore_path):
+                snapshot = IndexSnapshot(self.vectorstore_path)
+                self.postings = CSRPostings.from_arrays(snapshot.arrays('bm25'))
+                self.chunks = FlatChunkStore.from_arrays(snapshot.arrays('chunks'))
+                self.logger.info(f"BM25 snapshot loaded with {len(self.chunks)} chunks")
+                return
+            
             with open(self.vectorstore_path, 'rb') as f:
                 vectorstore = pickle.load(f)
             
-            self.bm25 = vectorstore.get('bm25_index')
-            self.chunks = vectorstore.get('chunks', [])
+            bm25: Optional[BM25Okapi] = vectorstore.get('bm25_index')
+            chunks = vectorstore.get('chunks', [])
             
-            if not self.bm25:
+            if not bm25:
                 raise ValueError("BM25 model not found in vectorstore")
             
-            if not self.chunks:
+            if not chunks:
                 raise ValueError("No chunks found in vectorstore")
             
+            # Flat buffers instead of the unpickled object graph (shared after fork)
+            self.postings = CSRPostings.from_bm25(bm25)
+            self.chunks = FlatChunkStore.from_chunks(chunks)
+            
             self.logger.info(f"BM25 vectorstore loaded with {len(self.chunks)} chunks")
             
         except Exception as e:
             self.logger.error(f"Error loading vectorstore: {e}")
             raise ValueError(f"Failed to load vectorstore: {e}")
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query: str, top_k: int = 5, doc_ids: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Perform BM25 search on the document collection.
         
         Args:
             query (str): Search query string
             top_k (int): Number of top results to return
+            doc_ids (np.ndarray, optional): Sorted chunk ids allowed by a metadata
+                filter; only these are scored
             
         Returns:
             List[Dict[str, Any]]: List of search results with scores and metadata
@@ -112,7 +129,7 @@ class BM25Retriever:
             >>> for result in results:
             ...     print(f"Score: {result['score']}, Text: {result['texto'][:100]}...")
         """
-        if not self.bm25 or not self.chunks:
+        if self.postings is None or not len(self.chunks):
             self.logger.warning("BM25 model or chunks not available")
             return []
         
@@ -124,24 +141,22 @@ class BM25Retriever:
             query_tokens = self._preprocess_text(query).split()
             self.logger.debug(f"Preprocessed query tokens: {query_tokens}")
             
-            # Get BM25 scores
-            scores = self.bm25.get_scores(query_tokens)
+            # Get BM25 scores (only for the allowed ids when a filter was pushed down)
+            scores = self.postings.get_scores(query_tokens, doc_ids)
+            ids = np.arange(len(scores)) if doc_ids is None else np.asarray(doc_ids)
             
-            # Get top-k indices
-            top_indices = sorted(
-                range(len(scores)), 
-                key=lambda i: scores[i], 
-                reverse=True
-            )[:top_k]
+            # Get top-k positions (stable: ties keep chunk order)
+            top_positions = np.argsort(-scores, kind='stable')[:top_k]
             
             # Format results
             results = []
-            for idx in top_indices:
-                if scores[idx] > 0:  # Only include results with positive scores
+            for position in top_positions:
+                idx = int(ids[position])
+                if scores[position] > 0:  # Only include results with positive scores
                     chunk = self.chunks[idx]
                     
                     result = {
-                        'score': float(scores[idx]),
+                        'score': float(scores[position]),
                         'texto': str(chunk.get('texto', chunk.get('text', ''))),
                         'titulo': str(chunk.get('titulo', chunk.get('title', f'Result {idx+1}'))),
                         'metadatos': chunk.get('metadatos', {}),
@@ -203,7 +218,8 @@ class BM25Retriever:
             'chunk_count': len(self.chunks),
             'vectorstore_path': str(self.vectorstore_path),
             'model_type': 'BM25Okapi',
-            'has_model': self.bm25 is not None
+            'has_model': self.postings is not None,
+            'index_bytes': (self.postings.nbytes if self.postings else 0) + self.chunks.nbytes
         }
 
 
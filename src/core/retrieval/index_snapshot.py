@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Versioned, checksummed index snapshots
+A snapshot is a directory with a JSON manifest and one file per array: raw
+.bin blobs for UTF-8 text (chunks, vocabulary) and .npy for numeric arrays.
+Segments are memory-mapped without unpickling anything. Loading checks each
+segment's size, dtype and shape; hashing every segment against its SHA-256 is
+opt-in (MINEDU_SNAPSHOT_VERIFY=1, or the verify command) because it reads the
+whole index. Snapshots converted from a pickle record its size, mtime and
+SHA-256; once the pickle is rebuilt the snapshot is stale and the pickle is
+loaded instead until it is reconverted.
+
+Convert the existing pickle vectorstores (trusted, offline) with:
+
+    python -m src.core.retrieval.index_snapshot convert data/vectorstores/bm25.pkl
+
+and check a deployed snapshot with:
+
+    python -m src.core.retrieval.index_snapshot verify data/vectorstores/bm25.snapshot
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.core.performance.shared_index import ArrayMap, CSRPostings, FlatChunkStore, pack_strings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = "minedu-index-snapshot"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_SUFFIX = ".snapshot"
+
+KINDS = ("bm25", "tfidf", "transformer")
+
+# Analyzer of the TF-IDF retriever; stored in the manifest and used to rebuild the vectorizer
+TFIDF_CONFIG = {
+    "max_features": 10000,
+    "stop_words": None,
+    "ngram_range": [1, 2],
+    "min_df": 1,
+    "max_df": 0.95,
+}
+
+PathLike = Union[str, Path]
+
+# Stale snapshots already reported (warn once per path)
+_stale_warned: set = set()
+
+# SHA-256 of source pickles already hashed: path -> (bytes, mtime_ns, sha256)
+_source_digests: Dict[Path, Tuple[int, int, str]] = {}
+
+
+def verify_on_load() -> bool:
+    """Whether snapshots hash every segment when loaded (MINEDU_SNAPSHOT_VERIFY)"""
+    return os.getenv("MINEDU_SNAPSHOT_VERIFY", "").lower() in ("1", "true", "yes")
+
+
+class SnapshotError(ValueError):
+    """Invalid, incompatible or corrupted snapshot"""
+
+
+def _sha256_file(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_snapshot(path: PathLike) -> bool:
+    return (Path(path) / MANIFEST_FILE).is_file()
+
+
+def _source_sha256(path: Path, stat: os.stat_result) -> str:
+    """SHA-256 of a source pickle, hashed once per (size, mtime)"""
+    cached = _source_digests.get(path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = _sha256_file(path)
+    _source_digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def source_fingerprint(path: PathLike) -> Dict[str, Any]:
+    """Size, mtime and SHA-256 of the pickle a snapshot is converted from"""
+    path = Path(path)
+    stat = path.stat()
+    return {"file": path.name, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "sha256": _source_sha256(path, stat)}
+
+
+def is_stale(snapshot_dir: PathLike, source: PathLike) -> bool:
+    """True if the source pickle changed after the snapshot was converted from it"""
+    snapshot_dir, source = Path(snapshot_dir), Path(source)
+    try:
+        stat = source.stat()
+    except OSError:
+        return False  # no pickle next to it: the snapshot is the index
+    try:
+        with open(snapshot_dir / MANIFEST_FILE, encoding="utf-8") as f:
+            recorded = json.load(f).get("source")
+    except (OSError, ValueError):
+        return True
+    if not recorded:
+        # Snapshots written before provenance was recorded: compare timestamps
+        return stat.st_mtime_ns > (snapshot_dir / MANIFEST_FILE).stat().st_mtime_ns
+    if stat.st_size != recorded.get("bytes"):
+        return True
+    if stat.st_mtime_ns == recorded.get("mtime_ns"):
+        return False
+    return _source_sha256(source, stat) != recorded.get("sha256")  # touched: compare contents
+
+
+def resolve_index_path(path: PathLike) -> Path:
+    """
+    Snapshot directory for a vectorstore path: the path itself or a sibling
+    <name>.snapshot/ that is not stale with respect to the pickle
+    """
+    path = Path(path)
+    if is_snapshot(path):
+        return path
+    sibling = path.with_name(path.stem + SNAPSHOT_SUFFIX)
+    if not is_snapshot(sibling):
+        return path
+    if is_stale(sibling, path):
+        if sibling not in _stale_warned:
+            _stale_warned.add(sibling)
+            logger.warning(f"⚠️ Snapshot {sibling} is older than {path.name}; loading the pickle "
+                           f"(reconvert with: python -m src.core.retrieval.index_snapshot convert {path})")
+        return path
+    return sibling
+
+
+def write_snapshot(directory: PathLike, kind: str, arrays: ArrayMap, metadata: Optional[Dict[str, Any]] = None,
+                   replace: bool = False) -> Dict[str, Any]:
+    """
+    Write a snapshot and return its manifest
+
+    Files are written into a temporary sibling directory that is renamed into
+    place once complete, so readers never see a partial snapshot. Existing
+    snapshots are only replaced with replace=True: the old directory is moved
+    aside and removed, and processes that still map its files keep reading
+    them until they unmap (POSIX unlink semantics).
+    """
+    if kind not in KINDS:
+        raise SnapshotError(f"unknown snapshot kind: {kind}")
+    directory = Path(directory)
+    if directory.exists() and not replace:
+        raise SnapshotError(f"snapshot already exists: {directory}")
+
+    staging = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    try:
+        segments = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.dtype == np.uint8 and array.ndim == 1:
+                file_name, file_format = f"{name}.bin", "bin"
+                (staging / file_name).write_bytes(array.tobytes())
+            else:
+                file_name, file_format = f"{name}.npy", "npy"
+                np.save(staging / file_name, array, allow_pickle=False)
+            segments[name] = {
+                "file": file_name,
+                "format": file_format,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "bytes": (staging / file_name).stat().st_size,
+                "sha256": _sha256_file(staging / file_name),
+            }
+
+        manifest = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "kind": kind,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **(metadata or {}),
+            "segments": segments,
+        }
+        with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        if directory.exists():
+            retired = directory.with_name(f"{directory.name}.old-{os.getpid()}")
+            os.replace(directory, retired)
+            os.replace(staging, directory)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    logger.info(f"💾 {kind} snapshot written to {directory} ({len(segments)} segments)")
+    return manifest
+
+
+class IndexSnapshot:
+    """
+    Read-only view of a snapshot directory
+
+    Arrays are memory-mapped (the page cache is shared by every process that
+    maps them). Size, dtype and shape are always checked; with verify=True a
+    segment is also hashed on first access and rejected if it does not match
+    the manifest. verify=None follows MINEDU_SNAPSHOT_VERIFY.
+    """
+
+    def __init__(self, directory: PathLike, verify: Optional[bool] = None):
+        self.directory = Path(directory)
+        self.verify = verify_on_load() if verify is None else verify
+        try:
+            with open(self.directory / MANIFEST_FILE, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"unreadable snapshot manifest in {self.directory}: {e}") from e
+
+        if self.manifest.get("format") != FORMAT_NAME:
+            raise SnapshotError(f"not an index snapshot: {self.directory}")
+        version = self.manifest.get("format_version")
+        if not isinstance(version, int) or version > FORMAT_VERSION:
+            raise SnapshotError(f"unsupported snapshot format version {version} (max {FORMAT_VERSION})")
+        for name, segment in self.segments.items():
+            file_name = segment.get("file", "")
+            if Path(file_name).name != file_name or file_name in ("", ".", ".."):
+                raise SnapshotError(f"invalid file name for segment {name}: {file_name!r}")
+            if segment.get("format") not in ("bin", "npy"):
+                raise SnapshotError(f"invalid format for segment {name}: {segment.get('format')!r}")
+
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def kind(self) -> str:
+        return self.manifest["kind"]
+
+    @property
+    def segments(self) -> Dict[str, Dict[str, Any]]:
+        return self.manifest.get("segments", {})
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment["bytes"] for segment in self.segments.values())
+
+    def array(self, name: str) -> np.ndarray:
+        """Memory-mapped segment, verified on first access"""
+        if name in self._arrays:
+            return self._arrays[name]
+        with self._lock:
+            if name not in self._arrays:
+                self._arrays[name] = self._open(name)
+        return self._arrays[name]
+
+    def arrays(self, prefix: str) -> ArrayMap:
+        """Segments named <prefix>_<key>, keyed by <key>"""
+        head = f"{prefix}_"
+        return {name[len(head):]: self.array(name) for name in self.segments if name.startswith(head)}
+
+    def verify_all(self) -> None:
+        for name in self.segments:
+            self.array(name)
+
+    def _open(self, name: str) -> np.ndarray:
+        segment = self.segments.get(name)
+        if segment is None:
+            raise SnapshotError(f"segment {name} not found in {self.directory}")
+        path = self.directory / segment["file"]
+        if not path.is_file():
+            raise SnapshotError(f"missing segment file: {path}")
+        if path.stat().st_size != segment["bytes"]:
+            raise SnapshotError(f"size mismatch for segment {name}")
+        if self.verify and _sha256_file(path) != segment["sha256"]:
+            raise SnapshotError(f"checksum mismatch for segment {name}")
+
+        if segment["format"] == "bin":
+            # np.memmap cannot map an empty file
+            array = np.memmap(path, dtype=np.uint8, mode="r") if segment["bytes"] else np.zeros(0, dtype=np.uint8)
+        else:
+            array = np.load(path, mmap_mode="r", allow_pickle=False)
+
+        if array.dtype.str != segment["dtype"] or list(array.shape) != segment["shape"]:
+            raise SnapshotError(f"dtype/shape mismatch for segment {name}")
+        return array
+
+
+def _prefixed(prefix: str, arrays: ArrayMap) -> ArrayMap:
+    return {f"{prefix}_{key}": array for key, array in arrays.items()}
+
+
+def write_bm25_snapshot(directory: PathLike, postings: CSRPostings, chunks: FlatChunkStore,
+                        source: Optional[Dict[str, Any]] = None, replace: bool = False) -> Dict[str, Any]:
+    return write_snapshot(directory, "bm25", {**_prefixed("chunks", chunks.to_arrays()),
+                                              **_prefixed("bm25", postings.to_arrays())}, {
+        "counts": {"chunks": len(chunks), "terms": len(postings.vocabulary)},
+        "analyzer": {"lowercase": True, "tokenizer": "whitespace"},
+        "params": {"k1": postings.k1, "b": postings.b, "avgdl": postings.avgdl},
+        **({"source": source} if source else {}),
+    }, replace=replace)
+
+
+def write_tfidf_snapshot(directory: PathLike, vectorizer: Any, matrix: Any, chunks: FlatChunkStore,
+                         source: Optional[Dict[str, Any]] = None, replace: bool = False) -> Dict[str, Any]:
+    """Vectorizer state (vocabulary, idf) and the CSR document matrix"""
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+    packed = pack_strings(terms)
+    matrix = matrix.tocsr()
+    return write_snapshot(directory, "tfidf", {
+        **_prefixed("chunks", chunks.to_arrays()),
+        "tfidf_terms_data": packed["data"], "tfidf_terms_offsets": packed["offsets"],
+        "tfidf_idf": np.asarray(vectorizer.idf_, dtype=np.float64),
+        "tfidf_data": matrix.data, "tfidf_indices": matrix.indices, "tfidf_indptr": matrix.indptr,
+    }, {
+        "counts": {"chunks": len(chunks), "terms": len(terms)},
+        "analyzer": TFIDF_CONFIG,
+        "params": {"shape": list(matrix.shape)},
+        **({"source": source} if source else {}),
+    }, replace=replace)
+
+
+def write_transformer_snapshot(directory: PathLike, embeddings: np.ndarray, chunks: FlatChunkStore,
+                               model_name: str, source: Optional[Dict[str, Any]] = None,
+                               replace: bool = False) -> Dict[str, Any]:
+    embeddings = np.asarray(embeddings)
+    return write_snapshot(directory, "transformer", {
+        **_prefixed("chunks", chunks.to_arrays()),
+        "embeddings": embeddings,
+    }, {
+        "counts": {"chunks": len(chunks), "dimension": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0},
+        "model_name": model_name,
+        **({"source": source} if source else {}),
+    }, replace=replace)
+
+
+def detect_kind(vectorstore: Dict[str, Any]) -> str:
+    if "bm25_index" in vectorstore:
+        return "bm25"
+    if "embeddings" in vectorstore:
+        return "transformer"
+    return "tfidf"
+
+
+def convert_pickle(pickle_path: PathLike, output_dir: Optional[PathLike] = None,
+                   kind: Optional[str] = None) -> Path:
+    """
+    Convert a pickle vectorstore into a snapshot (default: sibling <name>.snapshot/)
+
+    An existing snapshot is rebuilt only if it is stale with respect to the
+    pickle. Unpickling runs arbitrary code: only convert vectorstores you built.
+    """
+    pickle_path = Path(pickle_path)
+    output_dir = Path(output_dir) if output_dir else pickle_path.with_name(pickle_path.stem + SNAPSHOT_SUFFIX)
+    replace = output_dir.exists()
+    if replace and not is_stale(output_dir, pickle_path):
+        raise SnapshotError(f"snapshot already up to date: {output_dir}")
+    source = source_fingerprint(pickle_path)
+    with open(pickle_path, "rb") as f:
+        vectorstore = pickle.load(f)
+    options = {"source": source, "replace": replace}
+
+    kind = kind or detect_kind(vectorstore)
+    chunks = vectorstore.get("chunks") or []
+    if not chunks:
+        raise SnapshotError(f"no chunks found in {pickle_path}")
+    store = FlatChunkStore.from_chunks(chunks)
+
+    if kind == "bm25":
+        write_bm25_snapshot(output_dir, CSRPostings.from_bm25(vectorstore["bm25_index"]), store, **options)
+    elif kind == "tfidf":
+        # Same fit as TFIDFRetriever, so the snapshot answers exactly like the pickle did
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        texts = [chunk.get("texto", chunk.get("text", "")) if isinstance(chunk, dict) else str(chunk)
+                 for chunk in chunks]
+        vectorizer = TfidfVectorizer(**tfidf_params())
+        matrix = vectorizer.fit_transform(texts)
+        write_tfidf_snapshot(output_dir, vectorizer, matrix, store, **options)
+    elif kind == "transformer":
+        write_transformer_snapshot(output_dir, vectorstore["embeddings"], store, vectorstore["model_name"], **options)
+    else:
+        raise SnapshotError(f"unknown snapshot kind: {kind}")
+    return output_dir
+
+
+def tfidf_params(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """TfidfVectorizer keyword arguments from an analyzer config (JSON lists back to tuples)"""
+    params = dict(config or TFIDF_CONFIG)
+    params["ngram_range"] = tuple(params["ngram_range"])
+    return params
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Index snapshot tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="convert pickle vectorstores into snapshots")
+    convert.add_argument("pickles", nargs="+")
+    convert.add_argument("--output", help="output directory (single input only)")
+    convert.add_argument("--kind", choices=KINDS)
+    verify = commands.add_parser("verify", help="verify every segment checksum")
+    verify.add_argument("snapshots", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "convert":
+        if args.output and len(args.pickles) > 1:
+            parser.error("--output requires a single input")
+        for pickle_path in args.pickles:
+            print(convert_pickle(pickle_path, args.output, args.kind))
+        return 0
+
+    status = 0
+    for directory in args.snapshots:
+        try:
+            IndexSnapshot(directory, verify=True).verify_all()
+            print(f"OK {directory}")
+        except SnapshotError as e:
+            print(f"FAIL {directory}: {e}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,11 +12,13 @@ import time
 import re
 import logging
 from typing import List, Dict, Any, Optional
-from pathlib import Path
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import csr_matrix
 import numpy as np
 from src.core.config.security_config import SecurityConfig
+from src.core.performance.shared_index import FlatChunkStore, FlatStrings
+from src.core.retrieval.index_snapshot import IndexSnapshot, is_snapshot, resolve_index_path, tfidf_params
 
 
 class TFIDFRetriever:
@@ -28,7 +30,7 @@ class TFIDFRetriever:
     
     Attributes:
         vectorstore_path (str): Path to the TF-IDF vectorstore file
-        chunks (List[Dict]): Document chunks for retrieval
+        chunks (FlatChunkStore): Document chunks for retrieval
         tfidf_vectorizer (TfidfVectorizer): TF-IDF vectorizer instance
         tfidf_matrix: TF-IDF matrix of document vectors
         logger (logging.Logger): Logger instance for debugging
@@ -39,14 +41,15 @@ class TFIDFRetriever:
         Initialize the TF-IDF retriever.
         
         Args:
-            vectorstore_path (str): Path to the TF-IDF vectorstore pickle file
+            vectorstore_path (str): Path to the TF-IDF vectorstore pickle file or
+                snapshot directory (a sibling <name>.snapshot/ is preferred)
             
         Raises:
             FileNotFoundError: If the vectorstore file doesn't exist
             ValueError: If the vectorstore is corrupted or invalid
         """
-        self.vectorstore_path = Path(vectorstore_path)
-        self.chunks: List[Dict[str, Any]] = []
+        self.vectorstore_path = resolve_index_path(vectorstore_path)
+        self.chunks: FlatChunkStore = FlatChunkStore.from_chunks([])
         self.tfidf_vectorizer: Optional[TfidfVectorizer] = None
         self.tfidf_matrix = None
         self.logger = self._setup_logging()
@@ -82,17 +85,21 @@ class TFIDFRetriever:
             ValueError: If the vectorstore is corrupted or missing required components
         """
         try:
+            if is_snapshot(self.vectorstore_path):
+                self._load_snapshot(IndexSnapshot(self.vectorstore_path))
+                return
+            
             with open(self.vectorstore_path, 'rb') as f:
                 vectorstore = pickle.load(f)
             
-            self.chunks = vectorstore.get('chunks', [])
+            chunks = vectorstore.get('chunks', [])
             
-            if not self.chunks:
+            if not chunks:
                 raise ValueError("No chunks found in vectorstore")
             
             # Prepare texts for TF-IDF
             texts = []
-            for chunk in self.chunks:
+            for chunk in chunks:
                 if isinstance(chunk, dict):
                     text = chunk.get('texto', chunk.get('text', ''))
                 else:
@@ -100,17 +107,19 @@ class TFIDFRetriever:
                 texts.append(text)
             
             # Initialize TF-IDF vectorizer
-            self.tfidf_vectorizer = TfidfVectorizer(
-                max_features=10000,
-                stop_words=None,  # Keep Spanish stop words for now
-                ngram_range=(1, 2),  # Use unigrams and bigrams
-                min_df=1,
-                max_df=0.95
-            )
+            # Unigrams and bigrams, Spanish stop words kept (see TFIDF_CONFIG)
+            self.tfidf_vectorizer = TfidfVectorizer(**tfidf_params())
             
             # Fit and transform the texts
             self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts)
             
+            # stop_words_ only documents the pruned terms and can dwarf the vocabulary
+            self.tfidf_vectorizer.stop_words_ = None
+            
+            # Flat buffers instead of the unpickled chunk dicts (shared after fork);
+            # the CSR matrix is already three NumPy arrays
+            self.chunks = FlatChunkStore.from_chunks(chunks)
+            
             self.logger.info(f"TF-IDF vectorstore loaded with {len(self.chunks)} chunks")
             self.logger.info(f"TF-IDF matrix shape: {self.tfidf_matrix.shape}")
             
@@ -118,13 +127,33 @@ class TFIDFRetriever:
             self.logger.error(f"Error loading vectorstore: {e}")
             raise ValueError(f"Failed to load vectorstore: {e}")
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def _load_snapshot(self, snapshot: IndexSnapshot) -> None:
+        """
+        Restore the fitted vectorizer and the document matrix from a snapshot.
+        
+        Args:
+            snapshot (IndexSnapshot): TF-IDF snapshot (no refit, no unpickling)
+        """
+        terms = FlatStrings(snapshot.array('tfidf_terms_data'), snapshot.array('tfidf_terms_offsets'))
+        self.tfidf_vectorizer = TfidfVectorizer(**tfidf_params(snapshot.manifest.get('analyzer')))
+        self.tfidf_vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        self.tfidf_vectorizer.idf_ = np.asarray(snapshot.array('tfidf_idf'))
+        self.tfidf_matrix = csr_matrix(
+            (snapshot.array('tfidf_data'), snapshot.array('tfidf_indices'), snapshot.array('tfidf_indptr')),
+            shape=tuple(snapshot.manifest['params']['shape'])
+        )
+        self.chunks = FlatChunkStore.from_arrays(snapshot.arrays('chunks'))
+        self.logger.info(f"TF-IDF snapshot loaded with {len(self.chunks)} chunks")
+    
+    def search(self, query: str, top_k: int = 5, doc_ids: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Perform TF-IDF search on the document collection.
         
         Args:
             query (str): Search query string
             top_k (int): Number of top results to return
+            doc_ids (np.ndarray, optional): Sorted chunk ids allowed by a metadata
+                filter; only their rows are scored
             
         Returns:
             List[Dict[str, Any]]: List of search results with scores and metadata
@@ -150,20 +179,25 @@ class TFIDFRetriever:
             # Transform query to TF-IDF vector
             query_vector = self.tfidf_vectorizer.transform([processed_query])
             
-            # Calculate cosine similarity
-            similarities = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
+            # Calculate cosine similarity (only against the allowed rows when filtered)
+            ids = np.arange(self.tfidf_matrix.shape[0]) if doc_ids is None else np.asarray(doc_ids)
+            matrix = self.tfidf_matrix if doc_ids is None else self.tfidf_matrix[ids]
+            if not len(ids):
+                return []
+            similarities = cosine_similarity(query_vector, matrix).flatten()
             
-            # Get top-k indices
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            # Get top-k positions
+            top_positions = np.argsort(similarities)[::-1][:top_k]
             
             # Format results
             results = []
-            for idx in top_indices:
-                if similarities[idx] > 0:  # Only include results with positive similarity
+            for position in top_positions:
+                idx = int(ids[position])
+                if similarities[position] > 0:  # Only include results with positive similarity
                     chunk = self.chunks[idx]
                     
                     result = {
-                        'score': float(similarities[idx]),
+                        'score': float(similarities[position]),
                         'texto': str(chunk.get('texto', chunk.get('text', ''))),
                         'titulo': str(chunk.get('titulo', chunk.get('title', f'Result {idx+1}'))),
                         'metadatos': chunk.get('metadatos', {}),
@@ -231,7 +265,11 @@ class TFIDFRetriever:
             'model_type': 'TF-IDF',
             'vocabulary_size': vocab_size,
             'matrix_shape': matrix_shape,
-            'has_model': self.tfidf_vectorizer is not None
+            'has_model': self.tfidf_vectorizer is not None,
+            'index_bytes': self.chunks.nbytes + (
+                self.tfidf_matrix.data.nbytes + self.tfidf_matrix.indices.nbytes + self.tfidf_matrix.indptr.nbytes
+                if self.tfidf_matrix is not None else 0
+            )
         }
 
 
@@ -11,11 +11,14 @@ import pickle
 import time
 import logging
 from typing import List, Dict, Any, Optional
-from pathlib import Path
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from src.core.performance.quantization import apply_precision
+from src.core.performance.shared_index import FlatChunkStore, as_shared_matrix
+from src.core.retrieval.index_snapshot import IndexSnapshot, is_snapshot, resolve_index_path
+
 
 class TransformerRetriever:
     """
@@ -27,8 +30,8 @@ class TransformerRetriever:
     Attributes:
         vectorstore_path (str): Path to the transformer vectorstore file
         model (SentenceTransformer): Sentence transformer model instance
-        chunks (List[Dict]): Document chunks for retrieval
-        embeddings (np.ndarray): Pre-computed document embeddings
+        chunks (FlatChunkStore): Document chunks for retrieval
+        embeddings (np.ndarray): Pre-computed document embeddings (contiguous, read-only)
         logger (logging.Logger): Logger instance for debugging
     """
     
@@ -37,27 +40,33 @@ class TransformerRetriever:
         vectorstore_path: str,
         model_name: Optional[str] = None,
         fallback_model: str = 'paraphrase-multilingual-MiniLM-L12-v2',
-        device: str = 'cpu'
+        device: str = 'cpu',
+        precision: Optional[str] = None
     ):
         """
         Initialize the transformer retriever.
         
         Args:
-            vectorstore_path (str): Path to the transformer vectorstore pickle file
+            vectorstore_path (str): Path to the transformer vectorstore pickle file or
+                snapshot directory (a sibling <name>.snapshot/ is preferred)
             model_name (Optional[str]): Name of the transformer model to use
             fallback_model (str): Fallback model if the primary model fails
             device (str): Device to run the model on ('cpu' or 'cuda')
+            precision (Optional[str]): 'fp32' or 'int8' (dynamic quantization, CPU only);
+                None uses the per-model setting of ModelManager
             
         Raises:
             FileNotFoundError: If the vectorstore file doesn't exist
             ValueError: If the vectorstore is corrupted or invalid
         """
-        self.vectorstore_path = Path(vectorstore_path)
+        self.vectorstore_path = resolve_index_path(vectorstore_path)
         self.fallback_model = fallback_model
         self.device = device
+        self.precision = precision
         self.model: Optional[SentenceTransformer] = None
-        self.chunks: List[Dict[str, Any]] = []
+        self.chunks: FlatChunkStore = FlatChunkStore.from_chunks([])
         self.embeddings: Optional[np.ndarray] = None
+        self.vectorstore_model_name: Optional[str] = None
         self.logger = self._setup_logging()
         
         if not self.vectorstore_path.exists():
@@ -95,6 +104,15 @@ class TransformerRetriever:
             self.logger.info(f"Loading vectorstore from {self.vectorstore_path}")
             start_time = time.time()
             
+            if is_snapshot(self.vectorstore_path):
+                # Embeddings stay memory-mapped (read-only, shared page cache)
+                snapshot = IndexSnapshot(self.vectorstore_path)
+                self.chunks = FlatChunkStore.from_arrays(snapshot.arrays('chunks'))
+                self.embeddings = snapshot.array('embeddings')
+                self.vectorstore_model_name = snapshot.manifest.get('model_name')
+                self.logger.info(f"Snapshot loaded with {len(self.chunks)} chunks in {time.time() - start_time:.2f} seconds")
+                return
+            
             with open(self.vectorstore_path, 'rb') as f:
                 vectorstore = pickle.load(f)
             
@@ -104,8 +122,10 @@ class TransformerRetriever:
                 if key not in vectorstore:
                     raise ValueError(f"Invalid vectorstore: missing key '{key}'")
             
-            self.chunks = vectorstore['chunks']
-            self.embeddings = vectorstore['embeddings']
+            # Flat buffers instead of the unpickled object graph (shared after fork)
+            self.chunks = FlatChunkStore.from_chunks(vectorstore['chunks'])
+            self.embeddings = as_shared_matrix(np.asarray(vectorstore['embeddings']))
+            self.vectorstore_model_name = vectorstore['model_name']
             
             self.logger.info(f"Vectorstore loaded in {time.time() - start_time:.2f} seconds")
             self.logger.info(f"Vectorstore loaded with {len(self.chunks)} chunks")
@@ -125,15 +145,14 @@ class TransformerRetriever:
         try:
             # Determine model to use
             if not model_name:
-                # Try to get model name from vectorstore metadata
-                with open(self.vectorstore_path, 'rb') as f:
-                    vectorstore = pickle.load(f)
-                model_name = vectorstore.get('model_name', self.fallback_model)
+                # Model name from vectorstore metadata (read in _load_vectorstore)
+                model_name = self.vectorstore_model_name or self.fallback_model
             
             self.logger.info(f"Loading model {model_name}...")
             start_time = time.time()
             
             self.model = SentenceTransformer(model_name, device=self.device)
+            self.precision = apply_precision(self.model, model_name, self.precision, self.device)
             
             self.logger.info(f"Model {model_name} loaded in {time.time() - start_time:.2f} seconds")
             
@@ -144,19 +163,30 @@ class TransformerRetriever:
             try:
                 start_time = time.time()
                 self.model = SentenceTransformer(self.fallback_model, device=self.device)
+                self.precision = apply_precision(self.model, self.fallback_model, self.precision, self.device)
                 self.logger.info(f"Fallback model {self.fallback_model} loaded in {time.time() - start_time:.2f} seconds")
                 self.logger.warning("Using fallback model. Results may vary.")
             except Exception as e2:
                 self.logger.error(f"Error loading fallback model: {e2}")
                 raise ValueError(f"Could not load any model: {e}, {e2}")
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        query_embedding: Optional[np.ndarray] = None,
+        doc_ids: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
         """
         Perform semantic search on the document collection.
         
         Args:
             query (str): Search query string
             top_k (int): Number of top results to return
+            query_embedding (Optional[np.ndarray]): Precomputed query embedding
+                (e.g. from the semantic cache lookup)
+            doc_ids (Optional[np.ndarray]): Sorted chunk ids allowed by a metadata
+                filter; only their embeddings are compared
             
         Returns:
             List[Dict[str, Any]]: List of search results with scores and metadata
@@ -176,19 +206,25 @@ class TransformerRetriever:
             start_time = time.time()
             
             # Generate query embedding
-            query_embedding = self.model.encode([query])[0]
+            if query_embedding is None:
+                query_embedding = self.model.encode([query])[0]
             
-            # Calculate similarity with all embeddings
-            similarities = cosine_similarity([query_embedding], self.embeddings)[0]
+            # Calculate similarity with all embeddings (or only the allowed ones)
+            ids = np.arange(len(self.embeddings)) if doc_ids is None else np.asarray(doc_ids)
+            embeddings = self.embeddings if doc_ids is None else self.embeddings[ids]
+            if not len(ids):
+                return []
+            similarities = cosine_similarity([query_embedding], embeddings)[0]
             
-            # Get top-k indices
-            top_indices = similarities.argsort()[-top_k:][::-1]
+            # Get top-k positions
+            top_positions = similarities.argsort()[-top_k:][::-1]
             
             # Format results
             results = []
-            for idx in top_indices:
+            for position in top_positions:
+                idx = int(ids[position])
                 chunk = self.chunks[idx]
-                score = float(similarities[idx])
+                score = float(similarities[position])
                 
                 # Ensure chunk has 'texto' key
                 if 'texto' not in chunk and 'text' in chunk:
@@ -234,7 +270,8 @@ class TransformerRetriever:
             'model_name': model_name,
             'embedding_shape': embedding_shape,
             'device': self.device,
-            'has_model': self.model is not None
+            'has_model': self.model is not None,
+            'index_bytes': self.chunks.nbytes + (self.embeddings.nbytes if self.embeddings is not None else 0)
         }
 
 
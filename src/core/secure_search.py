@@ -138,10 +138,10 @@ class SecureHybridSearch:
             clean_query = LLMSecurityGuard.check_prompt_injection(clean_query)
             safe_top_k = InputValidator.validate_top_k(top_k)
             
-            # 4. Monitorear consulta
-            security_monitor.monitor_query(user_id, clean_query, ip_address)
+            # 4. Monitorear consulta (encolado al hilo escritor de auditoría)
+            security_monitor.monitor_query_async(user_id, clean_query, ip_address)
             
-            # 5. Log de auditoría (anonimizado)
+            # 5. Log de auditoría (anonimizado; solo se encola)
             audit_data = PrivacyProtector.anonymize_query_for_logging(query, user_id)
             compliance_logger.log_audit_event(
                 AuditEventType.SEARCH,
@@ -9,6 +9,7 @@ from .rate_limiter import RateLimiter, rate_limiter
 from .privacy import PrivacyProtector
 from .file_validator import FileValidator
 from .compliance import ComplianceLogger, AuditEventType, compliance_logger
+from .audit_store import PartitionedAuditStore, HyperLogLog
 from .monitor import SecurityMonitor, security_monitor
 from .logger import SecureLogger, app_logger, security_logger, audit_logger
 from .safe_pickle import SafePickleLoader, safe_load_vectorstore
@@ -24,6 +25,8 @@ __all__ = [
     'ComplianceLogger',
     'AuditEventType',
     'compliance_logger',
+    'PartitionedAuditStore',
+    'HyperLogLog',
     'SecurityMonitor',
     'security_monitor',
     'SecureLogger',
@@ -0,0 +1,269 @@
+"""
+Almacén de auditoría particionado por día con rollups incrementales
+
+Estructura en disco:
+    <base_dir>/<kind>/YYYY-MM-DD.jsonl         eventos del día (append-only)
+    <base_dir>/<kind>/YYYY-MM-DD.rollup.json   índice lateral del día
+
+El rollup guarda el offset en bytes hasta donde fue calculado, conteos por
+tipo, fallos y un HyperLogLog de user_hash. Se actualiza leyendo solo los
+bytes nuevos de la partición, por lo que es seguro con varios procesos
+escribiendo en el mismo archivo y un reporte lee únicamente los rollups
+de los días del rango (y los eventos de los días de borde parciales).
+"""
+import base64
+from datetime import date, datetime, time as dt_time, timedelta
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class HyperLogLog:
+    """HyperLogLog compacto (2^p registros de 1 byte) para cardinalidad aproximada"""
+
+    def __init__(self, p: int = 12, registers: Optional[bytearray] = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, value: str) -> None:
+        h = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = h >> (64 - self.p)
+        remaining = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("HyperLogLog con precisión distinta")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def to_string(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode("ascii")
+
+    @classmethod
+    def from_string(cls, data: str, p: int = 12) -> "HyperLogLog":
+        return cls(p, bytearray(base64.b64decode(data)))
+
+
+def _empty_rollup(day: str) -> Dict[str, Any]:
+    return {
+        "date": day,
+        "bytes": 0,
+        "total": 0,
+        "counts": {},
+        "failures": 0,
+        "hll": None,
+        "first_timestamp": None,
+        "last_timestamp": None
+    }
+
+
+class PartitionedAuditStore:
+    """Eventos de auditoría/seguridad en particiones diarias con rollups por día"""
+
+    # Campo que se agrega en los conteos por tipo de partición
+    COUNT_FIELDS = {"audit": "event_type", "security": "severity"}
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self._lock = threading.Lock()
+
+    # === ESCRITURA ===
+
+    def _partition_path(self, kind: str, day: str) -> Path:
+        return self.base_dir / kind / f"{day}.jsonl"
+
+    def _rollup_path(self, kind: str, day: str) -> Path:
+        return self.base_dir / kind / f"{day}.rollup.json"
+
+    def append(self, kind: str, entry: Dict[str, Any]) -> None:
+        """Agregar un evento a la partición de su día"""
+        self.append_many(kind, [entry])
+
+    def append_many(self, kind: str, entries: Iterable[Dict[str, Any]], fsync: bool = False) -> int:
+        """
+        Agregar eventos agrupados por día (una escritura por partición)
+
+        Returns:
+            Número de eventos escritos
+        """
+        by_day: Dict[str, List[str]] = {}
+        for entry in entries:
+            day = str(entry.get("timestamp", ""))[:10] or date.today().isoformat()
+            by_day.setdefault(day, []).append(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        written = 0
+        with self._lock:
+            (self.base_dir / kind).mkdir(parents=True, exist_ok=True)
+            for day, lines in by_day.items():
+                with open(self._partition_path(kind, day), "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                written += len(lines)
+        return written
+
+    # === ROLLUPS ===
+
+    def _load_rollup(self, kind: str, day: str) -> Dict[str, Any]:
+        rollup_path = self._rollup_path(kind, day)
+        if rollup_path.exists():
+            try:
+                with open(rollup_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return _empty_rollup(day)
+
+    def _save_rollup(self, kind: str, day: str, rollup: Dict[str, Any]) -> None:
+        rollup_path = self._rollup_path(kind, day)
+        tmp_path = rollup_path.with_name(f"{rollup_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rollup, f, ensure_ascii=False)
+        os.replace(tmp_path, rollup_path)
+
+    def refresh_rollup(self, kind: str, day: str) -> Dict[str, Any]:
+        """Actualizar el rollup del día leyendo solo los bytes nuevos de la partición"""
+        partition = self._partition_path(kind, day)
+        rollup = self._load_rollup(kind, day)
+        if not partition.exists():
+            return rollup
+
+        size = partition.stat().st_size
+        if size <= rollup["bytes"]:
+            return rollup
+
+        with open(partition, "rb") as f:
+            f.seek(rollup["bytes"])
+            chunk = f.read(size - rollup["bytes"])
+
+        # Consumir solo líneas completas (otro proceso puede estar escribiendo)
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        if not complete:
+            return rollup
+
+        count_field = self.COUNT_FIELDS.get(kind, "event_type")
+        hll = HyperLogLog.from_string(rollup["hll"]) if rollup["hll"] else HyperLogLog()
+        for raw in complete.splitlines():
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                continue
+            rollup["total"] += 1
+            key = str(event.get(count_field, "UNKNOWN"))
+            rollup["counts"][key] = rollup["counts"].get(key, 0) + 1
+            if not event.get("success", True):
+                rollup["failures"] += 1
+            if event.get("user_hash"):
+                hll.add(event["user_hash"])
+            timestamp = event.get("timestamp")
+            if timestamp:
+                if rollup["first_timestamp"] is None or timestamp < rollup["first_timestamp"]:
+                    rollup["first_timestamp"] = timestamp
+                if rollup["last_timestamp"] is None or timestamp > rollup["last_timestamp"]:
+                    rollup["last_timestamp"] = timestamp
+
+        rollup["bytes"] += len(complete)
+        rollup["hll"] = hll.to_string()
+        self._save_rollup(kind, day, rollup)
+        return rollup
+
+    # === CONSULTAS ===
+
+    def partition_days(self, kind: str, start_day: str, end_day: str) -> List[str]:
+        """Días con partición dentro de [start_day, end_day] (formato ISO)"""
+        kind_dir = self.base_dir / kind
+        if not kind_dir.exists():
+            return []
+        days = []
+        for path in kind_dir.glob("*.jsonl"):
+            day = path.stem
+            if start_day <= day <= end_day:
+                days.append(day)
+        return sorted(days)
+
+    def iter_events(self, kind: str, start: datetime, end: datetime) -> Iterator[Dict[str, Any]]:
+        """Eventos del rango leyendo solo las particiones relevantes"""
+        for day in self.partition_days(kind, start.date().isoformat(), end.date().isoformat()):
+            with open(self._partition_path(kind, day), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                        event_time = datetime.fromisoformat(event["timestamp"])
+                    except (ValueError, KeyError):
+                        continue
+                    if start <= event_time <= end:
+                        yield event
+
+    def summarize(self, kind: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Agregado del rango: rollups para días completos y lectura de eventos
+        solo en los días de borde cubiertos parcialmente
+        """
+        count_field = self.COUNT_FIELDS.get(kind, "event_type")
+        summary = {"total": 0, "counts": {}, "failures": 0, "partitions_scanned": 0}
+        hll = HyperLogLog()
+
+        for day in self.partition_days(kind, start.date().isoformat(), end.date().isoformat()):
+            day_date = date.fromisoformat(day)
+            day_start = datetime.combine(day_date, dt_time.min)
+            day_end = datetime.combine(day_date + timedelta(days=1), dt_time.min) - timedelta(microseconds=1)
+
+            if start <= day_start and day_end <= end:
+                rollup = self.refresh_rollup(kind, day)
+                summary["total"] += rollup["total"]
+                summary["failures"] += rollup["failures"]
+                for key, value in rollup["counts"].items():
+                    summary["counts"][key] = summary["counts"].get(key, 0) + value
+                if rollup["hll"]:
+                    hll.merge(HyperLogLog.from_string(rollup["hll"]))
+                continue
+
+            # Día de borde: filtrar eventos por timestamp
+            summary["partitions_scanned"] += 1
+            for event in self.iter_events(kind, max(start, day_start), min(end, day_end)):
+                summary["total"] += 1
+                key = str(event.get(count_field, "UNKNOWN"))
+                summary["counts"][key] = summary["counts"].get(key, 0) + 1
+                if not event.get("success", True):
+                    summary["failures"] += 1
+                if event.get("user_hash"):
+                    hll.add(event["user_hash"])
+
+        summary["unique_users"] = hll.count()
+        return summary
+
+    def import_jsonl(self, kind: str, source: Path, required_field: str, batch_size: int = 10000) -> int:
+        """Importar un log JSONL monolítico (se ignoran líneas que no son JSON)"""
+        imported = 0
+        batch: List[Dict[str, Any]] = []
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(event, dict) or required_field not in event or "timestamp" not in event:
+                    continue
+                batch.append(event)
+                if len(batch) >= batch_size:
+                    imported += self.append_many(kind, batch)
+                    batch = []
+        if batch:
+            imported += self.append_many(kind, batch)
+        return imported
@@ -0,0 +1,201 @@
+"""
+Escritor asíncrono por lotes para logs de auditoría y seguridad
+
+El camino de la petición solo encola (put_nowait en una cola acotada).
+Un hilo dedicado drena la cola en lotes, escribe una vez por partición y
+hace un fsync por lote (group commit). Al apagar se drena lo pendiente.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+if PROMETHEUS_AVAILABLE:
+    AUDIT_QUEUE_DEPTH = Gauge('audit_writer_queue_depth', 'Eventos de auditoría pendientes en cola')
+    AUDIT_DROPPED_TOTAL = Counter('audit_writer_dropped_total', 'Eventos de auditoría descartados por cola llena', ['kind'])
+    AUDIT_WRITTEN_TOTAL = Counter('audit_writer_written_total', 'Eventos de auditoría escritos', ['kind'])
+
+# Un evento puede encolarse ya construido o como callable que lo construye
+# en el hilo escritor (hash/sanitización fuera del camino de la petición)
+EventPayload = Union[Dict[str, Any], Callable[[], Optional[Dict[str, Any]]]]
+
+# kind=None indica una tarea en segundo plano (callable sin resultado a escribir)
+_QueueItem = Tuple[Optional[str], EventPayload]
+
+_STOP = object()
+
+
+class AsyncAuditWriter:
+    """Cola acotada + hilo escritor con flush por lotes y drenado al apagar"""
+
+    def __init__(
+        self,
+        store: Any,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        fsync: bool = True
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'tasks_run': 0,
+            'batches': 0,
+            'errors': 0,
+            'last_batch_size': 0,
+            'last_flush_ms': 0.0
+        }
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # === CAMINO DE LA PETICIÓN ===
+
+    def submit(self, kind: str, payload: EventPayload) -> bool:
+        """Encolar un evento; False si la cola está llena (evento descartado)"""
+        return self._put((kind, payload), kind)
+
+    def submit_task(self, task: Callable[[], Any]) -> bool:
+        """Encolar trabajo en segundo plano (p. ej. monitoreo) en el hilo escritor"""
+        return self._put((None, task), "task")
+
+    def _put(self, item: _QueueItem, label: str) -> bool:
+        if self._closed:
+            return self._write_sync(item)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self.stats['dropped'] += 1
+            if PROMETHEUS_AVAILABLE:
+                AUDIT_DROPPED_TOTAL.labels(kind=label).inc()
+            return False
+        with self._stats_lock:
+            self.stats['enqueued'] += 1
+        if PROMETHEUS_AVAILABLE:
+            AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    # === HILO ESCRITOR ===
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if first is _STOP:
+                self._flush(self._drain_nowait())
+                return
+
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stop:
+                self._flush(self._drain_nowait())
+                return
+
+    def _drain_nowait(self) -> List[_QueueItem]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def _flush(self, batch: List[_QueueItem]) -> None:
+        if not batch:
+            return
+        start = time.perf_counter()
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        tasks_run = 0
+
+        for kind, payload in batch:
+            try:
+                if kind is None:
+                    payload()
+                    tasks_run += 1
+                    continue
+                entry = payload() if callable(payload) else payload
+                if entry is not None:
+                    by_kind.setdefault(kind, []).append(entry)
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats['errors'] += 1
+                logger.error(f"Error preparando evento de auditoría: {e}")
+
+        written = 0
+        for kind, entries in by_kind.items():
+            try:
+                written += self.store.append_many(kind, entries, fsync=self.fsync)
+                if PROMETHEUS_AVAILABLE:
+                    AUDIT_WRITTEN_TOTAL.labels(kind=kind).inc(len(entries))
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats['errors'] += 1
+                logger.error(f"Error escribiendo lote de auditoría ({kind}): {e}")
+
+        with self._stats_lock:
+            self.stats['written'] += written
+            self.stats['tasks_run'] += tasks_run
+            self.stats['batches'] += 1
+            self.stats['last_batch_size'] = len(batch)
+            self.stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+        if PROMETHEUS_AVAILABLE:
+            AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _write_sync(self, item: _QueueItem) -> bool:
+        """Después del cierre se escribe de forma síncrona para no perder eventos"""
+        self._flush([item])
+        return True
+
+    # === CICLO DE VIDA ===
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Drenar la cola y detener el hilo escritor"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("⚠️ Escritor de auditoría no terminó de drenar la cola a tiempo")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                **self.stats,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'running': self._thread.is_alive()
+            }
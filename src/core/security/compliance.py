@@ -1,13 +1,23 @@
 """
 Logger de cumplimiento para normativas MINEDU y gobierno peruano
 """
-import json
+from functools import partial
 import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Any, Tuple, List
 from enum import Enum
 from src.core.config.security_config import SecurityConfig
+from src.core.security.audit_store import PartitionedAuditStore
+from src.core.security.audit_writer import AsyncAuditWriter
+
+logger = logging.getLogger(__name__)
 
 class AuditEventType(Enum):
     """Tipos de eventos para auditoría"""
@@ -29,6 +39,24 @@ class ComplianceLogger:
         SecurityConfig.LOGS_DIR.mkdir(parents=True, exist_ok=True)
         self.audit_file = SecurityConfig.AUDIT_LOG_FILE
         self.security_file = SecurityConfig.SECURITY_LOG_FILE
+        # Eventos en particiones diarias con rollups (reportes sin releer todo el historial)
+        self.store = PartitionedAuditStore(SecurityConfig.AUDIT_PARTITIONS_DIR)
+        # El historial de audit.log / security.log se importa antes del primer reporte (no al importar)
+        self._legacy_migrated = False
+        self._legacy_lock = threading.Lock()
+        # En el camino de la petición solo se encola; el hilo escritor agrupa y hace fsync
+        self.writer = AsyncAuditWriter(
+            self.store,
+            max_queue=SecurityConfig.AUDIT_QUEUE_SIZE,
+            batch_size=SecurityConfig.AUDIT_BATCH_SIZE
+        ) if SecurityConfig.AUDIT_ASYNC_WRITES else None
+    
+    def _write(self, kind: str, build_entry) -> None:
+        """Encolar (modo asíncrono) o escribir directamente la entrada"""
+        if self.writer is not None:
+            self.writer.submit(kind, build_entry)
+        else:
+            self.store.append(kind, build_entry())
     
     def log_audit_event(
         self,
@@ -48,9 +76,29 @@ class ComplianceLogger:
             ip_address: IP del usuario
             session_id: ID de sesión
         """
-        # Crear entrada de auditoría
-        audit_entry = {
-            'timestamp': datetime.now().isoformat(),
+        # La entrada (hashes + sanitización de PII) se construye en el hilo escritor
+        self._write('audit', partial(
+            self._build_audit_entry,
+            datetime.now().isoformat(),
+            event_type,
+            user_id,
+            dict(details),
+            ip_address,
+            session_id
+        ))
+    
+    def _build_audit_entry(
+        self,
+        timestamp: str,
+        event_type: AuditEventType,
+        user_id: str,
+        details: Dict[str, Any],
+        ip_address: Optional[str],
+        session_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Crear entrada de auditoría anonimizada"""
+        return {
+            'timestamp': timestamp,
             'event_type': event_type.value,
             'user_hash': hashlib.sha256(user_id.encode()).hexdigest()[:16],
             'ip_hash': hashlib.sha256(ip_address.encode()).hexdigest()[:16] if ip_address else None,
@@ -60,10 +108,6 @@ class ComplianceLogger:
             'action': details.get('action', 'N/A'),
             'metadata': self._sanitize_details(details)
         }
-        
-        # Escribir al log de auditoría (append-only)
-        with open(self.audit_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(audit_entry, ensure_ascii=False) + '\n')
     
     def log_security_event(
         self,
@@ -81,16 +125,42 @@ class ComplianceLogger:
             user_id: ID del usuario (opcional)
             additional_info: Información adicional
         """
-        security_entry = {
-            'timestamp': datetime.now().isoformat(),
+        self._write('security', partial(
+            self._build_security_entry,
+            datetime.now().isoformat(),
+            severity,
+            event_description,
+            user_id,
+            dict(additional_info or {})
+        ))
+    
+    def _build_security_entry(
+        self,
+        timestamp: str,
+        severity: str,
+        event_description: str,
+        user_id: Optional[str],
+        additional_info: Dict
+    ) -> Dict[str, Any]:
+        """Crear entrada de seguridad anonimizada"""
+        return {
+            'timestamp': timestamp,
             'severity': severity,
             'description': event_description,
             'user_hash': hashlib.sha256(user_id.encode()).hexdigest()[:16] if user_id else None,
-            'additional_info': self._sanitize_details(additional_info or {})
+            'additional_info': self._sanitize_details(additional_info)
         }
-        
-        with open(self.security_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(security_entry, ensure_ascii=False) + '\n')
+    
+    def flush(self, timeout: float = 10.0) -> None:
+        """Drenar eventos pendientes (apagado ordenado)"""
+        if self.writer is not None:
+            self.writer.close(timeout)
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Profundidad de cola, descartes y lotes del escritor asíncrono"""
+        if self.writer is None:
+            return {'mode': 'sync'}
+        return {'mode': 'async', **self.writer.get_stats()}
     
     def _sanitize_details(self, details: Dict) -> Dict:
         """Sanitiza detalles para no incluir información sensible"""
@@ -138,52 +208,125 @@ class ComplianceLogger:
         Returns:
             Reporte de cumplimiento
         """
-        events = []
-        security_incidents = []
-        
-        # Leer eventos de auditoría
-        if self.audit_file.exists():
-            with open(self.audit_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        event = json.loads(line)
-                        event_time = datetime.fromisoformat(event['timestamp'])
-                        if start_date <= event_time <= end_date:
-                            events.append(event)
-                    except:
-                        continue
-        
-        # Leer incidentes de seguridad
-        if self.security_file.exists():
-            with open(self.security_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        incident = json.loads(line)
-                        incident_time = datetime.fromisoformat(incident['timestamp'])
-                        if start_date <= incident_time <= end_date:
-                            security_incidents.append(incident)
-                    except:
-                        continue
-        
-        # Generar estadísticas
-        event_counts = {}
-        for event in events:
-            event_type = event.get('event_type', 'UNKNOWN')
-            event_counts[event_type] = event_counts.get(event_type, 0) + 1
+        self._ensure_legacy_migrated()
+        # Solo se leen los rollups de los días del rango (y eventos de días de borde)
+        audit_summary = self.store.summarize('audit', start_date, end_date)
+        security_summary = self.store.summarize('security', start_date, end_date)
+        security_incidents = security_summary['total']
         
         return {
             'report_period': {
                 'start': start_date.isoformat(),
                 'end': end_date.isoformat()
             },
-            'total_events': len(events),
-            'event_breakdown': event_counts,
-            'security_incidents': len(security_incidents),
-            'failed_attempts': sum(1 for e in events if not e.get('success', True)),
-            'unique_users': len(set(e.get('user_hash', '') for e in events)),
-            'compliance_status': 'COMPLIANT' if len(security_incidents) == 0 else 'REVIEW_REQUIRED',
+            'total_events': audit_summary['total'],
+            'event_breakdown': audit_summary['counts'],
+            'security_incidents': security_incidents,
+            'failed_attempts': audit_summary['failures'],
+            'unique_users': audit_summary['unique_users'],
+            'compliance_status': 'COMPLIANT' if security_incidents == 0 else 'REVIEW_REQUIRED',
             'generated_at': datetime.now().isoformat()
         }
+    
+    def _ensure_legacy_migrated(self) -> None:
+        """Migrar los logs legacy una vez por proceso, antes de leer el historial"""
+        if self._legacy_migrated:
+            return
+        with self._legacy_lock:
+            if self._legacy_migrated:
+                return
+            try:
+                self.migrate_legacy_logs()
+            except OSError as e:
+                logger.error(f"❌ No se pudieron migrar los logs legacy: {e}")
+                return
+            # Si otro proceso está migrando aún no hay marcador: se reintenta en el próximo reporte
+            self._legacy_migrated = (self.store.base_dir / '.legacy_imported').exists()
+    
+    def migrate_legacy_logs(self) -> Dict[str, int]:
+        """
+        Importar una sola vez los logs JSONL monolíticos (audit.log / security.log)
+        a las particiones diarias. Un archivo marcador evita reimportar y un lock
+        exclusivo (con pid, host y hora) evita que dos procesos importen a la vez;
+        el lock de un proceso caído o vencido se rompe
+        """
+        imported = {'audit': 0, 'security': 0}
+        base_dir = self.store.base_dir
+        marker = base_dir / '.legacy_imported'
+        if marker.exists():
+            return imported
+        
+        base_dir.mkdir(parents=True, exist_ok=True)
+        lock = base_dir / '.legacy_importing'
+        if not self._acquire_migration_lock(lock):
+            return imported  # otro proceso está migrando
+        
+        try:
+            if self.audit_file.exists():
+                imported['audit'] = self.store.import_jsonl('audit', self.audit_file, 'event_type')
+            if self.security_file.exists():
+                imported['security'] = self.store.import_jsonl('security', self.security_file, 'severity')
+            marker.write_text(datetime.now().isoformat(), encoding='utf-8')
+        finally:
+            lock.unlink()
+        
+        if any(imported.values()):
+            logger.info(f"✅ Logs legacy migrados a particiones: {imported}")
+        return imported
+    
+    def _acquire_migration_lock(self, lock: Path) -> bool:
+        """Crear el lock con O_EXCL; si existe pero está huérfano se rompe y se reintenta una vez"""
+        owner = json.dumps({'pid': os.getpid(), 'host': socket.gethostname(), 'started_at': time.time()})
+        for _ in range(2):
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._break_stale_lock(lock):
+                    return False
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(owner)
+            return True
+        return False
+    
+    def _break_stale_lock(self, lock: Path) -> bool:
+        """Eliminar el lock si su proceso ya no existe o si superó AUDIT_LEGACY_LOCK_TTL"""
+        try:
+            content = lock.read_text(encoding='utf-8')
+            started_at = lock.stat().st_mtime
+        except FileNotFoundError:
+            return True  # liberado entre tanto
+        try:
+            owner = json.loads(content)
+            started_at = float(owner.get('started_at', started_at))
+        except (ValueError, AttributeError, TypeError):
+            owner = {}  # lock vacío o ilegible (caída justo tras crearlo): decide la antigüedad
+        
+        expired = time.time() - started_at > SecurityConfig.AUDIT_LEGACY_LOCK_TTL
+        dead = owner.get('host') == socket.gethostname() and not self._pid_alive(owner.get('pid'))
+        if not (expired or dead):
+            return False
+        try:
+            # Solo si sigue siendo el mismo lock que se evaluó
+            if lock.read_text(encoding='utf-8') != content:
+                return False
+            lock.unlink()
+        except FileNotFoundError:
+            pass
+        logger.warning(f"⚠️ Lock de migración legacy huérfano eliminado: {content or 'vacío'}")
+        return True
+    
+    @staticmethod
+    def _pid_alive(pid: Any) -> bool:
+        if not isinstance(pid, int) or pid <= 0:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True  # existe, pero es de otro usuario
+        return True
 
 class ComplianceChecker:
     """
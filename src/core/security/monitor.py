@@ -3,6 +3,7 @@ Monitor de seguridad en tiempo real para detectar amenazas
 """
 from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import partial
 import hashlib
 from typing import Dict, List, Set
 from src.core.config.security_config import SecurityConfig
@@ -17,6 +18,7 @@ class SecurityMonitor:
         self.failed_attempts: Dict[str, int] = defaultdict(int)
         self.suspicious_patterns: Dict[str, int] = defaultdict(int)
         self.blocked_ips: Set[str] = set()
+        self._last_cleanup = datetime.min
         
         # Umbrales
         self.ANOMALY_THRESHOLD = 5
@@ -72,6 +74,17 @@ class SecurityMonitor:
                 # Bloquear IP
                 self.blocked_ips.add(ip_address)
     
+    def monitor_query_async(self, user_id: str, query: str, ip_address: str) -> None:
+        """
+        Encola monitor_query en el hilo escritor de auditoría para sacarlo
+        del camino de la petición; si no hay escritor o la cola está llena
+        se monitorea de forma síncrona
+        """
+        writer = compliance_logger.writer
+        task = partial(self.monitor_query, user_id, query, ip_address)
+        if writer is None or not writer.submit_task(task):
+            task()
+    
     def monitor_failed_login(self, user_id: str, ip_address: str) -> None:
         """Monitorea intentos fallidos de login"""
         key = f"{user_id}:{ip_address}"
@@ -114,8 +127,12 @@ class SecurityMonitor:
         return any(pattern in query_lower for pattern in all_patterns)
     
     def _clean_old_history(self) -> None:
-        """Limpia historial antiguo para liberar memoria"""
-        cutoff_time = datetime.now() - timedelta(hours=1)
+        """Limpia historial antiguo para liberar memoria (como máximo una vez por minuto)"""
+        now = datetime.now()
+        if now - self._last_cleanup < timedelta(minutes=1):
+            return
+        self._last_cleanup = now
+        cutoff_time = now - timedelta(hours=1)
         
         # Limpiar historial de consultas
         for key in list(self.query_history.keys()):
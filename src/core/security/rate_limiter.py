@@ -1,137 +1,388 @@
 """
 Limitador de tasa de peticiones para prevenir abuso
+
+Usa contadores de ventana deslizante (sliding window counter): por cada
+ventana se guardan solo el índice de la ventana actual y los conteos de la
+ventana actual y la anterior. La estimación
+    conteo = anterior * (1 - fracción_transcurrida) + actual
+es O(1) por verificación y ocupa memoria fija por usuario.
+
+Backends:
+- InMemoryRateLimitBackend: camino rápido en proceso (por worker)
+- RedisRateLimitBackend: script Lua atómico, límites compartidos por todo el cluster
 """
-from collections import defaultdict
-from datetime import datetime, timedelta
 import hashlib
-from typing import Dict, Optional, Tuple
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from src.core.config.security_config import SecurityConfig
 
+logger = logging.getLogger(__name__)
+
+# (nombre, ventana_segundos, límite, bloqueo_segundos)
+WindowSpec = Tuple[str, int, int, int]
+
+# Resultado de un backend: (permitido, índice de ventana excedida, segundos de bloqueo restantes)
+# índice -1: permitido; -2: usuario ya bloqueado
+CheckResult = Tuple[bool, int, float]
+
+BLOCKED_INDEX = -2
+
+
+def default_windows() -> List[WindowSpec]:
+    """Ventanas por defecto según SecurityConfig"""
+    return [
+        ("minute", 60, SecurityConfig.REQUESTS_PER_MINUTE, 5 * 60),
+        ("hour", 3600, SecurityConfig.REQUESTS_PER_HOUR, 3600),
+        ("day", 86400, SecurityConfig.REQUESTS_PER_DAY, 86400),
+    ]
+
+
+def _estimate(prev_count: float, cur_count: float, elapsed_fraction: float) -> float:
+    """Conteo estimado de la ventana deslizante"""
+    return prev_count * (1.0 - elapsed_fraction) + cur_count
+
+
+class InMemoryRateLimitBackend:
+    """
+    Backend en memoria con estado de tamaño fijo por usuario.
+
+    Estado por usuario: lista plana [idx_0, cur_0, prev_0, idx_1, cur_1, prev_1, ...]
+    """
+
+    def __init__(self, purge_interval: float = 3600.0):
+        self._state: Dict[str, List[int]] = {}
+        self._blocked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._purge_interval = purge_interval
+        self._last_purge = time.time()
+
+    def check(self, key: str, windows: Sequence[WindowSpec], now: float) -> CheckResult:
+        with self._lock:
+            block_until = self._blocked.get(key)
+            if block_until is not None:
+                if now < block_until:
+                    return False, BLOCKED_INDEX, block_until - now
+                del self._blocked[key]
+
+            state = self._state.get(key)
+            if state is None:
+                state = [0] * (3 * len(windows))
+                self._state[key] = state
+
+            # 1) Avanzar ventanas y verificar límites antes de registrar
+            for i, (_, window, limit, block_seconds) in enumerate(windows):
+                base = 3 * i
+                current_idx = int(now // window)
+                self._advance(state, base, current_idx)
+                elapsed = (now - current_idx * window) / window
+                if _estimate(state[base + 2], state[base + 1], elapsed) >= limit:
+                    if block_seconds > 0:
+                        self._blocked[key] = now + block_seconds
+                    return False, i, float(block_seconds)
+
+            # 2) Registrar petición en todas las ventanas
+            for i in range(len(windows)):
+                state[3 * i + 1] += 1
+
+            if now - self._last_purge >= self._purge_interval:
+                self._purge_idle(windows, now)
+
+        return True, -1, 0.0
+
+    @staticmethod
+    def _advance(state: List[int], base: int, current_idx: int) -> None:
+        stored_idx = state[base]
+        if stored_idx == current_idx:
+            return
+        if stored_idx == current_idx - 1:
+            state[base + 2] = state[base + 1]
+        else:
+            state[base + 2] = 0
+        state[base + 1] = 0
+        state[base] = current_idx
+
+    def _purge_idle(self, windows: Sequence[WindowSpec], now: float) -> None:
+        """Eliminar usuarios sin actividad en las dos últimas ventanas más largas"""
+        if not windows:
+            return
+        longest = max(range(len(windows)), key=lambda i: windows[i][1])
+        idle_before = int(now // windows[longest][1]) - 1
+        base = 3 * longest
+        stale = [k for k, s in self._state.items() if s[base] < idle_before]
+        for k in stale:
+            del self._state[k]
+        expired = [k for k, until in self._blocked.items() if until <= now]
+        for k in expired:
+            del self._blocked[k]
+        self._last_purge = now
+
+    def usage(self, key: str, windows: Sequence[WindowSpec], now: float) -> Dict[str, Any]:
+        with self._lock:
+            state = self._state.get(key)
+            counts = {}
+            for i, (name, window, _, _) in enumerate(windows):
+                if state is None:
+                    counts[name] = 0
+                    continue
+                current_idx = int(now // window)
+                stored_idx, cur, prev = state[3 * i], state[3 * i + 1], state[3 * i + 2]
+                if stored_idx == current_idx:
+                    pass
+                elif stored_idx == current_idx - 1:
+                    cur, prev = 0, cur
+                else:
+                    cur, prev = 0, 0
+                elapsed = (now - current_idx * window) / window
+                counts[name] = int(round(_estimate(prev, cur, elapsed)))
+            blocked_until = self._blocked.get(key)
+            return {
+                "counts": counts,
+                "is_blocked": blocked_until is not None and blocked_until > now
+            }
+
+    def reset(self, key: str, windows: Sequence[WindowSpec]) -> None:
+        with self._lock:
+            self._state.pop(key, None)
+            self._blocked.pop(key, None)
+
+    def system_stats(self, windows: Sequence[WindowSpec], now: float) -> Dict[str, Any]:
+        with self._lock:
+            day_index = max(range(len(windows)), key=lambda i: windows[i][1]) if windows else None
+            total_today = 0
+            if day_index is not None:
+                current_idx = int(now // windows[day_index][1])
+                base = 3 * day_index
+                total_today = sum(s[base + 1] for s in self._state.values() if s[base] == current_idx)
+            return {
+                "tracked_users": len(self._state),
+                "blocked_users": sum(1 for until in self._blocked.values() if until > now),
+                "total_requests_current_window": total_today
+            }
+
+
+# Script Lua atómico: KEYS[1] = clave de bloqueo, KEYS[2..n+1] = hash por ventana
+# ARGV = now_ms, luego por ventana: window_ms, limit, block_ms
+_REDIS_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local block_ttl = redis.call('PTTL', KEYS[1])
+if block_ttl > 0 then
+    return {0, -2, block_ttl}
+end
+local n = #KEYS - 1
+local windows_ms = {}
+for i = 1, n do
+    local window = tonumber(ARGV[2 + (i - 1) * 3])
+    local limit = tonumber(ARGV[3 + (i - 1) * 3])
+    local block_ms = tonumber(ARGV[4 + (i - 1) * 3])
+    local idx = math.floor(now / window)
+    local st = redis.call('HMGET', KEYS[i + 1], 'i', 'c', 'p')
+    local stored = tonumber(st[1]) or -1
+    local cur = tonumber(st[2]) or 0
+    local prev = tonumber(st[3]) or 0
+    if stored ~= idx then
+        if stored == idx - 1 then prev = cur else prev = 0 end
+        cur = 0
+        redis.call('HSET', KEYS[i + 1], 'i', idx, 'c', 0, 'p', prev)
+        redis.call('PEXPIRE', KEYS[i + 1], window * 2)
+    end
+    local elapsed = (now - idx * window) / window
+    if prev * (1 - elapsed) + cur >= limit then
+        if block_ms > 0 then
+            redis.call('SET', KEYS[1], 1, 'PX', block_ms)
+        end
+        return {0, i - 1, block_ms}
+    end
+    windows_ms[i] = window
+end
+for i = 1, n do
+    redis.call('HINCRBY', KEYS[i + 1], 'c', 1)
+    redis.call('PEXPIRE', KEYS[i + 1], windows_ms[i] * 2)
+end
+return {1, -1, 0}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Backend Redis para límites compartidos entre workers y nodos.
+
+    Las claves de un usuario comparten hash tag ({hash}) para caer en el
+    mismo slot de Redis Cluster. Los usuarios bloqueados se rechazan en el
+    camino rápido local sin ir a Redis; si Redis falla se usa el backend
+    en memoria como degradación.
+    """
+
+    def __init__(self, redis_client: Any, key_prefix: str = "ratelimit"):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self._script = redis_client.register_script(_REDIS_SLIDING_WINDOW_LUA)
+        self._local_blocks: Dict[str, float] = {}
+        self._fallback = InMemoryRateLimitBackend()
+
+    def _keys(self, key: str, windows: Sequence[WindowSpec]) -> List[str]:
+        base = f"{self.key_prefix}:{{{key}}}"
+        return [f"{base}:block"] + [f"{base}:{name}" for name, _, _, _ in windows]
+
+    def check(self, key: str, windows: Sequence[WindowSpec], now: float) -> CheckResult:
+        block_until = self._local_blocks.get(key)
+        if block_until is not None:
+            if now < block_until:
+                return False, BLOCKED_INDEX, block_until - now
+            self._local_blocks.pop(key, None)
+
+        args: List[int] = [int(now * 1000)]
+        for _, window, limit, block_seconds in windows:
+            args.extend([window * 1000, limit, block_seconds * 1000])
+
+        try:
+            allowed, index, remaining_ms = self._script(keys=self._keys(key, windows), args=args)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis rate limit no disponible, usando memoria local: {e}")
+            return self._fallback.check(key, windows, now)
+
+        remaining = int(remaining_ms) / 1000.0
+        if not allowed and remaining > 0:
+            self._local_blocks[key] = now + remaining
+        return bool(allowed), int(index), remaining
+
+    def usage(self, key: str, windows: Sequence[WindowSpec], now: float) -> Dict[str, Any]:
+        counts = {}
+        try:
+            keys = self._keys(key, windows)
+            for (name, window, _, _), window_key in zip(windows, keys[1:]):
+                stored, cur, prev = self.redis_client.hmget(window_key, "i", "c", "p")
+                current_idx = int(now * 1000 // (window * 1000))
+                stored = int(stored) if stored is not None else -1
+                cur, prev = int(cur or 0), int(prev or 0)
+                if stored == current_idx - 1:
+                    cur, prev = 0, cur
+                elif stored != current_idx:
+                    cur, prev = 0, 0
+                elapsed = (now - current_idx * window) / window
+                counts[name] = int(round(_estimate(prev, cur, elapsed)))
+            is_blocked = self.redis_client.pttl(keys[0]) > 0
+        except Exception as e:
+            logger.warning(f"⚠️ Error consultando uso en Redis: {e}")
+            return self._fallback.usage(key, windows, now)
+        return {"counts": counts, "is_blocked": is_blocked}
+
+    def reset(self, key: str, windows: Sequence[WindowSpec]) -> None:
+        self._local_blocks.pop(key, None)
+        self._fallback.reset(key, windows)
+        try:
+            self.redis_client.delete(*self._keys(key, windows))
+        except Exception as e:
+            logger.warning(f"⚠️ Error reseteando límites en Redis: {e}")
+
+    def system_stats(self, windows: Sequence[WindowSpec], now: float) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "locally_blocked_users": sum(1 for until in self._local_blocks.values() if until > now),
+            "fallback": self._fallback.system_stats(windows, now)
+        }
+
+
 class RateLimiter:
     """Limitador de tasa de peticiones para prevenir abuso"""
-    
-    def __init__(self):
-        # Almacenar: {user_hash: [timestamp1, timestamp2, ...]}
-        self._requests: Dict[str, list] = defaultdict(list)
-        self._blocked_users: Dict[str, datetime] = {}
-        
+
+    def __init__(
+        self,
+        windows: Optional[Sequence[WindowSpec]] = None,
+        backend: Optional[Any] = None
+    ):
+        self.windows: List[WindowSpec] = list(windows or default_windows())
+        self.backend = backend or InMemoryRateLimitBackend()
+
     def _hash_identifier(self, identifier: str) -> str:
         """Hashea el identificador del usuario para privacidad"""
         return hashlib.sha256(identifier.encode()).hexdigest()
-    
-    def _clean_old_requests(self, user_hash: str) -> None:
-        """Elimina peticiones antiguas del registro"""
-        now = datetime.now()
-        # Mantener solo peticiones del último día
-        self._requests[user_hash] = [
-            req_time for req_time in self._requests[user_hash]
-            if now - req_time < timedelta(days=1)
-        ]
-    
+
     def check_rate_limit(self, user_identifier: str) -> Tuple[bool, Optional[str]]:
         """
         Verifica si el usuario puede hacer una petición
-        
+
         Args:
             user_identifier: ID único del usuario (IP, session_id, etc.)
-            
+
         Returns:
             (permitido, mensaje_error)
         """
         user_hash = self._hash_identifier(user_identifier)
-        now = datetime.now()
-        
-        # Verificar si el usuario está bloqueado
-        if user_hash in self._blocked_users:
-            block_until = self._blocked_users[user_hash]
-            if now < block_until:
-                remaining = (block_until - now).total_seconds()
-                return False, f"Usuario bloqueado por {remaining:.0f} segundos más"
-            else:
-                del self._blocked_users[user_hash]
-        
-        # Limpiar peticiones antiguas
-        self._clean_old_requests(user_hash)
-        
-        # Contar peticiones en diferentes ventanas de tiempo
-        minute_requests = sum(
-            1 for req_time in self._requests[user_hash]
-            if now - req_time < timedelta(minutes=1)
-        )
-        
-        hour_requests = sum(
-            1 for req_time in self._requests[user_hash]
-            if now - req_time < timedelta(hours=1)
-        )
-        
-        day_requests = len(self._requests[user_hash])
-        
-        # Verificar límites
-        if minute_requests >= SecurityConfig.REQUESTS_PER_MINUTE:
-            # Bloquear por 5 minutos
-            self._blocked_users[user_hash] = now + timedelta(minutes=5)
-            return False, f"Límite por minuto excedido ({SecurityConfig.REQUESTS_PER_MINUTE} peticiones/minuto)"
-        
-        if hour_requests >= SecurityConfig.REQUESTS_PER_HOUR:
-            # Bloquear por 1 hora
-            self._blocked_users[user_hash] = now + timedelta(hours=1)
-            return False, f"Límite por hora excedido ({SecurityConfig.REQUESTS_PER_HOUR} peticiones/hora)"
-        
-        if day_requests >= SecurityConfig.REQUESTS_PER_DAY:
-            # Bloquear por 24 horas
-            self._blocked_users[user_hash] = now + timedelta(days=1)
-            return False, f"Límite diario excedido ({SecurityConfig.REQUESTS_PER_DAY} peticiones/día)"
-        
-        # Registrar petición
-        self._requests[user_hash].append(now)
-        
-        return True, None
-    
+        allowed, index, remaining = self.backend.check(user_hash, self.windows, time.time())
+
+        if allowed:
+            return True, None
+        if index == BLOCKED_INDEX:
+            return False, f"Usuario bloqueado por {remaining:.0f} segundos más"
+
+        name, _, limit, _ = self.windows[index]
+        messages = {
+            "minute": f"Límite por minuto excedido ({limit} peticiones/minuto)",
+            "hour": f"Límite por hora excedido ({limit} peticiones/hora)",
+            "day": f"Límite diario excedido ({limit} peticiones/día)",
+        }
+        return False, messages.get(name, f"Límite '{name}' excedido ({limit} peticiones)")
+
+    def is_allowed(self, user_identifier: str) -> bool:
+        """Atajo booleano de check_rate_limit"""
+        return self.check_rate_limit(user_identifier)[0]
+
     def get_user_stats(self, user_identifier: str) -> Dict:
         """Obtiene estadísticas de uso del usuario"""
         user_hash = self._hash_identifier(user_identifier)
-        self._clean_old_requests(user_hash)
-        
-        now = datetime.now()
-        
+        usage = self.backend.usage(user_hash, self.windows, time.time())
+        counts = usage["counts"]
+
         return {
-            'requests_last_minute': sum(
-                1 for req_time in self._requests[user_hash]
-                if now - req_time < timedelta(minutes=1)
-            ),
-            'requests_last_hour': sum(
-                1 for req_time in self._requests[user_hash]
-                if now - req_time < timedelta(hours=1)
-            ),
-            'requests_last_day': len(self._requests[user_hash]),
-            'is_blocked': user_hash in self._blocked_users
+            'requests_last_minute': counts.get("minute", 0),
+            'requests_last_hour': counts.get("hour", 0),
+            'requests_last_day': counts.get("day", 0),
+            'is_blocked': usage["is_blocked"]
         }
-    
+
     def reset_user_limits(self, user_identifier: str) -> None:
         """Resetea los límites para un usuario específico (solo para administradores)"""
-        user_hash = self._hash_identifier(user_identifier)
-        
-        if user_hash in self._requests:
-            del self._requests[user_hash]
-        
-        if user_hash in self._blocked_users:
-            del self._blocked_users[user_hash]
-    
+        self.backend.reset(self._hash_identifier(user_identifier), self.windows)
+
     def get_system_stats(self) -> Dict:
         """Obtiene estadísticas generales del sistema"""
-        now = datetime.now()
-        
-        total_users = len(self._requests)
-        blocked_users = len(self._blocked_users)
-        
-        total_requests_today = sum(len(requests) for requests in self._requests.values())
-        
+        stats = self.backend.system_stats(self.windows, time.time())
+        total_users = stats.get("tracked_users", 0)
+        total_requests = stats.get("total_requests_current_window", 0)
+
         return {
             'total_active_users': total_users,
-            'blocked_users': blocked_users,
-            'total_requests_today': total_requests_today,
-            'average_requests_per_user': total_requests_today / max(total_users, 1)
+            'blocked_users': stats.get("blocked_users", stats.get("locally_blocked_users", 0)),
+            'total_requests_today': total_requests,
+            'average_requests_per_user': total_requests / max(total_users, 1),
+            'backend': stats.get("backend", "memory")
         }
 
+
+def create_rate_limiter(
+    windows: Optional[Sequence[WindowSpec]] = None,
+    redis_url: Optional[str] = None,
+    key_prefix: str = "ratelimit"
+) -> RateLimiter:
+    """
+    Crear rate limiter; usa Redis si RATE_LIMIT_REDIS_URL está configurada
+    y el servidor responde, si no el backend en memoria
+    """
+    redis_url = redis_url or os.getenv("RATE_LIMIT_REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+            client = redis.from_url(redis_url, socket_connect_timeout=2, socket_timeout=2)
+            client.ping()
+            logger.info("✅ Rate limiter con backend Redis compartido")
+            return RateLimiter(windows, RedisRateLimitBackend(client, key_prefix=key_prefix))
+        except Exception as e:
+            logger.warning(f"⚠️ Redis para rate limiting no disponible, usando memoria: {e}")
+    return RateLimiter(windows)
+
+
 # Instancia global del rate limiter
-rate_limiter = RateLimiter() 
\ No newline at end of file
+rate_limiter = create_rate_limiter()
@@ -10,6 +10,8 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from ..graph.normative_graph import NormativeGraph, get_normative_graph
+
 # Visualización
 try:
     import plotly.express as px
@@ -343,8 +345,9 @@ class AdvancedRAGVisualizer:
             return None
     
     def create_normative_network_viz(self, 
-                                    concordance_data: Dict[str, Any]) -> Optional[go.Figure]:
-        """Crear visualización de red normativa"""
+                                    concordance_data: Dict[str, Any],
+                                    graph: Optional[NormativeGraph] = None) -> Optional[go.Figure]:
+        """Crear visualización de red normativa (desde el grafo normativo si está construido)"""
         if not PLOTLY_AVAILABLE:
             return None
         
@@ -353,8 +356,23 @@ class AdvancedRAGVisualizer:
             nodes = []
             edges = []
             
-            # Extraer nodos (normas)
-            if 'central_norms' in concordance_data:
+            graph = graph or concordance_data.get('graph') or get_normative_graph()
+            if graph.get_stats()['nodes_by_kind']['norm']:
+                # Las 20 normas con más relaciones y las aristas entre ellas
+                degrees = graph.degrees()
+                norm_nodes = [i for i, kind in enumerate(graph.node_kinds) if kind == 'norm']
+                norm_nodes.sort(key=lambda i: degrees[i], reverse=True)
+                positions = {}
+                for i, node in enumerate(norm_nodes[:20]):
+                    positions[graph.node_names[node]] = i
+                    nodes.append({
+                        'id': i,
+                        'name': graph.node_labels[node][:30] + '...',
+                        'references': int(degrees[node]),
+                        'size': min(int(degrees[node]) * 5 + 10, 50)
+                    })
+                edges = [(positions[a], positions[b]) for a, b, _, _ in graph.edges(positions)]
+            elif 'central_norms' in concordance_data:
                 for i, norm_data in enumerate(concordance_data['central_norms'][:20]):
                     nodes.append({
                         'id': i,
@@ -373,6 +391,19 @@ class AdvancedRAGVisualizer:
                 # Crear scatter plot para nodos
                 fig = go.Figure()
                 
+                if edges:
+                    edge_x, edge_y = [], []
+                    for a, b in edges:
+                        edge_x += [x_nodes[a], x_nodes[b], None]
+                        edge_y += [y_nodes[a], y_nodes[b], None]
+                    fig.add_trace(go.Scatter(
+                        x=edge_x,
+                        y=edge_y,
+                        mode='lines',
+                        line=dict(width=0.8, color=self.minedu_colors["light"]),
+                        hoverinfo='skip'
+                    ))
+                
                 fig.add_trace(go.Scatter(
                     x=x_nodes,
                     y=y_nodes,
@@ -4,10 +4,12 @@ Data processing pipeline for document ingestion.
 This package contains:
 - Document processing workflows
 - Vectorstore generation
+- Synthetic corpora for scaling benchmarks
 - Data pipeline orchestration
 """
 
 from .generate_chunks import ChunkGenerator
 from .generate_vectorstores import VectorstoreGenerator
+from .synthetic_corpus import SyntheticCorpusGenerator
 
-__all__ = ['ChunkGenerator', 'VectorstoreGenerator'] 
\ No newline at end of file
+__all__ = ['ChunkGenerator', 'VectorstoreGenerator', 'SyntheticCorpusGenerator'] 
\ No newline at end of file
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador determinista de corpus normativos sintéticos para benchmarks de escala.
+
+A partir de las oraciones de los chunks reales de la directiva construye
+chunks con estructura de numerales (6.2.3), montos en formatos S/ y
+metadatos de norma (norm_type, norm_number, publication_date). El chunk i
+depende solo de (seed, i): el corpus de 10k es prefijo del de 100k y el de
+100k del de 1M, por lo que los resultados son comparables entre tamaños.
+"""
+
+import json
+import logging
+import random
+import re
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.paths import ProjectPaths
+
+
+SEED_FILES = ("chunks.json", "chunks_directiva_limpia.json", "chunks_limpios.json")
+
+NORM_TYPES = [
+    ("Directiva", "MINEDU/SG-OGA"),
+    ("Resolución Ministerial", "MINEDU"),
+    ("Resolución de Secretaría General", "MINEDU"),
+    ("Decreto Supremo", "EF"),
+    ("Resolución Viceministerial", "MINEDU"),
+]
+
+SECTIONS = [
+    "viáticos", "pasajes", "rendición de cuentas", "solicitud", "autorización",
+    "alimentación", "hospedaje", "movilidad local", "devolución", "responsabilidades",
+    "disposiciones complementarias", "comisión de servicios",
+]
+
+SECTION_TITLES = [
+    "DISPOSICIONES GENERALES", "DISPOSICIONES ESPECÍFICAS", "PROCEDIMIENTO",
+    "RESPONSABILIDADES", "DISPOSICIONES COMPLEMENTARIAS", "DEFINICIONES",
+]
+
+CONCEPTS = [
+    "viáticos por día", "alimentación", "hospedaje", "movilidad local",
+    "pasajes terrestres", "pasajes aéreos", "gastos de traslado", "asignación diaria",
+]
+
+RANKS = [
+    "Ministros de Estado", "Viceministros", "Secretario General", "Directores Generales",
+    "Jefes de Oficina", "servidores civiles", "funcionarios de confianza",
+]
+
+AMOUNT_SENTENCES = [
+    "El monto máximo por concepto de {concept} para {rank} es de {amount}.",
+    "Se asigna hasta {amount} por {concept} según la escala vigente.",
+    "La asignación por {concept} no podrá exceder de {amount} por día de comisión.",
+    "Para {rank} el tope de {concept} asciende a {amount}.",
+]
+
+DEADLINE_SENTENCES = [
+    "La rendición de cuentas se presenta dentro de los {days} días hábiles siguientes a la culminación de la comisión.",
+    "La solicitud debe registrarse con {days} días calendario de anticipación.",
+    "El saldo no utilizado se devuelve en un plazo máximo de {days} días hábiles.",
+]
+
+
+def format_amount(rng: random.Random) -> str:
+    """Monto en uno de los formatos S/ presentes en las normas"""
+    value = rng.choice([rng.randint(20, 500), rng.randint(500, 5000)]) + rng.choice([0, 0, 0.5, 0.8])
+    style = rng.randrange(4)
+    if style == 0:
+        return f"S/ {value:.2f}"
+    if style == 1:
+        return f"S/. {value:,.2f}"
+    if style == 2:
+        return f"S/ {int(value)}"
+    return f"S/ {value:,.2f} ({int(value)} soles)"
+
+
+class SyntheticCorpusGenerator:
+    """
+    Generador de chunks sintéticos a partir de las oraciones de chunks reales.
+    """
+
+    def __init__(self, seed_chunks: Optional[List[Dict[str, Any]]] = None, seed: int = 42):
+        self.seed = seed
+        self.logger = self._setup_logging()
+        self.sentences = self._extract_sentences(seed_chunks if seed_chunks is not None else self._load_seed_chunks())
+        if not self.sentences:
+            raise ValueError("No hay oraciones base para generar el corpus")
+
+    def _setup_logging(self) -> logging.Logger:
+        """Configurar logging."""
+        logger = logging.getLogger('SyntheticCorpusGenerator')
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        return logger
+
+    def _load_seed_chunks(self) -> List[Dict[str, Any]]:
+        """Cargar los chunks reales de data/processed."""
+        chunks = []
+        for filename in SEED_FILES:
+            path = ProjectPaths.PROCESSED_DIR / filename
+            if not path.exists():
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"No se pudo leer {path}: {e}")
+                continue
+            if isinstance(data, list):
+                chunks.extend(chunk for chunk in data if isinstance(chunk, dict))
+        return chunks
+
+    def _extract_sentences(self, chunks: List[Dict[str, Any]]) -> List[str]:
+        """Oraciones legibles (sin ruido OCR) ordenadas para que el resultado sea determinista."""
+        sentences = set()
+        for chunk in chunks:
+            text = str(chunk.get('texto', chunk.get('text', '')))
+            text = re.sub(r'-{2,}\s*PÁGINA\s*\d+\s*-{2,}', ' ', text)
+            for sentence in re.split(r'(?<=[.;:])\s+', re.sub(r'\s+', ' ', text)):
+                sentence = sentence.strip(' -;:')
+                if not 40 <= len(sentence) <= 300:
+                    continue
+                letters = sum(ch.isalpha() or ch.isspace() for ch in sentence)
+                # Descartar oraciones con ruido OCR (letras separadas, símbolos, fragmentos)
+                if (letters / len(sentence) < 0.9 or not sentence[0].isupper()
+                        or re.search(r'[<>�$\\|{}]|(\b\w ){4,}', sentence)):
+                    continue
+                sentences.add(sentence if sentence.endswith('.') else f"{sentence}.")
+        return sorted(sentences)
+
+    def generate_chunk(self, index: int) -> Dict[str, Any]:
+        """Chunk sintético i (depende solo de la semilla y del índice)."""
+        rng = random.Random(f"{self.seed}:{index}")
+
+        norm_type, issuer = rng.choice(NORM_TYPES)
+        year = rng.randint(2005, 2024)
+        norm_number = f"{rng.randint(1, 350):03d}-{year}-{issuer}"
+        publication_date = date(year, 1, 1) + timedelta(days=rng.randrange(365))
+
+        numeral = ".".join(str(part) for part in [rng.randint(5, 9), rng.randint(1, 8), rng.randint(1, 12)][:rng.randint(2, 3)])
+        section = rng.choice(SECTIONS)
+        section_title = rng.choice(SECTION_TITLES)
+
+        body = rng.sample(self.sentences, min(rng.randint(2, 4), len(self.sentences)))
+        body.insert(rng.randrange(len(body) + 1), rng.choice(AMOUNT_SENTENCES).format(
+            concept=rng.choice(CONCEPTS),
+            rank=rng.choice(RANKS),
+            amount=format_amount(rng)
+        ))
+        if rng.random() < 0.4:
+            body.append(rng.choice(DEADLINE_SENTENCES).format(days=rng.choice([3, 5, 8, 10, 15, 30])))
+
+        texto = f"{numeral}. {section_title} - {section.capitalize()}: " + " ".join(body)
+        return {
+            "id": f"synthetic_{index}",
+            "texto": texto,
+            "titulo": f"{norm_type} N° {norm_number} - numeral {numeral}",
+            "metadatos": {
+                "norm_type": norm_type,
+                "norm_number": norm_number,
+                "publication_date": publication_date.isoformat(),
+                "numeral": numeral,
+                "section": section,
+                "page": rng.randint(1, 40),
+                "type": "normativa",
+                "source": f"{norm_type} N° {norm_number}",
+                "synthetic": True
+            }
+        }
+
+    def iter_chunks(self, n_chunks: int) -> Iterator[Dict[str, Any]]:
+        for index in range(n_chunks):
+            yield self.generate_chunk(index)
+
+    def write(self, n_chunks: int, output_path: str) -> Path:
+        """
+        Escribir el corpus como arreglo JSON (mismo formato que data/processed/chunks.json).
+
+        Se escribe en streaming para no mantener el corpus completo en memoria.
+        """
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write("[\n")
+            for index, chunk in enumerate(self.iter_chunks(n_chunks)):
+                if index:
+                    f.write(",\n")
+                f.write(json.dumps(chunk, ensure_ascii=False))
+            f.write("\n]\n")
+        self.logger.info(f"Corpus sintético de {n_chunks:,} chunks guardado en {output}")
+        return output
@@ -10,13 +10,20 @@ sin mezclarse con la extracción de datos.
 import yaml
 import logging
 import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Rendiciones por bloque en la validación masiva
+REPORT_CHUNK_SIZE = 2000
+
 @dataclass
 class ValidationResult:
     """Resultado de validación normativa"""
@@ -41,6 +48,43 @@ class ConceptEvaluation:
     violation_reason: Optional[str] = None
     confidence: float = 1.0
 
+@dataclass
+class ReportValidation:
+    """Resultado de validación de una rendición de gastos"""
+    report_id: Any
+    valid: bool
+    location: str
+    total_amount: float
+    daily_limit: float
+    days: int
+    concepts_count: int
+    violations: List[str]
+    warnings: List[str]
+
+@dataclass
+class CompiledCatalog:
+    """
+    Catálogo compilado: arrays indexados por (ubicación, numeral)
+    La última fila corresponde a ubicaciones desconocidas (no procede, límite 0)
+    """
+    numerals: List[str]
+    numeral_index: Dict[str, int]
+    conceptos: List[str]
+    location_index: Dict[str, int]
+    tariffs: np.ndarray
+    procede: np.ndarray
+    justifications: List[List[str]]
+    daily_limits: np.ndarray
+    exclusions: List[Tuple[np.ndarray, np.ndarray]]
+    same_day_mask: np.ndarray
+    max_per_day: int
+
+    def location_row(self, location: str) -> int:
+        return self.location_index.get(location, len(self.location_index))
+
+    def columns(self, mask: np.ndarray) -> List[str]:
+        return [self.numerals[i] for i in np.flatnonzero(mask)]
+
 class NormativeRulesEngine:
     """
     Motor de reglas declarativas que evalúa conceptos contra catálogo normativo.
@@ -58,6 +102,7 @@ class NormativeRulesEngine:
         
         self.catalog_path = Path(catalog_path)
         self.catalog = self._load_catalog()
+        self.compiled = self._compile_catalog()
         self.validation_cache = {}
         
         logger.info(f"NormativeRulesEngine inicializado con catálogo: {self.catalog_path}")
@@ -88,6 +133,88 @@ class NormativeRulesEngine:
             logger.error(f"❌ Error cargando catálogo: {e}")
             raise ValueError(f"Catálogo normativo inválido: {e}")
     
+    def _compile_catalog(self) -> CompiledCatalog:
+        """Compilar numerales, tarifas, procedencia y exclusiones en arrays"""
+        numerals_def = self.catalog['numerals']
+        numerals = [str(numeral) for numeral in numerals_def]
+        numeral_index = {numeral: i for i, numeral in enumerate(numerals)}
+        
+        locations = list(self.catalog['global_limits'])
+        for definition in numerals_def.values():
+            locations.extend(loc for loc in definition.get('ubicacion', {}) if loc not in locations)
+        
+        shape = (len(locations) + 1, len(numerals))
+        tariffs = np.zeros(shape)
+        procede = np.zeros(shape, dtype=bool)
+        justifications = [['Sin justificación'] * len(numerals) for _ in range(shape[0])]
+        for col, definition in enumerate(numerals_def.values()):
+            for row, location in enumerate(locations):
+                config = definition.get('ubicacion', {}).get(location, {})
+                tariffs[row, col] = config.get('tarifa', 0)
+                procede[row, col] = bool(config.get('procede', False))
+                justifications[row][col] = config.get('justificacion', 'Sin justificación')
+        
+        daily_limits = np.array(
+            [self.catalog['global_limits'].get(location, {}).get('daily_limit', 0) for location in locations] + [0],
+            dtype=np.float64
+        )
+        
+        def bitset(numeral_list: List[str]) -> np.ndarray:
+            mask = np.zeros(len(numerals), dtype=bool)
+            mask[[numeral_index[n] for n in map(str, numeral_list) if n in numeral_index]] = True
+            return mask
+        
+        rules = self.catalog['validation_rules']
+        same_day = rules.get('same_day_services', {})
+        return CompiledCatalog(
+            numerals=numerals,
+            numeral_index=numeral_index,
+            conceptos=[definition['concepto'] for definition in numerals_def.values()],
+            location_index={location: i for i, location in enumerate(locations)},
+            tariffs=tariffs,
+            procede=procede,
+            justifications=justifications,
+            daily_limits=daily_limits,
+            exclusions=[
+                (bitset(rule['group']), bitset(rule.get('exclusions', [])))
+                for rule in rules.get('mutual_exclusions', [])
+            ],
+            same_day_mask=bitset(same_day.get('applies_to', [])),
+            max_per_day=same_day.get('max_per_day', 999)
+        )
+    
+    def _violation_reason(self, numeral: str, col: int, row: int, location: str, amount: float) -> Optional[str]:
+        """Motivo por el que un concepto no es válido (None si es válido)"""
+        compiled = self.compiled
+        if col < 0:
+            return f"Numeral {numeral} no definido en catálogo"
+        if not compiled.procede[row, col]:
+            return f"No procede en {location}: {compiled.justifications[row][col]}"
+        expected_amount = float(compiled.tariffs[row, col])
+        if amount != expected_amount:
+            return f"Monto incorrecto: esperado S/{expected_amount}, recibido S/{amount}"
+        return None
+    
+    def _exclusion_violations(self, used: np.ndarray) -> List[str]:
+        """Exclusiones mutuas sobre el bitset de numerales usados"""
+        violations = []
+        for group, exclusions in self.compiled.exclusions:
+            if (used & group).any() and (used & exclusions).any():
+                violations.append(
+                    f"Conceptos mutuamente excluyentes: {self.compiled.columns(used & group)} "
+                    f"no puede usarse con {self.compiled.columns(used & exclusions)}"
+                )
+        return violations
+    
+    def _repetition_warnings(self, counts: np.ndarray) -> List[str]:
+        """Conceptos repetidos más veces que el máximo por día"""
+        compiled = self.compiled
+        repeated = np.flatnonzero((counts > compiled.max_per_day) & compiled.same_day_mask)
+        return [
+            f"Concepto {compiled.numerals[col]} repetido {counts[col]} veces (máximo recomendado: {compiled.max_per_day})"
+            for col in repeated
+        ]
+    
     def evaluate_concepts(self, extracted_concepts: List[Dict[str, Any]], 
                          location: str = "regiones") -> ValidationResult:
         """
@@ -137,11 +264,9 @@ class NormativeRulesEngine:
     def _validate_numerals_exist(self, extracted_concepts: List[Dict[str, Any]]):
         """Validar que todos los numerales existen en el catálogo"""
         
-        catalog_numerals = set(self.catalog['numerals'].keys())
-        
         for concept in extracted_concepts:
             numeral = str(concept.get('numeral', '')).strip()
-            if numeral and numeral not in catalog_numerals:
+            if numeral and numeral not in self.compiled.numeral_index:
                 error_msg = self.catalog['error_messages']['unknown_numeral'].format(numeral=numeral)
                 logger.error(f"❌ {error_msg}")
                 raise ValueError(error_msg)
@@ -152,49 +277,15 @@ class NormativeRulesEngine:
         numeral = str(concept.get('numeral', '')).strip()
         amount = float(concept.get('amount', 0))
         
-        # Obtener definición del catálogo
-        numeral_def = self.catalog['numerals'].get(numeral)
-        if not numeral_def:
-            return ConceptEvaluation(
-                numeral=numeral,
-                concepto="Desconocido",
-                amount=amount,
-                valid=False,
-                location=location,
-                violation_reason=f"Numeral {numeral} no definido en catálogo"
-            )
-        
-        # Verificar si procede en la ubicación
-        location_config = numeral_def['ubicacion'].get(location, {})
-        if not location_config.get('procede', False):
-            return ConceptEvaluation(
-                numeral=numeral,
-                concepto=numeral_def['concepto'],
-                amount=amount,
-                valid=False,
-                location=location,
-                violation_reason=f"No procede en {location}: {location_config.get('justificacion', 'Sin justificación')}"
-            )
-        
-        # Verificar monto correcto
-        expected_amount = location_config.get('tarifa', 0)
-        if amount != expected_amount:
-            return ConceptEvaluation(
-                numeral=numeral,
-                concepto=numeral_def['concepto'],
-                amount=amount,
-                valid=False,
-                location=location,
-                violation_reason=f"Monto incorrecto: esperado S/{expected_amount}, recibido S/{amount}"
-            )
-        
-        # Si llegamos aquí, el concepto individual es válido
+        col = self.compiled.numeral_index.get(numeral, -1)
+        reason = self._violation_reason(numeral, col, self.compiled.location_row(location), location, amount)
         return ConceptEvaluation(
             numeral=numeral,
-            concepto=numeral_def['concepto'],
+            concepto=self.compiled.conceptos[col] if col >= 0 else "Desconocido",
             amount=amount,
-            valid=True,
-            location=location
+            valid=reason is None,
+            location=location,
+            violation_reason=reason
         )
     
     def _evaluate_global_rules(self, evaluations: List[ConceptEvaluation], 
@@ -209,8 +300,7 @@ class NormativeRulesEngine:
         total_amount = sum(e.amount for e in valid_concepts)
         
         # Obtener límite diario
-        global_limits = self.catalog['global_limits']
-        daily_limit = global_limits.get(location, {}).get('daily_limit', 0)
+        daily_limit = float(self.compiled.daily_limits[self.compiled.location_row(location)])
         
         # Regla 1: Límite diario global
         if total_amount > daily_limit:
@@ -239,40 +329,19 @@ class NormativeRulesEngine:
                                 violations: List[str], warnings: List[str]):
         """Verificar exclusiones mutuas entre conceptos"""
         
-        used_numerals = {concept.numeral for concept in valid_concepts}
-        
-        # Verificar exclusiones definidas en el catálogo
-        mutual_exclusions = self.catalog['validation_rules'].get('mutual_exclusions', [])
-        
-        for exclusion_group in mutual_exclusions:
-            group_concepts = set(exclusion_group['group'])
-            exclusions = set(exclusion_group.get('exclusions', []))
-            
-            # Si usamos conceptos del grupo y también de las exclusiones
-            if used_numerals & group_concepts and used_numerals & exclusions:
-                group_used = list(used_numerals & group_concepts)
-                exclusions_used = list(used_numerals & exclusions)
-                violations.append(
-                    f"Conceptos mutuamente excluyentes: {group_used} no puede usarse con {exclusions_used}"
-                )
+        used = np.zeros(len(self.compiled.numerals), dtype=bool)
+        used[[self.compiled.numeral_index[concept.numeral] for concept in valid_concepts]] = True
+        violations.extend(self._exclusion_violations(used))
     
     def _check_concept_limits(self, valid_concepts: List[ConceptEvaluation], 
                             violations: List[str], warnings: List[str], location: str):
         """Verificar límites específicos por concepto"""
         
-        # Agrupar por numeral para verificar repeticiones
-        concept_counts = {}
-        for concept in valid_concepts:
-            concept_counts[concept.numeral] = concept_counts.get(concept.numeral, 0) + 1
-        
-        # Verificar límites de servicios por día
-        same_day_rules = self.catalog['validation_rules'].get('same_day_services', {})
-        max_per_day = same_day_rules.get('max_per_day', 999)
-        applies_to = same_day_rules.get('applies_to', [])
-        
-        for numeral, count in concept_counts.items():
-            if numeral in applies_to and count > max_per_day:
-                warnings.append(f"Concepto {numeral} repetido {count} veces (máximo recomendado: {max_per_day})")
+        counts = np.bincount(
+            [self.compiled.numeral_index[concept.numeral] for concept in valid_concepts],
+            minlength=len(self.compiled.numerals)
+        )
+        warnings.extend(self._repetition_warnings(counts))
     
     def _generate_suggestions(self, evaluations: List[ConceptEvaluation], 
                             global_validation: Dict[str, Any], location: str) -> List[str]:
@@ -322,7 +391,7 @@ class NormativeRulesEngine:
         alternatives = []
         
         total_amount = sum(e.amount for e in evaluations if e.valid)
-        daily_limit = self.catalog['global_limits'].get(location, {}).get('daily_limit', 0)
+        daily_limit = float(self.compiled.daily_limits[self.compiled.location_row(location)])
         
         if total_amount > daily_limit:
             # Alternativa 1: Distribuir en 2 días
@@ -359,6 +428,119 @@ class NormativeRulesEngine:
         
         return alternatives
     
+    def validate_reports(self, reports: List[Dict[str, Any]], processes: Optional[int] = None,
+                         chunk_size: int = REPORT_CHUNK_SIZE) -> List[ReportValidation]:
+        """
+        Validar muchas rendiciones en una sola llamada (auditoría anual).
+        
+        Args:
+            reports: Lista de {id, location, concepts}; cada concepto {numeral, amount, date}.
+                     Los límites diarios se aplican por fecha (sin fecha = un solo día)
+            processes: Procesos para lotes muy grandes (None = en este proceso)
+            chunk_size: Rendiciones por bloque
+            
+        Returns:
+            ReportValidation por rendición, en el mismo orden
+        """
+        chunks = [reports[i:i + chunk_size] for i in range(0, len(reports), chunk_size)]
+        if processes and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(str(self.catalog_path),)) as pool:
+                results = list(chain.from_iterable(pool.map(_validate_chunk_in_worker, chunks)))
+        else:
+            results = list(chain.from_iterable(self._validate_chunk(chunk) for chunk in chunks))
+        
+        observed = sum(not result.valid for result in results)
+        logger.info(f"📋 {len(results)} rendiciones validadas: {observed} con observaciones")
+        return results
+    
+    def _validate_chunk(self, reports: List[Dict[str, Any]]) -> List[ReportValidation]:
+        """Validación vectorizada de un bloque: totales, límites y exclusiones por día"""
+        compiled = self.compiled
+        locations = [str(report.get('location', 'regiones')) for report in reports]
+        report_rows = np.array([compiled.location_row(location) for location in locations], dtype=np.int64)
+        
+        # Aplanar conceptos: rendición, día (grupo), numeral y monto
+        numerals, concept_report, concept_group, amounts = [], [], [], []
+        group_report, group_labels = [], []
+        for r, report in enumerate(reports):
+            days: Dict[Any, int] = {}
+            for concept in report.get('concepts', []):
+                label = concept.get('date')
+                if label not in days:
+                    days[label] = len(group_report)
+                    group_report.append(r)
+                    group_labels.append(label)
+                numerals.append(str(concept.get('numeral', '')).strip())
+                concept_report.append(r)
+                concept_group.append(days[label])
+                amounts.append(float(concept.get('amount', 0)))
+        
+        cols = np.array([compiled.numeral_index.get(numeral, -1) for numeral in numerals], dtype=np.int64)
+        concept_report = np.array(concept_report, dtype=np.int64)
+        concept_group = np.array(concept_group, dtype=np.int64)
+        amounts = np.array(amounts, dtype=np.float64)
+        group_report = np.array(group_report, dtype=np.int64)
+        
+        rows = report_rows[concept_report]
+        known = cols >= 0
+        safe_cols = np.where(known, cols, 0)
+        procede = known & compiled.procede[rows, safe_cols]
+        valid = procede & (amounts == compiled.tariffs[rows, safe_cols])
+        valid_amounts = np.where(valid, amounts, 0.0)
+        
+        # Totales y bitsets de numerales usados por día
+        group_totals = np.bincount(concept_group, weights=valid_amounts, minlength=len(group_report))
+        group_limits = compiled.daily_limits[report_rows[group_report]]
+        counts = np.zeros((len(group_report), len(compiled.numerals)), dtype=np.int64)
+        np.add.at(counts, (concept_group[valid], cols[valid]), 1)
+        used = counts > 0
+        excluded = np.zeros(len(group_report), dtype=bool)
+        for group, exclusions in compiled.exclusions:
+            excluded |= used[:, group].any(axis=1) & used[:, exclusions].any(axis=1)
+        repeated = ((counts > compiled.max_per_day) & compiled.same_day_mask).any(axis=1)
+        
+        has_invalid = np.bincount(concept_group, weights=~valid, minlength=len(group_report)) > 0
+        group_problems = (group_totals > group_limits) | excluded | repeated | has_invalid
+        report_totals = np.bincount(concept_report, weights=valid_amounts, minlength=len(reports))
+        concepts_count = np.bincount(concept_report, minlength=len(reports))
+        days_count = np.bincount(group_report, minlength=len(reports))
+        
+        results = [
+            ReportValidation(
+                report_id=report.get('id', r),
+                valid=True,
+                location=locations[r],
+                total_amount=float(report_totals[r]),
+                daily_limit=float(compiled.daily_limits[report_rows[r]]),
+                days=int(days_count[r]),
+                concepts_count=int(concepts_count[r]),
+                violations=[],
+                warnings=[]
+            )
+            for r, report in enumerate(reports)
+        ]
+        
+        # Mensajes solo para las rendiciones con observaciones
+        invalid_by_group: Dict[int, List[int]] = {}
+        for i in np.flatnonzero(~valid).tolist():
+            invalid_by_group.setdefault(int(concept_group[i]), []).append(i)
+        for g in np.flatnonzero(group_problems).tolist():
+            result = results[group_report[g]]
+            prefix = f"{group_labels[g]}: " if group_labels[g] is not None else ""
+            violations = []
+            if group_totals[g] > group_limits[g]:
+                violations.append(f"Total S/{float(group_totals[g])} excede límite diario S/{float(group_limits[g])}")
+            if excluded[g]:
+                violations.extend(self._exclusion_violations(used[g]))
+            for i in invalid_by_group.get(g, []):
+                reason = self._violation_reason(numerals[i], int(cols[i]), int(rows[i]), result.location, float(amounts[i]))
+                violations.append(f"{numerals[i]}: {reason}")
+            result.violations.extend(prefix + violation for violation in violations)
+            result.warnings.extend(prefix + warning for warning in self._repetition_warnings(counts[g]))
+            result.valid = not result.violations
+        return results
+    
     def get_concept_definition(self, numeral: str) -> Optional[Dict[str, Any]]:
         """Obtener definición completa de un numeral"""
         
@@ -442,6 +624,16 @@ class NormativeRulesEngine:
         
         logger.info(f"📋 Reporte de validación guardado en: {output_path}")
 
+# Motor por proceso para validate_reports con processes
+_worker_engine: Optional[NormativeRulesEngine] = None
+
+def _init_worker(catalog_path: str):
+    global _worker_engine
+    _worker_engine = NormativeRulesEngine(catalog_path)
+
+def _validate_chunk_in_worker(reports: List[Dict[str, Any]]) -> List[ReportValidation]:
+    return _worker_engine._validate_chunk(reports)
+
 # Función de conveniencia
 def validate_concepts(concepts: List[Dict[str, Any]], location: str = "regiones") -> ValidationResult:
     """Función de conveniencia para validar conceptos"""
@@ -6,11 +6,14 @@ import logging
 import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import csv
+import io
 import json
+import time
 from decimal import Decimal
 
 try:
-    from fastapi import FastAPI, HTTPException
+    from fastapi import FastAPI, HTTPException, Request
     import uvicorn
     FASTAPI_AVAILABLE = True
 except ImportError:
@@ -23,6 +26,25 @@ from ..core.agents.calculation_agent import CalculationAgent
 
 logger = logging.getLogger(__name__)
 
+
+def parse_commission_rows(payload: Any, content_type: str = "application/json") -> List[Dict[str, Any]]:
+    """Filas de comisiones desde CSV (con encabezados) o JSON (lista o {"rows": [...]})"""
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8-sig")
+    if isinstance(payload, str):
+        if "csv" in content_type:
+            return [
+                {key.strip(): value.strip() for key, value in row.items() if key and value is not None}
+                for row in csv.DictReader(io.StringIO(payload))
+            ]
+        payload = json.loads(payload) if payload.strip() else []
+    if isinstance(payload, dict):
+        payload = payload.get("rows", [])
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise ValueError("Se esperaba una lista de comisiones")
+    return payload
+
+
 class CalculationService:
     """
     Microservicio especializado en cálculos normativos
@@ -122,6 +144,20 @@ class CalculationService:
                 logger.error(f"Error calculating viaticos: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
         
+        @self.app.post("/api/calculate/viaticos/batch")
+        async def calculate_viaticos_batch(request: Request):
+            """Calcular viáticos en lote desde CSV o JSON"""
+            try:
+                body = await request.body()
+                return await asyncio.to_thread(
+                    self.calculate_viaticos_bulk, body, request.headers.get("content-type", "application/json")
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                logger.error(f"Error calculating viaticos batch: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+        
         @self.app.post("/api/calculate/query")
         async def calculate_from_query(request: Dict[str, Any]):
             """Calcular basado en consulta natural usando CalculationAgent"""
@@ -308,6 +344,7 @@ class CalculationService:
                     "calculators_loaded": 3,
                     "endpoints": [
                         "/api/calculate/viaticos",
+                        "/api/calculate/viaticos/batch",
                         "/api/calculate/query",
                         "/api/calculate/uit",
                         "/api/calculate/percentage",
@@ -319,6 +356,35 @@ class CalculationService:
                 logger.error(f"Error getting stats: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
     
+    def calculate_viaticos_bulk(self, payload: Any, content_type: str = "application/json") -> Dict[str, Any]:
+        """Conciliación de viáticos de muchas comisiones (CSV o JSON) con totales por año y nivel"""
+        started = time.perf_counter()
+        rows = parse_commission_rows(payload, content_type)
+        results = self.normative_calculator.calculate_viaticos_batch(rows)
+        
+        by_year: Dict[int, float] = {}
+        by_level: Dict[str, float] = {}
+        for result in results:
+            amount = result["total_amount_soles"]
+            by_year[result["year"]] = by_year.get(result["year"], 0.0) + amount
+            by_level[result["level"].lower()] = by_level.get(result["level"].lower(), 0.0) + amount
+        
+        return {
+            "success": True,
+            "calculation_type": "viaticos_batch",
+            "count": len(results),
+            "totals": {
+                "total_amount_soles": round(sum(by_year.values()), 2),
+                "by_year": {year: round(amount, 2) for year, amount in sorted(by_year.items())},
+                "by_level": {level: round(amount, 2) for level, amount in sorted(by_level.items())},
+                "default_calculations": sum("note" in result for result in results)
+            },
+            "results": results,
+            "service": "calculation_service",
+            "time_ms": round((time.perf_counter() - started) * 1000, 1),
+            "timestamp": datetime.now().isoformat()
+        }
+    
     async def start_service(self):
         """Iniciar Calculation Service"""
         if not FASTAPI_AVAILABLE:
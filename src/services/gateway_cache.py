@@ -0,0 +1,327 @@
+"""
+Gateway Response Cache - Fase 5: RAGP
+Cache de respuestas y request hedging para rutas idempotentes del gateway
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# TTLs por defecto (segundos) por prefijo de ruta
+DEFAULT_ROUTE_TTLS = {
+    "/api/calculate": 3600,   # Tablas normativas (UIT, viáticos) cambian muy poco
+    "/api/agents": 120,
+    "/api/chat": 60,
+}
+
+
+def canonical_body_hash(json_data: Optional[Dict[str, Any]]) -> str:
+    """Hash SHA-256 del body JSON en forma canónica (claves ordenadas, sin espacios)"""
+    if not json_data:
+        return "empty"
+    canonical = json.dumps(
+        json_data,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PointerFileGeneration:
+    """
+    Generación activa del índice según el archivo puntero (CURRENT) que publica
+    el backend al activar una generación; se relee como máximo cada poll_interval
+    """
+
+    def __init__(self, pointer_file: Any, poll_interval: float = 5.0):
+        self.pointer_file = Path(pointer_file)
+        self.poll_interval = poll_interval
+        self._checked_at: Optional[float] = None
+        self._value = "default"
+
+    def __call__(self) -> str:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.poll_interval:
+            self._checked_at = now
+            try:
+                target = self.pointer_file.read_text(encoding="utf-8").strip()
+            except OSError:
+                target = ""
+            self._value = hashlib.sha256(target.encode("utf-8")).hexdigest()[:12] if target else "default"
+        return self._value
+
+
+class GatewayResponseCache:
+    """
+    Cache de respuestas del gateway con TTL por ruta
+    - L1: memoria local (LRU acotado)
+    - L2: Redis compartido entre instancias (opcional)
+    Las claves incluyen la generación del índice: tras un swap no se sirven
+    respuestas calculadas con la generación anterior
+    """
+
+    def __init__(
+        self,
+        route_ttls: Optional[Dict[str, int]] = None,
+        max_entries: int = 5000,
+        redis_client: Any = None,
+        key_prefix: str = "gateway:cache",
+        generation: Optional[Callable[[], str]] = None
+    ):
+        self.route_ttls = dict(route_ttls or DEFAULT_ROUTE_TTLS)
+        self.max_entries = max_entries
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.generation = generation
+        self._generation_seen: Optional[str] = None
+
+        # clave -> (expira_en, respuesta)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._invalidation_hooks: List[Callable[[str, str], None]] = []
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "generation_changes": 0
+        }
+
+    def ttl_for(self, path: str) -> Optional[int]:
+        """TTL de la ruta (prefijo más largo que coincide) o None si no es cacheable"""
+        best_prefix = None
+        for prefix in self.route_ttls:
+            if path.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+        if best_prefix is None:
+            return None
+        ttl = self.route_ttls[best_prefix]
+        return ttl if ttl > 0 else None
+
+    def current_generation(self) -> str:
+        """Generación del índice; al cambiar se vacía L1 (sus entradas ya no son alcanzables)"""
+        generation = self.generation() if self.generation else "default"
+        if generation != self._generation_seen:
+            with self._lock:
+                if self._generation_seen is not None:
+                    self._entries.clear()
+                    self.stats["generation_changes"] += 1
+                    logger.info(f"🔄 Cache gateway: nueva generación del índice {generation}")
+                self._generation_seen = generation
+        return generation
+
+    def build_key(self, service_name: str, path: str, json_data: Optional[Dict[str, Any]] = None) -> str:
+        """Clave de cache: servicio + ruta + generación del índice + hash canónico del body"""
+        return f"{self.key_prefix}:{service_name}:{path}:{self.current_generation()}:{canonical_body_hash(json_data)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Obtener respuesta cacheada (L1 -> L2)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._entries[key]
+
+        if self.redis_client is not None:
+            try:
+                raw = self.redis_client.get(key)
+                if raw:
+                    value = json.loads(raw)
+                    ttl = self.redis_client.ttl(key)
+                    self._store_local(key, value, ttl if ttl and ttl > 0 else 1)
+                    with self._lock:
+                        self.stats["hits"] += 1
+                    return value
+            except Exception as e:
+                logger.warning(f"⚠️ Error leyendo cache Redis del gateway: {e}")
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: int):
+        """Almacenar respuesta en L1 y L2"""
+        self._store_local(key, value, ttl)
+        with self._lock:
+            self.stats["stores"] += 1
+
+        if self.redis_client is not None:
+            try:
+                self.redis_client.setex(key, ttl, json.dumps(value, ensure_ascii=False, default=str))
+            except Exception as e:
+                logger.warning(f"⚠️ Error guardando cache Redis del gateway: {e}")
+
+    def _store_local(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def register_invalidation_hook(self, hook: Callable[[str, str], None]):
+        """Registrar callback(service_name, path_prefix) llamado en cada invalidación"""
+        self._invalidation_hooks.append(hook)
+
+    def invalidate(self, service_name: Optional[str] = None, path_prefix: str = "") -> int:
+        """
+        Invalidar entradas por servicio y/o prefijo de ruta
+
+        Returns:
+            Número de entradas locales eliminadas
+        """
+        match_prefix = f"{self.key_prefix}:{service_name}:{path_prefix}" if service_name else None
+        with self._lock:
+            if match_prefix is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [k for k in self._entries if k.startswith(match_prefix)]
+                for k in stale:
+                    del self._entries[k]
+                removed = len(stale)
+            self.stats["invalidations"] += 1
+
+        if self.redis_client is not None:
+            pattern = f"{match_prefix or self.key_prefix + ':'}*"
+            try:
+                for redis_key in self.redis_client.scan_iter(match=pattern, count=500):
+                    self.redis_client.delete(redis_key)
+            except Exception as e:
+                logger.warning(f"⚠️ Error invalidando cache Redis del gateway: {e}")
+
+        for hook in self._invalidation_hooks:
+            try:
+                hook(service_name or "*", path_prefix)
+            except Exception as e:
+                logger.error(f"Error en hook de invalidación: {e}")
+
+        logger.info(f"🗑️ Cache gateway invalidado: {service_name or '*'}{path_prefix} ({removed} entradas)")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del cache"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "generation": self._generation_seen,
+                "route_ttls": dict(self.route_ttls)
+            }
+
+
+class LatencyTracker:
+    """Ventana deslizante de latencias por ruta para estimar p95"""
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(route)
+            if samples is None:
+                samples = self._samples[route] = deque(maxlen=self.window_size)
+            samples.append(seconds)
+
+    def percentile(self, route: str, pct: float = 95.0) -> Optional[float]:
+        """Percentil de latencia o None si no hay muestras suficientes"""
+        with self._lock:
+            samples = self._samples.get(route)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class RequestHedger:
+    """
+    Request hedging: si el primer intento supera el p95 observado,
+    se lanza un segundo intento y gana la primera respuesta exitosa
+    """
+
+    def __init__(
+        self,
+        tracker: Optional[LatencyTracker] = None,
+        default_delay: float = 1.0,
+        min_delay: float = 0.05,
+        percentile: float = 95.0
+    ):
+        self.tracker = tracker or LatencyTracker()
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.percentile = percentile
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+
+    def hedge_delay(self, route: str) -> float:
+        p = self.tracker.percentile(route, self.percentile)
+        if p is None:
+            return self.default_delay
+        return max(self.min_delay, p)
+
+    async def run(
+        self,
+        route: str,
+        attempt: Callable[[], Awaitable[Any]],
+        on_hedge: Optional[Callable[[], None]] = None
+    ) -> Any:
+        """Ejecutar attempt() con hedging; la primera respuesta exitosa gana"""
+        self.stats["requests"] += 1
+        start = time.perf_counter()
+        delay = self.hedge_delay(route)
+
+        primary = asyncio.ensure_future(attempt())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            result = primary.result()  # propaga errores del intento único
+            self.tracker.record(route, time.perf_counter() - start)
+            return result
+
+        # Primer intento lento: lanzar intento de respaldo
+        self.stats["hedged"] += 1
+        if on_hedge is not None:
+            on_hedge()
+        hedge = asyncio.ensure_future(attempt())
+        pending = {primary, hedge}
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    if task is hedge:
+                        self.stats["hedge_wins"] += 1
+                    self.tracker.record(route, time.perf_counter() - start)
+                    return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -74,6 +74,8 @@ try:
 except ImportError:
     TELEMETRY_AVAILABLE = False
 
+from .gateway_cache import DEFAULT_ROUTE_TTLS, GatewayResponseCache, PointerFileGeneration, RequestHedger
+
 logger = logging.getLogger(__name__)
 
 # === MODELOS PYDANTIC PARA VALIDACIÓN ===
@@ -210,6 +212,8 @@ class GatewayService:
         self.redis_client = None
         self.limiter = None
         self.http_client = None
+        self.response_cache = None
+        self.hedger = None
         
         # Verificar dependencias críticas
         self._verify_dependencies()
@@ -220,6 +224,7 @@ class GatewayService:
         self._setup_redis()
         self._setup_rate_limiter()
         self._setup_http_client()
+        self._setup_response_cache()
         self._setup_fastapi()
         
         logger.info("🌐 GatewayService inicializado MODO SEGURO")
@@ -267,6 +272,28 @@ class GatewayService:
             "timeouts": {
                 "service_timeout": int(os.getenv("SERVICE_TIMEOUT", "30")),
                 "connection_timeout": int(os.getenv("CONNECTION_TIMEOUT", "5"))
+            },
+            "response_cache": {
+                # Opt-in: desactivado salvo GATEWAY_RESPONSE_CACHE=true
+                "enabled": os.getenv("GATEWAY_RESPONSE_CACHE", "false").lower() == "true",
+                "max_entries": int(os.getenv("GATEWAY_CACHE_MAX_ENTRIES", "5000")),
+                # Puntero de la generación activa del índice (las claves cambian tras un swap)
+                "generation_pointer": os.getenv(
+                    "INDEX_GENERATION_POINTER",
+                    str(Path(__file__).resolve().parents[2] / "data" / "vectorstores" / "CURRENT")
+                ),
+                "route_ttls": {
+                    "/api/calculate": int(os.getenv("GATEWAY_CACHE_TTL_CALCULATE", str(DEFAULT_ROUTE_TTLS["/api/calculate"]))),
+                    "/api/agents": int(os.getenv("GATEWAY_CACHE_TTL_AGENTS", str(DEFAULT_ROUTE_TTLS["/api/agents"]))),
+                    "/api/chat": int(os.getenv("GATEWAY_CACHE_TTL_CHAT", str(DEFAULT_ROUTE_TTLS["/api/chat"])))
+                }
+            },
+            "hedging": {
+                "enabled": os.getenv("GATEWAY_HEDGING", "false").lower() == "true",
+                # Solo rutas idempotentes: GETs y cálculos deterministas
+                "routes": ["/api/calculate", "/api/memory"],
+                "default_delay": float(os.getenv("GATEWAY_HEDGE_DEFAULT_DELAY", "1.0")),
+                "percentile": float(os.getenv("GATEWAY_HEDGE_PERCENTILE", "95"))
             }
         }
     
@@ -299,6 +326,16 @@ class GatewayService:
             "auth_failures": Counter(
                 "gateway_auth_failures_total",
                 "Total de fallos de autenticación"
+            ),
+            "cache_lookups": Counter(
+                "gateway_response_cache_lookups_total",
+                "Consultas al cache de respuestas del gateway",
+                ["service", "result"]
+            ),
+            "hedged_requests": Counter(
+                "gateway_hedged_requests_total",
+                "Requests con intento de respaldo (hedging)",
+                ["service"]
             )
         }
     
@@ -392,6 +429,33 @@ class GatewayService:
         
         logger.info("✅ HTTP client configurado")
     
+    def _setup_response_cache(self):
+        """Configurar cache de respuestas y request hedging (opt-in)"""
+        cache_config = self.config.get("response_cache", {})
+        if cache_config.get("enabled"):
+            self.response_cache = GatewayResponseCache(
+                route_ttls=cache_config.get("route_ttls"),
+                max_entries=cache_config.get("max_entries", 5000),
+                redis_client=self.redis_client,
+                generation=PointerFileGeneration(cache_config["generation_pointer"])
+                if cache_config.get("generation_pointer") else None
+            )
+            logger.info("✅ Cache de respuestas del gateway habilitado")
+        
+        hedging_config = self.config.get("hedging", {})
+        if hedging_config.get("enabled"):
+            self.hedger = RequestHedger(
+                default_delay=hedging_config.get("default_delay", 1.0),
+                percentile=hedging_config.get("percentile", 95.0)
+            )
+            logger.info("✅ Request hedging habilitado")
+    
+    def _is_hedgeable(self, path: str) -> bool:
+        """Solo rutas idempotentes admiten un segundo intento"""
+        if not self.hedger:
+            return False
+        return any(path.startswith(route) for route in self.config["hedging"]["routes"])
+    
     def _setup_fastapi(self):
         """Configurar aplicación FastAPI SEGURA"""
         if not FASTAPI_AVAILABLE:
@@ -474,6 +538,28 @@ class GatewayService:
         
         # === ENDPOINTS PRINCIPALES CON AUTENTICACIÓN ===
         
+        @self.app.get("/api/cache/stats")
+        async def cache_stats(environment: str = Depends(verify_api_key)):
+            """Estadísticas de cache de respuestas y hedging (autenticado)"""
+            return {
+                "response_cache": self.response_cache.get_stats() if self.response_cache else {"enabled": False},
+                "hedging": self.hedger.get_stats() if self.hedger else {"enabled": False}
+            }
+        
+        @self.app.post("/api/cache/invalidate")
+        async def cache_invalidate(
+            service_name: Optional[str] = None,
+            path_prefix: str = "",
+            environment: str = Depends(verify_api_key)
+        ):
+            """Invalidar cache de respuestas por servicio/prefijo (autenticado)"""
+            if not self.response_cache:
+                return {"invalidated": 0, "enabled": False}
+            if service_name and service_name not in self.config["services"]:
+                raise HTTPException(status_code=400, detail="Unknown service")
+            removed = self.response_cache.invalidate(service_name, path_prefix)
+            return {"invalidated": removed, "enabled": True}
+        
         @self.app.post("/api/chat", response_model=Dict[str, Any])
         async def chat_endpoint(
             request: ChatRequest,
@@ -578,6 +664,17 @@ class GatewayService:
                     detail=f"Service {service_name} temporarily unavailable"
                 )
         
+        # Cache de respuestas (opt-in): servicio + ruta + hash canónico del body
+        cache_key = None
+        cache_ttl = self.response_cache.ttl_for(path) if self.response_cache else None
+        if cache_ttl:
+            cache_key = self.response_cache.build_key(service_name, path, json_data)
+            cached = self.response_cache.get(cache_key)
+            self._record_cache_lookup(service_name, cached is not None)
+            if cached is not None:
+                self._record_metrics(request.method, path, 200, 0, environment)
+                return cached
+        
         start_time = datetime.utcnow()
         
         try:
@@ -596,21 +693,31 @@ class GatewayService:
             }
             
             # === PROXY REAL (NO SIMULACIÓN) ===
-            if json_data:
-                response = await self.http_client.post(
-                    full_url,
-                    json=json_data,
-                    headers=headers
+            async def send_attempt():
+                if json_data:
+                    attempt_response = await self.http_client.post(
+                        full_url,
+                        json=json_data,
+                        headers=headers
+                    )
+                else:
+                    # Para requests GET
+                    attempt_response = await self.http_client.get(
+                        full_url,
+                        headers=headers
+                    )
+                # Verificar respuesta
+                attempt_response.raise_for_status()
+                return attempt_response
+            
+            if self._is_hedgeable(path):
+                response = await self.hedger.run(
+                    f"{service_name}:{path}",
+                    send_attempt,
+                    on_hedge=lambda: self._record_hedge(service_name)
                 )
             else:
-                # Para requests GET
-                response = await self.http_client.get(
-                    full_url,
-                    headers=headers
-                )
-            
-            # Verificar respuesta
-            response.raise_for_status()
+                response = await send_attempt()
             
             # Métricas de éxito
             duration = (datetime.utcnow() - start_time).total_seconds()
@@ -620,7 +727,10 @@ class GatewayService:
             if service_name in self.circuit_breakers:
                 self.circuit_breakers[service_name].record_success()
             
-            return response.json()
+            result = response.json()
+            if cache_key:
+                self.response_cache.set(cache_key, result, cache_ttl)
+            return result
             
         except httpx.TimeoutException:
             logger.error(f"Timeout en {service_name}: {path}")
@@ -711,6 +821,27 @@ class GatewayService:
         
         return health_status
     
+    def _record_hedge(self, service_name: str):
+        """Registrar lanzamiento de un intento de respaldo"""
+        if not PROMETHEUS_AVAILABLE or not self.metrics:
+            return
+        try:
+            self.metrics["hedged_requests"].labels(service=service_name).inc()
+        except Exception as e:
+            logger.error(f"Error recording hedge metrics: {e}")
+    
+    def _record_cache_lookup(self, service_name: str, hit: bool):
+        """Registrar hit/miss del cache de respuestas"""
+        if not PROMETHEUS_AVAILABLE or not self.metrics:
+            return
+        try:
+            self.metrics["cache_lookups"].labels(
+                service=service_name,
+                result="hit" if hit else "miss"
+            ).inc()
+        except Exception as e:
+            logger.error(f"Error recording cache metrics: {e}")
+    
     def _record_metrics(
         self, 
         method: str, 
@@ -812,6 +943,8 @@ class GatewayService:
                 "metrics_authentication"
             ],
             "services_registered": len(self.config["services"]),
+            "response_cache": self.response_cache.get_stats() if self.response_cache else None,
+            "hedging": self.hedger.get_stats() if self.hedger else None,
             "cors_origins": len(SecurityConfig.ALLOWED_ORIGINS),
             "trusted_hosts": len(SecurityConfig.TRUSTED_HOSTS)
         }
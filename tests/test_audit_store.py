@@ -0,0 +1,163 @@
+"""
+Tests del almacén de auditoría particionado
+"""
+from datetime import datetime
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.core.security.audit_store import HyperLogLog, PartitionedAuditStore
+
+
+def _event(timestamp, event_type="SEARCH", user="u1", success=True):
+    return {"timestamp": timestamp, "event_type": event_type, "user_hash": user, "success": success}
+
+
+def test_events_are_partitioned_by_day(tmp_path):
+    store = PartitionedAuditStore(tmp_path)
+    store.append_many("audit", [
+        _event("2025-06-01T10:00:00"),
+        _event("2025-06-02T11:00:00"),
+        _event("2025-06-02T12:00:00", "LOGIN"),
+    ])
+    assert store.partition_days("audit", "2025-06-01", "2025-06-30") == ["2025-06-01", "2025-06-02"]
+
+
+def test_summary_uses_rollups_and_incremental_refresh(tmp_path):
+    store = PartitionedAuditStore(tmp_path)
+    store.append_many("audit", [
+        _event("2025-06-01T10:00:00", user="a"),
+        _event("2025-06-01T11:00:00", "LOGIN", user="b", success=False),
+    ])
+    summary = store.summarize("audit", datetime(2025, 6, 1), datetime(2025, 6, 1, 23, 59, 59, 999999))
+    assert summary["total"] == 2
+    assert summary["counts"] == {"SEARCH": 1, "LOGIN": 1}
+    assert summary["failures"] == 1
+    assert summary["unique_users"] == 2
+    assert summary["partitions_scanned"] == 0
+
+    # Eventos nuevos: el rollup solo procesa los bytes añadidos
+    store.append("audit", _event("2025-06-01T12:00:00", user="a"))
+    rollup = store.refresh_rollup("audit", "2025-06-01")
+    assert rollup["total"] == 3
+    assert rollup["bytes"] == (tmp_path / "audit" / "2025-06-01.jsonl").stat().st_size
+
+
+def test_partial_boundary_days_filter_by_timestamp(tmp_path):
+    store = PartitionedAuditStore(tmp_path)
+    store.append_many("audit", [
+        _event("2025-06-01T08:00:00"),
+        _event("2025-06-01T18:00:00"),
+        _event("2025-06-03T09:00:00"),
+    ])
+    summary = store.summarize("audit", datetime(2025, 6, 1, 12), datetime(2025, 6, 2, 23, 0))
+    assert summary["total"] == 1
+    assert summary["partitions_scanned"] == 1
+
+
+def test_hyperloglog_estimate_is_close():
+    hll = HyperLogLog()
+    for i in range(20000):
+        hll.add(f"user-{i}")
+    assert abs(hll.count() - 20000) / 20000 < 0.05
+    restored = HyperLogLog.from_string(hll.to_string())
+    assert restored.count() == hll.count()
+
+
+def test_async_writer_drains_on_close(tmp_path):
+    from src.core.security.audit_writer import AsyncAuditWriter
+
+    store = PartitionedAuditStore(tmp_path)
+    writer = AsyncAuditWriter(store, max_queue=1000, batch_size=50, fsync=False)
+    for i in range(300):
+        writer.submit("audit", _event("2025-06-05T10:00:00", user=f"u{i}"))
+    writer.submit("audit", lambda: _event("2025-06-05T11:00:00", "LOGIN"))
+    writer.close()
+
+    stats = writer.get_stats()
+    assert stats["written"] == 301 and stats["dropped"] == 0 and stats["queue_depth"] == 0
+    assert store.refresh_rollup("audit", "2025-06-05")["total"] == 301
+
+
+@pytest.fixture
+def legacy_logs(tmp_path, monkeypatch):
+    from src.core.config.security_config import SecurityConfig
+
+    monkeypatch.setattr(SecurityConfig, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(SecurityConfig, "AUDIT_LOG_FILE", tmp_path / "audit.log")
+    monkeypatch.setattr(SecurityConfig, "SECURITY_LOG_FILE", tmp_path / "security.log")
+    monkeypatch.setattr(SecurityConfig, "AUDIT_PARTITIONS_DIR", tmp_path / "audit_partitions")
+    monkeypatch.setattr(SecurityConfig, "AUDIT_ASYNC_WRITES", False)
+    (tmp_path / "audit.log").write_text("\n".join(json.dumps(event) for event in [
+        _event("2025-05-10T09:00:00", user="a"),
+        _event("2025-05-11T09:00:00", "LOGIN", user="b", success=False),
+    ]) + "\nlínea corrupta\n", encoding="utf-8")
+    (tmp_path / "security.log").write_text(json.dumps(
+        {"timestamp": "2025-05-10T10:00:00", "severity": "WARNING", "description": "x"}) + "\n", encoding="utf-8")
+    return tmp_path / "audit_partitions"
+
+
+def run_report(compliance_logger):
+    return compliance_logger.generate_compliance_report(datetime(2025, 5, 1), datetime(2025, 5, 31, 23, 59))
+
+
+def test_legacy_logs_are_migrated_once_and_reported(legacy_logs):
+    from src.core.security.compliance import ComplianceLogger
+
+    # Crear el logger (al importar el módulo) no migra: se hace antes del primer reporte
+    ComplianceLogger()
+    assert not (legacy_logs / ".legacy_imported").exists()
+
+    report = run_report(ComplianceLogger())
+    assert report["total_events"] == 2
+    assert report["event_breakdown"] == {"SEARCH": 1, "LOGIN": 1}
+    assert report["failed_attempts"] == 1
+    assert report["security_incidents"] == 1
+    assert (legacy_logs / ".legacy_imported").exists() and not (legacy_logs / ".legacy_importing").exists()
+    assert run_report(ComplianceLogger())["total_events"] == 2
+
+
+def test_migration_lock_of_a_live_process_is_respected_until_it_expires(legacy_logs, monkeypatch):
+    from src.core.config.security_config import SecurityConfig
+    from src.core.security.compliance import ComplianceLogger
+
+    lock = legacy_logs / ".legacy_importing"
+    legacy_logs.mkdir()
+    lock.write_text(json.dumps({"pid": os.getpid(), "host": socket.gethostname(), "started_at": time.time()}))
+    compliance_logger = ComplianceLogger()
+    assert run_report(compliance_logger)["total_events"] == 0
+    assert lock.exists() and not compliance_logger._legacy_migrated
+
+    # Vencido el TTL se rompe aunque el proceso siga vivo; el reporte siguiente reintenta
+    monkeypatch.setattr(SecurityConfig, "AUDIT_LEGACY_LOCK_TTL", 0)
+    time.sleep(0.01)
+    assert run_report(compliance_logger)["total_events"] == 2
+    assert not lock.exists() and compliance_logger._legacy_migrated
+
+
+def test_migration_lock_of_a_crashed_process_is_broken(legacy_logs):
+    from src.core.security.compliance import ComplianceLogger
+
+    crashed = subprocess.Popen([sys.executable, "-c", "pass"])
+    crashed.wait()
+    lock = legacy_logs / ".legacy_importing"
+    legacy_logs.mkdir()
+    lock.write_text(json.dumps({"pid": crashed.pid, "host": socket.gethostname(), "started_at": time.time()}))
+    assert run_report(ComplianceLogger())["total_events"] == 2
+    assert not lock.exists()
+
+
+def test_empty_migration_lock_expires_by_mtime(legacy_logs):
+    from src.core.security.compliance import ComplianceLogger
+
+    lock = legacy_logs / ".legacy_importing"
+    legacy_logs.mkdir()
+    lock.touch()
+    assert run_report(ComplianceLogger())["total_events"] == 0
+    os.utime(lock, (time.time() - 7200, time.time() - 7200))
+    assert run_report(ComplianceLogger())["total_events"] == 2
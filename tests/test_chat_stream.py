@@ -0,0 +1,58 @@
+"""
+Tests del streaming SSE de respuestas de chat
+"""
+import asyncio
+import json
+
+from backend.src.core.streaming.chat_stream import chunk_text, sse_event, sse_stream
+
+
+def parse_events(raw_events):
+    parsed = []
+    for raw in raw_events:
+        event_line, data_line = raw.strip("\n").split("\n")
+        parsed.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return parsed
+
+
+def collect(stages, max_chars=160):
+    async def run():
+        return [event async for event in sse_stream(stages, max_chars)]
+    return parse_events(asyncio.run(run()))
+
+
+def test_chunk_text_reassembles_answer():
+    text = "El monto máximo   por viático es S/ 320.00 diarios\n\nsegún la directiva vigente. " * 5
+    chunks = chunk_text(text, max_chars=40)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert chunk_text("") == []
+
+
+def test_sse_event_format():
+    assert sse_event("sources", {"titulo": "Directiva"}) == 'event: sources\ndata: {"titulo": "Directiva"}\n\n'
+
+
+def test_stream_order_chunks_and_done():
+    async def stages():
+        yield "sources", {"sources": [{"title": "Directiva"}]}
+        yield "answer", {"text": "uno dos tres cuatro"}
+        yield "validation", {"confidence": 0.9}
+
+    events = collect(stages(), max_chars=8)
+    names = [name for name, _ in events]
+    assert names[0] == "sources" and names[-2:] == ["validation", "done"]
+    chunks = [data for name, data in events if name == "answer_chunk"]
+    assert "".join(chunk["text"] for chunk in chunks) == "uno dos tres cuatro"
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert all("elapsed_ms" in data for _, data in events)
+
+
+def test_stream_reports_errors_and_finishes():
+    async def stages():
+        yield "sources", {"sources": []}
+        raise RuntimeError("retriever caído")
+
+    events = collect(stages())
+    assert [name for name, _ in events] == ["sources", "error", "done"]
+    assert events[1][1]["detail"] == "retriever caído"
@@ -0,0 +1,99 @@
+"""
+Tests de la caché y el reporte reanudable del runner de evaluación
+"""
+import multiprocessing
+import sys
+import time
+import types
+
+import pytest
+
+from backend.src.core.evaluation.parallel_runner import EvaluationWorkerPool, JSONLResultLog, evaluation_cache_key
+
+
+CASE = {"query": "¿Plazo de rendición?", "response": "Diez días hábiles", "contexts": ["La rendición se presenta en diez días"]}
+
+
+def test_cache_key_depends_on_case_and_metric_set():
+    key = evaluation_cache_key(CASE, "ragas")
+    assert key == evaluation_cache_key(dict(CASE), "ragas")
+    assert key != evaluation_cache_key({**CASE, "response": "Cinco días"}, "ragas")
+    assert key != evaluation_cache_key({**CASE, "metrics": ["faithfulness"]}, "ragas")
+    assert key != evaluation_cache_key(CASE, "fallback")
+    # El orden de las métricas no cambia el hash
+    assert evaluation_cache_key({**CASE, "metrics": ["a", "b"]}, "ragas") == \
+        evaluation_cache_key({**CASE, "metrics": ["b", "a"]}, "ragas")
+
+
+def test_jsonl_log_resumes_previous_results(tmp_path):
+    path = tmp_path / "report.jsonl"
+    log = JSONLResultLog(path)
+    log.append("k1", {"overall_score": 0.9}, case_ids=[1])
+    log.close()
+
+    # Línea truncada por una interrupción
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"cache_key": "k2", "res')
+
+    resumed = JSONLResultLog(path)
+    assert resumed.get("k1") == {"overall_score": 0.9}
+    assert resumed.get("k2") is None
+    resumed.append("k3", {"overall_score": 0.5})
+    resumed.close()
+    assert set(JSONLResultLog(path).entries) == {"k1", "k3"}
+
+
+class FakeEvaluator:
+    """Evaluador sin modelos: el score es la longitud de la respuesta; 'cuelga' no termina"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def evaluate_response(self, query, response, contexts, ground_truth=None, metrics=None):
+        if query == "cuelga":
+            time.sleep(60)
+        return {"overall_score": len(response), "query": query}
+
+    def _safe_error_response(self, message, code):
+        return {"error": message, "code": code}
+
+
+@pytest.fixture
+def fork_pool(tmp_path, monkeypatch):
+    """Pool con contexto fork: los workers heredan el evaluador falso de sys.modules"""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("el contexto fork no está disponible")
+    fake = types.ModuleType("backend.src.core.evaluation.ragas_evaluator")
+    fake.RAGASEvaluator = FakeEvaluator
+    monkeypatch.setitem(sys.modules, fake.__name__, fake)
+
+    pools = []
+
+    def make(workers, timeout):
+        pool = EvaluationWorkerPool(workers, timeout, str(tmp_path), context=multiprocessing.get_context("fork"))
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_process_pool_evaluates_every_case(fork_pool):
+    pool = fork_pool(workers=2, timeout=30)
+    tasks = [(f"k{i}", {"query": f"q{i}", "response": "x" * i}) for i in range(5)]
+    results = {key: (result, error) for key, result, error in pool.run(tasks)}
+    assert results == {f"k{i}": ({"overall_score": i, "query": f"q{i}"}, None) for i in range(5)}
+    assert pool.stats["spawned"] == 2 and pool.stats["replaced"] == 0
+
+
+def test_hung_worker_times_out_and_is_replaced(fork_pool):
+    pool = fork_pool(workers=2, timeout=1.0)
+    tasks = [("colgado", {"query": "cuelga", "response": ""}),
+             ("k1", {"query": "q1", "response": "ab"}), ("k2", {"query": "q2", "response": "abc"})]
+    started = time.monotonic()
+    results = {key: (result, error) for key, result, error in pool.run(tasks)}
+    assert time.monotonic() - started < 20
+    assert results["colgado"] == (None, "ERR_TIMEOUT")
+    assert results["k1"][0]["overall_score"] == 2 and results["k2"][0]["overall_score"] == 3
+    assert pool.stats["timeouts"] == 1 and pool.stats["replaced"] == 1 and pool.stats["spawned"] == 3
@@ -0,0 +1,217 @@
+"""
+Tests del cache de respuestas y del request hedging del gateway
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import gateway_cache
+from src.services.gateway_cache import GatewayResponseCache, LatencyTracker, PointerFileGeneration, RequestHedger
+
+
+def test_hit_miss_and_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gateway_cache.time, "time", lambda: now[0])
+    cache = GatewayResponseCache(route_ttls={"/api/calculate": 60, "/api/calculate/uit": 3600, "/api/chat": 0})
+    assert cache.ttl_for("/api/calculate/viaticos") == 60
+    assert cache.ttl_for("/api/calculate/uit") == 3600  # prefijo más largo
+    assert cache.ttl_for("/api/chat") is None and cache.ttl_for("/api/memory") is None
+
+    key = cache.build_key("calculation_service", "/api/calculate/viaticos", {"level": "ministro", "days": 2})
+    assert cache.get(key) is None
+    cache.set(key, {"total": 760.0}, 60)
+    assert cache.get(key) == {"total": 760.0}
+
+    now[0] += 61
+    assert cache.get(key) is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 2, 1, 0)
+
+
+def test_keys_separate_services_paths_and_bodies():
+    cache = GatewayResponseCache()
+    body = {"level": "ministro", "days": 2}
+    key = cache.build_key("calculation_service", "/api/calculate", body)
+    # El body se hashea en forma canónica: el orden de las claves no importa
+    assert cache.build_key("calculation_service", "/api/calculate", {"days": 2, "level": "ministro"}) == key
+    others = {
+        cache.build_key("agents_service", "/api/calculate", body),
+        cache.build_key("calculation_service", "/api/calculate/uit", body),
+        cache.build_key("calculation_service", "/api/calculate", {**body, "days": 3}),
+        cache.build_key("calculation_service", "/api/calculate", None),
+    }
+    assert key not in others and len(others) == 4
+
+    cache.set(key, {"total": 760.0}, 60)
+    assert all(cache.get(other) is None for other in others)
+    assert cache.invalidate("agents_service") == 0 and cache.get(key) == {"total": 760.0}
+    assert cache.invalidate("calculation_service", "/api/calculate") == 1 and cache.get(key) is None
+
+
+def test_keys_follow_the_index_generation(tmp_path):
+    pointer = tmp_path / "CURRENT"
+    cache = GatewayResponseCache(generation=PointerFileGeneration(pointer, poll_interval=0))
+    key = cache.build_key("rag_service", "/api/chat", {"message": "viáticos"})
+    cache.set(key, {"response": "gen anterior"}, 60)
+
+    pointer.write_text("/data/vectorstores/gen2", encoding="utf-8")
+    new_key = cache.build_key("rag_service", "/api/chat", {"message": "viáticos"})
+    assert new_key != key
+    assert cache.get(new_key) is None
+    assert cache.get(key) is None  # L1 se vacía al cambiar de generación
+    assert cache.get_stats()["generation_changes"] == 1
+
+
+def test_gateway_proxy_serves_repeated_requests_from_cache(tmp_path, monkeypatch):
+    for module in ("fastapi", "uvicorn", "httpx", "pydantic"):
+        pytest.importorskip(module)
+    monkeypatch.setenv("GATEWAY_RESPONSE_CACHE", "true")
+    monkeypatch.setenv("INDEX_GENERATION_POINTER", str(tmp_path / "CURRENT"))
+    try:
+        from src.services.gateway_service import GatewayService
+    except Exception as e:  # los modelos usan Field(regex=...) de pydantic v1
+        pytest.skip(f"gateway_service no importable: {e}")
+
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def __init__(self, url, body):
+            self.url, self.body = url, body
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"url": self.url, "body": self.body, "call": len(calls)}
+
+    class FakeClient:
+        async def post(self, url, json=None, headers=None):
+            calls.append(url)
+            return FakeResponse(url, json)
+
+        async def get(self, url, headers=None):
+            calls.append(url)
+            return FakeResponse(url, None)
+
+    gateway = GatewayService()
+    gateway.http_client = FakeClient()
+    request = SimpleNamespace(method="POST", client=SimpleNamespace(host="127.0.0.1"))
+
+    def proxy(service, path, body):
+        return asyncio.run(gateway._proxy_request_secure(service, path, request, body))
+
+    first = proxy("calculation_service", "/api/calculate", {"calculation_type": "uit"})
+    assert proxy("calculation_service", "/api/calculate", {"calculation_type": "uit"}) == first
+    assert len(calls) == 1
+    proxy("calculation_service", "/api/calculate", {"calculation_type": "viaticos"})
+    proxy("agents_service", "/api/calculate", {"calculation_type": "uit"})
+    proxy("memory_service", "/api/memory", None)  # ruta sin TTL: no se cachea
+    proxy("memory_service", "/api/memory", None)
+    assert len(calls) == 5
+    assert gateway.response_cache.get_stats()["hits"] == 1
+
+
+def test_latency_tracker_percentile_window_and_routes():
+    tracker = LatencyTracker(window_size=10, min_samples=5)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        tracker.record("/api/calculate", seconds)
+    assert tracker.percentile("/api/calculate") is None  # menos de min_samples
+    assert tracker.percentile("/api/chat") is None
+
+    for i in range(1, 11):
+        tracker.record("/api/calculate", i / 10)
+    # La ventana conserva solo las 10 últimas muestras (0.1 .. 1.0)
+    assert tracker.percentile("/api/calculate", 95) == 1.0
+    assert tracker.percentile("/api/calculate", 50) == 0.5
+    assert tracker.percentile("/api/calculate", 0) == 0.1
+
+
+def test_hedge_delay_uses_p95_with_floor_and_default():
+    tracker = LatencyTracker(min_samples=3)
+    hedger = RequestHedger(tracker, default_delay=1.0, min_delay=0.05)
+    assert hedger.hedge_delay("/api/calculate") == 1.0
+
+    for seconds in (0.2, 0.3, 0.4):
+        tracker.record("/api/calculate", seconds)
+    assert hedger.hedge_delay("/api/calculate") == 0.4
+
+    for _ in range(3):
+        tracker.record("/api/uit", 0.001)
+    assert hedger.hedge_delay("/api/uit") == 0.05
+
+
+def make_attempts(*plans):
+    """Intentos con (segundos, resultado o excepción); registra cancelaciones"""
+    cancelled = []
+    calls = iter(enumerate(plans))
+
+    async def attempt():
+        index, (seconds, outcome) = next(calls)
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return attempt, cancelled
+
+
+def test_fast_primary_is_not_hedged():
+    hedger = RequestHedger(default_delay=0.2)
+    attempt, cancelled = make_attempts((0.0, "primario"))
+    assert asyncio.run(hedger.run("/api/calculate", attempt)) == "primario"
+    assert hedger.get_stats() == {"requests": 1, "hedged": 0, "hedge_wins": 0}
+    assert cancelled == []
+
+
+def test_slow_primary_loses_to_hedge_and_is_cancelled():
+    hedger = RequestHedger(default_delay=0.02)
+    hedges = []
+    attempt, cancelled = make_attempts((1.0, "primario"), (0.01, "respaldo"))
+
+    async def run():
+        result = await hedger.run("/api/calculate", attempt, on_hedge=lambda: hedges.append(True))
+        await asyncio.sleep(0)  # deja que la cancelación del perdedor se procese
+        return result
+
+    assert asyncio.run(run()) == "respaldo"
+    assert hedges == [True] and cancelled == [0]
+    assert hedger.get_stats() == {"requests": 1, "hedged": 1, "hedge_wins": 1}
+    assert len(hedger.tracker._samples["/api/calculate"]) == 1
+
+
+def test_primary_wins_after_hedge_and_cancels_it():
+    hedger = RequestHedger(default_delay=0.02)
+    attempt, cancelled = make_attempts((0.05, "primario"), (1.0, "respaldo"))
+
+    async def run():
+        result = await hedger.run("/api/calculate", attempt)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "primario"
+    assert cancelled == [1]
+    assert hedger.get_stats() == {"requests": 1, "hedged": 1, "hedge_wins": 0}
+
+
+def test_failed_attempt_falls_back_to_the_other_and_errors_propagate():
+    hedger = RequestHedger(default_delay=0.02)
+    attempt, _ = make_attempts((0.05, RuntimeError("primario caído")), (0.1, "respaldo"))
+    assert asyncio.run(hedger.run("/api/calculate", attempt)) == "respaldo"
+
+    # Si ambos fallan se propaga el último error
+    attempt, _ = make_attempts((0.03, RuntimeError("uno")), (0.05, RuntimeError("dos")))
+    with pytest.raises(RuntimeError, match="dos"):
+        asyncio.run(hedger.run("/api/calculate", attempt))
+
+    # Sin hedging el error del intento único se propaga tal cual
+    attempt, _ = make_attempts((0.0, ValueError("inválido")))
+    with pytest.raises(ValueError, match="inválido"):
+        asyncio.run(RequestHedger(default_delay=1.0).run("/api/calculate", attempt))
+
@@ -0,0 +1,86 @@
+"""
+Tests del cambio de generación del índice sin downtime
+"""
+import pytest
+
+# src.core.hybrid importa HybridSearch y sus retrievers
+for module in ("numpy", "sklearn", "rank_bm25", "sentence_transformers"):
+    pytest.importorskip(module)
+
+from src.core.hybrid.index_generations import IndexGenerationManager
+
+
+class FakeSearch:
+    """Buscador mínimo: la generación es el nombre del directorio"""
+
+    def __init__(self, source):
+        self.index_generation = source.name
+        self.empty = source.name.startswith("broken")
+        self.bm25_retriever = self.tfidf_retriever = self.transformer_retriever = object()
+
+    def search(self, query, top_k=5):
+        return [] if self.empty else [{"texto": query, "generation": self.index_generation}]
+
+
+def test_in_flight_queries_keep_their_generation(tmp_path):
+    manager = IndexGenerationManager(FakeSearch, ["viáticos", "plazos"])
+    assert manager.swap(tmp_path / "gen1")["status"] == "swapped"
+
+    with manager.acquire() as searcher:
+        report = manager.swap(tmp_path / "gen2")
+        assert report["status"] == "swapped" and report["previous_id"] == "gen1"
+        assert searcher.search("monto")[0]["generation"] == "gen1"
+        assert manager.status()["retired"][0]["active_queries"] == 1
+
+    assert manager.status()["retired"] == []
+    assert manager.stats["released"] == 1
+    assert manager.search("monto")[0]["generation"] == "gen2"
+
+
+def test_failed_validation_keeps_current_generation(tmp_path):
+    manager = IndexGenerationManager(FakeSearch, ["viáticos"])
+    manager.swap(tmp_path / "gen1")
+    report = manager.swap(tmp_path / "broken")
+    assert report["status"] == "failed"
+    assert manager.generation_id == "gen1"
+
+
+def test_workers_follow_the_pointer_file(tmp_path):
+    pointer = tmp_path / "CURRENT"
+    publisher = IndexGenerationManager(FakeSearch, ["viáticos"], pointer_file=pointer, poll_interval=0)
+    follower = IndexGenerationManager(FakeSearch, ["viáticos"], pointer_file=pointer, poll_interval=0)
+    publisher.swap(tmp_path / "gen1")
+    follower.swap(tmp_path / "gen1")
+
+    publisher.publish(tmp_path / "gen2")
+    publisher._swap_thread.join()
+    follower.search("monto")  # detecta el puntero y cambia en segundo plano
+    follower._swap_thread.join()
+    assert publisher.generation_id == follower.generation_id == "gen2"
+
+
+def test_validation_fails_closed_without_smoke_queries(tmp_path):
+    manager = IndexGenerationManager(FakeSearch, [])
+    manager.swap(tmp_path / "gen1")  # la primera generación se activa igualmente
+    report = manager.swap(tmp_path / "gen2")
+    assert report["status"] == "failed" and not report["validation"]["passed"]
+    assert manager.generation_id == "gen1"
+
+
+def test_blocking_swap_respects_running_swap(tmp_path):
+    import threading
+
+    release = threading.Event()
+
+    def slow_loader(source):
+        if source.name == "slow":
+            release.wait(5)
+        return FakeSearch(source)
+
+    manager = IndexGenerationManager(slow_loader, ["viáticos"])
+    manager.swap(tmp_path / "gen1")
+    assert manager.start_swap(tmp_path / "slow")
+    assert manager.swap(tmp_path / "gen2")["status"] == "busy"
+    release.set()
+    manager._swap_thread.join()
+    assert manager.generation_id == "slow" and not manager.swapping
@@ -0,0 +1,141 @@
+"""
+Tests del formato de snapshots de índices (manifiesto, checksums, mmap)
+"""
+import json
+import os
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+# src.core.retrieval importa los tres retrievers
+for module in ("rank_bm25", "sklearn", "sentence_transformers"):
+    pytest.importorskip(module)
+
+from src.core.performance.shared_index import FlatChunkStore
+from src.core.retrieval import index_snapshot
+from src.core.retrieval.index_snapshot import (
+    MANIFEST_FILE, IndexSnapshot, SnapshotError, convert_pickle, resolve_index_path, write_snapshot
+)
+
+CHUNKS = [{"id": f"chunk_{i}", "texto": f"viático {i} días", "titulo": f"Sección {i}"} for i in range(10)]
+
+
+def write_example(directory):
+    store = FlatChunkStore.from_chunks(CHUNKS)
+    return write_snapshot(directory, "transformer", {
+        "chunks_data": store.data, "chunks_offsets": store.offsets,
+        "embeddings": np.arange(30, dtype=np.float32).reshape(10, 3)
+    }, {"model_name": "paraphrase-multilingual-MiniLM-L12-v2"})
+
+
+def test_snapshot_roundtrip_is_memory_mapped(tmp_path):
+    manifest = write_example(tmp_path / "transformers.snapshot")
+    assert manifest["segments"]["chunks_data"]["format"] == "bin"
+    assert manifest["segments"]["embeddings"]["shape"] == [10, 3]
+
+    snapshot = IndexSnapshot(tmp_path / "transformers.snapshot")
+    store = FlatChunkStore.from_arrays(snapshot.arrays("chunks"))
+    assert list(store) == CHUNKS
+    embeddings = snapshot.array("embeddings")
+    assert isinstance(embeddings, np.memmap) and not embeddings.flags.writeable
+    assert embeddings[2].tolist() == [6.0, 7.0, 8.0]
+
+    # La ruta del pickle resuelve al snapshot hermano
+    assert resolve_index_path(tmp_path / "transformers.pkl") == tmp_path / "transformers.snapshot"
+    with pytest.raises(SnapshotError):
+        write_example(tmp_path / "transformers.snapshot")
+
+
+def test_corrupted_segment_is_rejected_on_first_access(tmp_path, monkeypatch):
+    write_example(tmp_path / "snap")
+    path = tmp_path / "snap" / "chunks_data.bin"
+    raw = bytearray(path.read_bytes())
+    raw[0] ^= 0xFF
+    path.write_bytes(bytes(raw))
+
+    snapshot = IndexSnapshot(tmp_path / "snap", verify=True)
+    assert snapshot.array("embeddings").shape == (10, 3)
+    with pytest.raises(SnapshotError, match="checksum"):
+        snapshot.array("chunks_data")
+
+    # Por defecto la carga no lee el índice completo: hashear es opt-in
+    monkeypatch.delenv("MINEDU_SNAPSHOT_VERIFY", raising=False)
+    assert IndexSnapshot(tmp_path / "snap").array("chunks_data").size == len(raw)
+    monkeypatch.setenv("MINEDU_SNAPSHOT_VERIFY", "1")
+    with pytest.raises(SnapshotError, match="checksum"):
+        IndexSnapshot(tmp_path / "snap").array("chunks_data")
+    assert index_snapshot.main(["verify", str(tmp_path / "snap")]) == 1
+
+
+def test_truncated_segment_is_rejected_without_verification(tmp_path):
+    write_example(tmp_path / "snap")
+    path = tmp_path / "snap" / "embeddings.npy"
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(SnapshotError, match="size mismatch"):
+        IndexSnapshot(tmp_path / "snap", verify=False).array("embeddings")
+
+
+def test_manifest_cannot_escape_the_snapshot_directory(tmp_path):
+    write_example(tmp_path / "snap")
+    manifest_path = tmp_path / "snap" / MANIFEST_FILE
+    manifest = json.loads(manifest_path.read_text())
+    manifest["segments"]["embeddings"]["file"] = "../secrets.npy"
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(SnapshotError, match="invalid file name"):
+        IndexSnapshot(tmp_path / "snap")
+
+    manifest["format_version"] = 99
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(SnapshotError, match="unsupported"):
+        IndexSnapshot(tmp_path / "snap")
+
+
+def test_rebuilt_pickle_is_not_shadowed_by_a_stale_snapshot(tmp_path):
+    pkl = tmp_path / "transformers.pkl"
+
+    def write_pickle(offset):
+        embeddings = np.arange(30, dtype=np.float32).reshape(10, 3) + offset
+        with open(pkl, "wb") as f:
+            pickle.dump({"chunks": CHUNKS, "embeddings": embeddings, "model_name": "m"}, f)
+
+    write_pickle(0)
+    snapshot_dir = convert_pickle(pkl)
+    assert resolve_index_path(pkl) == snapshot_dir
+    # Mismo contenido, solo touch: sigue vigente (decide el sha256)
+    os.utime(pkl, ns=(0, pkl.stat().st_mtime_ns + 10**9))
+    assert resolve_index_path(pkl) == snapshot_dir
+    with pytest.raises(SnapshotError, match="up to date"):
+        convert_pickle(pkl)
+
+    # Pickle reconstruido: se sirve el pickle hasta reconvertir
+    write_pickle(100)
+    assert resolve_index_path(pkl) == pkl
+    assert convert_pickle(pkl) == snapshot_dir
+    assert resolve_index_path(pkl) == snapshot_dir
+    assert IndexSnapshot(snapshot_dir).array("embeddings")[0].tolist() == [100.0, 101.0, 102.0]
+
+
+def test_touched_pickle_is_hashed_once_per_size_and_mtime(tmp_path, monkeypatch):
+    pkl = tmp_path / "transformers.pkl"
+    with open(pkl, "wb") as f:
+        pickle.dump({"chunks": CHUNKS, "embeddings": np.zeros((10, 3), dtype=np.float32), "model_name": "m"}, f)
+    snapshot_dir = convert_pickle(pkl)
+
+    hashed = []
+    sha256_file = index_snapshot._sha256_file
+    monkeypatch.setattr(index_snapshot, "_sha256_file", lambda path: hashed.append(path) or sha256_file(path))
+
+    # Sin cambios de mtime no se hashea nada
+    assert not index_snapshot.is_stale(snapshot_dir, pkl)
+    assert hashed == []
+    # Touch: un solo hash para ese (tamaño, mtime), aunque se consulte varias veces
+    os.utime(pkl, ns=(0, pkl.stat().st_mtime_ns + 10**9))
+    for _ in range(3):
+        assert not index_snapshot.is_stale(snapshot_dir, pkl)
+    assert hashed == [pkl]
+    # Cambio de tamaño: stale sin hashear
+    with open(pkl, "ab") as f:
+        f.write(b"\0")
+    assert index_snapshot.is_stale(snapshot_dir, pkl)
+    assert hashed == [pkl]
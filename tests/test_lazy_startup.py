@@ -0,0 +1,76 @@
+"""
+Tests del arranque perezoso de la API: proveedores, readiness y presupuesto de importación
+"""
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend.src.core.startup.lazy_providers import ProviderRegistry
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Presupuesto de `import backend.src.main` (python -X importtime, acumulado)
+IMPORT_BUDGET_SECONDS = 1.0
+
+# Módulos pesados que solo deben cargarse en la precarga, nunca al importar la app
+DEFERRED_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "numpy",
+    "langgraph",
+    "backend.src.langchain_integration.vectorstores.simple_retriever",
+    "backend.src.langchain_integration.orchestration.professional_langgraph",
+    "backend.src.domain.legal_reasoning",
+]
+
+
+def test_providers_load_once_and_report_readiness():
+    calls = []
+    registry = ProviderRegistry()
+    registry.register("retriever", lambda: calls.append("retriever") or "docs", required=True)
+    registry.register("optional", lambda: __import__("modulo_que_no_existe"))
+
+    assert registry.peek("retriever") is None
+    assert registry.readiness()["ready"] is False
+
+    asyncio.run(registry.warm_up())
+    assert registry.get("retriever") == "docs"
+    assert registry.get("optional") is None
+    assert calls == ["retriever"]
+
+    readiness = registry.readiness()
+    assert readiness["ready"] is True
+    assert readiness["providers"]["optional"]["status"] == "failed"
+
+
+def test_required_provider_failure_is_not_ready():
+    registry = ProviderRegistry()
+    registry.register("retriever", lambda: None, required=True)
+    asyncio.run(registry.warm_up())
+    assert registry.readiness()["failed_required"] == ["retriever"]
+    assert registry.readiness()["ready"] is False
+
+
+def test_main_import_time_budget():
+    pytest.importorskip("fastapi")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.src.main"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    # "import time: self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, total, name = line.split("|")
+            cumulative[name.strip()] = int(total)
+
+    for module in DEFERRED_MODULES:
+        assert module not in cumulative, f"{module} se importa al arrancar"
+    assert cumulative["backend.src.main"] / 1e6 < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,123 @@
+"""
+Tests de los índices de metadatos, las expresiones de filtro y el pushdown a BM25
+"""
+from datetime import date, timedelta
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+for module in ("sklearn", "rank_bm25", "sentence_transformers"):  # src.core.hybrid importa HybridSearch
+    pytest.importorskip(module)
+
+from src.core.hybrid.metadata_index import FilterError, MetadataIndex
+
+NORM_TYPES = ["directiva", "resolución", "decreto"]
+STATUSES = ["vigente", "derogada", "modificada"]
+TAGS = ["viaticos", "rendicion", "pasajes", "lima"]
+
+
+def make_chunks(count=300, seed=5):
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(count):
+        published = date(2010, 1, 1) + timedelta(days=rng.randrange(5000))
+        chunk = {
+            "texto": f"chunk {i}",
+            "norm_type": rng.choice(NORM_TYPES),
+            "validity_status": rng.choice(STATUSES),
+            "tags": rng.sample(TAGS, rng.randint(0, 2)),
+            "publication_date": published.isoformat(),
+        }
+        if rng.random() < 0.3:
+            chunk["metadatos"] = {"valid_to": (published + timedelta(days=rng.randrange(3000))).isoformat()}
+        chunks.append(chunk)
+    return chunks
+
+
+def linear_filter(chunk, today=None):
+    today = today or date.today()
+    published = date.fromisoformat(chunk["publication_date"])
+    valid_to = chunk.get("metadatos", {}).get("valid_to")
+    in_force = published <= today and (valid_to is None or today <= date.fromisoformat(valid_to))
+    return (chunk["norm_type"] == "directiva" and in_force and chunk["validity_status"] != "derogada"
+            and published <= date(2023, 12, 31))
+
+
+def test_expression_matches_linear_scan():
+    chunks = make_chunks()
+    index = MetadataIndex.from_chunks(chunks)
+
+    mask = index.mask("norm_type=directiva AND vigente AND date<=2023-12-31")
+    assert mask.tolist() == [linear_filter(chunk) for chunk in chunks]
+    assert index.mask("norm_type = Directiva and vigente and date <= '2023-12-31'").tolist() == mask.tolist()
+
+    expected = [("viaticos" in c["tags"] or c["norm_type"] == "decreto") and not c["publication_date"] > "2015-06-30"
+                for c in chunks]
+    assert index.mask("(tag=viaticos OR norm_type=decreto) AND NOT date>2015-06-30").tolist() == expected
+    assert index.mask({"norm_type": ["decreto", "resolución"], "status": "vigente"}).tolist() == \
+        [c["norm_type"] != "directiva" and c["validity_status"] == "vigente" for c in chunks]
+
+    index.mask("norm_type=directiva AND vigente AND date<=2023-12-31")
+    assert index.get_stats()["mask_cache_hits"] == 1
+
+    for invalid in ("", "norm_type", "autor=x", "norm_type<directiva", "date>=ayer", "(vigente"):
+        with pytest.raises(FilterError):
+            index.mask(invalid)
+
+
+def test_postings_score_only_allowed_ids():
+    from rank_bm25 import BM25Okapi
+    from src.core.performance.shared_index import CSRPostings
+
+    rng = random.Random(9)
+    words = ["viático", "monto", "lima", "directiva", "días", "pasajes", "rendición"]
+    corpus = [[rng.choice(words) for _ in range(rng.randint(1, 20))] for _ in range(200)]
+    postings = CSRPostings.from_bm25(BM25Okapi(corpus))
+
+    for size in (0, 3, 50, 200):
+        doc_ids = np.array(sorted(rng.sample(range(200), size)), dtype=np.int64)
+        query = rng.sample(words, 3) + ["inexistente"]
+        np.testing.assert_array_equal(postings.get_scores(query, doc_ids), postings.get_scores(query)[doc_ids])
+
+
+def write_vectorstores(directory, chunks, tfidf_chunks=None):
+    import pickle
+    from rank_bm25 import BM25Okapi
+
+    with open(directory / "bm25.pkl", "wb") as f:
+        pickle.dump({"bm25_index": BM25Okapi([c["texto"].lower().split() for c in chunks]), "chunks": chunks}, f)
+    with open(directory / "tfidf.pkl", "wb") as f:
+        pickle.dump({"chunks": tfidf_chunks or chunks}, f)
+    return [str(directory / name) for name in ("bm25.pkl", "tfidf.pkl", "transformers.pkl")]
+
+
+def test_search_pushdown_matches_post_filtering(tmp_path):
+    from src.core.hybrid.hybrid_search import HybridSearch
+
+    rng = random.Random(3)
+    words = [a + b for a in "viático" for b in "lmnprs"]  # vocabulario amplio: IDF de BM25 positivo
+    chunks = make_chunks(400)
+    for chunk in chunks:
+        chunk["texto"] = " ".join(rng.choice(words) for _ in range(rng.randint(3, 8)))
+    search = HybridSearch(*write_vectorstores(tmp_path, chunks))
+
+    expression = "norm_type=directiva AND vigente AND date<=2023-12-31"
+    valid_at = date(2022, 6, 1)
+    allowed = search.metadata_index.mask(expression) & search.chunk_validity.mask(valid_at)
+    assert 5 < allowed.sum() < len(chunks)
+    for method in ("bm25", "tfidf"):
+        unfiltered = search.search("vl im án", top_k=len(chunks), use_methods=[method])
+        expected = [result["index"] for result in unfiltered if allowed[result["index"]]][:5]
+        filtered = search.search("vl im án", top_k=5, use_methods=[method],
+                                 metadata_filter=expression, valid_at=valid_at)
+        assert len(expected) == 5 and [result["index"] for result in filtered] == expected
+
+
+def test_filter_rejects_retrievers_with_different_chunk_lists(tmp_path):
+    from src.core.hybrid.hybrid_search import HybridSearch
+
+    chunks = make_chunks(30)
+    search = HybridSearch(*write_vectorstores(tmp_path, chunks, tfidf_chunks=chunks[:20]))
+    with pytest.raises(ValueError, match="different chunk lists"):
+        search.search("chunk", metadata_filter="norm_type=directiva")
@@ -0,0 +1,66 @@
+"""
+Tests de las trazas por nodo: presupuesto de latencia, cancelación y ejecución concurrente
+"""
+import asyncio
+import time
+
+from src.core.monitoring.node_tracing import run_concurrently, traced_node
+
+
+def test_budget_cancels_slow_node_and_keeps_state():
+    cancelled = []
+
+    async def slow(state):
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        state["value"] = "late"
+        return state
+
+    node = traced_node("test", "slow", slow, budget=0.05)
+    state = asyncio.run(node({"value": "default"}))
+
+    assert state["value"] == "default"
+    assert cancelled == [True]
+    assert [(entry["node"], entry["status"]) for entry in state["node_trace"]] == [("slow", "timeout")]
+
+
+def test_independent_nodes_run_concurrently():
+    async def first(state):
+        await asyncio.sleep(0.1)
+        state["first"] = True
+        return state
+
+    async def second(state):
+        await asyncio.sleep(0.1)
+        state["second"] = True
+        return state
+
+    branches = [traced_node("test", "first", first), traced_node("test", "second", second)]
+    started = time.perf_counter()
+    state = asyncio.run(run_concurrently({}, branches))
+
+    assert time.perf_counter() - started < 0.19
+    assert state["first"] and state["second"]
+    assert sorted(entry["node"] for entry in state["node_trace"]) == ["first", "second"]
+    assert all(entry["status"] == "ok" and entry["duration_ms"] >= 90 for entry in state["node_trace"])
+
+
+def test_budget_cuts_cpu_bound_work_moved_to_an_executor():
+    # Trabajo síncrono en un thread: el nodo vecino avanza y el presupuesto puede cortarlo
+    async def blocking(state):
+        loop = asyncio.get_running_loop()
+        state["blocking"] = await loop.run_in_executor(None, time.sleep, 0.3)
+        return state
+
+    async def quick(state):
+        state["quick"] = True
+        return state
+
+    branches = [traced_node("test", "blocking", blocking, budget=0.05), traced_node("test", "quick", quick)]
+    state = asyncio.run(run_concurrently({}, branches))
+
+    assert state["quick"] and "blocking" not in state
+    assert {entry["node"]: entry["status"] for entry in state["node_trace"]} == {"blocking": "timeout", "quick": "ok"}
@@ -0,0 +1,112 @@
+"""
+Tests de la calculadora normativa compilada (searchsorted, índices por año y nivel, lote)
+"""
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.core.calculations.normative_calculator import NormativeCalculator
+
+VIATICOS = [
+    {"year": 2023, "level": "Viceministro", "amount_soles": 340.0, "decree": "DS-A", "location": "Nacional"},
+    {"year": 2023, "level": "Ministro", "amount_soles": 380.0, "decree": "DS-A", "location": "Nacional"},
+    {"year": 2025, "level": "Funcionario", "amount_soles": 320.0, "decree": "DS-B", "location": "Nacional"},
+]
+RATES = [
+    {"date": "2024-06-01", "buy": 3.75, "sell": 3.77},
+    {"date": "2024-01-01", "buy": 3.70, "sell": 3.72},
+    {"date": "2025-01-01", "buy": 3.78, "sell": 3.80},
+]
+
+
+@pytest.fixture
+def calculator(tmp_path):
+    (tmp_path / "viaticos_table.json").write_text(json.dumps(VIATICOS))
+    (tmp_path / "tipo_cambio.json").write_text(json.dumps(RATES))
+    return NormativeCalculator(data_path=tmp_path)
+
+
+def test_lookups_use_compiled_tables(calculator):
+    assert calculator.get_uit_value(2023) == 4950.0
+    assert calculator.get_uit_value(2031) == 5350.0  # el más reciente
+
+    assert calculator.get_exchange_rate("2024-03-17")["date"] == "2024-01-01"  # empate: la fecha anterior
+    assert calculator.get_exchange_rate("2024-03-18")["sell"] == 3.77
+    assert calculator.get_exchange_rate("2030-01-01")["date"] == "2025-01-01"
+
+    # Primera fila del año cuyo nivel contiene el buscado (como str.contains)
+    assert calculator.calculate_viaticos("ministro", 2023)["daily_amount_soles"] == 340.0
+    result = calculator.calculate_viaticos("Funcionario", 2026, days=3)
+    assert result["total_amount_soles"] == 960.0 and result["decree"] == "DS-B"
+    assert result["amount_uit"] == round(960.0 / 5350.0, 4)
+    assert "note" in calculator.calculate_viaticos("servidor", 2025)
+
+
+def test_batch_results_and_invalid_rows(calculator):
+    rows = [
+        {"level": "Ministro", "year": 2023, "days": 4},  # "ministro" está contenido en "viceministro"
+        {"level": "funcionario", "year": 2026, "days": 2},  # año sin tabla: el más cercano (2025)
+        {"level": "Viceministro", "year": 2019, "days": 1},  # tabla de 2023, UIT más reciente
+        {"level": "apoyo", "year": 2023, "days": 3},  # sin nivel: cálculo por defecto
+    ]
+    batch = calculator.calculate_viaticos_batch(rows)
+    assert [(r["daily_amount_soles"], r["total_amount_soles"], r["uit_reference"]) for r in batch[:3]] == [
+        (340.0, 1360.0, 4950.0), (320.0, 640.0, 5350.0), (340.0, 340.0, 5350.0)
+    ]
+    assert [r.get("decree") for r in batch[:3]] == ["DS-A", "DS-B", "DS-A"]
+    assert batch[0]["amount_uit"] == round(1360.0 / 4950.0, 4)
+    assert "note" in batch[3] and batch[3]["total_amount_soles"] == 960.0
+    assert [calculator.calculate_viaticos(**row)["total_amount_soles"] for row in rows[:3]] == [1360.0, 640.0, 340.0]
+
+    csv_like = calculator.calculate_viaticos_batch([{"level": "Ministro", "year": "2023", "days": "2", "location": ""}])
+    assert csv_like[0]["total_amount_soles"] == 680.0 and csv_like[0]["location"] == "Nacional"
+    for invalid in ({"level": "Ministro", "year": "dos mil"}, {"level": "Ministro", "year": 2023, "days": 0},
+                    {"level": "Ministro", "year": 2023, "days": "-2"}):
+        with pytest.raises(ValueError):
+            calculator.calculate_viaticos_batch([{"level": "Ministro", "year": 2023}, invalid])
+
+
+def test_viatico_lookup_memo_is_bounded(calculator, monkeypatch):
+    from src.core.calculations import normative_calculator
+
+    monkeypatch.setattr(normative_calculator, "VIATICO_LOOKUP_CACHE_SIZE", 3)
+    calculator.calculate_viaticos_batch([{"level": f"nivel {i}", "year": 2023} for i in range(10)])
+    assert list(calculator._viatico_lookups) == [(2023, "nivel 7"), (2023, "nivel 8"), (2023, "nivel 9")]
+
+
+def test_parse_commission_rows_csv_and_json():
+    for module in ("fastapi", "uvicorn"):  # calculation_service los importa al definir la app
+        pytest.importorskip(module)
+    from src.services.calculation_service import parse_commission_rows
+
+    csv_body = "\ufefflevel, year ,days\nMinistro,2023, 2\nFuncionario,2025,\n".encode("utf-8")
+    assert parse_commission_rows(csv_body, "text/csv; charset=utf-8") == [
+        {"level": "Ministro", "year": "2023", "days": "2"},
+        {"level": "Funcionario", "year": "2025", "days": ""},
+    ]
+    rows = [{"level": "Ministro", "year": 2023}]
+    assert parse_commission_rows(json.dumps({"rows": rows})) == rows
+    assert parse_commission_rows(json.dumps(rows).encode()) == rows
+    assert parse_commission_rows("") == []
+    for invalid in ('{"rows": {"level": "Ministro"}}', '[1, 2]', '"texto"'):
+        with pytest.raises(ValueError):
+            parse_commission_rows(invalid)
+
+
+def test_batch_endpoint_rejects_bad_input():
+    for module in ("fastapi", "uvicorn", "httpx"):
+        pytest.importorskip(module)
+    from fastapi.testclient import TestClient
+    from src.services.calculation_service import CalculationService
+
+    client = TestClient(CalculationService().app)
+    response = client.post("/api/calculate/viaticos/batch", content=b"level,year,days\nMinistro,2023,3\n",
+                           headers={"content-type": "text/csv"})
+    assert response.status_code == 200 and response.json()["count"] == 1
+
+    for body, content_type in ((b"{no es json", "application/json"), (b'{"rows": 5}', "application/json"),
+                               (b"level,year,days\nMinistro,2023,0\n", "text/csv")):
+        response = client.post("/api/calculate/viaticos/batch", content=body, headers={"content-type": content_type})
+        assert response.status_code == 400, body
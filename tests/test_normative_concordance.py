@@ -0,0 +1,142 @@
+"""
+Tests de la concordancia normativa indexada (matriz de embeddings, patrones compilados)
+"""
+import random
+import re
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("jinja2")  # src.core.legal importa el generador de reportes
+
+from src.core.legal.normative_concordance import NormativeConcordance, norms_from_chunks
+
+NAMES = ["Ley 27619", "Decreto Supremo 007-2013-EF", "Directiva 001-2023-MINEDU",
+         "Resolución Ministerial 045-2022", "Jurisprudencia TC", "Informe técnico"]
+PHRASES = ["viáticos", "modifica", "de conformidad con", "salvo", "gastos de viaje",
+           "deroga", "sin perjuicio", "movilidad", "plazo de rendición", "alimentación", "hospedaje"]
+
+
+class FakeModel:
+    """Embeddings deterministas por frecuencia de palabras"""
+
+    def encode(self, texts, show_progress_bar=False):
+        single = isinstance(texts, str)
+        vectors = [[text.lower().count(word) for word in ("viático", "gasto", "plazo", "modifica", "salvo", "a")]
+                   for text in ([texts] if single else texts)]
+        array = np.asarray(vectors, dtype=np.float32)
+        return array[0] if single else array
+
+
+def make_corpus(count, seed=5):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"norma_{i % (count - 3)}",  # algunos ids repetidos
+            "name": rng.choice(NAMES),
+            "article": f"Art. {i}",
+            "content": " ".join(rng.choice(PHRASES) for _ in range(rng.randint(0, 6))),
+            "date": "2023-01-15",
+        }
+        for i in range(count)
+    ]
+
+
+def reference_related(concordance, article, source_norm, corpus, max_results):
+    """Algoritmo anterior: patrones + semántica + jerarquía, dedupe por id y orden por score"""
+    matches = []
+    for norm in corpus:
+        for relation_type, patterns in concordance.relation_patterns.items():
+            detected = [p for p in patterns if re.search(p, norm["content"].lower(), re.IGNORECASE)]
+            if detected:
+                matches.append((norm["id"], relation_type, min(len(detected) / len(patterns), 1.0)))
+    query = concordance.embeddings_model.encode(article[:512])
+    for norm in corpus:
+        if norm["content"]:
+            vector = concordance.embeddings_model.encode(norm["content"][:512])
+            denominator = np.linalg.norm(query) * np.linalg.norm(vector)
+            similarity = float(np.dot(query, vector) / denominator) if denominator else 0.0
+            if similarity > 0.3:
+                matches.append((norm["id"], "thematic", similarity))
+    source = concordance._get_norm_hierarchy(source_norm)
+    for norm in corpus:
+        level = concordance._get_norm_hierarchy(norm["name"])
+        score = 0.7 if level < source else 0.6 if level > source else 0.5
+        matches.append((norm["id"], "hierarchical", score))
+
+    seen, unique = set(), []
+    for match in matches:
+        if match[0] not in seen:
+            seen.add(match[0])
+            unique.append(match)
+    unique.sort(key=lambda match: match[2], reverse=True)
+    return unique[:max_results]
+
+
+@pytest.fixture
+def concordance(tmp_path):
+    concordance = NormativeConcordance(data_path=tmp_path)
+    concordance.embeddings_model = FakeModel()
+    return concordance
+
+
+def test_indexed_lookup_matches_reference(concordance):
+    corpus = make_corpus(80)
+    for article, source_norm in [("viáticos y gastos de viaje", "Directiva 001"),
+                                 ("plazo salvo modifica", "Ley 30057"), ("", "Informe")]:
+        got = concordance.find_related_norms(article, source_norm, corpus, max_results=len(corpus))
+        expected = reference_related(concordance, article, source_norm, corpus, len(corpus))
+        # Empates en float32/float64 pueden alternar el orden: comparar como conjuntos
+        assert sorted((m.norm_id, m.relation_type.split("_")[0], round(m.similarity_score, 4)) for m in got) == \
+            sorted((norm_id, relation_type, round(score, 4)) for norm_id, relation_type, score in expected)
+
+        top = concordance.find_related_norms(article, source_norm, corpus, max_results=15)
+        assert [m.similarity_score for m in top] == pytest.approx([m[2] for m in expected[:15]], abs=1e-5)
+    assert concordance.stats["corpus_indexed"] == 1
+
+
+def test_results_cached_per_article_and_corpus_version(concordance, monkeypatch):
+    corpus = make_corpus(20)
+    versions = []
+    original = concordance._corpus_version
+    monkeypatch.setattr(concordance, "_corpus_version", lambda norms: versions.append(1) or original(norms))
+
+    first = concordance.find_related_norms("viáticos", "Ley 1", corpus)
+    assert concordance.find_related_norms("viáticos", "Ley 1", corpus) == first
+    assert concordance.find_related_norms("gastos de viaje", "Ley 1", corpus)
+    assert concordance.stats["result_cache_hits"] == 1
+    # La versión se calcula al cargar el corpus, no en cada consulta
+    assert len(versions) == 1
+
+    corpus[0] = {**corpus[0], "content": "modifica y deroga"}
+    concordance.invalidate_corpus(corpus)
+    concordance.find_related_norms("viáticos", "Ley 1", corpus)
+    assert len(versions) == 2
+    assert concordance.stats["result_cache_hits"] == 1
+    assert concordance.stats["corpus_indexed"] == 2
+
+
+def test_graph_build_indexes_the_corpus_once(concordance, monkeypatch):
+    corpus = make_corpus(30)
+    versions = []
+    original = concordance._corpus_version
+    monkeypatch.setattr(concordance, "_corpus_version", lambda norms: versions.append(1) or original(norms))
+
+    graph = concordance.build_normative_graph(corpus, max_related=2)
+    assert len(versions) == 1 and concordance.stats["corpus_indexed"] == 1
+    expected = [m.norm_id for m in concordance.find_related_norms(corpus[0]["content"], corpus[0]["name"], corpus, 3)
+                if m.norm_id != corpus[0]["id"]][:2]
+    assert [target for target, _, _ in graph.neighbors(corpus[0]["id"])][:2] == expected
+
+
+def test_norms_from_chunks_groups_by_source_document():
+    chunks = [
+        {"id": 1, "texto": "Escala de viáticos", "metadatos": {"source": "Directiva 011-2020"}},
+        {"id": 2, "texto": "Rendición de cuentas", "metadatos": {"source": "Directiva 011-2020"}},
+        {"id": 3, "texto": "Monto máximo", "source": "DS 007-2013-EF", "validity_status": "derogada"},
+        {"id": 4, "texto": "Sin fuente"},
+    ]
+    norms = norms_from_chunks(chunks)
+    assert [norm["id"] for norm in norms] == ["Directiva 011-2020", "DS 007-2013-EF"]
+    assert norms[0]["content"] == "Escala de viáticos\nRendición de cuentas"
+    assert norms[1]["status"] == "derogada"
@@ -0,0 +1,74 @@
+"""
+Tests del grafo normativo compacto (CSR, union-find, caminos mínimos)
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.core.graph.normative_graph import NormativeGraph
+
+
+def make_graph():
+    graph = NormativeGraph()
+    graph.add_edge("ley_27619", "ds_007_2013", "hierarchical_inferior", weight=1.0, kind="norm")
+    graph.add_edge("ds_007_2013", "directiva_001", "hierarchical_inferior", weight=1.0, kind="norm")
+    graph.add_edge("ley_27619", "directiva_001", "thematic", weight=5.0, kind="norm")
+    graph.add_edge("directiva_001", "rm_045", "temporal", weight=0.5, kind="norm")
+    graph.add_node("tesis_tc", kind="norm")
+    return graph
+
+
+def test_k_hop_and_relation_filters():
+    graph = make_graph()
+    assert graph.k_hop("ley_27619", k=1) == {"ds_007_2013": 1, "directiva_001": 1}
+    assert graph.k_hop("ley_27619", k=3) == {"ds_007_2013": 1, "directiva_001": 1, "rm_045": 2}
+    assert graph.k_hop("ley_27619", k=3, relation_types=["hierarchical_inferior"]) == \
+        {"ds_007_2013": 1, "directiva_001": 2}
+    assert graph.neighbors("directiva_001") == [("rm_045", "temporal", 0.5)]
+
+
+def test_weighted_shortest_path_and_components():
+    graph = make_graph()
+    path, cost = graph.shortest_path("ley_27619", "rm_045")
+    assert path == ["ley_27619", "ds_007_2013", "directiva_001", "rm_045"] and cost == 2.5
+    assert graph.shortest_path("rm_045", "ley_27619") == ([], float("inf"))
+
+    assert graph.connected("ley_27619", "rm_045") and not graph.connected("ley_27619", "tesis_tc")
+    assert [len(component) for component in graph.components()] == [4, 1]
+
+    graph.remove_edges("directiva_001")
+    assert not graph.connected("ley_27619", "rm_045")
+    assert graph.k_hop("ley_27619", k=3) == {"ds_007_2013": 1, "directiva_001": 1}
+
+
+def test_semantic_memory_uses_graph():
+    pytest.importorskip("sentence_transformers")  # src.core.memory lo requiere al importar
+    from src.core.memory.semantic_memory import SemanticMemoryManager
+
+    memory = SemanticMemoryManager(graph=NormativeGraph())
+    memory.add_concept("viáticos", "Asignación por comisión", ["pasajes", "alimentación"])
+    memory.add_concept("pasajes", "Traslado", ["tarifa"])
+    memory.add_concept("licencia", "Permiso", [])
+
+    assert memory.get_related_concepts("viáticos", max_depth=1) == ["pasajes", "alimentación"]
+    assert memory.get_related_concepts("viáticos") == ["pasajes", "alimentación", "tarifa"]
+    # Cluster = concepto + relacionados directos (no la componente transitiva)
+    assert list(memory.find_semantic_clusters().values()) == [{"viáticos", "pasajes", "alimentación"}]
+    assert memory.find_semantic_clusters(min_cluster_size=3) == {}
+
+    memory.add_relation("licencia", "tarifa", "regulates", strength=0.5)
+    assert memory.get_concept_path("licencia", "tarifa") == ["licencia", "tarifa"]
+
+
+def test_semantic_memory_managers_do_not_share_edges():
+    pytest.importorskip("sentence_transformers")
+    from src.core.memory.semantic_memory import SemanticMemoryManager
+
+    first, second = SemanticMemoryManager(), SemanticMemoryManager()
+    first.add_concept("viáticos", "Asignación", ["pasajes"])
+    second.add_concept("viáticos", "Asignación", ["alimentación"])
+    assert first.get_related_concepts("viáticos") == ["pasajes"]
+    assert second.get_related_concepts("viáticos") == ["alimentación"]
+
+    shared = NormativeGraph()
+    assert SemanticMemoryManager(graph=shared).graph is shared
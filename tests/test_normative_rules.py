@@ -0,0 +1,56 @@
+"""
+Tests del motor de reglas compilado y la validación masiva de rendiciones
+"""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("yaml")
+
+from src.rules.normative_rules import NormativeRulesEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return NormativeRulesEngine()
+
+
+def random_reports(engine, count, seed=3):
+    rng = random.Random(seed)
+    reports = []
+    for i in range(count):
+        location = rng.choice(["lima", "regiones", "cusco"])
+        concepts = []
+        for _ in range(rng.randint(0, 7)):
+            numeral = rng.choice(engine.compiled.numerals)
+            tariff = engine.catalog["numerals"][numeral]["ubicacion"].get(location, {}).get("tarifa", 10.0)
+            concepts.append({"numeral": numeral, "amount": tariff if rng.random() > 0.2 else 12.0})
+        reports.append({"id": i, "location": location, "concepts": concepts})
+    return reports
+
+
+def test_bulk_validation_matches_single_evaluation(engine):
+    reports = random_reports(engine, 400)
+    results = engine.validate_reports(reports, chunk_size=64)
+    assert [result.report_id for result in results] == list(range(400))
+    for report, result in zip(reports, results):
+        expected = engine.evaluate_concepts(report["concepts"], report["location"])
+        assert (result.valid, result.violations, result.warnings) == \
+            (expected.valid, expected.violations, expected.warnings)
+        assert result.total_amount == pytest.approx(expected.total_amount)
+
+
+def test_daily_limits_apply_per_date(engine):
+    report = {"id": "R-1", "location": "lima", "concepts": [
+        {"numeral": "8.4.17.3", "amount": 45.0, "date": "2024-03-01"},
+        {"numeral": "8.4.17.3", "amount": 45.0, "date": "2024-03-02"},
+        {"numeral": "8.4.17.1", "amount": 35.0, "date": "2024-03-02"},
+        {"numeral": "9.9.9", "amount": 1.0, "date": "2024-03-02"},
+    ]}
+    [result] = engine.validate_reports([report])
+    assert result.days == 2 and result.total_amount == 90.0
+    assert result.violations == [
+        "2024-03-02: 8.4.17.1: No procede en lima: No procede en Lima",
+        "2024-03-02: 9.9.9: Numeral 9.9.9 no definido en catálogo",
+    ]
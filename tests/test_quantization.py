@@ -0,0 +1,33 @@
+"""
+Tests de la selección de precisión por modelo y la cuantización int8
+"""
+import pytest
+
+from src.core.performance import quantization
+from src.core.performance.quantization import apply_precision, resolve_precision, set_model_precision
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch):
+    monkeypatch.setattr(quantization, "_model_precision", {})
+    monkeypatch.delenv("MINEDU_INT8_MODELS", raising=False)
+
+
+def test_precision_resolution_order(monkeypatch):
+    assert resolve_precision("modelo-a") == "fp32"
+    monkeypatch.setenv("MINEDU_INT8_MODELS", "modelo-a, modelo-b")
+    assert resolve_precision("modelo-a") == "int8"
+    set_model_precision("modelo-a", "fp32")
+    assert resolve_precision("modelo-a") == "fp32"
+    assert resolve_precision("modelo-a", "int8") == "int8"
+    with pytest.raises(ValueError):
+        set_model_precision("modelo-a", "fp16")
+
+
+def test_int8_quantizes_linear_layers_on_cpu_only():
+    torch = pytest.importorskip("torch")
+    model = torch.nn.Sequential(torch.nn.Linear(8, 8), torch.nn.ReLU(), torch.nn.Linear(8, 2))
+    assert apply_precision(model, "modelo", "int8", "cuda:0") == "fp32"
+    assert apply_precision(model, "modelo", "int8") == "int8"
+    assert not any(type(m) is torch.nn.Linear for m in model.modules())
+    assert model(torch.randn(3, 8)).shape == (3, 2)
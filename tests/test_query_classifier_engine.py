@@ -0,0 +1,88 @@
+"""
+Tests del motor de patrones del clasificador: mismos resultados que el escaneo keyword a keyword
+"""
+import random
+import re
+
+from src.core.agents.pattern_matcher import AhoCorasickAutomaton, CompiledPatternSet, required_literals
+from src.core.agents.query_classifier import QueryClassifierAgent
+
+
+WORDS = [
+    "monto", "máximo", "viático", "s/", "320", "cuánto", "es", "ley", "n°", "27444", "artículo", "5",
+    "base", "legal", "cómo", "solicitar", "presentar", "documentos", "requisitos", "antes", "de",
+    "año", "2019", "cambio", "normativa", "comparar", "entre", "diferencia", "y", "además", "también",
+    "decreto", "Directiva", "procedimiento", "para", "pasos", "a", "seguir", "lima", "provincia"
+]
+
+
+def reference_type_scores(agent, query_lower):
+    scores = {}
+    for query_type, data in agent.classification_patterns.items():
+        keywords_found = sum(1 for keyword in data["keywords"] if keyword in query_lower)
+        patterns_found = sum(1 for pattern in data["patterns"] if re.search(pattern, query_lower))
+        scores[query_type] = (keywords_found / len(data["keywords"])) * 0.7 + (patterns_found / len(data["patterns"])) * 0.3
+    return scores
+
+
+def reference_entities(agent, query):
+    entities = {}
+    for entity_type, extractor in agent.entity_extractors.items():
+        matches = re.findall(extractor["pattern"], query, re.IGNORECASE)
+        if matches:
+            entities[entity_type] = {"values": matches, "type": extractor["type"], "count": len(matches)}
+    return entities
+
+
+def reference_complexity(agent, query_lower, entities):
+    indicators = ["y", "además", "también", "comparar", "diferencia", "entre"]
+    high_scores = [score for score in reference_type_scores(agent, query_lower).values() if score > 0.3]
+    return sum([
+        min(len(query_lower.split()) / 20, 1.0),
+        min(sum(len(entity["values"]) for entity in entities.values()) / 5, 1.0),
+        min(sum(1 for indicator in indicators if indicator in query_lower) / 3, 1.0),
+        min(len(high_scores) / 3, 1.0)
+    ]) / 4
+
+
+def test_automaton_matches_substring_semantics():
+    rng = random.Random(7)
+    keywords = ["he", "she", "his", "hers", "a", "aa", "ab", "bab", "viático", "por día", "día"]
+    automaton = AhoCorasickAutomaton(keywords)
+    for _ in range(500):
+        text = "".join(rng.choice("hersabvitco dí") for _ in range(rng.randint(0, 30)))
+        assert automaton.find(text) == {kw for kw in keywords if kw in text}
+
+
+def test_required_literals_gate_patterns():
+    assert set(required_literals(r"(?:monto|precio|costo)\s+(?:máximo|mínimo)")) in (
+        {"monto", "precio", "costo"}, {"máximo", "mínimo"}
+    )
+    assert required_literals(r"(?:año\s+)?(\d{4})") is None
+    assert required_literals(r"base", re.IGNORECASE) is None
+
+    matcher = CompiledPatternSet(patterns={"g": [r"lima|provincia", r"\d+ días", r"s/\s*\d+"]})
+    assert matcher.scan("viaje a provincia por 3 días")[1] == {"g": [0, 1]}
+    assert matcher.scan("monto s/ 320")[1] == {"g": [2]}
+
+
+def test_classifier_matches_reference_scan():
+    agent = QueryClassifierAgent()
+    rng = random.Random(13)
+    queries = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) for _ in range(400)]
+
+    for query in queries:
+        query_lower = query.lower()
+        assert agent._calculate_type_scores(query_lower) == reference_type_scores(agent, query_lower)
+        assert agent._extract_entities(query) == reference_entities(agent, query)
+
+    results = agent.classify_batch(queries + queries[:50])
+    assert len(results) == 450
+    for query, result in zip(queries, results):
+        scores = reference_type_scores(agent, query.lower())
+        assert result.query_type == max(scores.items(), key=lambda x: x[1])[0]
+        assert result.complexity_score == reference_complexity(agent, query.lower(), reference_entities(agent, query))
+
+    summary = agent.summarize_batch(results)
+    assert summary["total_queries"] == 450
+    assert sum(summary["by_type"].values()) == 450
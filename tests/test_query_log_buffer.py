@@ -0,0 +1,102 @@
+"""
+Tests del buffer write-behind de QueryLog: lotes, drenado al apagar y desborde
+"""
+import asyncio
+from uuid import uuid4
+import warnings
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("passlib")
+
+with warnings.catch_warnings():
+    # models.DocumentChunk declara un atributo 'metadata' (aviso de SQLAlchemy, error en versiones 2.0.x)
+    warnings.simplefilter("ignore")
+    try:
+        from backend.src.core.database import query_log_buffer as buffer_module
+    except Exception as e:
+        pytest.skip(f"modelos de base de datos no importables: {e}", allow_module_level=True)
+QueryLogBuffer = buffer_module.QueryLogBuffer
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    written = []
+
+    class FakeRepository:
+        def __init__(self, session):
+            pass
+
+        async def create_query_logs_bulk(self, rows):
+            written.append(list(rows))
+            return len(rows)
+
+    monkeypatch.setattr(buffer_module, "QueryLogRepository", FakeRepository)
+    return written
+
+
+def add_logs(buffer, count):
+    return [buffer.add(uuid4(), f"consulta {i}", "respuesta", f"trace-{i}", "hybrid", 0.1, 0.8)
+            for i in range(count)]
+
+
+def test_flush_writes_in_batches(batches):
+    buffer = QueryLogBuffer(session_factory=lambda: FakeSession(), batch_size=4)
+    add_logs(buffer, 10)
+    assert asyncio.run(buffer.flush()) == 10
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert buffer.get_stats()["batches"] == 3 and buffer.get_stats()["pending"] == 0
+
+
+def test_stop_drains_pending_logs(batches):
+    async def run():
+        buffer = QueryLogBuffer(session_factory=lambda: FakeSession(), batch_size=100, flush_interval=60)
+        buffer.start()
+        add_logs(buffer, 7)
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(run())
+    assert sum(len(batch) for batch in batches) == 7
+    assert not buffer.get_stats()["running"]
+
+
+def test_overflow_drops_and_counts(batches):
+    buffer = QueryLogBuffer(session_factory=lambda: FakeSession(), max_size=5)
+    assert add_logs(buffer, 8) == [True] * 5 + [False] * 3
+    assert buffer.get_stats()["dropped"] == 3
+    assert asyncio.run(buffer.flush()) == 5
+
+
+def test_unknown_and_anonymous_users_are_stored_without_user_id(batches):
+    known_id = uuid4()
+    queries = []
+
+    class UsersSession(FakeSession):
+        async def execute(self, stmt):
+            queries.append(stmt)
+
+            class Result:
+                def all(self):
+                    return [("consultor", known_id)]
+            return Result()
+
+    buffer = QueryLogBuffer(session_factory=lambda: UsersSession())
+    for user in ("consultor", "admin", None):
+        buffer.add(user, "consulta", "respuesta", f"trace-{user}", "hybrid", 0.1, 0.8)
+
+    assert asyncio.run(buffer.flush()) == 3
+    assert [row["user_id"] for row in batches[0]] == [known_id, None, None]
+    assert len(queries) == 1 and buffer.get_stats()["unresolved_users"] == 1
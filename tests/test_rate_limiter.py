@@ -0,0 +1,51 @@
+"""
+Tests del rate limiter de ventana deslizante
+"""
+from src.core.security.rate_limiter import InMemoryRateLimitBackend, RateLimiter
+
+
+WINDOWS = [("minute", 60, 3, 300), ("hour", 3600, 5, 3600)]
+
+
+def test_minute_limit_blocks_user():
+    backend = InMemoryRateLimitBackend()
+    now = 1_000_020.0
+    for _ in range(3):
+        assert backend.check("u1", WINDOWS, now)[0]
+    allowed, index, remaining = backend.check("u1", WINDOWS, now)
+    assert not allowed and index == 0 and remaining == 300
+    # Bloqueado aunque la ventana haya avanzado
+    allowed, index, _ = backend.check("u1", WINDOWS, now + 120)
+    assert not allowed and index == -2
+
+
+def test_sliding_window_weights_previous_window():
+    backend = InMemoryRateLimitBackend()
+    windows = [("minute", 60, 4, 0)]
+    start = 6000.0  # inicio exacto de una ventana
+    for _ in range(4):
+        assert backend.check("u2", windows, start + 1)[0]
+    # A mitad de la siguiente ventana la anterior pesa 50% → 2 estimadas
+    assert backend.check("u2", windows, start + 90)[0]
+    assert backend.check("u2", windows, start + 90)[0]
+    assert not backend.check("u2", windows, start + 90)[0]
+
+
+def test_users_are_independent_and_reset():
+    limiter = RateLimiter(windows=WINDOWS)
+    for _ in range(3):
+        assert limiter.check_rate_limit("10.0.0.1")[0]
+    allowed, message = limiter.check_rate_limit("10.0.0.1")
+    assert not allowed and "minuto" in message
+    assert limiter.check_rate_limit("10.0.0.2")[0]
+
+    limiter.reset_user_limits("10.0.0.1")
+    assert limiter.check_rate_limit("10.0.0.1")[0]
+    assert limiter.get_user_stats("10.0.0.1")["requests_last_minute"] == 1
+
+
+def test_state_size_is_fixed_per_user():
+    backend = InMemoryRateLimitBackend()
+    for i in range(50):
+        backend.check("u3", WINDOWS, 1000.0 + i * 30)
+    assert len(backend._state["u3"]) == 3 * len(WINDOWS)
@@ -0,0 +1,58 @@
+"""
+Tests del caché de resultados de búsqueda de RedisManager acotado por generación del índice
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("redis")
+
+from src.core.cache import redis_manager as redis_module
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = redis_module.RedisManager.__new__(redis_module.RedisManager)
+    manager._redis_client = FakeRedis()
+    monkeypatch.setattr(redis_module, "redis_manager", manager)
+    return manager
+
+
+def test_search_key_is_scoped_by_generation(manager):
+    key = manager._generate_search_key("Monto de Viáticos ", "hybrid", "gen-1")
+    assert key == manager._generate_search_key("monto de viáticos", "hybrid", "gen-1")
+    assert key != manager._generate_search_key("monto de viáticos", "hybrid", "gen-2")
+    assert ":default:" in manager._generate_search_key("monto de viáticos", "hybrid")
+
+    manager.cache_search_result("monto", "hybrid", [{"id": 1}], generation="gen-1")
+    assert manager.get_cached_search_result("monto", "hybrid", "gen-1")["results"] == [{"id": 1}]
+    assert manager.get_cached_search_result("monto", "hybrid", "gen-2") is None
+
+
+def test_decorator_misses_after_generation_change(manager):
+    calls = []
+    generation = {"id": "gen-1"}
+
+    @redis_module.cache_search_results(generation=lambda: generation["id"])
+    async def search(query, method="hybrid"):
+        calls.append(query)
+        return [{"query": query, "generation": generation["id"]}]
+
+    assert asyncio.run(search("monto de viáticos")) == asyncio.run(search("monto de viáticos"))
+    assert len(calls) == 1
+
+    generation["id"] = "gen-2"
+    assert asyncio.run(search("monto de viáticos"))[0]["generation"] == "gen-2"
+    assert len(calls) == 2
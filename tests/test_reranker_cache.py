@@ -0,0 +1,72 @@
+"""
+Tests de la caché de scores y la política de cascada del reranking
+"""
+import pytest
+
+from src.ai.reranking.score_cache import (
+    CrossEncoderScoreCache,
+    plan_cascade,
+    score_with_cache,
+    truncate_tokens
+)
+
+
+def test_cache_reuses_scores_for_normalized_query():
+    cache = CrossEncoderScoreCache(max_entries=10)
+    calls = []
+
+    def predict(pairs):
+        calls.append(pairs)
+        return [float(len(text)) for _, text in pairs]
+
+    texts = ["viáticos nacionales", "", "rendición de cuentas"]
+    scores, predicted = score_with_cache(cache, "modelo", "Monto de viáticos", texts, predict)
+    assert scores == [19.0, None, 20.0] and predicted == 2
+    # El modelo ve la misma forma de la consulta que la clave de caché
+    assert {query for query, _ in calls[0]} == {"monto de viáticos"}
+
+    scores, predicted = score_with_cache(cache, "modelo", "  monto DE   viáticos ", texts, predict)
+    assert scores == [19.0, None, 20.0] and predicted == 0
+    assert len(calls) == 1
+    assert cache.get_stats()["cache_hits"] == 2
+
+    # Otro modelo no comparte scores
+    assert score_with_cache(cache, "otro", "monto de viáticos", texts, predict)[1] == 2
+
+
+def test_cache_is_bounded_lru():
+    cache = CrossEncoderScoreCache(max_entries=2)
+    _, _, keys = cache.lookup("m", "q", ["a", "b", "c"])
+    cache.store(keys[:2], [1.0, 2.0])
+    cache.lookup("m", "q", ["a"])
+    cache.store(keys[2:], [3.0])
+    found, missing, _ = cache.lookup("m", "q", ["a", "b", "c"])
+    assert found == {0: 1.0, 2: 3.0} and missing == [1]
+
+
+def test_cascade_skips_decisive_margin_and_limits_window():
+    assert plan_cascade([10.0, 4.0, 3.0], 0.3, 20) == (True, 0)
+    assert plan_cascade([10.0, 9.5] + [1.0] * 40, 0.3, 20) == (False, 20)
+    assert plan_cascade([0.5], 0.3, 20) == (True, 1)
+    assert truncate_tokens("uno dos tres cuatro", 2) == "uno dos"
+    assert truncate_tokens("uno dos", None) == "uno dos"
+
+
+def test_threshold_applies_to_every_document_even_when_cascade_would_skip(monkeypatch):
+    pytest.importorskip("torch")
+    pytest.importorskip("sentence_transformers")
+    from src.ai.reranking.cross_encoder import NeuralReranker
+
+    class FakeCrossEncoder:
+        def predict(self, pairs, batch_size=16, show_progress_bar=False):
+            return [1.0 if "viáticos" in text else -1.0 for _, text in pairs]
+
+    monkeypatch.setattr(NeuralReranker, "_load_model", lambda self: setattr(self, "model", FakeCrossEncoder()))
+    reranker = NeuralReranker(device="cpu", rerank_window=1)
+    # Margen decisivo: sin umbral la cascada omite el modelo
+    documents = [{"text": "pasajes aéreos", "score": 10.0}, {"text": "viáticos", "score": 1.0},
+                 {"text": "", "score": 0.5}]
+    assert [doc["reranker_score"] for doc in reranker.rerank("Viáticos", documents)] == [None, None, None]
+
+    kept = reranker.rerank("Viáticos", documents, score_threshold=0.0)
+    assert [(doc["text"], doc["reranker_score"]) for doc in kept] == [("viáticos", 1.0)]
@@ -0,0 +1,50 @@
+"""
+Tests de métricas y detección de regresiones del benchmark de retrieval
+"""
+from src.core.performance.retrieval_benchmark import (
+    compare_with_baseline,
+    load_ground_truth,
+    load_queries,
+    percentile,
+    recall_at_k,
+    reciprocal_rank
+)
+
+
+CASE = {"query": "monto máximo", "relevant_ids": ["chunk_id_7"], "entities": ["S/ 320", "S/ 380"]}
+
+
+def _report(p95, recall, mrr):
+    return {"results": {"bm25": {"latency_ms": {"p95": p95}, "quality": {"recall@5": recall, "mrr": mrr, "cases": 5}}}}
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4], 0.5) == 2.5
+    assert percentile([5], 0.99) == 5
+    assert percentile([], 0.95) == 0.0
+
+
+def test_recall_and_mrr_use_ids_and_entities():
+    results = [
+        {"texto": "Sin relación", "index": 1},
+        {"texto": "El tope es S/ 320 por día", "index": 3},
+        {"texto": "Otro", "id": 7}
+    ]
+    assert recall_at_k(results, CASE, 5) == 2 / 3
+    assert recall_at_k(results, CASE, 1) == 0.0
+    assert reciprocal_rank(results, CASE, 5) == 0.5
+
+
+def test_compare_flags_latency_and_quality_regressions():
+    baseline = _report(10.0, 0.60, 0.50)
+    assert compare_with_baseline(_report(11.0, 0.60, 0.50), baseline) == []
+    assert len(compare_with_baseline(_report(15.0, 0.60, 0.50), baseline)) == 1
+    assert len(compare_with_baseline(_report(10.0, 0.50, 0.40), baseline)) == 2
+    # Variaciones menores al umbral absoluto no cuentan
+    assert compare_with_baseline(_report(0.9, 0.6, 0.5), _report(0.5, 0.6, 0.5)) == []
+
+
+def test_evaluation_sets_load():
+    assert len(load_queries()) > 20
+    cases = load_ground_truth()
+    assert cases and all(case["entities"] for case in cases)
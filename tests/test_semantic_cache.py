@@ -0,0 +1,58 @@
+"""
+Tests del cache semántico de consultas
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.core.cache.semantic_cache import SemanticCache  # noqa: E402
+
+# Embeddings de juguete: consultas parafraseadas comparten dirección
+VECTORS = {
+    "¿cuánto es el viático diario?": [1.0, 0.0, 0.0],
+    "monto máximo de viáticos por día": [0.98, 0.05, 0.0],
+    "plazo de rendición de cuentas": [0.0, 1.0, 0.0],
+    "viático por 3 días": [0.0, 0.0, 1.0],
+    "viático por 5 días": [0.0, 0.0, 1.0],
+}
+
+
+def make_cache(**options):
+    return SemanticCache(lambda query: VECTORS[query], **options)
+
+
+def test_paraphrase_hits_and_generation_invalidates():
+    cache = make_cache()
+    cache.put("¿cuánto es el viático diario?", [{"texto": "S/ 320.00"}], generation="g1")
+
+    assert cache.get("monto máximo de viáticos por día", generation="g1") == [{"texto": "S/ 320.00"}]
+    assert cache.get("plazo de rendición de cuentas", generation="g1") is None
+    assert cache.get("monto máximo de viáticos por día", namespace="otro", generation="g1") is None
+    assert cache.get("monto máximo de viáticos por día", generation="g2") is None
+    # La entrada de otra generación se descarta
+    assert cache.get_stats()["entries"] == 0
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_numbers_must_match_and_size_eviction():
+    cache = make_cache(max_entries=2)
+    cache.put("viático por 3 días", "tres")
+    assert cache.get("viático por 5 días") is None
+    cache.put("viático por 5 días", "cinco")
+    cache.put("plazo de rendición de cuentas", "plazo")
+    stats = cache.get_stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert cache.get("viático por 3 días") is None
+    assert cache.get("viático por 5 días") == "cinco"
+
+
+def test_ttl_expires_entries(monkeypatch):
+    import src.core.cache.semantic_cache as module
+
+    now = [100.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    cache = make_cache(ttl_seconds=10)
+    cache.put("plazo de rendición de cuentas", "plazo")
+    now[0] += 11
+    assert cache.get("plazo de rendición de cuentas") is None
+    assert cache.get_stats()["expired"] == 1
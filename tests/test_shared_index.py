@@ -0,0 +1,71 @@
+"""
+Tests del layout plano de índices (copy-on-write) y del reporte de memoria
+"""
+import os
+import random
+
+import pytest
+
+from src.core.monitoring.memory_report import memory_report, process_memory
+
+WORDS = ["viático", "monto", "máximo", "lima", "provincia", "declaración", "jurada", "directiva", "días", "s/"]
+
+
+def make_chunks(count=60, seed=3):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"chunk_{i}",
+            "texto": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40))),
+            "titulo": f"Sección {i}",
+            "metadatos": {"page": i % 7, "source": "directiva.pdf"}
+        }
+        for i in range(count)
+    ]
+
+
+def test_flat_chunk_store_roundtrip(tmp_path):
+    pytest.importorskip("numpy")
+    from src.core.performance.shared_index import FlatChunkStore, load_arrays, save_arrays
+
+    chunks = make_chunks()
+    store = FlatChunkStore.from_chunks(chunks)
+    assert len(store) == len(chunks)
+    assert list(store) == chunks
+    assert store[-1] == chunks[-1]
+
+    save_arrays(tmp_path, store.to_arrays())
+    mapped = FlatChunkStore.from_arrays(load_arrays(tmp_path, ["data", "offsets"], mmap=True))
+    assert mapped[5] == chunks[5]
+
+
+def test_csr_postings_match_bm25okapi(tmp_path):
+    pytest.importorskip("numpy")
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    from src.core.performance.shared_index import CSRPostings, load_arrays, save_arrays
+
+    corpus = [chunk["texto"].split() for chunk in make_chunks(200)]
+    bm25 = rank_bm25.BM25Okapi(corpus)
+    postings = CSRPostings.from_bm25(bm25)
+
+    rng = random.Random(11)
+    for _ in range(50):
+        query = [rng.choice(WORDS + ["inexistente"]) for _ in range(rng.randint(1, 5))]
+        assert postings.get_scores(query).tolist() == bm25.get_scores(query).tolist()
+
+    arrays = postings.to_arrays()
+    save_arrays(tmp_path, arrays)
+    mapped = CSRPostings.from_arrays(load_arrays(tmp_path, list(arrays)))
+    assert mapped.get_scores(["monto", "lima"]).tolist() == postings.get_scores(["monto", "lima"]).tolist()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup") and not os.path.exists("/proc/self/smaps"),
+                    reason="requiere /proc (Linux)")
+def test_memory_report_splits_private_and_shared():
+    own = process_memory(os.getpid())
+    assert own["uss_kb"] == own["private_clean_kb"] + own["private_dirty_kb"]
+    assert own["shared_kb"] == own["shared_clean_kb"] + own["shared_dirty_kb"]
+
+    report = memory_report()
+    assert report["master"]["pid"] == os.getpid()
+    assert report["totals"]["rss_kb"] >= report["master"]["rss_kb"]
@@ -0,0 +1,69 @@
+"""
+Tests del índice invertido de SimpleRetriever: mismo ranking que el recorrido completo
+"""
+import json
+import random
+
+from backend.src.langchain_integration.vectorstores.simple_retriever import SimpleRetriever
+
+
+WORDS = [
+    "viático", "viáticos", "monto", "máximo", "diario", "de", "la", "a", "por", "día",
+    "rendición", "cuentas", "plazo", "hábiles", "declaración", "jurada", "ministro",
+    "S/", "320.00", "ñandú", "comisión", "servicio", "lima", "provincia", "días"
+]
+
+
+def brute_force_search(retriever, query, k):
+    query_words = retriever._normalize_text(query).split()
+    scored = [(doc, retriever._calculate_similarity(query_words, doc.page_content)) for doc in retriever.documents]
+    scored = [item for item in scored if item[1] > 0]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [doc for doc, _ in scored[:k]]
+
+
+def brute_force_keywords(retriever, keywords, k):
+    normalized = [retriever._normalize_text(kw) for kw in keywords]
+    scored = []
+    for doc in retriever.documents:
+        text = retriever._normalize_text(doc.page_content)
+        score = sum(text.count(kw) * len(kw) for kw in normalized)
+        if score > 0:
+            scored.append((doc, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [doc for doc, _ in scored[:k]]
+
+
+def test_index_matches_full_scan(tmp_path):
+    rng = random.Random(7)
+    chunks = [
+        {"id": i, "texto": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30)))}
+        for i in range(200)
+    ]
+    path = tmp_path / "chunks.json"
+    path.write_text(json.dumps(chunks, ensure_ascii=False), encoding="utf-8")
+    retriever = SimpleRetriever(str(path))
+
+    for _ in range(100):
+        query = " ".join(rng.choice(WORDS + ["viat", "ticos", "xyz"]) for _ in range(rng.randint(1, 5)))
+        assert retriever.simple_similarity_search(query, k=10) == brute_force_search(retriever, query, 10), query
+
+        keywords = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))] + ["de viaticos", "o de"]
+        assert retriever.search_by_keywords(keywords, k=10) == brute_force_keywords(retriever, keywords, 10), keywords
+
+
+def test_metadata_filter_matches_full_scan(tmp_path):
+    rng = random.Random(3)
+    chunks = [
+        {"id": i, "texto": "viático", "metadatos": {"type": rng.choice(["norma", "anexo"]), "page": rng.randint(0, 4)}}
+        for i in range(100)
+    ]
+    path = tmp_path / "chunks.json"
+    path.write_text(json.dumps(chunks), encoding="utf-8")
+    retriever = SimpleRetriever(str(path))
+
+    for metadata_filter in ({"type": "anexo"}, {"type": "norma", "page": 2}, {"page": 9}, {},
+                            {"original_chunk": chunks[5], "type": chunks[5]["metadatos"]["type"]}):
+        expected = [doc for doc in retriever.documents
+                    if all(key in doc.metadata and doc.metadata[key] == value for key, value in metadata_filter.items())]
+        assert retriever.get_documents_by_metadata(metadata_filter) == expected
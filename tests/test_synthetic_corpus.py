@@ -0,0 +1,42 @@
+"""
+Tests del generador de corpus sintéticos
+"""
+import json
+import re
+
+import pytest
+
+# El paquete data_pipeline importa los generadores de vectorstores
+pytest.importorskip("rank_bm25")
+pytest.importorskip("sentence_transformers")
+
+from src.data_pipeline.synthetic_corpus import SyntheticCorpusGenerator  # noqa: E402
+
+
+SEED_CHUNKS = [{
+    "texto": (
+        "El monto máximo diario para viáticos nacionales es de S/ 320.00 según la escala vigente. "
+        "Los viáticos deben ser solicitados con diez días hábiles de anticipación a la fecha del viaje."
+    )
+}]
+
+
+def test_chunks_are_deterministic_and_prefix_stable(tmp_path):
+    generator = SyntheticCorpusGenerator(SEED_CHUNKS, seed=7)
+    small = list(generator.iter_chunks(20))
+    large = list(SyntheticCorpusGenerator(SEED_CHUNKS, seed=7).iter_chunks(50))
+    assert small == large[:20]
+    assert small != list(SyntheticCorpusGenerator(SEED_CHUNKS, seed=8).iter_chunks(20))
+
+    path = generator.write(20, str(tmp_path / "chunks.json"))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == small
+
+
+def test_chunks_have_numerals_amounts_and_metadata():
+    chunk = SyntheticCorpusGenerator(SEED_CHUNKS).generate_chunk(3)
+    assert re.match(r"^\d+\.\d+(\.\d+)?\. ", chunk["texto"])
+    assert "S/" in chunk["texto"]
+    metadata = chunk["metadatos"]
+    assert {"norm_type", "norm_number", "publication_date"} <= set(metadata)
+    assert re.match(r"^\d{4}-\d{2}-\d{2}$", metadata["publication_date"])
@@ -0,0 +1,75 @@
+"""
+Tests del índice de intervalos de períodos legales y la vigencia de chunks
+"""
+from datetime import date, timedelta
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.core.calculations.temporal_legal import LegalPeriod, LegalPeriodIndex, TemporalLegalProcessor
+
+
+def linear_lookup(periods, target):
+    """Algoritmo anterior: primer período en orden de carga que cubre la fecha"""
+    for period in periods:
+        if period.start_date <= target and (period.end_date is None or target <= period.end_date):
+            return period
+    return max(periods, key=lambda p: p.start_date)
+
+
+def random_periods(rng, count):
+    periods = []
+    for i in range(count):
+        start = date(2000, 1, 1) + timedelta(days=rng.randrange(9000))
+        end = None if rng.random() < 0.3 else start + timedelta(days=rng.randrange(3000))
+        periods.append(LegalPeriod(start, end, f"R-{i}", "", []))
+    return periods
+
+
+def test_overlapping_periods_match_linear_scan():
+    rng = random.Random(11)
+    for _ in range(50):
+        periods = random_periods(rng, rng.randint(1, 8))
+        index = LegalPeriodIndex(periods)
+        dates = [date(1998, 1, 1) + timedelta(days=rng.randrange(12000)) for _ in range(100)]
+        dates += [p.start_date for p in periods] + [p.end_date + timedelta(days=1) for p in periods if p.end_date]
+        expected = [linear_lookup(periods, d) for d in dates]
+
+        assert [index.lookup(d) for d in dates] == expected
+        positions = index.lookup_many(np.array([d.toordinal() for d in dates]))
+        assert [periods[i] for i in positions] == expected
+
+        start, end = sorted(rng.sample(dates, 2))
+        overlapping = [p for p in periods if p.start_date <= end and (p.end_date is None or p.end_date >= start)]
+        assert sorted(p.regulation for p in index.overlapping(start, end)) == \
+            sorted(p.regulation for p in overlapping)
+
+
+def test_processor_bulk_and_context_detection():
+    processor = TemporalLegalProcessor()
+    dates = ["2020-06-01", date(2010, 3, 1), "1990-01-01"]
+    assert [p.regulation for p in processor.get_applicable_regulations(dates)] == \
+        [processor.get_applicable_regulation(date.fromisoformat(str(d))).regulation for d in dates]
+    assert [p.regulation for p in processor.get_periods_between("2012-06-01", "2013-02-01")] == \
+        ["Sistema Anterior", "DS-007-2013-EF"]
+
+    assert processor.detect_temporal_context("¿cuál es el viático por día?").confidence == 0.0
+    detected = processor.detect_temporal_context("viáticos el 15/03/2021")
+    assert detected.detected_date == date(2021, 3, 15) and detected.confidence == 0.95
+
+
+def test_chunk_validity_mask():
+    for module in ("sklearn", "rank_bm25", "sentence_transformers"):  # src.core.hybrid importa HybridSearch
+        pytest.importorskip(module)
+    from src.core.hybrid.chunk_validity import ChunkValidity
+
+    validity = ChunkValidity.from_chunks([
+        {"texto": "a", "metadatos": {"publication_date": "2015-01-01"}},
+        {"texto": "b", "valid_from": "2010-01-01", "valid_to": "2019-12-31"},
+        {"texto": "c", "metadatos": {}},
+    ])
+    assert validity.mask("2020-01-01").tolist() == [True, False, True]
+    assert validity.mask(date(2012, 1, 1)).tolist() == [False, True, True]
+    assert validity.is_valid(np.array([1, 7, -1]), "2020-01-01").tolist() == [False, True, True]